@@ -0,0 +1,93 @@
+"""
+Script to benchmark the cost of pronunciation guides.
+
+This script times batch character generation and reports how much of it
+goes to pronunciation guides.
+
+Each batch times its own pronounce() calls, so the overhead is measured
+against the rest of the same batch rather than by subtracting two noisy
+batch times. Every round seeds the random generator, and the median of the
+rounds is reported so one slow round doesn't decide the result.
+"""
+import gc
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.character import generate_characters
+from src.lib import wordplay
+
+
+def time_batch(count, seed):
+    """
+    Generate one seeded batch of characters.
+
+    Returns:
+        tuple: Total time and the time spent in pronounce(), in seconds
+    """
+    real_pronounce = wordplay.pronounce
+    spent = 0.0
+
+    def timed_pronounce(name):
+        nonlocal spent
+        start = time.perf_counter()
+        guide = real_pronounce(name)
+        spent += time.perf_counter() - start
+        return guide
+
+    random.seed(seed)
+    gc.collect()
+    wordplay.pronounce = timed_pronounce
+    try:
+        start = time.perf_counter()
+        generate_characters(count)
+        total = time.perf_counter() - start
+    finally:
+        wordplay.pronounce = real_pronounce
+    return total, spent
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark pronunciation guide overhead")
+    parser.add_argument("-n", "--num", type=int, default=2000, help="Characters per batch")
+    parser.add_argument("-r", "--repeats", type=int, default=15, help="Number of timed rounds")
+    parser.add_argument("--target", type=float, default=5.0,
+                        help="Largest acceptable overhead in percent (default: 5)")
+    args = parser.parse_args()
+
+    # Warm up: the hyphenation tables, the homeworld pool and the name data
+    # are loaded once per process, not per character
+    generate_characters(100)
+
+    totals = []
+    guides = []
+    overheads = []
+    for round_number in range(args.repeats):
+        total, spent = time_batch(args.num, round_number)
+        totals.append(total)
+        guides.append(spent)
+        # The timer calls are counted against the guides
+        overheads.append(spent / (total - spent) * 100)
+
+    overhead = statistics.median(overheads)
+    quartiles = statistics.quantiles(overheads, n=4)
+    print(f"Batch:         {statistics.median(totals):.3f}s for {args.num} characters (median)")
+    print(f"Pronunciation: {statistics.median(guides):.3f}s (median)")
+    print(f"Overhead:      {overhead:+.1f}% (median of {args.repeats} rounds, "
+          f"quartiles {quartiles[0]:+.1f}% to {quartiles[2]:+.1f}%)")
+
+    if overhead >= args.target:
+        print(f"Target of {args.target:g}% not met")
+        sys.exit(1)
+    print(f"Target of {args.target:g}% met")
+
+
+if __name__ == "__main__":
+    main()
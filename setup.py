@@ -23,6 +23,10 @@ setup(
         "Operating System :: OS Independent",
     ],
     python_requires=">=3.6",
+    extras_require={
+        "arrays": ["numpy>=1.17"],
+        "parquet": ["pyarrow>=10"],
+    },
     include_package_data=True,
     package_data={
         "ctchargen": [
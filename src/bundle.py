@@ -0,0 +1,501 @@
+"""
+Data bundle module for CTchargen.
+
+This module packs the static generation data (name lists, syllable rules,
+hyphenation tables and templates) into one read-only buffer. The buffer can be placed in shared memory so worker
+processes attach to a single copy instead of each reloading the sources,
+or written to a versioned cache file that is memory-mapped at startup.
+"""
+
+import os
+import json
+import mmap
+import random
+import struct
+from collections.abc import Sequence
+from typing import Dict, List, Any, Optional, Union
+
+from src import __version__
+from src.config import config
+
+# Bundle header: magic, format version and table of contents length
+BUNDLE_MAGIC = b'CTDB'
+BUNDLE_VERSION = 1
+BUNDLE_HEADER = struct.Struct('<4sHI')
+
+# Sections start on 8-byte boundaries so integer tables can be cast in place
+SECTION_ALIGNMENT = 8
+
+# File name of the cached bundle inside the cache directory
+BUNDLE_FILENAME = 'ctchargen.bundle'
+
+
+class PackedStrings(Sequence):
+    """
+    Read-only list of strings stored as an offsets array plus a UTF-8 blob.
+    """
+
+    def __init__(self, buffer: memoryview, count: int):
+        """
+        Initialize the list over a packed buffer.
+
+        Args:
+            buffer: Buffer holding count + 1 offsets followed by the blob
+            count: Number of strings
+        """
+        table_size = (count + 1) * 4
+        self.offsets = buffer[:table_size].cast('I')
+        self.blob = buffer[table_size:]
+
+    def __len__(self) -> int:
+        """Return the number of strings."""
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        """
+        Get a string by index.
+
+        Args:
+            index: Index of the string
+
+        Returns:
+            str: The decoded string
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("packed string index out of range")
+        return str(self.blob[self.offsets[index]:self.offsets[index + 1]], 'utf-8')
+
+    @staticmethod
+    def pack(strings: List[str]) -> bytes:
+        """
+        Pack strings into an offsets array and a UTF-8 blob.
+
+        Args:
+            strings: Strings to pack
+
+        Returns:
+            bytes: Packed strings
+        """
+        encoded = [s.encode('utf-8') for s in strings]
+        offsets = [0]
+        for item in encoded:
+            offsets.append(offsets[-1] + len(item))
+        return struct.pack(f'<{len(offsets)}I', *offsets) + b''.join(encoded)
+
+
+class DataBundle:
+    """
+    Class giving access to the sections of a packed data bundle.
+    """
+
+    def __init__(self, buffer: Union[bytes, memoryview], keepalive: Any = None):
+        """
+        Initialize the bundle over a buffer.
+
+        Sections are read as memoryviews into the buffer, so a shared or
+        memory-mapped buffer is never copied.
+
+        Args:
+            buffer: Bundle buffer, as produced by build_bundle()
+            keepalive: Object owning the buffer, kept alive with the bundle (optional)
+        """
+        self.buffer = memoryview(buffer)
+        self.keepalive = keepalive
+
+        magic, version, toc_length = BUNDLE_HEADER.unpack_from(self.buffer)
+        if magic != BUNDLE_MAGIC or version != BUNDLE_VERSION:
+            raise ValueError("Not a CTchargen data bundle, or an unsupported bundle version")
+
+        toc_start = BUNDLE_HEADER.size
+        self.toc = json.loads(bytes(self.buffer[toc_start:toc_start + toc_length]))
+        self.sections = self.toc['sections']
+
+    def raw(self, name: str) -> memoryview:
+        """
+        Get the raw bytes of a section.
+
+        Args:
+            name: Section name
+
+        Returns:
+            memoryview: Section contents
+        """
+        section = self.sections[name]
+        return self.buffer[section['offset']:section['offset'] + section['length']]
+
+    def json(self, name: str) -> Any:
+        """
+        Decode a JSON section.
+
+        Args:
+            name: Section name
+
+        Returns:
+            Any: Decoded data
+        """
+        return json.loads(bytes(self.raw(name)))
+
+    def strings(self, name: str) -> PackedStrings:
+        """
+        Get a packed string list section.
+
+        Args:
+            name: Section name
+
+        Returns:
+            PackedStrings: The strings, read in place
+        """
+        return PackedStrings(self.raw(name), self.sections[name]['count'])
+
+    def name_lists(self) -> Dict[str, PackedStrings]:
+        """
+        Get every name list in the bundle.
+
+        Returns:
+            Dict[str, PackedStrings]: Name lists keyed by file name
+        """
+        return {
+            name[len('names/'):]: self.strings(name)
+            for name in self.sections if name.startswith('names/')
+        }
+
+    def install(self) -> None:
+        """Make the generators read their static data from this bundle."""
+        # Imported here so loading a bundle doesn't import the generators it feeds
+        from src import renderer
+        from src.lib import namefilter, wordplay
+        from src.lib.hyphenate import hyphenator
+
+        for filename, names in self.name_lists().items():
+            namefilter.install_name_list(os.path.join(config.NAMES_DIR, filename), names)
+
+        if 'syllables' in self.sections:
+            wordplay.install_syllable_rules(self.sections['syllables']['source'], self.json('syllables'))
+
+        if 'hyphenation' in self.sections:
+            hyphenator.load_tables(self.raw('hyphenation'))
+
+        for name in self.sections:
+            if name.startswith('templates/'):
+                template_path = os.path.join(config.TEMPLATES_DIR, name[len('templates/'):])
+                renderer.install_template(template_path, str(self.raw(name), 'utf-8'))
+
+    def is_fresh(self) -> bool:
+        """
+        Check whether the bundle still matches its sources.
+
+        Returns:
+            bool: True if no source file or relevant setting changed since the build
+        """
+        return (self.toc.get('package_version') == __version__
+                and self.toc.get('settings') == bundle_settings()
+                and self.toc.get('sources') == source_fingerprint())
+
+
+def build_bundle() -> bytes:
+    """
+    Compile the static generation data into a bundle.
+
+    Returns:
+        bytes: The bundle
+    """
+    # Imported here so loading a bundle doesn't import the generators it feeds
+    from src.lib import namefilter, wordplay
+    from src.lib.hyphenate import hyphenator
+
+    sections = []
+
+    # Name lists, already filtered against the name blocklist
+    for name_path in data_files(config.NAMES_DIR, '.txt'):
+        names = namefilter.load_name_list(name_path)
+        sections.append((f'names/{os.path.basename(name_path)}', PackedStrings.pack(names), {'count': len(names)}))
+
+    # Syllable rules for phonetic names
+    data_file = wordplay.syllable_rules_file()
+    rules = wordplay.load_syllable_rules(data_file)
+    if rules is not None:
+        sections.append(('syllables', json.dumps(rules).encode('utf-8'), {'source': data_file}))
+
+    # Compiled hyphenation tables
+    sections.append(('hyphenation', hyphenator.dump_tables(), {}))
+
+    # Output templates
+    for template_path in data_files(config.TEMPLATES_DIR, '.template'):
+        with open(template_path, 'rb') as f:
+            sections.append((f'templates/{os.path.basename(template_path)}', f.read(), {}))
+
+    return pack_sections(sections, {
+        'package_version': __version__,
+        'settings': bundle_settings(),
+        'sources': source_fingerprint(),
+    })
+
+
+def data_files(directory: str, extension: str) -> List[str]:
+    """
+    List the data files with an extension in a directory.
+
+    A plain directory listing is used rather than glob, which compiles a
+    pattern on every call and is a noticeable part of checking a bundle
+    at startup.
+
+    Args:
+        directory: Directory to list
+        extension: File extension, e.g. ".txt"
+
+    Returns:
+        List[str]: Sorted file paths, empty if the directory is missing
+    """
+    try:
+        filenames = os.listdir(directory)
+    except OSError:
+        return []
+    return sorted(
+        os.path.join(directory, filename) for filename in filenames
+        if filename.endswith(extension) and not filename.startswith('.')
+    )
+
+
+def bundle_sources() -> List[str]:
+    """
+    List the files a bundle is compiled from.
+
+    Returns:
+        List[str]: Source file paths
+    """
+    # Imported here so checking a bundle's freshness doesn't load the word generator
+    from src.lib.wordplay import syllable_rules_file
+
+    sources = data_files(config.NAMES_DIR, '.txt')
+    sources += data_files(config.TEMPLATES_DIR, '.template')
+    sources.append(syllable_rules_file())
+
+    blocklist_file = config.get('name_generation', {}).get('blocklist_file')
+    if blocklist_file:
+        sources.append(blocklist_file)
+
+    sources.append(os.path.join(config.SRC_DIR, 'lib', 'hyphenate.py'))
+
+    return sources
+
+
+def source_fingerprint() -> Dict[str, List[int]]:
+    """
+    Fingerprint the bundle sources by modification time and size.
+
+    Returns:
+        Dict[str, List[int]]: [mtime_ns, size] per source path, [0, 0] if missing
+    """
+    fingerprint = {}
+    for path in bundle_sources():
+        try:
+            stat = os.stat(path)
+            fingerprint[path] = [stat.st_mtime_ns, stat.st_size]
+        except OSError:
+            fingerprint[path] = [0, 0]
+    return fingerprint
+
+
+def bundle_settings() -> Dict[str, Any]:
+    """
+    Get the settings that change what a bundle contains.
+
+    Returns:
+        Dict[str, Any]: Name generation settings
+    """
+    settings = config.get('name_generation', {})
+    return json.loads(json.dumps(settings, sort_keys=True))
+
+
+def bundle_path() -> str:
+    """
+    Get the path of the cached bundle file.
+
+    Returns:
+        str: Path inside the configured cache directory
+    """
+    return os.path.join(config.get('cache_dir', config.CACHE_DIR), BUNDLE_FILENAME)
+
+
+def write_bundle(path: Optional[str] = None) -> str:
+    """
+    Build the bundle and write it to the cache.
+
+    The file is replaced atomically, so readers never see a partial bundle.
+
+    Args:
+        path: Output path (optional, defaults to the cache directory)
+
+    Returns:
+        str: Path of the written bundle
+    """
+    path = path or bundle_path()
+    data = build_bundle()
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+    return path
+
+
+def load_bundle(path: Optional[str] = None) -> Optional[DataBundle]:
+    """
+    Memory-map the cached bundle if it is current.
+
+    Args:
+        path: Bundle path (optional, defaults to the cache directory)
+
+    Returns:
+        Optional[DataBundle]: The bundle, or None if it is missing, unreadable or stale
+    """
+    path = path or bundle_path()
+    try:
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        bundle = DataBundle(mapped, keepalive=mapped)
+    except (ValueError, struct.error, json.JSONDecodeError):
+        return None
+
+    return bundle if bundle.is_fresh() else None
+
+
+def use_cached_bundle(path: Optional[str] = None) -> bool:
+    """
+    Install the cached bundle, falling back to the sources if it is stale.
+
+    Args:
+        path: Bundle path (optional, defaults to the cache directory)
+
+    Returns:
+        bool: True if the cached bundle is in use
+    """
+    bundle = load_bundle(path)
+    if bundle is None:
+        return False
+    bundle.install()
+    return True
+
+
+def pack_sections(sections: List[tuple], extra: Optional[Dict[str, Any]] = None) -> bytes:
+    """
+    Lay out sections behind a header and table of contents.
+
+    Args:
+        sections: (name, payload, metadata) tuples
+        extra: Additional table of contents entries (optional)
+
+    Returns:
+        bytes: The bundle
+    """
+    def align(offset: int) -> int:
+        return offset + (-offset % SECTION_ALIGNMENT)
+
+    # The table of contents holds the section offsets, which depend on its
+    # own length, so lay it out until the length settles.
+    toc_length = 0
+    while True:
+        offset = align(BUNDLE_HEADER.size + toc_length)
+        toc = dict(extra or {})
+        toc['sections'] = {}
+        for name, payload, metadata in sections:
+            entry = dict(metadata)
+            entry.update({'offset': offset, 'length': len(payload)})
+            toc['sections'][name] = entry
+            offset = align(offset + len(payload))
+
+        toc_bytes = json.dumps(toc, sort_keys=True).encode('utf-8')
+        if len(toc_bytes) == toc_length:
+            break
+        toc_length = len(toc_bytes)
+
+    parts = [BUNDLE_HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, toc_length), toc_bytes]
+    position = BUNDLE_HEADER.size + toc_length
+    for name, payload, _ in sections:
+        padding = toc['sections'][name]['offset'] - position
+        parts.append(b'\0' * padding)
+        parts.append(payload)
+        position += padding + len(payload)
+
+    return b''.join(parts)
+
+
+class SharedBundle:
+    """
+    Context manager publishing a bundle in shared memory.
+
+    Example:
+        with SharedBundle() as shared:
+            pool = ProcessPoolExecutor(initializer=init_worker, initargs=(shared.name,))
+    """
+
+    def __init__(self, data: Optional[bytes] = None):
+        """
+        Initialize the shared bundle.
+
+        Args:
+            data: Bundle to publish (optional, built from the sources if omitted)
+        """
+        self.data = data
+        self.memory = None
+
+    @property
+    def name(self) -> str:
+        """Name of the shared memory block."""
+        return self.memory.name
+
+    def __enter__(self) -> 'SharedBundle':
+        from multiprocessing import shared_memory
+
+        data = self.data if self.data is not None else build_bundle()
+        self.memory = shared_memory.SharedMemory(create=True, size=len(data))
+        self.memory.buf[:len(data)] = data
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.memory.close()
+        self.memory.unlink()
+        self.memory = None
+
+
+def attach_shared(name: str) -> DataBundle:
+    """
+    Attach to a bundle published by SharedBundle.
+
+    Args:
+        name: Name of the shared memory block
+
+    Returns:
+        DataBundle: The bundle, read in place
+    """
+    from multiprocessing import shared_memory
+
+    memory = shared_memory.SharedMemory(name=name)
+    return DataBundle(memory.buf, keepalive=memory)
+
+
+# Bundle attached by this worker process
+_worker_bundle: Optional[DataBundle] = None
+
+
+def init_worker(name: str) -> None:
+    """
+    Process pool initializer attaching a worker to a shared bundle.
+
+    Args:
+        name: Name of the shared memory block
+    """
+    global _worker_bundle
+
+    # Forked workers inherit the parent's random state, so give each its own
+    random.seed()
+
+    _worker_bundle = attach_shared(name)
+    _worker_bundle.install()
@@ -516,19 +516,24 @@ def process_career_term(career: str, upp: Dict[str, int], current_rank: int,
     return True, has_commission, current_rank
 
 
-def generate_career_history(upp: Dict[str, int]) -> Tuple[str, int, int, bool]:
+def generate_career_history(upp: Dict[str, int], career: Optional[str] = None) -> Tuple[str, int, int, bool]:
     """
     Generate a complete career history for a character.
     
     Args:
         upp: Character's UPP
+        career: Career to serve in without an enlistment roll (optional,
+            tries random careers)
         
     Returns:
         Tuple[str, int, int, bool]: (career, rank, terms, died)
     """
+    if career is not None and career not in CAREERS:
+        raise ValueError(f"Unknown career: {career}")
+    
     # Try to enlist in a random career
     attempts = 0
-    career = ""
+    career = career or ""
     while not career and attempts < 6:
         attempts += 1
         potential_career = random.choice(list(CAREERS.keys()))
@@ -5,11 +5,12 @@ This module handles character generation for Classic Traveller.
 """
 
 import random
-from typing import Dict, List, Any, Optional, Tuple, Union
+from typing import Dict, Iterator, List, Any, Optional, Tuple, Union
 import os
 
 from src.lib import stellagama as sg
 from src.lib import wordplay
+from src.lib import namefilter
 from src.config import config
 from src.careers import (
     generate_career, 
@@ -23,6 +24,9 @@ from src.careers import (
     AGING_START_TERM
 )
 from src.psionics import generate_psionic_abilities
+from src.lib.homeworld import HomeworldPool, get_homeworld_pool
+from src.lib.worldgen import World
+
 
 
 class Character:
@@ -30,11 +34,20 @@ class Character:
     Class representing a Traveller character.
     """
     
-    def __init__(self):
-        """Initialize a new character with random characteristics."""
+    def __init__(self, homeworlds: Optional[HomeworldPool] = None, career: Optional[str] = None,
+                 homeworld: Optional[World] = None):
+        """
+        Initialize a new character with random characteristics.
+        
+        Args:
+            homeworlds: Pool to draw the homeworld from (optional, uses the active pool)
+            career: Career the character serves in (optional, random enlistment)
+            homeworld: The character's homeworld (optional, drawn from the pool)
+        """
         # Basic characteristics
         self.upp = self._generate_characteristics()
         self.name = ""
+        self.pronunciation = ""
         self.gender = self._generate_gender()
         self.age = 18
         self.race = self._generate_race()
@@ -64,10 +77,17 @@ class Character:
         self._generate_name()
         
         # Generate career and related attributes
-        self._generate_career_and_skills()
+        self._generate_career_and_skills(career)
         
         # Generate psionic abilities
         self._generate_psionic_abilities()
+        
+        # Draw a homeworld, shared with every other character from it
+        if homeworld is None:
+            if homeworlds is None:
+                homeworlds = get_homeworld_pool()
+            homeworld = homeworlds.draw()
+        self.homeworld = homeworld
     
     def _generate_characteristics(self) -> Dict[str, int]:
         """
@@ -113,30 +133,51 @@ class Character:
         return random.choice(config.get_races())
     
     def _generate_name(self) -> None:
-        """Generate a random name for the character."""
-        # Use phonetic name generation
+        """
+        Generate a random name for the character.
+        
+        A phonetic name falls back to the name lists, and a list name to a
+        phonetic name, when the name filter settings leave its source
+        nothing to choose from for this character.
+        
+        Raises:
+            NameFilterError: If the name filter settings allow no name at all
+        """
         if config.get('name_generation', {}).get('use_phonetic', True):
-            self.name = wordplay.create_word(None)
-            # Capitalize the first letter
-            self.name = self.name[0].upper() + self.name[1:]
+            generate, fallback = self._generate_phonetic_name, self._generate_list_name
         else:
-            # Use name lists based on gender
-            if self.gender == "Male":
-                name_file = os.path.join(config.NAMES_DIR, "malenames.txt")
-            else:
-                name_file = os.path.join(config.NAMES_DIR, "femalenames.txt")
-            
-            # Add a surname
-            surname_file = os.path.join(config.NAMES_DIR, "surnames.txt")
-            
+            generate, fallback = self._generate_list_name, self._generate_phonetic_name
+        
+        try:
+            generate()
+        except (FileNotFoundError, namefilter.NameFilterError):
             try:
-                first_name = sg.random_line(name_file)
-                surname = sg.random_line(surname_file)
-                self.name = f"{first_name} {surname}"
-            except FileNotFoundError:
-                # Fallback to phonetic name generation
-                self.name = wordplay.create_word(None)
-                self.name = self.name[0].upper() + self.name[1:]
+                fallback()
+            except (FileNotFoundError, namefilter.NameFilterError):
+                raise namefilter.NameFilterError("No name satisfies the name_generation filter settings")
+    
+    def _generate_list_name(self) -> None:
+        """Choose a first name and surname from the name lists."""
+        # Use name lists based on gender
+        if self.gender == "Male":
+            name_file = os.path.join(config.NAMES_DIR, "malenames.txt")
+        else:
+            name_file = os.path.join(config.NAMES_DIR, "femalenames.txt")
+        
+        # Add a surname
+        surname_file = os.path.join(config.NAMES_DIR, "surnames.txt")
+        
+        self.name = namefilter.random_name(name_file, surname_file)
+        self.pronunciation = wordplay.pronounce(self.name)
+
+    def _generate_phonetic_name(self) -> None:
+        """Generate a phonetic name and its pronunciation guide."""
+        self.name = wordplay.create_word(None)
+
+        # Capitalize the first letter
+        self.name = self.name[0].upper() + self.name[1:]
+        pronunciation = wordplay.wordplay.word_pronounced
+        self.pronunciation = pronunciation[0].upper() + pronunciation[1:]
     
     def add_skill(self, skill: str, level: int = 1) -> None:
         """
@@ -151,10 +192,10 @@ class Character:
         else:
             self.skills[skill] = level
     
-    def _generate_career_and_skills(self) -> None:
+    def _generate_career_and_skills(self, career: Optional[str] = None) -> None:
         """Generate a career, skills, and equipment for the character using Classic Traveller rules."""
         # Generate career history
-        self.career, self.rank, self.terms, self.died = generate_career_history(self.upp)
+        self.career, self.rank, self.terms, self.died = generate_career_history(self.upp, career)
         
         # Update age based on terms
         self.age = 18 + (self.terms * 4)
@@ -286,6 +327,7 @@ class Character:
         """
         return {
             "name": self.name,
+            "pronunciation": self.pronunciation,
             "gender": self.gender,
             "race": self.race,
             "age": self.age,
@@ -301,7 +343,8 @@ class Character:
             "armor": self.armor,
             "equipment": self.equipment,
             "cash": self.cash,
-            "psionic": self.psionic
+            "psionic": self.psionic,
+            "homeworld": self.homeworld.to_dict()
         }
     
     def get_rank_title(self) -> str:
@@ -340,6 +383,17 @@ class Character:
         talents_str = ", ".join(talents) if talents else "None"
         return f"PSR {psr} (Trained) - Talents: {talents_str}"
     
+    def get_homeworld_string(self) -> str:
+        """
+        Get the character's homeworld as a formatted string.
+        
+        Returns:
+            str: Homeworld name, hex, UWP and trade classifications
+        """
+        world = self.homeworld
+        details = " ".join(part for part in (world.hex, world.get_uwp_string(), world.get_trade_string()) if part)
+        return f"{world.name} ({details})"
+    
     def __str__(self) -> str:
         """
         Get a string representation of the character.
@@ -357,10 +411,12 @@ class Character:
         
         return (
             f"Name: {self.name}\n"
+            f"Pronunciation: {self.pronunciation}\n"
             f"UPP: {self.get_upp_string()}\n"
             f"Gender: {self.gender}\n"
             f"Race: {self.race}\n"
             f"Age: {self.age}\n"
+            f"Homeworld: {self.get_homeworld_string()}\n"
             f"Career: {self.career}\n"
             f"Rank: {rank_display}\n"
             f"Terms: {self.terms}\n"
@@ -374,24 +430,101 @@ class Character:
         )
 
 
-def generate_character() -> Character:
+def generate_character(homeworlds: Optional[HomeworldPool] = None) -> Character:
     """
     Generate a new random character.
     
+    Args:
+        homeworlds: Pool to draw the homeworld from (optional, uses the active pool)
+    
     Returns:
         Character: A new character instance
     """
-    return Character()
+    return Character(homeworlds)
 
 
-def generate_characters(count: int = 1) -> List[Character]:
+def generate_characters(count: int = 1, homeworlds: Optional[HomeworldPool] = None) -> List[Character]:
     """
     Generate multiple random characters.
     
     Args:
         count: Number of characters to generate
+        homeworlds: Pool to draw homeworlds from (optional, uses the active pool)
+        
+    Returns:
+        List[Character]: List of character instances
+    """
+    return list(iter_characters(count, homeworlds))
+
+
+def iter_characters(count: int = 1, homeworlds: Optional[HomeworldPool] = None) -> Iterator[Character]:
+    """
+    Generate random characters one at a time.
+    
+    Args:
+        count: Number of characters to generate
+        homeworlds: Pool to draw homeworlds from (optional, uses the active pool)
+        
+    Yields:
+        Character: Each new character
+    """
+    if homeworlds is None:
+        homeworlds = get_homeworld_pool()
+    for _ in range(count):
+        yield Character(homeworlds)
+
+
+def generate_characters_parallel(count: int = 1, workers: Optional[int] = None,
+                                 chunk_size: int = 250) -> List[Character]:
+    """
+    Generate multiple random characters across worker processes.
+    
+    Args:
+        count: Number of characters to generate
+        workers: Number of worker processes (optional, defaults to the CPU count)
+        chunk_size: Number of characters generated per task
         
     Returns:
         List[Character]: List of character instances
     """
-    return [Character() for _ in range(count)]
+    return list(iter_characters_parallel(count, workers, chunk_size))
+
+
+def iter_characters_parallel(count: int = 1, workers: Optional[int] = None,
+                             chunk_size: int = 250, max_pending: Optional[int] = None) -> Iterator[Character]:
+    """
+    Generate random characters across worker processes, one at a time.
+    
+    The static generation data is packed once into a shared-memory bundle
+    that every worker attaches to, instead of each worker reloading the
+    name lists, syllable rules and hyphenation patterns. Workers draw from
+    the configured homeworld pool; the worlds they send back are swapped for
+    this process's copies, so characters still share them. At most
+    `max_pending` chunks are generated ahead of the reader, so streaming a
+    huge batch to a file uses bounded memory.
+    
+    Args:
+        count: Number of characters to generate
+        workers: Number of worker processes (optional, defaults to the CPU count)
+        chunk_size: Number of characters generated per task
+        max_pending: Most chunks generating or waiting to be read (optional,
+            twice the number of workers)
+        
+    Yields:
+        Character: Each new character
+    """
+    # Imported here so single-character runs don't pay for multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    from src.bundle import SharedBundle, init_worker
+    from src.lib.pipeline import ordered_map
+
+    sizes = (min(chunk_size, count - start) for start in range(0, count, chunk_size))
+    homeworlds = get_homeworld_pool()
+
+    with SharedBundle() as shared:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(shared.name,)) as pool:
+            for batch in ordered_map(pool, generate_characters, sizes, max_pending):
+                for character in batch:
+                    character.homeworld = homeworlds.intern(character.homeworld)
+                    yield character
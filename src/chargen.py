@@ -7,23 +7,50 @@ This module provides the main entry point for the character generator.
 import os
 import sys
 import argparse
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
-from src.character import Character, generate_characters
-from src.renderer import save_character, save_characters
+from src.character import Character, generate_characters, iter_characters, iter_characters_parallel
+from src.renderer import TemplateRenderer, save_character, save_characters
+from src.lib.namefilter import NameFilterError
+from src.lib.outputfile import COMPRESSIONS
 from src.config import config
 
 
-def parse_args() -> argparse.Namespace:
+def parse_outputs(value: str) -> List[Tuple[str, Optional[str]]]:
+    """
+    Parse a list of outputs such as "text:txt,markdown:md,jsonl".
+    
+    Args:
+        value: Comma-separated outputs, each a template or export format with
+            an optional ":extension"
+        
+    Returns:
+        List[Tuple[str, Optional[str]]]: (template or format, extension) of each output
+    """
+    outputs = []
+    for item in value.split(','):
+        name, _, extension = item.strip().partition(':')
+        if not name:
+            raise argparse.ArgumentTypeError(f"Invalid output: {item!r}")
+        outputs.append((name, extension or None))
+    return outputs
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     """
     Parse command line arguments.
     
+    Args:
+        argv: Arguments to parse (optional, defaults to sys.argv)
+        
     Returns:
         argparse.Namespace: Parsed arguments
     """
     parser = argparse.ArgumentParser(
         description="Classic Traveller Character Generator",
-        epilog="Example: chargen.py -n 5 -o characters -t text"
+        epilog="Example: chargen.py -n 5 -o characters -t text\n"
+               "Commands: chargen.py build-cache, chargen.py npcs, chargen.py sector, chargen.py site, chargen.py trade, chargen.py world-stats",
+        formatter_class=argparse.RawDescriptionHelpFormatter
     )
     
     parser.add_argument(
@@ -51,7 +78,8 @@ def parse_args() -> argparse.Namespace:
         "-f", "--format",
         type=str,
         default=config.get('default_output_format', 'txt'),
-        help="Output file format (default: txt)"
+        help="Output file format: the extension of a template output (txt, md) or "
+             "jsonl, csv, parquet or arrow for structured data (default: txt)"
     )
     
     parser.add_argument(
@@ -60,18 +88,497 @@ def parse_args() -> argparse.Namespace:
         help="Path to configuration file"
     )
     
+    parser.add_argument(
+        "-w", "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes generating and rendering characters "
+             "(default: 1; 0 uses the CPU count)"
+    )
+    
+    parser.add_argument(
+        "--outputs",
+        type=parse_outputs,
+        help="Save the same characters in several formats in one pass, e.g. "
+             "text:txt,markdown:md,jsonl (replaces -t and -f)"
+    )
+    
+    parser.add_argument(
+        "-z", "--compression",
+        choices=sorted(COMPRESSIONS),
+        help="Compress the output as it is written (adds .gz, .bz2 or .xz to the extension)"
+    )
+    
+    parser.add_argument(
+        "--shard-size",
+        type=int,
+        help="Save the characters as numbered shards of this many characters, "
+             "written by the workers, with a manifest (<output>.manifest.json)"
+    )
+    
+    parser.add_argument(
+        "--seed",
+        type=str,
+        help="Seed of a sharded run; every shard's seed is derived from it (default: random)"
+    )
+    
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Keep the intact shards of an interrupted sharded run and generate the rest"
+    )
+    
     parser.add_argument(
         "-v", "--verbose",
         action="store_true",
         help="Enable verbose output"
     )
     
-    return parser.parse_args()
+    return parser.parse_args(argv)
+
+
+def build_cache_command(argv: List[str]) -> None:
+    """
+    Compile the static data into the cached bundle.
+    
+    Args:
+        argv: Command arguments
+    """
+    parser = argparse.ArgumentParser(
+        prog="chargen.py build-cache",
+        description="Compile careers, psionic talents, syllable rules, name lists, "
+                    "hyphenation patterns and templates into one data bundle"
+    )
+    parser.add_argument(
+        "-o", "--output",
+        type=str,
+        help="Bundle path (default: <cache_dir>/ctchargen.bundle)"
+    )
+    args = parser.parse_args(argv)
+    
+    from src.bundle import write_bundle
+    path = write_bundle(args.output)
+    print(f"Data bundle written to: {path} ({os.path.getsize(path)} bytes)")
+
+
+def add_domain_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the options that choose a block of sectors to generate.
+    
+    Args:
+        parser: Command argument parser
+    """
+    parser.add_argument(
+        "-s", "--seed",
+        type=str,
+        default="CTchargen",
+        help="Domain seed; the same seed always gives the same worlds (default: CTchargen)"
+    )
+    parser.add_argument(
+        "--sectors",
+        type=str,
+        default="1x1",
+        help="Size of the domain in sectors, as WIDTHxHEIGHT (default: 1x1)"
+    )
+    parser.add_argument(
+        "--origin",
+        type=str,
+        default="0,0",
+        help="Coordinates of the top left sector, as X,Y (default: 0,0)"
+    )
+    parser.add_argument(
+        "-p", "--presence",
+        type=int,
+        default=config.get('sector_generation', {}).get('presence', 4),
+        help="Minimum 1D roll for a hex to hold a system (default: 4)"
+    )
+    parser.add_argument(
+        "-r", "--rules",
+        type=str,
+        help="World generation rule set name or rule file (default: world_generation.rules)"
+    )
+    parser.add_argument(
+        "-w", "--workers",
+        type=int,
+        help="Number of worker processes (default: CPU count)"
+    )
+
+
+def generate_domain_from_args(parser: argparse.ArgumentParser, args: argparse.Namespace) -> List[Any]:
+    """
+    Generate the block of sectors chosen by the domain options.
+    
+    Args:
+        parser: Command argument parser, for reporting bad options
+        args: Parsed arguments
+        
+    Returns:
+        List[Any]: The generated sectors
+    """
+    try:
+        width, height = (int(value) for value in args.sectors.lower().split('x'))
+        origin = tuple(int(value) for value in args.origin.split(','))
+        if len(origin) != 2:
+            raise ValueError(args.origin)
+    except ValueError:
+        parser.error("--sectors must look like 4x4 and --origin like 0,0")
+    
+    from src.bundle import use_cached_bundle
+    use_cached_bundle()
+    
+    from src.lib.sector import generate_domain
+    from src.lib.worldrules import get_rules, load_rules
+    try:
+        rules = load_rules(args.rules) if args.rules else get_rules()
+    except ValueError as e:
+        parser.error(str(e))
+    
+    return generate_domain(args.seed, width, height, origin, args.presence, args.workers, rules)
+
+
+def npcs_command(argv: List[str]) -> None:
+    """
+    Generate the notable NPCs of one world, printing each as it is generated.
+    
+    Args:
+        argv: Command arguments
+    """
+    parser = argparse.ArgumentParser(
+        prog="chargen.py npcs",
+        description="Generate the patrons, officials and crew for hire of a world, "
+                    "as many as its population calls for",
+        epilog="Example: chargen.py npcs -s spinward --sector 0,0 --hex 0304 --json"
+    )
+    parser.add_argument(
+        "-s", "--seed",
+        type=str,
+        default="CTchargen",
+        help="Domain seed (default: CTchargen)"
+    )
+    parser.add_argument(
+        "--sector",
+        type=str,
+        default="0,0",
+        help="Coordinates of the world's sector, as X,Y (default: 0,0)"
+    )
+    parser.add_argument(
+        "--hex",
+        type=str,
+        required=True,
+        help="Hex number of the world within its sector, e.g. 0304"
+    )
+    parser.add_argument(
+        "-n", "--count",
+        type=int,
+        help="Number of NPCs (default: scaled to the world's population)"
+    )
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="Multiplier for the population-scaled count (default: 1.0)"
+    )
+    parser.add_argument(
+        "-p", "--presence",
+        type=int,
+        default=config.get('sector_generation', {}).get('presence', 4),
+        help="Minimum 1D roll for a hex to hold a system (default: 4)"
+    )
+    parser.add_argument(
+        "-r", "--rules",
+        type=str,
+        help="World generation rule set name or rule file (default: world_generation.rules)"
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print one JSON object per NPC"
+    )
+    args = parser.parse_args(argv)
+    
+    try:
+        sector_x, sector_y = (int(value) for value in args.sector.split(','))
+    except ValueError:
+        parser.error("--sector must look like 0,0")
+    
+    from src.bundle import use_cached_bundle
+    use_cached_bundle()
+    
+    from src.lib.sector import world_at
+    from src.lib.worldrules import load_rules, set_rules
+    from src.npc import generate_npcs, npc_count
+    try:
+        if args.rules:
+            set_rules(load_rules(args.rules))
+        world = world_at(args.seed, sector_x, sector_y, args.hex, args.presence)
+    except ValueError as e:
+        parser.error(str(e))
+    if world is None:
+        parser.error(f"Hex {args.hex} of sector {args.sector} is empty")
+    
+    count = args.count if args.count is not None else npc_count(world, args.scale)
+    if not args.json:
+        print(f"{world.name} {world.hex} {world.get_uwp_string()} {world.get_trade_string()}: {count} NPCs")
+    
+    import json
+    for role, character in generate_npcs(world, count):
+        if args.json:
+            print(json.dumps({"role": role, **character.to_dict()}))
+        else:
+            print(f"\n{role.title()}\n{character}")
+
+
+def sector_command(argv: List[str]) -> None:
+    """
+    Generate sectors and save a map of every subsector.
+    
+    Args:
+        argv: Command arguments
+    """
+    parser = argparse.ArgumentParser(
+        prog="chargen.py sector",
+        description="Generate a block of sectors and render each subsector to a hex map",
+        epilog="Example: chargen.py sector -s spinward --sectors 4x4 -o domain"
+    )
+    add_domain_arguments(parser)
+    parser.add_argument(
+        "-o", "--output",
+        type=str,
+        default="sector",
+        help="Output filename prefix (default: sector)"
+    )
+    parser.add_argument(
+        "-f", "--format",
+        choices=["html", "svg", "tab", "sec"],
+        default="html",
+        help="Save subsector maps (html), SVG sector maps (svg) or one tab-delimited "
+             "or SEC file per sector (default: html)"
+    )
+    parser.add_argument(
+        "--jump",
+        type=int,
+        default=0,
+        help="Draw jump routes of up to this many parsecs on SVG maps (default: 0, none)"
+    )
+    parser.add_argument(
+        "--tile",
+        type=int,
+        help="Split SVG maps into tiles of TILE x TILE sectors (default: one map)"
+    )
+    args = parser.parse_args(argv)
+    
+    if not 0 <= args.jump <= 6:
+        parser.error("--jump must be between 0 and 6")
+    if args.tile is not None and args.tile < 1:
+        parser.error("--tile must be at least 1")
+    
+    sectors = generate_domain_from_args(parser, args)
+    if args.format == 'html':
+        from src.lib.sector import save_sector_maps
+        paths = save_sector_maps(sectors, args.output)
+        saved = "subsector maps"
+    elif args.format == 'svg':
+        from src.lib.sectormap import save_sector_svgs
+        paths = save_sector_svgs(sectors, args.output, args.jump, args.tile)
+        saved = "SVG maps"
+    else:
+        from src.lib.secfile import save_sector_files
+        paths = save_sector_files(sectors, args.output, args.format)
+        saved = "sector files"
+    
+    for sector in sectors:
+        print(f"{sector.name} ({sector.sector_x},{sector.sector_y}): {len(sector)} worlds")
+    print(f"{len(paths)} {saved} saved to: {config.get('output_dir')}")
+
+
+def site_command(argv: List[str]) -> None:
+    """
+    Generate sectors and build or update their static HTML site.
+    
+    Args:
+        argv: Command arguments
+    """
+    parser = argparse.ArgumentParser(
+        prog="chargen.py site",
+        description="Generate a block of sectors and publish a page per world, subsector "
+                    "and sector, with sector maps. Only pages whose content changed are rewritten.",
+        epilog="Example: chargen.py site -s spinward --sectors 2x2 -o spinward"
+    )
+    add_domain_arguments(parser)
+    parser.add_argument(
+        "-o", "--output",
+        type=str,
+        default="site",
+        help="Site directory, inside the output directory (default: site)"
+    )
+    parser.add_argument(
+        "--jump",
+        type=int,
+        default=2,
+        help="Draw jump routes of up to this many parsecs on the maps (default: 2)"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rewrite every page"
+    )
+    args = parser.parse_args(argv)
+    
+    if not 0 <= args.jump <= 6:
+        parser.error("--jump must be between 0 and 6")
+    
+    sectors = generate_domain_from_args(parser, args)
+    
+    from src.sitebuilder import build_site
+    root = os.path.join(config.get('output_dir'), args.output)
+    try:
+        result = build_site(sectors, root, args.jump, args.workers, args.force)
+    except ValueError as e:
+        print(f"Error building site: {e}")
+        return
+    
+    print(f"Site built in: {root}")
+    print(f"{len(result['written'])} pages written, {len(result['unchanged'])} unchanged, "
+          f"{len(result['removed'])} removed")
+
+
+def trade_command(argv: List[str]) -> None:
+    """
+    Generate sectors and print the most profitable trade routes of each.
+    
+    Args:
+        argv: Command arguments
+    """
+    parser = argparse.ArgumentParser(
+        prog="chargen.py trade",
+        description="Generate a block of sectors and report the best speculative trade "
+                    "between their worlds, with passenger and freight revenue",
+        epilog="Example: chargen.py trade -s spinward --jump 2 --max-jumps 4 -n 20"
+    )
+    add_domain_arguments(parser)
+    parser.add_argument(
+        "--jump",
+        type=int,
+        default=2,
+        help="Ship jump rating (default: 2)"
+    )
+    parser.add_argument(
+        "--max-jumps",
+        type=int,
+        help="Longest trip to consider, in jumps (default: any reachable world)"
+    )
+    parser.add_argument(
+        "-n", "--routes",
+        type=int,
+        default=20,
+        help="Number of routes to list per sector (default: 20)"
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the report as JSON"
+    )
+    args = parser.parse_args(argv)
+    
+    if not 1 <= args.jump <= 6:
+        parser.error("--jump must be between 1 and 6")
+    
+    sectors = generate_domain_from_args(parser, args)
+    
+    from src.lib.routes import JumpGraph
+    from src.lib.trade import sector_trade
+    graph = JumpGraph.from_sectors(sectors, max_jump=args.jump)
+    
+    report = []
+    for sector in sectors:
+        locations, matrix = sector_trade(graph, sector.sector_x, sector.sector_y, args.jump, args.max_jumps)
+        routes = matrix.routes(args.routes)
+        for route in routes:
+            for end in ("origin", "destination"):
+                world = graph.worlds[locations[route[end]]]
+                route[end] = {"name": world.name, "hex": world.hex, "uwp": world.get_uwp_string(),
+                              "trade": world.get_trade_string()}
+        report.append({"sector": sector.name, "x": sector.sector_x, "y": sector.sector_y, "routes": routes})
+    
+    if args.json:
+        import json
+        print(json.dumps(report, indent=2))
+        return
+    
+    for entry in report:
+        print(f"{entry['sector']} ({entry['x']},{entry['y']}): best jump-{args.jump} trade")
+        for route in entry["routes"]:
+            origin, destination = route["origin"], route["destination"]
+            print(f"  {origin['name']} {origin['hex']} -> {destination['name']} {destination['hex']} "
+                  f"({route['jumps']} jumps): {route['good']}, "
+                  f"Cr{route['profit_per_ton']:,.0f}/ton (Cr{route['profit_per_jump']:,.0f}/ton/jump), "
+                  f"traffic Cr{route['traffic_revenue']:,.0f}")
+
+
+def world_stats_command(argv: List[str]) -> None:
+    """
+    Print exact world statistics for a rule set.
+    
+    Args:
+        argv: Command arguments
+    """
+    parser = argparse.ArgumentParser(
+        prog="chargen.py world-stats",
+        description="Print the exact probability of every UWP value and trade code"
+    )
+    parser.add_argument(
+        "-r", "--rules",
+        type=str,
+        help="World generation rule set name or rule file (default: world_generation.rules)"
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the statistics as JSON"
+    )
+    args = parser.parse_args(argv)
+    
+    from src.lib.worldrules import get_rules, load_rules
+    from src.lib.worldstats import FIELDS, enumerate_worlds
+    try:
+        rules = load_rules(args.rules) if args.rules else get_rules()
+    except ValueError as e:
+        parser.error(str(e))
+    
+    stats = enumerate_worlds(rules)
+    
+    if args.json:
+        import json
+        print(json.dumps(stats.to_dict(), indent=2))
+        return
+    
+    print(f"World statistics for the {rules.name} rules\n")
+    for field in FIELDS:
+        print(field.capitalize())
+        for value, probability in stats.marginal(field).items():
+            print(f"  {value!s:>2}: {float(probability):8.4%}")
+    print("Trade codes")
+    for code, probability in stats.trade_codes().items():
+        print(f"  {code}: {float(probability):8.4%}")
+
+
+# Subcommands, dispatched on the first command line argument
+COMMANDS = {
+    "build-cache": build_cache_command,
+    "npcs": npcs_command,
+    "sector": sector_command,
+    "site": site_command,
+    "trade": trade_command,
+    "world-stats": world_stats_command,
+}
 
 
 def generate_and_save_characters(num_characters: int, output_filename: str, 
                                 template_name: str, output_format: str, 
-                                verbose: bool = False) -> str:
+                                verbose: bool = False, workers: Optional[int] = 1,
+                                compression: Optional[str] = None, shard_size: Optional[int] = None,
+                                seed: Optional[str] = None, resume: bool = False,
+                                outputs: Optional[List[Tuple[str, Optional[str]]]] = None) -> str:
     """
     Generate characters and save them to a file.
     
@@ -81,28 +588,84 @@ def generate_and_save_characters(num_characters: int, output_filename: str,
         template_name: Template to use for output
         output_format: Output file format
         verbose: Enable verbose output
+        workers: Number of worker processes for generation and rendering
+            (1 works in this process, None uses the CPU count)
+        compression: Compress the output with "gzip", "bz2" or "lzma" (optional)
+        shard_size: Save numbered shards of this many characters with a
+            manifest instead of one file (optional)
+        seed: Seed of a sharded run (optional, random)
+        resume: Keep the intact shards of an earlier sharded run
+        outputs: (template or format, extension) of several outputs saved in
+            one pass instead of template_name and output_format (optional)
         
     Returns:
-        str: Path to the saved file
+        str: Path to the saved file, or to the manifest of a sharded run
+            (paths joined with ", " for several outputs)
     """
     if verbose:
         print(f"Generating {num_characters} characters...")
     
-    # Generate characters
-    characters = generate_characters(num_characters)
-    
-    # Convert characters to dictionaries
-    characters_data = [character.to_dict() for character in characters]
+    # Shards are generated and written whole by the workers
+    if shard_size:
+        # Imported here so unsharded runs don't load it
+        from src.shards import save_sharded_characters
+        output_path = save_sharded_characters(
+            num_characters,
+            output_filename,
+            shard_size,
+            template_name,
+            output_format,
+            compression,
+            seed,
+            workers,
+            resume
+        )
+        if verbose:
+            print(f"Shard manifest saved to {output_path}")
+        return output_path
     
     if verbose:
         print(f"Saving characters to {output_filename}.{output_format}...")
     
-    # Save characters to file
+    # Across workers, each worker renders the characters it generates, so
+    # one process pool does both
+    from src.exporters import EXPORT_FORMATS, export_characters
+    if workers != 1 and not outputs and output_format not in EXPORT_FORMATS:
+        output_path = TemplateRenderer(template_name).save_generated(
+            num_characters, output_filename, output_format, workers=workers, compression=compression
+        )
+        if verbose:
+            print(f"Characters saved to {output_path}")
+        return output_path
+    
+    # Generate characters as they are saved, so a large batch is never held in memory
+    if workers == 1:
+        characters = iter_characters(num_characters)
+    else:
+        characters = iter_characters_parallel(num_characters, workers)
+    
+    # Save characters in every format at once, generating them only once
+    if outputs:
+        output_path = ", ".join(save_characters(characters, output_filename,
+                                                compression=compression, outputs=outputs))
+        if verbose:
+            print(f"Characters saved to {output_path}")
+        return output_path
+    
+    # Save characters to file, as structured data or through a template
+    if output_format in EXPORT_FORMATS:
+        output_path = export_characters(characters, output_filename, output_format,
+                                        compression=compression)
+        if verbose:
+            print(f"Characters saved to {output_path}")
+        return output_path
+    
     output_path = save_characters(
-        characters_data, 
+        characters, 
         output_filename, 
         template_name, 
-        output_format
+        output_format,
+        compression=compression
     )
     
     if verbose:
@@ -111,19 +674,63 @@ def generate_and_save_characters(num_characters: int, output_filename: str,
     return output_path
 
 
-def main() -> None:
-    """Main entry point for the character generator."""
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Main entry point for the character generator.
+    
+    Args:
+        argv: Command line arguments (optional, defaults to sys.argv)
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    
+    if argv and argv[0] in COMMANDS:
+        COMMANDS[argv[0]](argv[1:])
+        return
+    
     # Parse command line arguments
-    args = parse_args()
+    args = parse_args(argv)
     
-    # Generate and save characters
-    output_path = generate_and_save_characters(
-        args.num_characters,
-        args.output,
-        args.template,
-        args.format,
-        args.verbose
-    )
+    if args.outputs and args.shard_size:
+        print("Error: --outputs cannot be combined with --shard-size")
+        sys.exit(1)
+    
+    # Check export formats up front; pyarrow is only imported for the
+    # formats that need it
+    from src.exporters import EXPORT_FORMATS, check_export_format
+    formats = [name for name, _ in args.outputs] if args.outputs else [args.format]
+    for file_format in formats:
+        if file_format in EXPORT_FORMATS:
+            try:
+                check_export_format(file_format)
+            except ImportError as e:
+                print(f"Error: {e}")
+                sys.exit(1)
+    
+    # Load static data from the compiled bundle when it is current
+    from src.bundle import use_cached_bundle
+    if use_cached_bundle() and args.verbose:
+        print("Using cached data bundle")
+    
+    # Generate and save characters; name filter settings that no name can
+    # satisfy are a configuration error rather than a crash
+    try:
+        output_path = generate_and_save_characters(
+            args.num_characters,
+            args.output,
+            args.template,
+            args.format,
+            args.verbose,
+            args.workers or None,
+            args.compression,
+            args.shard_size,
+            args.seed,
+            args.resume,
+            args.outputs
+        )
+    except NameFilterError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
     
     # Print the output path
     print(f"Characters saved to: {output_path}")
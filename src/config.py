@@ -15,16 +15,38 @@ DATA_DIR = os.path.join(BASE_DIR, 'data')
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 NAMES_DIR = os.path.join(BASE_DIR, 'names')
 OUTPUT_DIR = os.path.join(BASE_DIR, 'output')
+CACHE_DIR = os.path.join(BASE_DIR, 'cache')
 
 # Default configuration
 DEFAULT_CONFIG = {
     'output_dir': OUTPUT_DIR,
+    'cache_dir': CACHE_DIR,
     'default_template': 'text',
     'default_output_format': 'txt',
     'default_num_characters': 1,
+    'output_flush_size': 1 << 20,
+    'parquet_compression': 'zstd',
     'name_generation': {
         'use_phonetic': True,
         'data_file': os.path.join(DATA_DIR, 'syllable_starter.json'),
+        'blocklist': [],
+        'blocklist_file': os.path.join(DATA_DIR, 'name_blocklist.txt'),
+        'min_syllables': None,
+        'max_syllables': None,
+        'min_length': None,
+        'max_length': None,
+    },
+    'world_generation': {
+        'rules': 'classic',
+    },
+    'sector_generation': {
+        'presence': 4,
+        'world_cache_size': 65536,
+    },
+    'homeworlds': {
+        'seed': 'CTchargen',
+        'sector': [0, 0],
+        'subsector': None,
     },
     'races': [
         "Aslan", "Droyne", "Hiver", "Humaniti", "K'kree", "Vargr",
@@ -63,6 +85,7 @@ class Config:
     TEMPLATES_DIR = TEMPLATES_DIR
     NAMES_DIR = NAMES_DIR
     OUTPUT_DIR = OUTPUT_DIR
+    CACHE_DIR = CACHE_DIR
     
     def __init__(self, config_file: Optional[str] = None):
         """
@@ -81,9 +104,6 @@ class Config:
             except (json.JSONDecodeError, IOError) as e:
                 print(f"Error loading configuration file: {e}")
                 print("Using default configuration.")
-        
-        # Ensure output directory exists
-        os.makedirs(self.config['output_dir'], exist_ok=True)
     
     def get(self, key: str, default: Any = None) -> Any:
         """
@@ -114,6 +134,9 @@ class Config:
         """
         Get the full path to an output file.
         
+        The output directory is created on first use rather than when the
+        configuration is loaded.
+        
         Args:
             filename: Base filename
             extension: File extension (optional, uses default if not provided)
@@ -128,6 +151,9 @@ class Config:
         if '.' in filename:
             filename = filename.split('.')[0]
         
+        # Ensure output directory exists
+        os.makedirs(self.config['output_dir'], exist_ok=True)
+        
         # Handle paths with directory separators
         if '/' in filename or '\\' in filename:
             # Extract just the filename part
@@ -0,0 +1,290 @@
+"""
+Exporters module for CTchargen.
+
+This module saves characters as structured data for analysis instead of
+rendered text:
+
+- `jsonl`: one JSON object per line, exactly `Character.to_dict()`
+- `csv`: one row per character with the UPP, homeworld and psionics
+  flattened into columns and a level column per career skill
+- `parquet` and `arrow`: the same columns, typed, as Parquet or Arrow IPC
+  files (requires pyarrow)
+
+Characters are exported in batches. Each batch is turned into columns
+once, and the columnar formats write each batch as a row group (Parquet)
+or record batch (Arrow) straight from those columns, so exports stream in
+bounded memory. Files are written through `OutputFile` and replace the
+target only when complete.
+"""
+
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.careers import CAREERS
+from src.config import config
+from src.lib.outputfile import OutputFile, compressed_extension
+from src.lib.pipeline import chunked
+
+
+# Characters turned into columns and written together
+BATCH_SIZE = 65536
+
+UPP_KEYS = ('STR', 'DEX', 'END', 'INT', 'EDU', 'SOC')
+
+# Every skill a career can teach, one level column each
+SKILL_NAMES = tuple(sorted({skill for career in CAREERS.values() for skill in career['skills']}))
+
+
+# Column of each skill's level
+SKILL_COLUMNS = {name: index for index, name in enumerate(SKILL_NAMES)}
+
+# Flat columns and their types: "string", "int", "small" (a characteristic,
+# rank or skill level) and "bool"
+COLUMNS: List[Tuple[str, str]] = [
+    ('name', 'string'),
+    ('pronunciation', 'string'),
+    ('gender', 'string'),
+    ('race', 'string'),
+    ('age', 'int'),
+    ('upp', 'string'),
+] + [
+    (key, 'small') for key in UPP_KEYS
+] + [
+    ('career', 'string'),
+    ('rank', 'small'),
+    ('rank_title', 'string'),
+    ('terms', 'small'),
+    ('died', 'bool'),
+    ('skills', 'string'),
+    ('weapons', 'string'),
+    ('armor', 'string'),
+    ('equipment', 'string'),
+    ('cash', 'int'),
+    ('psionic', 'bool'),
+    ('psr', 'small'),
+    ('psionic_trained', 'bool'),
+    ('talents', 'string'),
+    ('homeworld', 'string'),
+    ('homeworld_hex', 'string'),
+    ('homeworld_uwp', 'string'),
+    ('homeworld_trade', 'string'),
+] + [
+    (f"skill_{name}", 'small') for name in SKILL_NAMES
+]
+
+COLUMN_NAMES = [name for name, _ in COLUMNS]
+
+
+def character_row(data: Dict[str, Any]) -> Tuple[Any, ...]:
+    """
+    Flatten one character into the values of COLUMNS.
+
+    Args:
+        data: Character data dictionary
+
+    Returns:
+        Tuple[Any, ...]: One value per column
+    """
+    upp = data['upp']
+    psionic = data['psionic']
+    homeworld = data.get('homeworld') or {}
+    ranks = CAREERS.get(data['career'], {}).get('ranks', ())
+    rank = data['rank']
+
+    levels = [0] * len(SKILL_NAMES)
+    for skill, level in data['skills'].items():
+        index = SKILL_COLUMNS.get(skill)
+        if index is not None:
+            levels[index] = level
+
+    return (
+        data['name'], data.get('pronunciation', ''), data['gender'], data['race'], data['age'],
+        data['upp_string'], upp['STR'], upp['DEX'], upp['END'], upp['INT'], upp['EDU'], upp['SOC'],
+        data['career'], rank, ranks[rank] if rank < len(ranks) else '', data['terms'], data['died'],
+        data['skills_string'], ", ".join(data['weapons']), data['armor'], ", ".join(data['equipment']),
+        data['cash'], psionic['has_psionic'], psionic['psr'], psionic['is_trained'],
+        ", ".join(psionic['talents']),
+        homeworld.get('name', ''), homeworld.get('hex', ''), homeworld.get('uwp_string', ''),
+        homeworld.get('trade_string', ''),
+        *levels,
+    )
+
+
+def _as_dict(character: Any) -> Dict[str, Any]:
+    """Get the data of a character or character dictionary."""
+    return character if isinstance(character, dict) else character.to_dict()
+
+
+def character_columns(batch: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """
+    Turn a batch of characters into flat columns.
+
+    Args:
+        batch: Character data dictionaries
+
+    Returns:
+        Dict[str, List[Any]]: Values of each column in COLUMNS, in order
+    """
+    upps = [data['upp'] for data in batch]
+    psionics = [data['psionic'] for data in batch]
+    homeworlds = [data.get('homeworld') or {} for data in batch]
+
+    rank_titles = []
+    for data in batch:
+        ranks = CAREERS.get(data['career'], {}).get('ranks', ())
+        rank_titles.append(ranks[data['rank']] if data['rank'] < len(ranks) else '')
+
+    levels = [[0] * len(batch) for _ in SKILL_NAMES]
+    for row, data in enumerate(batch):
+        for skill, level in data['skills'].items():
+            index = SKILL_COLUMNS.get(skill)
+            if index is not None:
+                levels[index][row] = level
+
+    columns: Dict[str, List[Any]] = {
+        'name': [data['name'] for data in batch],
+        'pronunciation': [data.get('pronunciation', '') for data in batch],
+        'gender': [data['gender'] for data in batch],
+        'race': [data['race'] for data in batch],
+        'age': [data['age'] for data in batch],
+        'upp': [data['upp_string'] for data in batch],
+        'career': [data['career'] for data in batch],
+        'rank': [data['rank'] for data in batch],
+        'rank_title': rank_titles,
+        'terms': [data['terms'] for data in batch],
+        'died': [data['died'] for data in batch],
+        'skills': [data['skills_string'] for data in batch],
+        'weapons': [", ".join(data['weapons']) for data in batch],
+        'armor': [data['armor'] for data in batch],
+        'equipment': [", ".join(data['equipment']) for data in batch],
+        'cash': [data['cash'] for data in batch],
+        'psionic': [psionic['has_psionic'] for psionic in psionics],
+        'psr': [psionic['psr'] for psionic in psionics],
+        'psionic_trained': [psionic['is_trained'] for psionic in psionics],
+        'talents': [", ".join(psionic['talents']) for psionic in psionics],
+        'homeworld': [homeworld.get('name', '') for homeworld in homeworlds],
+        'homeworld_hex': [homeworld.get('hex', '') for homeworld in homeworlds],
+        'homeworld_uwp': [homeworld.get('uwp_string', '') for homeworld in homeworlds],
+        'homeworld_trade': [homeworld.get('trade_string', '') for homeworld in homeworlds],
+    }
+    for key in UPP_KEYS:
+        columns[key] = [upp[key] for upp in upps]
+    for name, column in zip(SKILL_NAMES, levels):
+        columns[f"skill_{name}"] = column
+    return {name: columns[name] for name in COLUMN_NAMES}
+
+
+def arrow_schema() -> 'pa.Schema':
+    """
+    Get the Arrow schema of the flat columns.
+
+    Returns:
+        pa.Schema: Schema for COLUMNS
+
+    Raises:
+        ImportError: If pyarrow is not installed
+    """
+    # Imported here since only the parquet and arrow formats need pyarrow
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ImportError("The parquet and arrow formats require pyarrow")
+    types = {'string': pa.string(), 'int': pa.int64(), 'small': pa.int8(), 'bool': pa.bool_()}
+    return pa.schema([(name, types[kind]) for name, kind in COLUMNS])
+
+
+def _export_jsonl(batches: Iterable[List[Dict[str, Any]]], output: OutputFile) -> None:
+    """Write characters as JSON Lines."""
+    encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+    for batch in batches:
+        output.write('\n'.join(encode(data) for data in batch) + '\n')
+
+
+def _export_csv(batches: Iterable[List[Dict[str, Any]]], output: OutputFile) -> None:
+    """Write characters as CSV with a header line."""
+    # Imported here so the other formats don't load the csv module
+    import csv
+    writer = csv.writer(output, lineterminator='\n')
+    writer.writerow(COLUMN_NAMES)
+    for batch in batches:
+        writer.writerows(map(character_row, batch))
+
+
+def _export_arrow(batches: Iterable[List[Dict[str, Any]]], output: OutputFile, file_format: str) -> None:
+    """Write characters as Parquet row groups or Arrow record batches."""
+    schema = arrow_schema()
+    import pyarrow as pa
+    if file_format == 'parquet':
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(output.file, schema,
+                                  compression=config.get('parquet_compression', 'zstd'))
+    else:
+        writer = pa.ipc.new_file(output.file, schema)
+
+    try:
+        for batch in batches:
+            writer.write_table(pa.Table.from_pydict(character_columns(batch), schema=schema))
+    finally:
+        writer.close()
+
+
+# Exporters by format, with whether they write bytes
+EXPORT_FORMATS = {
+    'jsonl': False,
+    'csv': False,
+    'parquet': True,
+    'arrow': True,
+}
+
+
+def check_export_format(file_format: str) -> None:
+    """
+    Check that a format can be exported, before generating anything for it.
+
+    Args:
+        file_format: Export format
+
+    Raises:
+        ValueError: If the format is unknown
+        ImportError: If the format needs pyarrow and it is not installed
+    """
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {file_format}")
+    if EXPORT_FORMATS[file_format]:
+        arrow_schema()
+
+
+def export_characters(characters: Iterable[Any], filename: str, file_format: str,
+                      batch_size: int = BATCH_SIZE, atomic: bool = True,
+                      compression: Optional[str] = None) -> str:
+    """
+    Save characters as structured data.
+
+    Args:
+        characters: Characters or character data dictionaries, e.g. a generator
+        filename: Output filename (without extension)
+        file_format: "jsonl", "csv", "parquet" or "arrow"; also the extension
+        batch_size: Characters per batch (and per Parquet row group)
+        atomic: Replace the output file only when it is complete
+        compression: Compress the file with "gzip", "bz2" or "lzma"
+            (optional; the extension gets the compression's suffix)
+
+    Returns:
+        str: Path to the saved file
+
+    Raises:
+        ValueError: If the format or compression is unknown
+        ImportError: If the format needs pyarrow and it is not installed
+    """
+    check_export_format(file_format)
+    output_path = config.get_output_path(filename, compressed_extension(file_format, compression))
+    batches = chunked((_as_dict(character) for character in characters), batch_size)
+    with OutputFile(output_path, atomic=atomic, binary=EXPORT_FORMATS[file_format],
+                    compression=compression) as output:
+        if file_format == 'jsonl':
+            _export_jsonl(batches, output)
+        elif file_format == 'csv':
+            _export_csv(batches, output)
+        else:
+            _export_arrow(batches, output, file_format)
+    return output_path
@@ -0,0 +1,485 @@
+"""
+Homeworld module for CTchargen.
+
+This module gives characters homeworlds drawn from a shared pool of
+generated worlds, so a whole campaign's characters come from the same map.
+
+A world's chance of being drawn is proportional to its population: 10 to
+the power of its population digit, the order of magnitude of the people
+living there, so an uninhabited world is never anyone's homeworld. Draws use
+an alias table built once per pool, which picks a world with a single random
+number whatever the size of the pool. Characters hold a reference to the
+pool's World, so any number of characters share a few hundred worlds.
+Worlds are kept as plain rows and only become World objects when they are
+first drawn.
+
+The default pool is one sector (or one subsector of it) generated from the
+`homeworlds` settings. Because sector hexes are seeded from their location,
+every process builds the same pool. It is generated once and written to the
+cache directory as a small binary file holding the alias table and the
+worlds' characteristics and names, keyed by the settings and files it
+depends on, so later runs load it instead of generating the sector again.
+
+v1.0 - Added for CTchargen homeworlds
+"""
+
+import os
+import json
+import random
+import struct
+from array import array
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src import __version__
+from src.config import config
+from src.lib.outputfile import OutputFile
+from src.lib.worldgen import World
+
+
+# File name of the cached default pool inside the cache directory
+POOL_CACHE_FILENAME = 'homeworlds.bin'
+
+# Pool cache header: magic, format version, key length and number of worlds
+POOL_CACHE_MAGIC = b'CTHW'
+POOL_CACHE_VERSION = 1
+POOL_CACHE_HEADER = struct.Struct('<4sHII')
+
+# A world's hex, name, starport and characteristics
+WorldKey = Tuple[str, str, str, Tuple[int, ...]]
+
+
+def population_weight(world: World) -> float:
+    """
+    Weight a world by its population.
+
+    Args:
+        world: World to weigh
+
+    Returns:
+        float: 10 to the power of the population digit, or 0 if uninhabited
+    """
+    return float(10 ** world.population) if world.population > 0 else 0.0
+
+
+class AliasTable:
+    """
+    Class for drawing indexes with fixed weights in constant time (Vose's
+    alias method).
+
+    Each of the n columns holds its own index with probability `prob[i]` and
+    `alias[i]` otherwise, so a draw picks a column and a side of it from one
+    random number.
+    """
+
+    def __init__(self, weights: Sequence[float]):
+        """
+        Build the table.
+
+        Args:
+            weights: Non-negative weight of each index
+
+        Raises:
+            ValueError: If there are no weights or they are all zero
+        """
+        n = len(weights)
+        total = float(sum(weights))
+        if n == 0 or total <= 0:
+            raise ValueError("Nothing to draw from")
+
+        scaled = [weight * n / total for weight in weights]
+        self.prob = array('d', [1.0]) * n
+        self.alias = array('i', range(n))
+
+        small = [i for i, weight in enumerate(scaled) if weight < 1.0]
+        large = [i for i, weight in enumerate(scaled) if weight >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.prob[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] += scaled[less] - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+
+    @classmethod
+    def from_arrays(cls, prob: Sequence[float], alias: Sequence[int]) -> 'AliasTable':
+        """
+        Rebuild a table from its columns, as saved from `prob` and `alias`.
+
+        Args:
+            prob: Probability of each column keeping its own index
+            alias: Index each column gives otherwise
+
+        Returns:
+            AliasTable: The table
+
+        Raises:
+            ValueError: If the columns are empty or of different lengths
+        """
+        if not prob or len(prob) != len(alias):
+            raise ValueError("Invalid alias table")
+        table = cls.__new__(cls)
+        table.prob = array('d', prob)
+        table.alias = array('i', alias)
+        return table
+
+    def __len__(self) -> int:
+        """Return the number of indexes."""
+        return len(self.prob)
+
+    def draw(self) -> int:
+        """
+        Draw an index.
+
+        Returns:
+            int: Index, drawn with probability proportional to its weight
+        """
+        position = random.random() * len(self.prob)
+        column = int(position)
+        return column if position - column < self.prob[column] else self.alias[column]
+
+
+class HomeworldPool:
+    """
+    Class holding the worlds characters can come from.
+    """
+
+    def __init__(self, worlds: Iterable[World],
+                 weight: Callable[[World], float] = population_weight):
+        """
+        Build the pool.
+
+        Args:
+            worlds: Candidate worlds
+            weight: Function weighting each world (optional, by population)
+
+        Raises:
+            ValueError: If no world has a positive weight
+        """
+        weighted = [(world, weight(world)) for world in worlds]
+        self._worlds: List[Optional[World]] = [world for world, value in weighted if value > 0]
+        self.rows: List[List[Any]] = [_world_row(world) for world in self._worlds]
+        self.table = AliasTable([value for _, value in weighted if value > 0])
+        self._index: Optional[Dict[WorldKey, int]] = None
+
+    @classmethod
+    def from_setting(cls) -> 'HomeworldPool':
+        """
+        Generate the pool described by the `homeworlds` settings.
+
+        Returns:
+            HomeworldPool: Worlds of the configured sector or subsector
+        """
+        # Imported here so characters can be generated without loading the
+        # sector module until a homeworld is needed
+        from src.lib.sector import SUBSECTOR_LETTERS, Sector, Subsector
+
+        settings = config.get('homeworlds', {})
+        seed = settings.get('seed', 'CTchargen')
+        sector_x, sector_y = settings.get('sector', (0, 0))
+        letter = settings.get('subsector')
+
+        if letter:
+            area = Subsector(seed, sector_x, sector_y, SUBSECTOR_LETTERS.index(letter.upper())).generate()
+        else:
+            area = Sector(seed, sector_x, sector_y).generate(workers=1)
+        return cls(world for _, world in sorted(area.worlds.items()))
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence[Any]],
+                  table: Optional[AliasTable] = None) -> 'HomeworldPool':
+        """
+        Rebuild a pool saved by to_rows().
+
+        With the saved alias table no World is created until it is drawn.
+
+        Args:
+            rows: [hex, name, starport, values] of each world
+            table: The pool's alias table (optional, rebuilt from the
+                populations if omitted)
+
+        Returns:
+            HomeworldPool: The pool
+
+        Raises:
+            ValueError: If the table does not match the rows
+        """
+        if table is None:
+            return cls(_row_world(row) for row in rows)
+
+        pool = cls.__new__(cls)
+        pool.rows = rows if isinstance(rows, _PackedRows) else [list(row) for row in rows]
+        if len(pool.rows) != len(table):
+            raise ValueError("The alias table does not match the worlds")
+        pool._worlds = [None] * len(pool.rows)
+        pool.table = table
+        pool._index = None
+        return pool
+
+    def to_rows(self) -> List[List[Any]]:
+        """
+        Describe the worlds of the pool as plain values.
+
+        Returns:
+            List[List[Any]]: [hex, name, starport, values] of each world
+        """
+        return [list(row) for row in self.rows]
+
+    @property
+    def worlds(self) -> List[World]:
+        """Every world that can be drawn, in pool order."""
+        return [self.world(index) for index in range(len(self.rows))]
+
+    def world(self, index: int) -> World:
+        """
+        Get a world of the pool, creating it on first use.
+
+        Args:
+            index: Position of the world in the pool
+
+        Returns:
+            World: The pool's world
+        """
+        world = self._worlds[index]
+        if world is None:
+            world = self._worlds[index] = _row_world(self.rows[index])
+        return world
+
+    def __len__(self) -> int:
+        """Return the number of worlds that can be drawn."""
+        return len(self.rows)
+
+    def draw(self) -> World:
+        """
+        Draw a homeworld.
+
+        Returns:
+            World: A world of the pool, shared with every other draw of it
+        """
+        return self.world(self.table.draw())
+
+    def intern(self, world: World) -> World:
+        """
+        Get the pool's own copy of a world, such as one unpickled from a worker.
+
+        Args:
+            world: A world equal to one in the pool
+
+        Returns:
+            World: The pool's world, or the given world if the pool has no match
+        """
+        if self._index is None:
+            self._index = {_row_key(row): index for index, row in enumerate(self.rows)}
+        index = self._index.get(_row_key(_world_row(world)))
+        return world if index is None else self.world(index)
+
+
+class _PackedRows(Sequence[List[Any]]):
+    """
+    World rows read from the pool cache, decoded one at a time as they are used.
+    """
+
+    def __init__(self, values: bytes, strings: List[str]):
+        """
+        Wrap the cached columns.
+
+        Args:
+            values: Starport byte and seven characteristic bytes of each world
+            strings: Hex number and name of each world, one after the other
+        """
+        if len(values) % 8 or len(strings) != len(values) // 4:
+            raise ValueError("The world columns do not match")
+        self.values = values
+        self.strings = strings
+
+    def __len__(self) -> int:
+        """Return the number of worlds."""
+        return len(self.values) // 8
+
+    def __getitem__(self, index):
+        """Decode the row of a world."""
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("world index out of range")
+        start = 8 * index
+        return [self.strings[2 * index], self.strings[2 * index + 1],
+                chr(self.values[start]), list(self.values[start + 1:start + 8])]
+
+
+def _world_row(world: World) -> List[Any]:
+    """Describe a world as [hex, name, starport, values]."""
+    return [world.hex, world.name, world.starport, list(world.upp)]
+
+
+def _row_world(row: Sequence[Any]) -> World:
+    """Create the world a row describes."""
+    hex_number, name, starport, values = row
+    return World.from_values(starport, values, name, hex_number)
+
+
+def _row_key(row: Sequence[Any]) -> WorldKey:
+    """Identify a world row by its hex, name, starport and characteristics."""
+    return row[0], row[1], row[2], tuple(row[3])
+
+
+def pool_cache_path() -> str:
+    """
+    Get the path of the cached default pool.
+
+    Returns:
+        str: Path inside the configured cache directory
+    """
+    return os.path.join(config.get('cache_dir', config.CACHE_DIR), POOL_CACHE_FILENAME)
+
+
+def pool_cache_key() -> str:
+    """
+    Identify the default pool by everything it is generated from.
+
+    The key covers the homeworld, sector, world rule and name settings, and
+    the modification time and size of the rule and syllable files and of the
+    modules that generate worlds and their names.
+
+    Returns:
+        str: The key as canonical JSON, compared as it is rather than hashed
+    """
+    # Imported here so the key can be checked without loading the sector module
+    from src.lib import wordplay
+    from src.lib.worldrules import rules_path
+
+    rules = config.get('world_generation', {}).get('rules', 'classic')
+    sources = [rules_path(rules), wordplay.syllable_rules_file()]
+    blocklist_file = config.get('name_generation', {}).get('blocklist_file')
+    if blocklist_file:
+        sources.append(blocklist_file)
+    lib_dir = os.path.dirname(os.path.abspath(__file__))
+    for module in ('homeworld.py', 'sector.py', 'worldgen.py', 'worldrules.py',
+                   'wordplay.py', 'namefilter.py', 'stellagama.py'):
+        sources.append(os.path.join(lib_dir, module))
+
+    fingerprint = {}
+    for path in sources:
+        try:
+            stat = os.stat(path)
+            fingerprint[path] = [stat.st_mtime_ns, stat.st_size]
+        except OSError:
+            fingerprint[path] = [0, 0]
+
+    key = {
+        'package_version': __version__,
+        'settings': {name: config.get(name, {}) for name in
+                     ('homeworlds', 'sector_generation', 'world_generation', 'name_generation')},
+        'sources': fingerprint,
+    }
+    return json.dumps(key, sort_keys=True)
+
+
+def load_cached_pool(key: str) -> Optional[HomeworldPool]:
+    """
+    Load the cached default pool.
+
+    The cache holds, after its header and key, the alias table columns, a
+    starport byte and seven characteristic bytes per world, and the worlds'
+    hex numbers and names separated by NUL characters.
+
+    Args:
+        key: Key of the current settings, from pool_cache_key()
+
+    Returns:
+        Optional[HomeworldPool]: The pool, or None if the cache is missing,
+            unreadable or was saved for other settings
+    """
+    try:
+        with open(pool_cache_path(), 'rb') as f:
+            blob = f.read()
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        print(f"Error loading homeworld cache: {e}")
+        return None
+
+    try:
+        magic, version, key_length, count = POOL_CACHE_HEADER.unpack_from(blob)
+        if magic != POOL_CACHE_MAGIC or version != POOL_CACHE_VERSION:
+            return None
+        offset = POOL_CACHE_HEADER.size
+        if blob[offset:offset + key_length] != key.encode('utf-8'):
+            return None
+        offset += key_length
+
+        prob, alias = array('d'), array('i')
+        for column in (prob, alias):
+            size = column.itemsize * count
+            column.frombytes(blob[offset:offset + size])
+            offset += size
+        values = blob[offset:offset + 8 * count]
+        rows = _PackedRows(values, blob[offset + 8 * count:].decode('utf-8').split('\0'))
+        return HomeworldPool.from_rows(rows, AliasTable.from_arrays(prob, alias))
+    except (ValueError, struct.error) as e:
+        print(f"Error loading homeworld cache: {e}")
+        return None
+
+
+def save_cached_pool(pool: HomeworldPool, key: str) -> None:
+    """
+    Write the default pool to the cache.
+
+    Args:
+        pool: The pool
+        key: Key of the settings it was generated from, from pool_cache_key()
+    """
+    try:
+        key_bytes = key.encode('utf-8')
+        values = bytes(
+            value for _, _, starport, upp in pool.rows for value in [ord(starport)] + list(upp)
+        )
+        strings = '\0'.join(text for hex_number, name, _, _ in pool.rows for text in (hex_number, name))
+
+        os.makedirs(os.path.dirname(pool_cache_path()), exist_ok=True)
+        with OutputFile(pool_cache_path(), binary=True) as f:
+            f.write(POOL_CACHE_HEADER.pack(POOL_CACHE_MAGIC, POOL_CACHE_VERSION, len(key_bytes), len(pool)))
+            f.write(key_bytes)
+            f.write(array('d', pool.table.prob).tobytes())
+            f.write(array('i', pool.table.alias).tobytes())
+            f.write(values)
+            f.write(strings.encode('utf-8'))
+    except ValueError as e:
+        # A characteristic above 255 cannot be stored in a byte
+        print(f"Error saving homeworld cache: {e}")
+    except (IOError, OSError) as e:
+        print(f"Error saving homeworld cache: {e}")
+
+
+_active: Optional[HomeworldPool] = None
+
+
+def get_homeworld_pool() -> HomeworldPool:
+    """
+    Get the active homeworld pool, loading the configured one on first use.
+
+    The configured pool is read from the cache when it was saved for the
+    current settings, and generated and cached otherwise.
+
+    Returns:
+        HomeworldPool: The active pool
+    """
+    global _active
+    if _active is None:
+        key = pool_cache_key()
+        _active = load_cached_pool(key)
+        if _active is None:
+            _active = HomeworldPool.from_setting()
+            save_cached_pool(_active, key)
+    return _active
+
+
+def set_homeworld_pool(pool: Optional[HomeworldPool]) -> None:
+    """
+    Swap the active homeworld pool.
+
+    Args:
+        pool: The new pool, or None to go back to the configured one
+    """
+    global _active
+    _active = pool
@@ -10,61 +10,310 @@ a string (the word), and returns a list of parts that can be separated by hyphen
 ['su', 'per', 'cal', 'ifrag', 'ilis', 'tic', 'ex', 'pi', 'ali', 'do', 'cious']
 >>> hyphenate_word("project")
 ['project']
+>>> hyphenate_many(["project", "table"])
+[['project'], ['ta', 'ble']]
+
+The patterns are compiled into a DFA held in flat `array` tables. The
+tables are built on first use and written to a cache file, so later runs
+load them with a single read instead of re-parsing the patterns.
 
 Ned Batchelder, July 2007.
 This Python code is in the public domain.
 
+v1.2 - Packed DFA tables with an on-disk cache
 v1.1 - Updated for CTchargen refactoring
 """
 
+import os
 import re
-from typing import List, Dict, Any, Optional, Union
+import struct
+import zlib
+from array import array
+from typing import List, Dict, Optional, Union, Iterable, Sequence
+
+from src.config import config
+
+__version__ = '1.2.20250530'
 
-__version__ = '1.1.20250530'
+# Cache file header: magic, format version, source digest and table sizes
+CACHE_MAGIC = b'CTHY'
+CACHE_VERSION = 2
+CACHE_HEADER = struct.Struct('<4sH8sHII')
 
 
 class Hyphenator:
     """
     Class for hyphenating words using Frank Liang's algorithm.
+    
+    The patterns are compiled into an Aho-Corasick DFA: a dense transition
+    table over the pattern alphabet, plus, for each state, the points of
+    every pattern that ends there merged into one vector. A word is then
+    hyphenated in a single left-to-right pass instead of one trie walk per
+    starting position.
     """
-    def __init__(self, patterns: str, exceptions: str = ''):
+    def __init__(self, patterns: str, exceptions: str = '', cache_file: Optional[str] = None):
         """
         Initialize the hyphenator with patterns and exceptions.
         
+        The patterns are not compiled until the first word is hyphenated.
+        
         Args:
             patterns: String containing hyphenation patterns
             exceptions: String containing exception words with hyphens
+            cache_file: Path of the compiled table cache (optional, no caching if omitted)
         """
-        self.tree = {}
-        for pattern in patterns.split():
-            self._insert_pattern(pattern)
+        self.patterns = patterns
+        self.cache_file = cache_file
+        self.compiled = False
+
+        # DFA tables, filled in by _compile(). Code 0 stands for any
+        # character outside the alphabet.
+        self.alphabet = ''
+        self.codes: Dict[str, int] = {}
+        self.width = 1
+        self.transitions: Sequence[int] = array('i')
+        self.value: Sequence[int] = array('i')
+        self.point_data: Sequence[int] = array('B')
 
         self.exceptions = {}
         for ex in exceptions.split():
             # Convert the hyphenated pattern into a point array for use later.
             self.exceptions[ex.replace('-', '')] = [0] + [int(h == '-') for h in re.split(r"[a-z]", ex)]
 
-    def _insert_pattern(self, pattern: str) -> None:
+    def digest(self) -> bytes:
         """
-        Insert a pattern into the pattern tree.
+        Get the digest identifying the source patterns.
+        
+        The digest only has to notice edited patterns, so a CRC-32 and the
+        length are enough, and checking a cache doesn't load hashlib.
+        
+        Returns:
+            bytes: CRC-32 and length of the UTF-8 patterns
+        """
+        data = self.patterns.encode('utf-8')
+        return struct.pack('<II', zlib.crc32(data), len(data))
+
+    def _compile(self) -> None:
+        """Load the tables from the cache, or build and cache them."""
+        if not self._load_cache():
+            self._build_tables()
+            self._save_cache()
+        self.compiled = True
+
+    def _build_tables(self) -> None:
+        """Compile the patterns into DFA tables."""
+        # Insert the patterns into a trie of parallel lists. Each pattern like
+        # 'a1bc3d4' becomes the chars 'abcd' and the points [0, 1, 0, 3, 4].
+        children: List[Dict[str, int]] = [{}]
+        depth = [0]
+        own_points: List[Optional[List[int]]] = [None]
+        for pattern in self.patterns.split():
+            chars = re.sub('[0-9]', '', pattern)
+            points = [int(d or 0) for d in re.split("[.a-z]", pattern)]
+
+            state = 0
+            for c in chars:
+                if c not in children[state]:
+                    children[state][c] = len(children)
+                    children.append({})
+                    depth.append(depth[state] + 1)
+                    own_points.append(None)
+                state = children[state][c]
+            own_points[state] = points
+
+        alphabet = ''.join(sorted({c for node in children for c in node}))
+        codes = {c: i + 1 for i, c in enumerate(alphabet)}
+        width = len(alphabet) + 1
+
+        # Breadth-first pass: failure links, dense transitions and, for each
+        # state, the points of every pattern ending there aligned to the
+        # start of the longest one.
+        transitions = [0] * (len(children) * width)
+        fail = [0] * len(children)
+        merged: List[Optional[List[int]]] = [None] * len(children)
+        order = [0]
+        for state in order:
+            link = fail[state]
+            points = list(own_points[state]) if own_points[state] else None
+            inherited = merged[link] if state else None
+            if inherited:
+                shift = depth[state] - depth[link]
+                points = points or [0] * (depth[state] + 1)
+                for k, p in enumerate(inherited):
+                    if p > points[shift + k]:
+                        points[shift + k] = p
+            merged[state] = points
+
+            row = state * width
+            for c, code in codes.items():
+                child = children[state].get(c)
+                if child is not None:
+                    fail[child] = transitions[link * width + code] if state else 0
+                    transitions[row + code] = child
+                    order.append(child)
+                else:
+                    transitions[row + code] = transitions[link * width + code] if state else 0
+
+        value = [-1] * len(children)
+        point_data = []
+        for state, points in enumerate(merged):
+            if points:
+                value[state] = len(point_data)
+                point_data.append(len(points))
+                point_data.extend(points)
+
+        self.alphabet = alphabet
+        self.codes = codes
+        self.width = width
+        self.transitions = array('i', transitions)
+        self.value = array('i', value)
+        self.point_data = array('B', point_data)
+
+    def _load_cache(self) -> bool:
+        """
+        Load the tables from the cache file.
+        
+        Returns:
+            bool: True if a current cache was loaded
+        """
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return False
+
+        try:
+            with open(self.cache_file, 'rb') as f:
+                blob = f.read()
+        except IOError:
+            return False
+
+        return self.load_tables(blob)
+
+    def load_tables(self, blob: Union[bytes, memoryview]) -> bool:
+        """
+        Load compiled tables from a serialized buffer.
+        
+        The tables are memoryviews into the buffer rather than copies, so a
+        shared or memory-mapped buffer is used in place.
         
         Args:
-            pattern: Hyphenation pattern to insert
+            blob: Serialized tables, as written by dump_tables()
+            
+        Returns:
+            bool: True if the buffer holds tables for these patterns
         """
-        # Convert the a pattern like 'a1bc3d4' into a string of chars 'abcd'
-        # and a list of points [ 0, 1, 0, 3, 4 ].
-        chars = re.sub('[0-9]', '', pattern)
-        points = [int(d or 0) for d in re.split("[.a-z]", pattern)]
-
-        # Insert the pattern into the tree. Each character finds a dict
-        # another level down in the tree, and leaf nodes have the list of
-        # points.
-        t = self.tree
-        for c in chars:
-            if c not in t:
-                t[c] = {}
-            t = t[c]
-        t[None] = points
+        blob = memoryview(blob)
+        if len(blob) < CACHE_HEADER.size:
+            return False
+
+        magic, version, digest, alphabet_size, states, data_size = CACHE_HEADER.unpack_from(blob)
+        if magic != CACHE_MAGIC or version != CACHE_VERSION or digest != self.digest():
+            return False
+
+        offset = CACHE_HEADER.size
+        alphabet = bytes(blob[offset:offset + alphabet_size]).rstrip(b'\0').decode('ascii')
+        offset += alphabet_size
+        width = len(alphabet) + 1
+
+        transitions = blob[offset:offset + states * width * 4].cast('i')
+        offset += states * width * 4
+        value = blob[offset:offset + states * 4].cast('i')
+        offset += states * 4
+        point_data = blob[offset:offset + data_size]
+        if len(point_data) != data_size:
+            return False
+
+        self.alphabet = alphabet
+        self.codes = {c: i + 1 for i, c in enumerate(alphabet)}
+        self.width = width
+        self.transitions = transitions
+        self.value = value
+        self.point_data = point_data
+        self.compiled = True
+        return True
+
+    def dump_tables(self) -> bytes:
+        """
+        Serialize the compiled tables.
+        
+        Returns:
+            bytes: Header, alphabet and tables in native byte order
+        """
+        if not self.compiled:
+            self._compile()
+
+        # Pad the alphabet so the integer tables stay 4-byte aligned
+        alphabet = self.alphabet.encode('ascii')
+        alphabet += b'\0' * (-len(alphabet) % 4)
+        header = CACHE_HEADER.pack(
+            CACHE_MAGIC, CACHE_VERSION, self.digest(),
+            len(alphabet), len(self.value), len(self.point_data)
+        )
+        return b''.join([
+            header, alphabet,
+            bytes(self.transitions), bytes(self.value), bytes(self.point_data)
+        ])
+
+    def _save_cache(self) -> None:
+        """Write the compiled tables to the cache file, if one is configured."""
+        if not self.cache_file:
+            return
+
+        self.compiled = True
+        temp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            with open(temp_file, 'wb') as f:
+                f.write(self.dump_tables())
+            os.replace(temp_file, self.cache_file)
+        except (IOError, OSError) as e:
+            print(f"Error saving hyphenation cache: {e}")
+
+    def _word_points(self, work: str, points: List[int]) -> None:
+        """
+        Apply every matching pattern to a point buffer.
+        
+        Args:
+            work: Lowercased word wrapped in '.' markers
+            points: Buffer of at least len(work) + 1 zeros, updated in place
+        """
+        codes = self.codes
+        width = self.width
+        transitions = self.transitions
+        value = self.value
+        point_data = self.point_data
+
+        state = 0
+        end = 1
+        for c in work:
+            state = transitions[state * width + codes.get(c, 0)]
+            v = value[state]
+            if v >= 0:
+                size = point_data[v]
+                k = end - size + 1
+                for p in point_data[v + 1:v + 1 + size]:
+                    if p > points[k]:
+                        points[k] = p
+                    k += 1
+            end += 1
+
+    def _pieces(self, word: str, points: Sequence[int]) -> List[str]:
+        """
+        Split a word at the odd points.
+        
+        Args:
+            word: Word to split
+            points: Points for the word, offset by the leading '.' marker
+            
+        Returns:
+            List[str]: List of word parts
+        """
+        pieces = []
+        start = 0
+        for k in range(len(word)):
+            if points[k + 2] % 2:
+                pieces.append(word[start:k + 1])
+                start = k + 1
+        pieces.append(word[start:])
+        return pieces
 
     def hyphenate_word(self, word: str) -> List[str]:
         """
@@ -80,34 +329,60 @@ class Hyphenator:
         # Short words aren't hyphenated.
         if len(word) <= 4:
             return [word]
+
+        if not self.compiled:
+            self._compile()
             
         # If the word is an exception, get the stored points.
-        if word.lower() in self.exceptions:
-            points = self.exceptions[word.lower()]
+        lowered = word.lower()
+        if lowered in self.exceptions:
+            points = self.exceptions[lowered]
         else:
-            work = '.' + word.lower() + '.'
+            work = '.' + lowered + '.'
             points = [0] * (len(work) + 1)
-            for i in range(len(work)):
-                t = self.tree
-                for c in work[i:]:
-                    if c in t:
-                        t = t[c]
-                        if None in t:
-                            p = t[None]
-                            for j in range(len(p)):
-                                points[i + j] = max(points[i + j], p[j])
-                    else:
-                        break
+            self._word_points(work, points)
             # No hyphens in the first two chars or the last two.
             points[1] = points[2] = points[-2] = points[-3] = 0
 
-        # Examine the points to build the pieces list.
-        pieces = ['']
-        for c, p in zip(word, points[2:]):
-            pieces[-1] += c
-            if p % 2:
-                pieces.append('')
-        return pieces
+        return self._pieces(word, points)
+
+    def hyphenate_many(self, words: Iterable[str]) -> List[List[str]]:
+        """
+        Hyphenate a batch of words, reusing one point buffer.
+        
+        Args:
+            words: Words to hyphenate
+            
+        Returns:
+            List[List[str]]: Pieces of each word, in input order
+        """
+        if not self.compiled:
+            self._compile()
+
+        results = []
+        buffer = [0] * 64
+        for word in words:
+            if len(word) <= 4:
+                results.append([word])
+                continue
+
+            lowered = word.lower()
+            if lowered in self.exceptions:
+                results.append(self._pieces(word, self.exceptions[lowered]))
+                continue
+
+            work = '.' + lowered + '.'
+            size = len(work) + 1
+            if size > len(buffer):
+                buffer = [0] * (size * 2)
+            for i in range(size):
+                buffer[i] = 0
+            self._word_points(work, buffer)
+            # No hyphens in the first two chars or the last two.
+            buffer[1] = buffer[2] = buffer[size - 2] = buffer[size - 3] = 0
+
+            results.append(self._pieces(word, buffer[:size]))
+        return results
 
 
 # Load the patterns and exceptions
@@ -271,8 +546,12 @@ ret-ri-bu-tion ta-ble
 """
 
 # Create a singleton instance
-hyphenator = Hyphenator(patterns, exceptions)
+hyphenator = Hyphenator(
+    patterns, exceptions,
+    cache_file=os.path.join(config.get('cache_dir', config.CACHE_DIR), 'hyphenate.bin')
+)
 hyphenate_word = hyphenator.hyphenate_word
+hyphenate_many = hyphenator.hyphenate_many
 
 # Clean up namespace
 del patterns
@@ -0,0 +1,435 @@
+"""
+Name filter module for CTchargen.
+
+A module to keep generated names clear of blocked substrings and within
+length and syllable-count limits.
+
+The blocklist is compiled into an Aho-Corasick automaton, so checking a name
+costs time proportional to the length of the name no matter how many
+entries the blocklist holds. The automaton can also be stepped one letter at
+a time, which lets the word generator reject a letter as soon as it would
+complete a blocked substring instead of regenerating the whole word.
+
+v1.0 - Added for CTchargen name filtering
+"""
+
+import os
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.lib import stellagama as sg
+from src.config import config
+
+
+class NameFilterError(ValueError):
+    """
+    Raised when the name filter settings leave no name to choose.
+    """
+
+
+def letter_count(name: str) -> int:
+    """
+    Count the letters of a name, ignoring spaces and commas.
+
+    Args:
+        name: Name to measure
+
+    Returns:
+        int: Number of letters
+    """
+    return len(name.replace(' ', '').replace(',', ''))
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton for matching many substrings at once.
+    """
+
+    def __init__(self, words: Iterable[str]):
+        """
+        Compile the automaton.
+
+        Args:
+            words: Substrings to match (matched case-insensitively)
+        """
+        self.words: List[str] = []
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[Tuple[int, ...]] = [()]
+
+        seen = set()
+        for word in words:
+            word = word.strip().lower()
+            if word and word not in seen:
+                seen.add(word)
+                self._insert(word)
+
+        self._build_failure_links()
+
+    def _insert(self, word: str) -> None:
+        """
+        Insert a word into the goto trie.
+
+        Args:
+            word: Word to insert
+        """
+        state = 0
+        for char in word:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][char] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(())
+            state = next_state
+
+        self.output[state] = self.output[state] + (len(self.words),)
+        self.words.append(word)
+
+    def _build_failure_links(self) -> None:
+        """Compute failure links breadth-first and merge outputs along them."""
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                link = self.goto[fallback].get(char, 0)
+                self.fail[child] = link if link != child else 0
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def __len__(self) -> int:
+        """Return the number of compiled words."""
+        return len(self.words)
+
+    def step(self, state: int, char: str) -> int:
+        """
+        Advance the automaton by one character.
+
+        Args:
+            state: Current state (0 is the start state)
+            char: Next character of the text
+
+        Returns:
+            int: New state
+        """
+        char = char.lower()
+        while state and char not in self.goto[state]:
+            state = self.fail[state]
+        return self.goto[state].get(char, 0)
+
+    def advance(self, state: int, text: str) -> Tuple[int, bool]:
+        """
+        Advance the automaton over a string.
+
+        Args:
+            state: Current state
+            text: Text to feed into the automaton
+
+        Returns:
+            Tuple[int, bool]: (new state, whether any word was matched)
+        """
+        matched = False
+        for char in text:
+            state = self.step(state, char)
+            if self.output[state]:
+                matched = True
+        return state, matched
+
+    def search(self, text: str) -> List[Tuple[int, str]]:
+        """
+        Find every occurrence of every word in a text.
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            List[Tuple[int, str]]: (start index, word) pairs in order of their end
+        """
+        matches = []
+        state = 0
+        for index, char in enumerate(text):
+            state = self.step(state, char)
+            for word_index in self.output[state]:
+                word = self.words[word_index]
+                matches.append((index - len(word) + 1, word))
+        return matches
+
+    def contains_match(self, text: str) -> bool:
+        """
+        Check whether a text contains any of the words.
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            bool: True if at least one word occurs in the text
+        """
+        return self.advance(0, text)[1]
+
+
+class NameFilter:
+    """
+    Class holding the content and shape constraints for generated names.
+    """
+
+    def __init__(self, blocklist: Iterable[str] = (),
+                 min_syllables: Optional[int] = None, max_syllables: Optional[int] = None,
+                 min_length: Optional[int] = None, max_length: Optional[int] = None):
+        """
+        Initialize the filter.
+
+        Args:
+            blocklist: Substrings that may not appear in a name
+            min_syllables: Minimum number of syllables (optional)
+            max_syllables: Maximum number of syllables (optional)
+            min_length: Minimum number of letters (optional)
+            max_length: Maximum number of letters (optional)
+        """
+        self.automaton = AhoCorasick(blocklist)
+        self.min_syllables = min_syllables
+        self.max_syllables = max_syllables
+        self.min_length = min_length
+        self.max_length = max_length
+
+    @classmethod
+    def from_config(cls, settings: Dict) -> 'NameFilter':
+        """
+        Create a filter from the `name_generation` configuration section.
+
+        Args:
+            settings: Name generation settings
+
+        Returns:
+            NameFilter: The configured filter
+        """
+        blocklist = list(settings.get('blocklist', []))
+
+        blocklist_file = settings.get('blocklist_file')
+        if blocklist_file:
+            blocklist.extend(load_blocklist(blocklist_file))
+
+        return cls(
+            blocklist,
+            min_syllables=settings.get('min_syllables'),
+            max_syllables=settings.get('max_syllables'),
+            min_length=settings.get('min_length'),
+            max_length=settings.get('max_length'),
+        )
+
+    @property
+    def has_blocklist(self) -> bool:
+        """Whether any substrings are blocked."""
+        return len(self.automaton) > 0
+
+    @property
+    def has_length_limits(self) -> bool:
+        """Whether the name length is constrained."""
+        return self.min_length is not None or self.max_length is not None
+
+    @property
+    def is_active(self) -> bool:
+        """Whether the filter constrains anything at all."""
+        return (self.has_blocklist or self.has_length_limits
+                or self.min_syllables is not None or self.max_syllables is not None)
+
+    def allowed_syllables(self, choices: Sequence[int]) -> List[int]:
+        """
+        Restrict a weighted list of syllable counts to the configured range.
+
+        Args:
+            choices: Syllable counts to choose from (repeats act as weights)
+
+        Returns:
+            List[int]: The counts that fall within the range
+        """
+        low = self.min_syllables if self.min_syllables is not None else 0
+        high = self.max_syllables if self.max_syllables is not None else max(choices, default=0)
+        allowed = [count for count in choices if low <= count <= high]
+        if not allowed:
+            # The configured range does not overlap the syllable rules, so
+            # use the nearest count the range allows.
+            allowed = [max(low, min(high, max(choices, default=1)))]
+        return allowed
+
+    def is_allowed(self, name: str) -> bool:
+        """
+        Check a finished name against the filter.
+
+        Args:
+            name: Name to check
+
+        Returns:
+            bool: True if the name passes every constraint
+        """
+        return self.allows_length(letter_count(name)) and not self.automaton.contains_match(name)
+
+    def allows_length(self, letters: int) -> bool:
+        """
+        Check a number of letters against the length limits.
+
+        Args:
+            letters: Letters in a name
+
+        Returns:
+            bool: True if the length is within the limits
+        """
+        if self.min_length is not None and letters < self.min_length:
+            return False
+        if self.max_length is not None and letters > self.max_length:
+            return False
+        return True
+
+    def filter_names(self, names: Iterable[str]) -> List[str]:
+        """
+        Drop every name that contains a blocked substring.
+
+        Args:
+            names: Names to filter
+
+        Returns:
+            List[str]: Names free of blocked substrings
+        """
+        if not self.has_blocklist:
+            return list(names)
+        return [name for name in names if not self.automaton.contains_match(name)]
+
+
+def load_blocklist(filename: str) -> List[str]:
+    """
+    Load a blocklist file with one entry per line.
+
+    Blank lines and lines starting with `#` are ignored.
+
+    Args:
+        filename: Path to the blocklist file
+
+    Returns:
+        List[str]: Blocklist entries
+    """
+    if not os.path.isabs(filename):
+        filename = os.path.join(config.BASE_DIR, filename)
+
+    try:
+        with open(filename, 'r') as blocklist_file:
+            return [line.strip() for line in blocklist_file
+                    if line.strip() and not line.lstrip().startswith('#')]
+    except IOError as e:
+        print(f"Error loading name blocklist: {e}")
+        return []
+
+
+# Name lists already read and filtered, keyed by file path
+_name_lists: Dict[str, Sequence[str]] = {}
+
+# Allowed names of each name list grouped by letter count, keyed by file path
+_names_by_length: Dict[str, Dict[int, List[str]]] = {}
+
+
+def load_name_list(filename: str) -> Sequence[str]:
+    """
+    Load a name list file, dropping names the filter blocks.
+
+    The filtered list is cached, so each file is read and scanned once.
+
+    Args:
+        filename: Path to the name list
+
+    Returns:
+        Sequence[str]: Allowed names
+    """
+    names = _name_lists.get(filename)
+    if names is None:
+        with open(filename, 'r') as name_file:
+            lines = [line.strip() for line in name_file if line.strip()]
+        names = name_filter.filter_names(lines)
+        _name_lists[filename] = names
+    return names
+
+
+def install_name_list(filename: str, names: Sequence[str]) -> None:
+    """
+    Provide an already-filtered name list for a file.
+
+    Args:
+        filename: Path the names were loaded from
+        names: Allowed names
+    """
+    _name_lists[filename] = names
+    _names_by_length.pop(filename, None)
+
+
+def names_by_length(filename: str) -> Dict[int, List[str]]:
+    """
+    Group the allowed names of a name list by their number of letters.
+
+    Args:
+        filename: Path to the name list
+
+    Returns:
+        Dict[int, List[str]]: Names keyed by letter count, in list order
+    """
+    groups = _names_by_length.get(filename)
+    if groups is None:
+        groups = {}
+        for name in load_name_list(filename):
+            groups.setdefault(letter_count(name), []).append(name)
+        _names_by_length[filename] = groups
+    return groups
+
+
+def random_name(*filenames: str) -> str:
+    """
+    Randomly choose an allowed name from each name list and join them.
+
+    Without length limits each part is drawn from its whole list. With
+    them, each part is drawn only from the names that the parts still to
+    come can complete into a name within the limits.
+
+    Args:
+        filenames: Paths to the name lists, e.g. first names then surnames
+
+    Returns:
+        str: The parts joined by spaces
+
+    Raises:
+        NameFilterError: If a list has no allowed names, or no combination
+            fits the length limits
+    """
+    for filename in filenames:
+        if not load_name_list(filename):
+            raise NameFilterError(f"No allowed names in {filename}")
+
+    if not name_filter.has_length_limits:
+        return " ".join(sg.random_choice(load_name_list(filename)) for filename in filenames)
+
+    groups = [names_by_length(filename) for filename in filenames]
+
+    # Letter counts the parts after each part can add up to
+    totals_after = [{0}]
+    for lengths in reversed(groups[1:]):
+        totals_after.insert(0, {total + length for total in totals_after[0] for length in lengths})
+
+    parts = []
+    letters = 0
+    for lengths, totals in zip(groups, totals_after):
+        candidates = [
+            name
+            for length in sorted(lengths)
+            if any(name_filter.allows_length(letters + length + total) for total in totals)
+            for name in lengths[length]
+        ]
+        if not candidates:
+            raise NameFilterError("No names from the name lists fit the name length limits")
+        name = sg.random_choice(candidates)
+        parts.append(name)
+        letters += letter_count(name)
+    return " ".join(parts)
+
+
+# Create a singleton instance
+name_filter = NameFilter.from_config(config.get('name_generation', {}))
@@ -0,0 +1,253 @@
+"""
+Output file module for CTchargen.
+
+This module writes output files as streams of text. Text is collected into
+chunks of `output_flush_size` characters and written a chunk at a time, so
+an export of any size is written in constant memory and reaches the disk as
+it goes.
+
+Files are written atomically: the text goes to a temporary file beside the
+target, which replaces the target only once everything has been written and
+synced. A run that fails or is killed part way leaves any earlier file in
+place and never a half-written one. The new file keeps the permissions of
+the file it replaces, or gets the ones open() would give it under the
+umask.
+
+Files can be compressed as they are written with gzip, bz2 or lzma. The
+compressed stream is written deterministically (gzip headers carry no
+name or timestamp), so the same content always gives the same bytes.
+
+v1.0 - Added for CTchargen output
+"""
+
+import io
+import os
+import stat
+from typing import IO, List, Optional, Tuple, Union
+
+from src.config import config
+
+
+# Characters collected before a chunk is written
+DEFAULT_FLUSH_SIZE = 1 << 20
+
+# Permissions of a new file under the process umask, read once at import
+# since the umask can only be read by setting it
+_umask = os.umask(0)
+os.umask(_umask)
+NEW_FILE_MODE = 0o666 & ~_umask
+del _umask
+
+# File extension of each compression
+COMPRESSIONS = {
+    'gzip': 'gz',
+    'bz2': 'bz2',
+    'lzma': 'xz',
+}
+
+
+def compressed_extension(extension: str, compression: Optional[str]) -> str:
+    """
+    Get the extension of a file once compressed.
+
+    Args:
+        extension: Extension of the uncompressed file (e.g. "jsonl")
+        compression: "gzip", "bz2", "lzma" or None
+
+    Returns:
+        str: Extension with the compression's suffix (e.g. "jsonl.gz")
+
+    Raises:
+        ValueError: If the compression is unknown
+    """
+    if not compression:
+        return extension
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression: {compression}")
+    return f"{extension}.{COMPRESSIONS[compression]}"
+
+
+def _compressor(raw: IO, compression: str) -> IO:
+    """Wrap a binary file in a compressing writer that leaves it open when closed."""
+    # Imported here so uncompressed output doesn't load the compression libraries
+    if compression == 'gzip':
+        import gzip
+        return gzip.GzipFile(filename='', mode='wb', fileobj=raw, mtime=0)
+    if compression == 'bz2':
+        import bz2
+        return bz2.BZ2File(raw, 'wb')
+    if compression == 'lzma':
+        import lzma
+        return lzma.LZMAFile(raw, 'wb')
+    raise ValueError(f"Unknown compression: {compression}")
+
+
+def _create_temp_file(directory: str, name: str) -> Tuple[int, str]:
+    """
+    Create a new file, private to its owner, beside the one it will replace.
+
+    Does what tempfile.mkstemp() does without importing tempfile, which
+    loads shutil, weakref and the compression libraries with it.
+
+    Args:
+        directory: Directory of the target file
+        name: Name of the target file
+
+    Returns:
+        Tuple[int, str]: Descriptor and path of the new file
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
+    for _ in range(100):
+        # os.urandom() leaves the seeded random sequence alone
+        path = os.path.join(directory, f".{name}.{os.urandom(6).hex()}.tmp")
+        try:
+            return os.open(path, flags, 0o600), path
+        except FileExistsError:
+            continue
+    raise FileExistsError(f"No unused temporary file name for {name}")
+
+
+class OutputFile:
+    """
+    Class writing a text or binary file in chunks, replacing the target atomically.
+
+    Use it as a context manager: the file is committed when the block ends
+    normally and discarded if it raises.
+    """
+
+    def __init__(self, path: str, flush_size: Optional[int] = None, atomic: bool = True,
+                 binary: bool = False, compression: Optional[str] = None):
+        """
+        Prepare the file.
+
+        Args:
+            path: Target path
+            flush_size: Characters (or bytes) collected before each write
+                (optional, uses the output_flush_size setting)
+            atomic: Write to a temporary file and rename it over the target;
+                if False the target is written in place
+            binary: Write bytes instead of text
+            compression: Compress the file with "gzip", "bz2" or "lzma"
+                (optional)
+
+        Raises:
+            ValueError: If the compression is unknown
+        """
+        if compression and compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression: {compression}")
+        if flush_size is None:
+            flush_size = config.get('output_flush_size', DEFAULT_FLUSH_SIZE)
+        self.path = path
+        self.flush_size = max(1, flush_size)
+        self.atomic = atomic
+        self.binary = binary
+        self.compression = compression or None
+        self.temp_path: Optional[str] = None
+        self._raw: Optional[IO] = None
+        self._file: Optional[IO] = None
+        self._pending: List[Union[str, bytes]] = []
+        self._pending_size = 0
+
+    def open(self) -> 'OutputFile':
+        """
+        Open the file for writing.
+
+        Returns:
+            OutputFile: This file
+        """
+        if self.atomic:
+            directory, name = os.path.split(os.path.abspath(self.path))
+            fd, self.temp_path = _create_temp_file(directory, name)
+            self._raw = os.fdopen(fd, 'wb')
+            # The temporary file is created private to its owner
+            try:
+                mode = stat.S_IMODE(os.stat(self.path).st_mode)
+            except OSError:
+                mode = NEW_FILE_MODE
+            try:
+                os.chmod(self.temp_path, mode)
+            except OSError:
+                self.discard()
+                raise
+        else:
+            self._raw = open(self.path, 'wb')
+
+        self._file = self._raw
+        if self.compression:
+            self._file = _compressor(self._raw, self.compression)
+        if not self.binary:
+            self._file = io.TextIOWrapper(self._file, encoding='utf-8', write_through=True)
+        return self
+
+    @property
+    def file(self) -> IO:
+        """
+        The open file, for libraries that write to it themselves.
+
+        Text passed to `write()` is flushed first, so the two can be mixed.
+        """
+        self.flush()
+        return self._file
+
+    def write(self, text: Union[str, bytes]) -> None:
+        """
+        Add text to the file, writing a chunk once enough has been collected.
+
+        Args:
+            text: Text to write (bytes for a binary file)
+        """
+        self._pending.append(text)
+        self._pending_size += len(text)
+        if self._pending_size >= self.flush_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the collected text."""
+        if self._pending:
+            self._file.write((b'' if self.binary else '').join(self._pending))
+            self._pending = []
+            self._pending_size = 0
+
+    def commit(self) -> None:
+        """Finish the file and move it into place."""
+        self.flush()
+        layer = self._file
+        if isinstance(layer, io.TextIOWrapper):
+            layer = layer.detach()
+        if layer is not self._raw and not layer.closed:
+            # Closing the compression layer ends the compressed stream but
+            # leaves the file itself open
+            layer.close()
+        if not self._raw.closed:
+            if self.atomic:
+                self._raw.flush()
+                os.fsync(self._raw.fileno())
+            self._raw.close()
+        if self.atomic:
+            os.replace(self.temp_path, self.path)
+            self.temp_path = None
+
+    def discard(self) -> None:
+        """Abandon the file, removing the temporary file."""
+        self._pending = []
+        for f in (self._file, self._raw):
+            if f is not None:
+                try:
+                    f.close()
+                except (OSError, ValueError):
+                    pass
+        if self.temp_path is not None:
+            try:
+                os.remove(self.temp_path)
+            except OSError:
+                pass
+            self.temp_path = None
+
+    def __enter__(self) -> 'OutputFile':
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
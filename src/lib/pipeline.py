@@ -0,0 +1,66 @@
+"""
+Pipeline module for CTchargen.
+
+This module runs a stream of work through a process pool and merges the
+results back in their original order.
+
+Input is cut into chunks and each chunk is one task. Only a bounded number
+of tasks is in flight at a time: once the limit is reached, the oldest task
+is waited for and its result yielded before more input is read. A slow
+consumer (such as a file being written) therefore holds back the input
+instead of letting results pile up, and memory stays bounded by the chunk
+size times the number of tasks in flight, whatever the length of the stream.
+
+v1.0 - Added for CTchargen output
+"""
+
+from collections import deque
+from itertools import islice
+from typing import Any, Callable, Deque, Iterable, Iterator, List, Optional
+
+
+def chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """
+    Cut a stream into lists.
+
+    Args:
+        items: Items to cut up
+        size: Items per list
+
+    Yields:
+        List[Any]: Lists of `size` items, the last possibly shorter
+    """
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, max(1, size)))
+        if not chunk:
+            return
+        yield chunk
+
+
+def ordered_map(executor: Any, function: Callable[[Any], Any], tasks: Iterable[Any],
+                max_pending: Optional[int] = None) -> Iterator[Any]:
+    """
+    Run tasks in a pool, yielding results in task order with bounded work in flight.
+
+    Args:
+        executor: A concurrent.futures executor
+        function: Function run on each task; it must be picklable for a process pool
+        tasks: Task arguments, read lazily
+        max_pending: Most tasks submitted but not yet yielded (optional,
+            twice the executor's workers)
+
+    Yields:
+        Any: The result of each task, in task order
+    """
+    if max_pending is None:
+        max_pending = 2 * getattr(executor, '_max_workers', 1)
+    max_pending = max(1, max_pending)
+
+    pending: Deque[Any] = deque()
+    for task in tasks:
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+        pending.append(executor.submit(function, task))
+    while pending:
+        yield pending.popleft().result()
@@ -0,0 +1,414 @@
+"""
+Jump route module for CTchargen.
+
+This module connects worlds on the hex map into jump-1 to jump-6 graphs and
+finds shortest jump paths between them.
+
+Hex distances use map-wide coordinates (see `sector.to_global`), converted
+from the offset layout of the map, where every other column sits half a hex
+lower, to cube coordinates. Worlds are bucketed into squares of the maximum
+jump distance, so finding the worlds within jump range only looks at the
+nine surrounding buckets instead of every other world.
+
+Shortest paths are precomputed per sector and jump rating by a breadth-first
+search from every world, and stored as two flat arrays (jump counts and next
+hops). Tables are built on first use and dropped only for the sectors whose
+worlds or borders changed. A table path is used when no path leaving the
+sector could be shorter; otherwise the whole map is searched.
+
+v1.0 - Added for CTchargen route planning
+"""
+
+from array import array
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.lib.sector import Sector, from_global, parse_hex, to_global
+from src.lib.worldgen import World
+
+
+# Longest jump a route graph supports
+MAX_JUMP = 6
+
+Location = Tuple[int, int]
+
+
+def to_cube(x: int, y: int) -> Tuple[int, int, int]:
+    """
+    Convert map-wide offset coordinates to cube coordinates.
+
+    Columns with an odd map-wide x (even hex columns within a sector) sit
+    half a hex lower than their neighbours.
+
+    Args:
+        x: Map-wide hex column
+        y: Map-wide hex row
+
+    Returns:
+        Tuple[int, int, int]: Cube coordinates (q, r, s), with q + r + s == 0
+    """
+    q = x
+    r = y - (x - (x & 1)) // 2
+    return q, r, -q - r
+
+
+def hex_distance(a: Location, b: Location) -> int:
+    """
+    Count the hexes between two map-wide locations.
+
+    Args:
+        a: First location (x, y)
+        b: Second location (x, y)
+
+    Returns:
+        int: Distance in parsecs
+    """
+    aq, ar, as_ = to_cube(*a)
+    bq, br, bs = to_cube(*b)
+    return max(abs(aq - bq), abs(ar - br), abs(as_ - bs))
+
+
+class RouteTable:
+    """
+    Class holding the shortest jump paths between every pair of worlds in a
+    sector.
+
+    For worlds i and j (indexes into `locations`), `hops[i * n + j]` is the
+    number of jumps from i to j (-1 if j is unreachable) and
+    `next_hop[i * n + j]` is the index of the first world on the way.
+    `exits` are the worlds with a world of another sector in range, where a
+    path can leave the sector.
+    """
+
+    def __init__(self, locations: List[Location], hops: array, next_hop: array,
+                 exits: Sequence[int] = ()):
+        """
+        Initialize the table.
+
+        Args:
+            locations: Locations of the sector's worlds
+            hops: Flat matrix of jump counts
+            next_hop: Flat matrix of next hops
+            exits: Indexes of the worlds in range of another sector's worlds
+        """
+        self.locations = locations
+        self.index = {location: i for i, location in enumerate(locations)}
+        self.hops = hops
+        self.next_hop = next_hop
+        self.exits = exits
+
+    def __len__(self) -> int:
+        """Return the number of worlds in the table."""
+        return len(self.locations)
+
+    def jumps(self, start: Location, end: Location) -> Optional[int]:
+        """
+        Get the fewest jumps between two worlds.
+
+        Args:
+            start: Starting location
+            end: Destination location
+
+        Returns:
+            Optional[int]: Number of jumps, or None if the destination is unreachable
+        """
+        hops = self.hops[self.index[start] * len(self.locations) + self.index[end]]
+        return None if hops < 0 else hops
+
+    def fewest_outside_jumps(self, start: Location, end: Location) -> Optional[int]:
+        """
+        Get a lower bound on the jumps of a path that leaves the sector.
+
+        Such a path reaches an exit, makes at least two jumps outside the
+        sector to come back in at another exit, and goes on to the end.
+
+        Args:
+            start: Starting location
+            end: Destination location
+
+        Returns:
+            Optional[int]: The bound, or None if no path can leave and re-enter
+        """
+        n = len(self.locations)
+        row, column = self.index[start] * n, self.index[end]
+        out = [self.hops[row + exit_] for exit_ in self.exits if self.hops[row + exit_] >= 0]
+        back = [self.hops[exit_ * n + column] for exit_ in self.exits if self.hops[exit_ * n + column] >= 0]
+        if not out or not back:
+            return None
+        return min(out) + 2 + min(back)
+
+    def path(self, start: Location, end: Location) -> Optional[List[Location]]:
+        """
+        Get a shortest jump path between two worlds.
+
+        Args:
+            start: Starting location
+            end: Destination location
+
+        Returns:
+            Optional[List[Location]]: Locations from start to end, or None if unreachable
+        """
+        n = len(self.locations)
+        current, target = self.index[start], self.index[end]
+        if self.hops[current * n + target] < 0:
+            return None
+
+        path = [self.locations[current]]
+        while current != target:
+            current = self.next_hop[current * n + target]
+            path.append(self.locations[current])
+        return path
+
+
+class JumpGraph:
+    """
+    Class connecting worlds within jump range of each other.
+    """
+
+    def __init__(self, worlds: Iterable[Tuple[int, int, World]] = (), max_jump: int = MAX_JUMP):
+        """
+        Build the graph.
+
+        Args:
+            worlds: (x, y, world) for every world, in map-wide coordinates
+            max_jump: Longest jump the graph supports (1-6)
+        """
+        if not 1 <= max_jump <= MAX_JUMP:
+            raise ValueError(f"max_jump must be between 1 and {MAX_JUMP}")
+
+        self.max_jump = max_jump
+        self.worlds: Dict[Location, World] = {}
+        self._buckets: Dict[Location, List[Location]] = {}
+        self._neighbors: Dict[Location, Dict[Location, int]] = {}
+        self._tables: Dict[Tuple[int, int, int], RouteTable] = {}
+
+        for x, y, world in worlds:
+            self.worlds[(x, y)] = world
+            self._buckets.setdefault(self._bucket(x, y), []).append((x, y))
+
+        for location in self.worlds:
+            self._neighbors[location] = self._find_neighbors(location)
+
+    @classmethod
+    def from_sectors(cls, sectors: Iterable[Sector], max_jump: int = MAX_JUMP) -> 'JumpGraph':
+        """
+        Build the graph for generated sectors.
+
+        Args:
+            sectors: Sectors to connect
+            max_jump: Longest jump the graph supports (1-6)
+
+        Returns:
+            JumpGraph: The graph
+        """
+        worlds = []
+        for sector in sectors:
+            for hex_number, world in sector.worlds.items():
+                x, y = to_global(sector.sector_x, sector.sector_y, *parse_hex(hex_number))
+                worlds.append((x, y, world))
+        return cls(worlds, max_jump)
+
+    def _bucket(self, x: int, y: int) -> Location:
+        """Get the spatial bucket holding a location."""
+        return x // self.max_jump, y // self.max_jump
+
+    def _find_neighbors(self, location: Location) -> Dict[Location, int]:
+        """
+        Find the worlds within the graph's maximum jump of a location.
+
+        A hex within N parsecs is at most N columns and N rows away, so only
+        the 3x3 buckets around the location can hold one.
+
+        Args:
+            location: Map-wide location
+
+        Returns:
+            Dict[Location, int]: Distance to every world in range
+        """
+        bucket_x, bucket_y = self._bucket(*location)
+        neighbors = {}
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for other in self._buckets.get((bucket_x + dx, bucket_y + dy), ()):
+                    if other != location:
+                        distance = hex_distance(location, other)
+                        if distance <= self.max_jump:
+                            neighbors[other] = distance
+        return neighbors
+
+    def __len__(self) -> int:
+        """Return the number of worlds in the graph."""
+        return len(self.worlds)
+
+    def neighbors(self, location: Location, jump: int) -> List[Location]:
+        """
+        List the worlds reachable from a location in a single jump.
+
+        Args:
+            location: Map-wide location of a world
+            jump: Jump rating (1 to the graph's maximum)
+
+        Returns:
+            List[Location]: Locations within range, nearest first
+        """
+        self._check_jump(jump)
+        in_range = [(distance, other) for other, distance in self._neighbors[location].items()
+                    if distance <= jump]
+        return [other for _, other in sorted(in_range)]
+
+    def set_world(self, location: Location, world: Optional[World]) -> None:
+        """
+        Replace the world at a location, for example after regenerating it.
+
+        If the hex stays occupied the routes are unchanged. If a world
+        appears or disappears, only its neighbours' adjacency is updated and
+        only the route tables of its own sector and of its neighbours'
+        sectors, whose exits may change, are dropped.
+
+        Args:
+            location: Map-wide location
+            world: The new world, or None if the hex is now empty
+        """
+        occupied = location in self.worlds
+        if world is not None and occupied:
+            self.worlds[location] = world
+            return
+        if world is None and not occupied:
+            return
+
+        bucket = self._buckets.setdefault(self._bucket(*location), [])
+        if world is None:
+            del self.worlds[location]
+            bucket.remove(location)
+            neighbors = self._neighbors.pop(location)
+            for other in neighbors:
+                del self._neighbors[other][location]
+        else:
+            self.worlds[location] = world
+            bucket.append(location)
+            neighbors = self._neighbors[location] = self._find_neighbors(location)
+            for other, distance in neighbors.items():
+                self._neighbors[other][location] = distance
+
+        sectors = {from_global(*other)[:2] for other in neighbors}
+        sectors.add(from_global(*location)[:2])
+        for key in [key for key in self._tables if key[:2] in sectors]:
+            del self._tables[key]
+
+    def route_table(self, sector_x: int, sector_y: int, jump: int) -> RouteTable:
+        """
+        Get the all-pairs shortest jump paths within a sector.
+
+        Paths only pass through worlds of the same sector. The table is
+        built on first use and kept until a world of the sector, or one in
+        range of it, changes.
+
+        Args:
+            sector_x: Sector column
+            sector_y: Sector row
+            jump: Jump rating (1 to the graph's maximum)
+
+        Returns:
+            RouteTable: Paths between the sector's worlds
+        """
+        self._check_jump(jump)
+        key = (sector_x, sector_y, jump)
+        table = self._tables.get(key)
+        if table is None:
+            table = self._build_table(sector_x, sector_y, jump)
+            self._tables[key] = table
+        return table
+
+    def _build_table(self, sector_x: int, sector_y: int, jump: int) -> RouteTable:
+        """
+        Run a breadth-first search from every world of a sector.
+
+        Args:
+            sector_x: Sector column
+            sector_y: Sector row
+            jump: Jump rating
+
+        Returns:
+            RouteTable: Paths between the sector's worlds
+        """
+        locations = sorted(location for location in self.worlds
+                           if from_global(*location)[:2] == (sector_x, sector_y))
+        index = {location: i for i, location in enumerate(locations)}
+        adjacency = [
+            [index[other] for other, distance in self._neighbors[location].items()
+             if distance <= jump and other in index]
+            for location in locations
+        ]
+        exits = array('i', [
+            i for i, location in enumerate(locations)
+            if any(distance <= jump and other not in index
+                   for other, distance in self._neighbors[location].items())
+        ])
+
+        n = len(locations)
+        hops = array('h', [-1]) * (n * n)
+        next_hop = array('i', [-1]) * (n * n)
+
+        for source in range(n):
+            row = source * n
+            hops[row + source] = 0
+            next_hop[row + source] = source
+            queue = deque([source])
+            while queue:
+                current = queue.popleft()
+                depth = hops[row + current] + 1
+                first = next_hop[row + current]
+                for other in adjacency[current]:
+                    if hops[row + other] < 0:
+                        hops[row + other] = depth
+                        next_hop[row + other] = other if current == source else first
+                        queue.append(other)
+
+        return RouteTable(locations, hops, next_hop, exits)
+
+    def path(self, start: Location, end: Location, jump: int) -> Optional[List[Location]]:
+        """
+        Find a shortest jump path between two worlds.
+
+        Paths within one sector come from the sector's route table, unless a
+        path through a neighbouring sector could be shorter; other paths are
+        searched directly.
+
+        Args:
+            start: Starting location
+            end: Destination location
+            jump: Jump rating (1 to the graph's maximum)
+
+        Returns:
+            Optional[List[Location]]: Locations from start to end, or None if unreachable
+        """
+        start_sector = from_global(*start)[:2]
+        if start_sector == from_global(*end)[:2]:
+            table = self.route_table(start_sector[0], start_sector[1], jump)
+            hops = table.jumps(start, end)
+            if hops is not None:
+                outside = table.fewest_outside_jumps(start, end)
+                if outside is None or outside >= hops:
+                    return table.path(start, end)
+
+        self._check_jump(jump)
+        previous: Dict[Location, Optional[Location]] = {start: None}
+        queue = deque([start])
+        while queue:
+            current = queue.popleft()
+            if current == end:
+                path = []
+                while current is not None:
+                    path.append(current)
+                    current = previous[current]
+                return path[::-1]
+            for other, distance in self._neighbors[current].items():
+                if distance <= jump and other not in previous:
+                    previous[other] = current
+                    queue.append(other)
+        return None
+
+    def _check_jump(self, jump: int) -> None:
+        """Reject jump ratings the graph was not built for."""
+        if not 1 <= jump <= self.max_jump:
+            raise ValueError(f"jump must be between 1 and {self.max_jump}")
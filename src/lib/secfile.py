@@ -0,0 +1,361 @@
+"""
+Sector file module for CTchargen.
+
+This module reads and writes the community sector data formats:
+
+- Tab-delimited files, with a header line naming the columns (Hex, Name,
+  UWP, Bases, Remarks, Zone, PBG, Allegiance, Stars, ...)
+- Classic SEC files, with one world per line in loosely fixed columns:
+  name, hex, UWP, bases, remarks, travel zone, PBG, allegiance and stars
+
+Files are processed a line at a time, so memory use does not grow with the
+size of the file. UWP strings such as "A788899-C" are decoded with a
+precomputed byte translation table, which turns all nine characters into
+values in one call; the columnar reader decodes a whole chunk of worlds at
+once.
+
+v1.0 - Added for CTchargen sector import and export
+"""
+
+import re
+from contextlib import contextmanager
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from src.config import config
+from src.lib.sector import Sector
+from src.lib.worldgen import STARPORT_CLASSES, World, WorldArray, get_numpy
+
+
+# Pseudo-hex digits, 0-9 then letters without I and O
+PSEUDO_HEX = '0123456789ABCDEFGHJKLMNPQRSTUVWXYZ'
+
+# Value of each byte as a pseudo-hex digit (case-insensitive), or INVALID.
+# Starport classes keep their own letters so a whole UWP translates at once.
+INVALID = 0xFF
+_table = bytearray([INVALID]) * 256
+for _value, _digit in enumerate(PSEUDO_HEX):
+    _table[ord(_digit)] = _table[ord(_digit.lower())] = _value
+_table[ord('-')] = _table[ord('?')] = 0
+DECODE_TABLE = bytes(_table)
+del _table, _value, _digit
+
+# Tab-delimited columns written by write_worlds()
+TAB_COLUMNS = ('Sector', 'SS', 'Hex', 'Name', 'UWP', 'Bases', 'Remarks',
+               'Zone', 'PBG', 'Allegiance', 'Stars')
+
+# The hex number and UWP that anchor each line of a SEC file. Any starport
+# letter matches, so decode_uwp() reports an unsupported one instead of the
+# line being skipped.
+SEC_PATTERN = re.compile(r'^(?P<name>.*?)\s*(?P<hex>\d{4})\s+(?P<uwp>[A-HX?][0-9A-Z?]{6}-[0-9A-Z?])(?:\s+|$)')
+ZONES = ('A', 'R', 'F', 'U', '-')
+
+
+def decode_uwp(uwp: str) -> Tuple[str, List[int]]:
+    """
+    Decode a UWP string.
+
+    An unknown starport ("?") is read as X, as read_world_arrays() does.
+
+    Args:
+        uwp: UWP string, e.g. "A788899-C"
+
+    Returns:
+        Tuple[str, List[int]]: (starport class, [size, atmosphere, hydrographics,
+            population, government, law level, tech level])
+
+    Raises:
+        ValueError: If the UWP is malformed or its starport is not one of
+            STARPORT_CLASSES
+    """
+    if len(uwp) != 9 or uwp[7] != '-':
+        raise ValueError(f"Invalid UWP: {uwp!r}")
+    starport = 'X' if uwp[0] == '?' else uwp[0].upper()
+    codes = uwp.encode('ascii', 'replace').translate(DECODE_TABLE)
+    values = list(codes[1:7]) + [codes[8]]
+    if starport not in STARPORT_CLASSES or INVALID in values:
+        raise ValueError(f"Invalid UWP: {uwp!r}")
+    return starport, values
+
+
+def encode_uwp(starport: str, values: Iterable[int]) -> str:
+    """
+    Encode a UWP string.
+
+    Args:
+        starport: Starport class
+        values: Size, atmosphere, hydrographics, population, government,
+            law level and tech level
+
+    Returns:
+        str: UWP string
+    """
+    digits = ''.join(PSEUDO_HEX[value] for value in values)
+    return f"{starport}{digits[:6]}-{digits[6:]}"
+
+
+def subsector_letter(hex_number: str) -> str:
+    """
+    Get the letter of the subsector holding a sector hex.
+
+    Args:
+        hex_number: Hex number, e.g. "1910"
+
+    Returns:
+        str: Subsector letter, A to P
+    """
+    column, row = int(hex_number[:2]), int(hex_number[2:])
+    return 'ABCDEFGHIJKLMNOP'[((row - 1) // 10) * 4 + (column - 1) // 8]
+
+
+@contextmanager
+def _open(source: Union[str, IO[str]], mode: str) -> Iterator[IO[str]]:
+    """Open a path, or pass an already open file through."""
+    if isinstance(source, str):
+        with open(source, mode, encoding='utf-8', newline='') as f:
+            yield f
+    else:
+        yield source
+
+
+def _parse_sec_line(line: str) -> Optional[Dict[str, str]]:
+    """
+    Split a SEC line into its columns.
+
+    Args:
+        line: Line from a SEC file
+
+    Returns:
+        Optional[Dict[str, str]]: Columns by tab-delimited column name, or
+            None if the line holds no world
+    """
+    match = SEC_PATTERN.match(line)
+    if match is None:
+        return None
+
+    row = {'Name': match.group('name').strip(), 'Hex': match.group('hex'), 'UWP': match.group('uwp')}
+    tokens = line[match.end():].split()
+
+    # The PBG is the first three-digit token; the zone may sit just before it
+    pbg = next((i for i, token in enumerate(tokens) if re.fullmatch(r'[0-9X]{3}', token)), len(tokens))
+    before, after = tokens[:pbg], tokens[pbg:]
+    if len(before) > 0 and before[-1] in ZONES and (len(before) > 1 or after):
+        row['Zone'] = before.pop()
+    if before and re.fullmatch(r'[A-Z]{1,3}|-', before[0]):
+        row['Bases'] = before.pop(0)
+    row['Remarks'] = ' '.join(before)
+    if after:
+        row['PBG'] = after[0]
+        if len(after) > 1:
+            row['Allegiance'] = after[1]
+        row['Stars'] = ' '.join(after[2:])
+    return row
+
+
+def read_rows(source: Union[str, IO[str]]) -> Iterator[Dict[str, str]]:
+    """
+    Read the world rows of a tab-delimited or SEC file.
+
+    The format is detected from the first line that is neither blank nor a
+    comment: a line with tabs starts a tab-delimited file. Lines that hold
+    no world (column headers and rulers in SEC files) are skipped.
+
+    Args:
+        source: Path or open text file
+
+    Yields:
+        Dict[str, str]: Columns of each world, by tab-delimited column name
+    """
+    with _open(source, 'r') as f:
+        header = None
+        tabbed = None
+        for line in f:
+            line = line.rstrip('\r\n')
+            if not line.strip() or line.startswith('#'):
+                continue
+
+            if tabbed is None:
+                tabbed = '\t' in line
+                if tabbed:
+                    header = [column.strip() for column in line.split('\t')]
+                    continue
+
+            if tabbed:
+                yield dict(zip(header, map(str.strip, line.split('\t'))))
+            else:
+                row = _parse_sec_line(line)
+                if row is not None:
+                    yield row
+
+
+def read_worlds(source: Union[str, IO[str]]) -> Iterator[World]:
+    """
+    Read the worlds of a tab-delimited or SEC file.
+
+    Columns other than the name, hex and UWP are kept in `world.extra` so
+    they can be written back out.
+
+    Args:
+        source: Path or open text file
+
+    Yields:
+        World: Each world in the file
+
+    Raises:
+        ValueError: If a UWP is malformed
+    """
+    for row in read_rows(source):
+        starport, values = decode_uwp(row['UWP'])
+        world = World.from_values(starport, values, row.get('Name', ''), row.get('Hex', ''))
+        world.extra = {column: value for column, value in row.items()
+                       if column not in ('Name', 'Hex', 'UWP')}
+        yield world
+
+
+def read_world_arrays(source: Union[str, IO[str]], chunk_size: int = 65536) -> Iterator[WorldArray]:
+    """
+    Read the worlds of a tab-delimited or SEC file as columns, a chunk at a time.
+
+    The UWPs of a whole chunk are joined and translated in one call. Requires
+    NumPy.
+
+    Args:
+        source: Path or open text file
+        chunk_size: Number of worlds per chunk
+
+    Yields:
+        WorldArray: Columns for up to chunk_size worlds, with names and hexes
+
+    Raises:
+        ValueError: If a UWP is malformed
+    """
+    np = get_numpy()
+    if np is None:
+        raise ImportError("read_world_arrays() requires numpy")
+
+    starport_codes = np.full(256, INVALID, dtype=np.uint8)
+    for index, starport in enumerate(STARPORT_CLASSES):
+        starport_codes[ord(starport)] = index
+
+    def build(uwps: List[str], names: List[str], hexes: List[str]) -> WorldArray:
+        data = ''.join(uwps).encode('ascii', 'replace')
+        raw = np.frombuffer(data, dtype=np.uint8).reshape(len(uwps), 9)
+        codes = np.frombuffer(data.translate(DECODE_TABLE), dtype=np.uint8).reshape(len(uwps), 9)
+        starport = starport_codes[raw[:, 0]]
+        digits = codes[:, [1, 2, 3, 4, 5, 6, 8]]
+        invalid = (starport == INVALID) | (digits == INVALID).any(axis=1) | (raw[:, 7] != ord('-'))
+        if invalid.any():
+            raise ValueError(f"Invalid UWP: {uwps[int(np.argmax(invalid))]!r}")
+        columns = {field: digits[:, i].copy() for i, field in enumerate(WorldArray.FIELDS[1:])}
+        return WorldArray(names=names, hexes=hexes, starport=starport, **columns)
+
+    uwps: List[str] = []
+    names: List[str] = []
+    hexes: List[str] = []
+    for row in read_rows(source):
+        uwp = row['UWP'].upper()
+        if len(uwp) != 9:
+            raise ValueError(f"Invalid UWP: {uwp!r}")
+        uwps.append(uwp.replace('?', 'X', 1) if uwp[0] == '?' else uwp)
+        names.append(row.get('Name', ''))
+        hexes.append(row.get('Hex', ''))
+        if len(uwps) == chunk_size:
+            yield build(uwps, names, hexes)
+            uwps, names, hexes = [], [], []
+    if uwps:
+        yield build(uwps, names, hexes)
+
+
+def _world_row(world: World, sector: str) -> Dict[str, str]:
+    """
+    Get the tab-delimited columns of a world.
+
+    Args:
+        world: World to write
+        sector: Sector name for worlds that don't carry one
+
+    Returns:
+        Dict[str, str]: Columns by name
+    """
+    extra = getattr(world, 'extra', {})
+    row = {column: '' for column in TAB_COLUMNS}
+    row.update(extra)
+    row['Sector'] = extra.get('Sector', sector)
+    row['Hex'] = world.hex
+    row['SS'] = extra.get('SS') or (subsector_letter(world.hex) if world.hex else '')
+    row['Name'] = world.name
+    row['UWP'] = encode_uwp(world.starport, world.upp)
+    if 'Remarks' not in extra:
+        row['Remarks'] = world.get_trade_string()
+    return row
+
+
+def write_worlds(worlds: Iterable[World], destination: Union[str, IO[str]],
+                 file_format: str = 'tab', sector: str = '') -> int:
+    """
+    Write worlds to a tab-delimited or SEC file, one line at a time.
+
+    Worlds read from a file keep their other columns (bases, zone, PBG and
+    so on); generated worlds get their trade codes as remarks.
+
+    Args:
+        worlds: Worlds to write
+        destination: Path or open text file
+        file_format: "tab" or "sec"
+        sector: Sector name for the tab-delimited Sector column (optional)
+
+    Returns:
+        int: Number of worlds written
+
+    Raises:
+        ValueError: If the format is unknown
+    """
+    if file_format not in ('tab', 'sec'):
+        raise ValueError(f"Unknown sector file format: {file_format}")
+
+    count = 0
+    with _open(destination, 'w') as f:
+        if file_format == 'tab':
+            columns = TAB_COLUMNS
+            f.write('\t'.join(columns) + '\n')
+        else:
+            f.write(f"{'Name':<20} {'Hex':<4} {'UWP':<9} {'B':<3} {'Remarks':<25} "
+                    f"Z {'PBG':<3} {'Al':<4} Stars\n")
+            f.write(f"{'-' * 20} {'-' * 4} {'-' * 9} {'-' * 3} {'-' * 25} - {'-' * 3} {'-' * 4} {'-' * 14}\n")
+
+        for world in worlds:
+            row = _world_row(world, sector)
+            if file_format == 'tab':
+                f.write('\t'.join(row[column] for column in columns) + '\n')
+            else:
+                f.write(f"{row['Name'][:20]:<20} {row['Hex']:<4} {row['UWP']:<9} "
+                        f"{row['Bases'] or '-':<3} {row['Remarks'][:25]:<25} "
+                        f"{row['Zone'] or '-':1} {row['PBG'] or '000':<3} "
+                        f"{row['Allegiance'] or 'Na':<4} {row['Stars']}".rstrip() + '\n')
+            count += 1
+    return count
+
+
+def save_sector_files(sectors: Iterable[Sector], filename: str, file_format: str = 'tab') -> List[str]:
+    """
+    Save every world of some sectors to one sector file per sector.
+
+    Files are named `<filename>_<sector x>_<sector y>.<tab|sec>`.
+
+    Args:
+        sectors: Sectors to save
+        filename: Base output filename
+        file_format: "tab" or "sec"
+
+    Returns:
+        List[str]: Paths to the saved files
+    """
+    paths = []
+    for sector in sectors:
+        output_path = config.get_output_path(f"{filename}_{sector.sector_x}_{sector.sector_y}", file_format)
+        worlds = sector.worlds.values()
+        try:
+            write_worlds(worlds, output_path, file_format, sector.name)
+            paths.append(output_path)
+        except IOError as e:
+            print(f"Error saving file: {e}")
+    return paths
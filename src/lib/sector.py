@@ -0,0 +1,587 @@
+"""
+Sector generation module for CTchargen.
+
+This module places worlds on the hex grid of a subsector (8x10 hexes) or a
+sector (32x40 hexes, sixteen subsectors lettered A to P) and renders
+subsectors to the grid template.
+
+Every hex is generated from its own seed, derived from the domain seed, the
+sector coordinates and the hex number. A hex therefore always holds the same
+world for the same seed, whichever process generates it and in whatever
+order, which lets subsectors be generated in parallel worker processes, and lets
+any hex of an effectively unbounded map be regenerated on its own.
+
+v1.0 - Added for CTchargen sector generation
+"""
+
+import hashlib
+import html
+import os
+import random
+import string
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.lib import stellagama as sg
+from src.lib import wordplay
+from src.lib.worldgen import World
+from src.lib.worldrules import WorldRules, get_rules
+from src.config import config
+
+
+# Subsector and sector dimensions in hexes
+SUBSECTOR_COLUMNS = 8
+SUBSECTOR_ROWS = 10
+SECTOR_SUBSECTOR_COLUMNS = 4
+SECTOR_SUBSECTOR_ROWS = 4
+SECTOR_COLUMNS = SUBSECTOR_COLUMNS * SECTOR_SUBSECTOR_COLUMNS
+SECTOR_ROWS = SUBSECTOR_ROWS * SECTOR_SUBSECTOR_ROWS
+
+# Subsector letters in row-major order across the sector
+SUBSECTOR_LETTERS = 'ABCDEFGHIJKLMNOP'
+
+# A hex holds a system when 1D rolls at least this number
+DEFAULT_PRESENCE = 4
+
+# Largest region, in hexes, that worlds_in_region() will generate
+MAX_REGION_HEXES = 16384
+
+GRID_TEMPLATE = 'sector_grid.html'
+
+# Grid cells for the map template
+EMPTY_CELL = (
+    '\t\t\t<li>\n'
+    '\t\t\t\t<div class="hexagon">\n'
+    '\t\t\t\t\t<div class="label">{label}</div>\n'
+    '\t\t\t\t</div>\n'
+    '\t\t\t</li>\n'
+)
+WORLD_CELL = (
+    '\t\t\t<li>\n'
+    '\t\t\t\t<div class="hexagon">\n'
+    '\t\t\t\t\t<div class="label">{label}</div>\n'
+    '\t\t\t\t\t<div class="star"></div>\n'
+    '\t\t\t\t\t<div class="starport">{starport}</div>\n'
+    '\t\t\t\t\t<div class="starname">{name}</div>\n'
+    '\t\t\t\t</div>\n'
+    '\t\t\t</li>\n'
+)
+
+
+def hex_label(column: int, row: int) -> str:
+    """
+    Format a hex number, e.g. column 3, row 7 as "0307".
+
+    Args:
+        column: Hex column (1-based)
+        row: Hex row (1-based)
+
+    Returns:
+        str: Hex number
+    """
+    return f"{column:02d}{row:02d}"
+
+
+def hex_seed(seed: str, sector_x: int, sector_y: int, hex_number: str) -> int:
+    """
+    Derive the random seed for a single hex.
+
+    Args:
+        seed: Domain seed
+        sector_x: Sector column in the domain
+        sector_y: Sector row in the domain
+        hex_number: Hex number within the sector
+
+    Returns:
+        int: Seed for the hex
+    """
+    key = f"{seed}:{sector_x}:{sector_y}:{hex_number}".encode('utf-8')
+    return int.from_bytes(hashlib.sha256(key).digest()[:8], 'little')
+
+
+def parse_hex(hex_number: str) -> Tuple[int, int]:
+    """
+    Split a hex number into its column and row.
+
+    Args:
+        hex_number: Hex number, e.g. "0307"
+
+    Returns:
+        Tuple[int, int]: (column, row)
+
+    Raises:
+        ValueError: If the hex number is malformed or outside a sector
+    """
+    if len(hex_number) != 4 or not hex_number.isdigit():
+        raise ValueError(f"Invalid hex number: {hex_number!r}")
+    column, row = int(hex_number[:2]), int(hex_number[2:])
+    if not (1 <= column <= SECTOR_COLUMNS and 1 <= row <= SECTOR_ROWS):
+        raise ValueError(f"Hex {hex_number} is outside the sector")
+    return column, row
+
+
+def to_global(sector_x: int, sector_y: int, column: int, row: int) -> Tuple[int, int]:
+    """
+    Convert a sector hex to map-wide hex coordinates.
+
+    Map coordinates count hexes from the top left hex of sector (0, 0), which
+    is (0, 0), and carry on across sector edges in every direction.
+
+    Args:
+        sector_x: Sector column
+        sector_y: Sector row
+        column: Hex column within the sector (1-based)
+        row: Hex row within the sector (1-based)
+
+    Returns:
+        Tuple[int, int]: Map-wide (x, y)
+    """
+    return sector_x * SECTOR_COLUMNS + column - 1, sector_y * SECTOR_ROWS + row - 1
+
+
+def from_global(x: int, y: int) -> Tuple[int, int, int, int]:
+    """
+    Convert map-wide hex coordinates to a sector hex.
+
+    Args:
+        x: Map-wide hex column
+        y: Map-wide hex row
+
+    Returns:
+        Tuple[int, int, int, int]: (sector_x, sector_y, column, row)
+    """
+    sector_x, column = divmod(x, SECTOR_COLUMNS)
+    sector_y, row = divmod(y, SECTOR_ROWS)
+    return sector_x, sector_y, column + 1, row + 1
+
+
+def presence_setting() -> int:
+    """
+    Get the configured system presence roll.
+
+    Returns:
+        int: Minimum 1D roll for a hex to hold a system
+    """
+    return config.get('sector_generation', {}).get('presence', DEFAULT_PRESENCE)
+
+
+def generate_hex(seed: str, sector_x: int, sector_y: int, column: int, row: int,
+                 presence: int = DEFAULT_PRESENCE,
+                 rules: Optional[WorldRules] = None) -> Optional[World]:
+    """
+    Generate the world in a hex, if the hex holds one.
+
+    The global random state is restored afterwards, so generating a hex does
+    not disturb other random rolls.
+
+    Args:
+        seed: Domain seed
+        sector_x: Sector column in the domain
+        sector_y: Sector row in the domain
+        column: Hex column within the sector (1-based)
+        row: Hex row within the sector (1-based)
+        presence: Minimum 1D roll for the hex to hold a system
+        rules: World generation rules (optional, uses the active rules)
+
+    Returns:
+        Optional[World]: The world, or None for an empty hex
+    """
+    hex_number = hex_label(column, row)
+    state = random.getstate()
+    try:
+        random.seed(hex_seed(seed, sector_x, sector_y, hex_number))
+        if sg.dice(1, 6) < presence:
+            return None
+
+        world = World(rules)
+        world.hex = hex_number
+        try:
+            world.name = wordplay.wordplay.create_word(None, with_pronunciation=False).capitalize()
+        except ValueError:
+            # The name filter could not be satisfied, leave the world unnamed
+            world.name = ''
+        return world
+    finally:
+        random.setstate(state)
+
+
+@lru_cache(maxsize=config.get('sector_generation', {}).get('world_cache_size', 65536))
+def _cached_hex(seed: str, sector_x: int, sector_y: int, column: int, row: int,
+                presence: int, rules: WorldRules) -> Optional[World]:
+    """Generate a hex through the recently used worlds cache."""
+    return generate_hex(seed, sector_x, sector_y, column, row, presence, rules)
+
+
+def world_at(seed: str, sector_x: int, sector_y: int, hex_number: str,
+             presence: Optional[int] = None) -> Optional[World]:
+    """
+    Get the world in any hex of the map.
+
+    The world depends only on the seed and its location, so it is the same
+    every time, in any order, without generating the rest of its sector.
+    Recently used worlds are kept in a bounded cache and shared between
+    callers, so treat them as read-only.
+
+    Args:
+        seed: Domain seed
+        sector_x: Sector column
+        sector_y: Sector row
+        hex_number: Hex number within the sector, e.g. "0307"
+        presence: Minimum 1D roll for a hex to hold a system (optional, uses config)
+
+    Returns:
+        Optional[World]: The world, or None for an empty hex
+    """
+    column, row = parse_hex(hex_number)
+    if presence is None:
+        presence = presence_setting()
+    return _cached_hex(seed, sector_x, sector_y, column, row, presence, get_rules())
+
+
+def worlds_in_region(seed: str, left: int, top: int, right: int, bottom: int,
+                     presence: Optional[int] = None) -> List[Tuple[int, int, World]]:
+    """
+    Generate the worlds in a rectangle of map-wide hex coordinates.
+
+    Only the hexes inside the rectangle are generated, so a viewer can pan
+    across the map and request just the visible hexes.
+
+    Args:
+        seed: Domain seed
+        left: First map-wide column
+        top: First map-wide row
+        right: Last map-wide column (inclusive)
+        bottom: Last map-wide row (inclusive)
+        presence: Minimum 1D roll for a hex to hold a system (optional, uses config)
+
+    Returns:
+        List[Tuple[int, int, World]]: (x, y, world) for every occupied hex, row by row
+
+    Raises:
+        ValueError: If the rectangle is empty or larger than MAX_REGION_HEXES
+    """
+    width, height = right - left + 1, bottom - top + 1
+    if width <= 0 or height <= 0:
+        raise ValueError("The region is empty")
+    if width * height > MAX_REGION_HEXES:
+        raise ValueError(f"The region is larger than {MAX_REGION_HEXES} hexes")
+    if presence is None:
+        presence = presence_setting()
+
+    rules = get_rules()
+    worlds = []
+    for y in range(top, bottom + 1):
+        for x in range(left, right + 1):
+            sector_x, sector_y, column, row = from_global(x, y)
+            world = _cached_hex(seed, sector_x, sector_y, column, row, presence, rules)
+            if world is not None:
+                worlds.append((x, y, world))
+    return worlds
+
+
+class Subsector:
+    """
+    Class for one 8x10 hex subsector of a sector.
+    """
+
+    def __init__(self, seed: str, sector_x: int = 0, sector_y: int = 0, index: int = 0,
+                 presence: Optional[int] = None, rules: Optional[WorldRules] = None):
+        """
+        Initialize an empty subsector.
+
+        Args:
+            seed: Domain seed
+            sector_x: Sector column in the domain
+            sector_y: Sector row in the domain
+            index: Subsector index within the sector (0-15, A-P)
+            presence: Minimum 1D roll for a hex to hold a system (optional, uses config)
+            rules: World generation rules (optional, uses the active rules)
+        """
+        self.seed = seed
+        self.sector_x = sector_x
+        self.sector_y = sector_y
+        self.index = index
+        self.presence = presence_setting() if presence is None else presence
+        self.rules = get_rules() if rules is None else rules
+        self.worlds: Dict[str, World] = {}
+
+    @property
+    def letter(self) -> str:
+        """The subsector letter, A to P."""
+        return SUBSECTOR_LETTERS[self.index]
+
+    @property
+    def origin(self) -> Tuple[int, int]:
+        """The sector column and row of the subsector's first hex."""
+        return (
+            (self.index % SECTOR_SUBSECTOR_COLUMNS) * SUBSECTOR_COLUMNS + 1,
+            (self.index // SECTOR_SUBSECTOR_COLUMNS) * SUBSECTOR_ROWS + 1,
+        )
+
+    def hexes(self) -> List[str]:
+        """
+        List the subsector's hex numbers in map order.
+
+        Returns:
+            List[str]: Hex numbers, row by row
+        """
+        first_column, first_row = self.origin
+        return [
+            hex_label(first_column + column, first_row + row)
+            for row in range(SUBSECTOR_ROWS)
+            for column in range(SUBSECTOR_COLUMNS)
+        ]
+
+    def generate(self) -> 'Subsector':
+        """
+        Generate the worlds of every hex in the subsector.
+
+        Returns:
+            Subsector: The subsector itself
+        """
+        first_column, first_row = self.origin
+        self.worlds = {}
+        for row in range(first_row, first_row + SUBSECTOR_ROWS):
+            for column in range(first_column, first_column + SUBSECTOR_COLUMNS):
+                world = generate_hex(self.seed, self.sector_x, self.sector_y,
+                                     column, row, self.presence, self.rules)
+                if world is not None:
+                    self.worlds[world.hex] = world
+        return self
+
+    def render(self, title: Optional[str] = None) -> str:
+        """
+        Render the subsector map to the grid template.
+
+        Args:
+            title: Map title (optional)
+
+        Returns:
+            str: HTML map
+        """
+        if title is None:
+            title = f"Subsector {self.letter}"
+
+        cells = []
+        for hex_number in self.hexes():
+            world = self.worlds.get(hex_number)
+            if world is None:
+                cells.append(EMPTY_CELL.format(label=hex_number))
+            else:
+                cells.append(WORLD_CELL.format(
+                    label=hex_number,
+                    starport=world.starport,
+                    name=html.escape(world.name),
+                ))
+
+        template = string.Template(load_grid_template())
+        return template.safe_substitute(title=html.escape(title), hexes="".join(cells))
+
+    def __len__(self) -> int:
+        """Return the number of worlds in the subsector."""
+        return len(self.worlds)
+
+
+class Sector:
+    """
+    Class for one 32x40 hex sector, made of sixteen subsectors.
+    """
+
+    def __init__(self, seed: str, sector_x: int = 0, sector_y: int = 0,
+                 presence: Optional[int] = None, rules: Optional[WorldRules] = None):
+        """
+        Initialize an empty sector.
+
+        Args:
+            seed: Domain seed
+            sector_x: Sector column in the domain
+            sector_y: Sector row in the domain
+            presence: Minimum 1D roll for a hex to hold a system (optional, uses config)
+            rules: World generation rules (optional, uses the active rules)
+        """
+        self.seed = seed
+        self.sector_x = sector_x
+        self.sector_y = sector_y
+        self.presence = presence_setting() if presence is None else presence
+        self.rules = get_rules() if rules is None else rules
+        self.name = sector_name(seed, sector_x, sector_y)
+        self.subsectors = [
+            Subsector(seed, sector_x, sector_y, index, self.presence, self.rules)
+            for index in range(len(SUBSECTOR_LETTERS))
+        ]
+
+    @property
+    def worlds(self) -> Dict[str, World]:
+        """Every world in the sector, keyed by hex number."""
+        worlds = {}
+        for subsector in self.subsectors:
+            worlds.update(subsector.worlds)
+        return dict(sorted(worlds.items()))
+
+    def generate(self, workers: Optional[int] = None) -> 'Sector':
+        """
+        Generate every subsector of the sector.
+
+        Args:
+            workers: Number of worker processes (optional, 1 generates in this process)
+
+        Returns:
+            Sector: The sector itself
+        """
+        self.subsectors = generate_subsectors(self.subsectors, workers)
+        return self
+
+    def __len__(self) -> int:
+        """Return the number of worlds in the sector."""
+        return sum(len(subsector) for subsector in self.subsectors)
+
+
+def sector_name(seed: str, sector_x: int, sector_y: int) -> str:
+    """
+    Generate the name of a sector.
+
+    Args:
+        seed: Domain seed
+        sector_x: Sector column in the domain
+        sector_y: Sector row in the domain
+
+    Returns:
+        str: Sector name
+    """
+    state = random.getstate()
+    try:
+        random.seed(hex_seed(seed, sector_x, sector_y, 'sector'))
+        return wordplay.wordplay.create_word(None, with_pronunciation=False).capitalize()
+    except ValueError:
+        return f"Sector {sector_x},{sector_y}"
+    finally:
+        random.setstate(state)
+
+
+def _generate_subsector(subsector: Subsector) -> Subsector:
+    """
+    Generate a subsector, as a task for a worker process.
+
+    Args:
+        subsector: Subsector to generate
+
+    Returns:
+        Subsector: The generated subsector
+    """
+    return subsector.generate()
+
+
+def generate_subsectors(subsectors: Iterable[Subsector],
+                        workers: Optional[int] = None) -> List[Subsector]:
+    """
+    Generate subsectors across worker processes.
+
+    Workers attach to the shared data bundle, so the syllable rules and name
+    filter are not reloaded in each process.
+
+    Args:
+        subsectors: Subsectors to generate
+        workers: Number of worker processes (optional, defaults to the CPU count;
+            1 generates in this process)
+
+    Returns:
+        List[Subsector]: The generated subsectors, in the order given
+    """
+    subsectors = list(subsectors)
+    if workers == 1 or len(subsectors) <= 1:
+        return [subsector.generate() for subsector in subsectors]
+
+    # Imported here so single-subsector runs don't pay for multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    from src.bundle import SharedBundle, init_worker
+
+    with SharedBundle() as shared:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(shared.name,)) as pool:
+            return list(pool.map(_generate_subsector, subsectors, chunksize=4))
+
+
+def generate_domain(seed: str, width: int = 1, height: int = 1, origin: Tuple[int, int] = (0, 0),
+                    presence: Optional[int] = None, workers: Optional[int] = None,
+                    rules: Optional[WorldRules] = None) -> List[Sector]:
+    """
+    Generate a rectangular block of sectors.
+
+    The subsectors of all the sectors are generated in one pool of worker
+    processes.
+
+    Args:
+        seed: Domain seed
+        width: Number of sector columns
+        height: Number of sector rows
+        origin: Coordinates of the top left sector
+        presence: Minimum 1D roll for a hex to hold a system (optional, uses config)
+        workers: Number of worker processes (optional, defaults to the CPU count)
+        rules: World generation rules (optional, uses the active rules)
+
+    Returns:
+        List[Sector]: The sectors, row by row
+    """
+    sectors = [
+        Sector(seed, origin[0] + column, origin[1] + row, presence, rules)
+        for row in range(height)
+        for column in range(width)
+    ]
+
+    subsectors = generate_subsectors(
+        [subsector for sector in sectors for subsector in sector.subsectors], workers
+    )
+
+    per_sector = len(SUBSECTOR_LETTERS)
+    for position, sector in enumerate(sectors):
+        sector.subsectors = subsectors[position * per_sector:(position + 1) * per_sector]
+
+    return sectors
+
+
+def load_grid_template() -> str:
+    """
+    Load the hex grid map template.
+
+    Returns:
+        str: Template content
+    """
+    template_path = os.path.join(config.TEMPLATES_DIR, GRID_TEMPLATE)
+
+    # Imported here to keep the renderer out of worker processes
+    from src.renderer import read_template
+    content = read_template(template_path)
+    if content is None:
+        print(f"Template file not found: {template_path}")
+        print("Using default template.")
+        return "<html><head><title>${title}</title></head><body><ul>${hexes}</ul></body></html>"
+    return content
+
+
+def save_sector_maps(sectors: Iterable[Sector], filename: str) -> List[str]:
+    """
+    Render every subsector of some sectors and save each map to a file.
+
+    Maps are named `<filename>_<sector x>_<sector y>_<letter>.html`.
+
+    Args:
+        sectors: Sectors to save
+        filename: Base output filename
+
+    Returns:
+        List[str]: Paths to the saved files
+    """
+    paths = []
+    for sector in sectors:
+        for subsector in sector.subsectors:
+            output_path = config.get_output_path(
+                f"{filename}_{sector.sector_x}_{sector.sector_y}_{subsector.letter}", 'html'
+            )
+            try:
+                with open(output_path, 'w') as f:
+                    f.write(subsector.render(f"{sector.name} Sector, Subsector {subsector.letter}"))
+                paths.append(output_path)
+            except IOError as e:
+                print(f"Error saving file: {e}")
+    return paths
+
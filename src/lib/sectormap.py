@@ -0,0 +1,331 @@
+"""
+Sector map module for CTchargen.
+
+This module renders subsectors, sectors and blocks of sectors to SVG maps.
+
+The hex grid is drawn once, as a pattern built from a single hex `<symbol>`,
+so empty hexes cost nothing. Each world is one small group placed at its hex
+centre, carrying only what differs per hex: the hex number, starport, name,
+UWP and trade codes (as `data-` attributes for styling and scripting). Jump
+routes are drawn as a few long paths.
+
+Maps are produced as a stream of text chunks, so they can be written to a
+file or sent as an HTTP response while they are rendered. Large domains can
+be split into tiles of a few sectors each, sharing one coordinate system so
+the tiles line up.
+
+v1.0 - Added for CTchargen sector maps
+"""
+
+import html
+import math
+from typing import IO, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from src.config import config
+from src.lib.outputfile import OutputFile
+from src.lib.routes import JumpGraph, Location
+from src.lib.sector import (
+    SECTOR_COLUMNS, SECTOR_ROWS, SUBSECTOR_COLUMNS, SUBSECTOR_ROWS, Sector, Subsector,
+    parse_hex, to_global
+)
+from src.lib.worldgen import World
+
+
+# Hex radius (centre to corner) in SVG units; hexes have flat tops
+HEX_RADIUS = 32
+COLUMN_WIDTH = HEX_RADIUS * 1.5
+ROW_HEIGHT = HEX_RADIUS * math.sqrt(3)
+
+# Worlds and routes written per chunk of output
+CHUNK_SIZE = 512
+
+Bounds = Tuple[int, int, int, int]
+
+SVG_HEAD = (
+    '<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+    'viewBox="{min_x:.1f} {min_y:.1f} {width:.1f} {height:.1f}" '
+    'width="{width:.0f}" height="{height:.0f}">\n'
+    '<title>{title}</title>\n'
+    '<style>\n'
+    'svg {{ background: #393939; font-family: sans-serif; }}\n'
+    '.grid {{ fill: none; stroke: #7a7a7a; stroke-width: 1; }}\n'
+    '.routes {{ fill: none; stroke: #2f8f4f; stroke-width: 3; stroke-opacity: 0.7; }}\n'
+    '.w circle {{ fill: #fdbf00; }}\n'
+    '.w text {{ fill: #fff; text-anchor: middle; }}\n'
+    '.w .h {{ font-size: 8px; fill: #bbb; }}\n'
+    '.w .p {{ font-size: 11px; font-weight: bold; }}\n'
+    '.w .n {{ font-size: 9px; }}\n'
+    '.w .u {{ font-size: 7px; fill: #bbb; }}\n'
+    '.X circle {{ fill: #fd005f; }}\n'
+    '</style>\n'
+    '<defs>\n'
+    '<symbol id="hex" overflow="visible"><polygon points="{hexagon}"/></symbol>\n'
+    '<pattern id="grid" patternUnits="userSpaceOnUse" width="{pattern_width:.3f}" height="{pattern_height:.3f}">\n'
+    '<g class="grid">{pattern}</g>\n'
+    '</pattern>\n'
+    '<symbol id="world" overflow="visible"><circle r="6"/></symbol>\n'
+    '</defs>\n'
+    '<rect x="{min_x:.1f}" y="{min_y:.1f}" width="{width:.1f}" height="{height:.1f}" fill="url(#grid)"/>\n'
+)
+WORLD_GROUP = (
+    '<g class="w {starport}" transform="translate({x:.1f} {y:.1f})" '
+    'data-uwp="{uwp}" data-trade="{trade}">'
+    '<use href="#world"/>'
+    '<text class="h" y="-19">{hex}</text>'
+    '<text class="p" y="-6">{starport}</text>'
+    '<text class="n" y="18">{name}</text>'
+    '<text class="u" y="26">{uwp}</text>'
+    '</g>\n'
+)
+
+
+def hex_center(x: int, y: int) -> Tuple[float, float]:
+    """
+    Get the SVG position of a hex centre.
+
+    Columns with an odd map-wide x sit half a hex lower, as in `routes.to_cube`.
+
+    Args:
+        x: Map-wide hex column
+        y: Map-wide hex row
+
+    Returns:
+        Tuple[float, float]: SVG (x, y)
+    """
+    return x * COLUMN_WIDTH, (y + (x & 1) * 0.5) * ROW_HEIGHT
+
+
+def _hexagon() -> str:
+    """Get the corner points of a hex centred on the origin."""
+    return ' '.join(
+        f"{HEX_RADIUS * math.cos(math.radians(angle)):.2f},{HEX_RADIUS * math.sin(math.radians(angle)):.2f}"
+        for angle in range(0, 360, 60)
+    )
+
+
+def _grid_pattern() -> str:
+    """
+    Get the hexes of one grid pattern tile.
+
+    A tile is two columns wide and one row high, with an even column's hex
+    centred on the tile's corner, so tiles placed from the SVG origin line
+    up with hex_center().
+    """
+    centers = [(0, 0), (0, ROW_HEIGHT), (COLUMN_WIDTH, -ROW_HEIGHT / 2), (COLUMN_WIDTH, ROW_HEIGHT / 2),
+               (COLUMN_WIDTH * 2, 0), (COLUMN_WIDTH * 2, ROW_HEIGHT)]
+    return ''.join(f'<use href="#hex" x="{x:.3f}" y="{y:.3f}"/>' for x, y in centers)
+
+
+def map_bounds(maps: Iterable[Union[Sector, Subsector]]) -> Bounds:
+    """
+    Get the map-wide hexes covered by some sectors or subsectors.
+
+    Args:
+        maps: Sectors and subsectors
+
+    Returns:
+        Bounds: (left, top, right, bottom), inclusive
+    """
+    left = top = right = bottom = None
+    for item in maps:
+        if isinstance(item, Subsector):
+            column, row = item.origin
+            first = to_global(item.sector_x, item.sector_y, column, row)
+            last = (first[0] + SUBSECTOR_COLUMNS - 1, first[1] + SUBSECTOR_ROWS - 1)
+        else:
+            first = to_global(item.sector_x, item.sector_y, 1, 1)
+            last = to_global(item.sector_x, item.sector_y, SECTOR_COLUMNS, SECTOR_ROWS)
+        left = first[0] if left is None else min(left, first[0])
+        top = first[1] if top is None else min(top, first[1])
+        right = last[0] if right is None else max(right, last[0])
+        bottom = last[1] if bottom is None else max(bottom, last[1])
+    if left is None:
+        raise ValueError("Nothing to map")
+    return left, top, right, bottom
+
+
+def map_worlds(maps: Iterable[Union[Sector, Subsector]]) -> List[Tuple[int, int, World]]:
+    """
+    List the worlds of some sectors or subsectors at their map-wide locations.
+
+    Args:
+        maps: Generated sectors and subsectors
+
+    Returns:
+        List[Tuple[int, int, World]]: (x, y, world) for every world
+    """
+    worlds = []
+    for item in maps:
+        for hex_number, world in item.worlds.items():
+            x, y = to_global(item.sector_x, item.sector_y, *parse_hex(hex_number))
+            worlds.append((x, y, world))
+    return worlds
+
+
+def jump_routes(worlds: Iterable[Tuple[int, int, World]], jump: int) -> List[Tuple[Location, Location]]:
+    """
+    List every pair of worlds within a jump of each other.
+
+    Args:
+        worlds: (x, y, world) for every world
+        jump: Jump rating (1-6)
+
+    Returns:
+        List[Tuple[Location, Location]]: Each pair once, nearer end first
+    """
+    graph = JumpGraph(worlds, max_jump=jump)
+    return [(location, other) for location in sorted(graph.worlds)
+            for other in graph.neighbors(location, jump) if other > location]
+
+
+def iter_svg(worlds: Iterable[Tuple[int, int, World]], bounds: Bounds,
+             routes: Sequence[Tuple[Location, Location]] = (), title: str = "Sector Map") -> Iterator[str]:
+    """
+    Render a map to SVG, a chunk at a time.
+
+    Worlds and routes outside the bounds are skipped; routes leaving the map
+    are drawn up to its edge.
+
+    Args:
+        worlds: (x, y, world) for every world to draw
+        bounds: Map-wide (left, top, right, bottom) hexes to show, inclusive
+        routes: Pairs of world locations to connect (optional)
+        title: Map title
+
+    Yields:
+        str: Consecutive parts of the SVG document
+    """
+    left, top, right, bottom = bounds
+    min_x = left * COLUMN_WIDTH - HEX_RADIUS
+    min_y = (top - 0.5) * ROW_HEIGHT
+    yield SVG_HEAD.format(
+        min_x=min_x,
+        min_y=min_y,
+        width=(right - left) * COLUMN_WIDTH + HEX_RADIUS * 2,
+        height=(bottom - top + 1.5) * ROW_HEIGHT,
+        title=html.escape(title),
+        hexagon=_hexagon(),
+        pattern_width=COLUMN_WIDTH * 2,
+        pattern_height=ROW_HEIGHT,
+        pattern=_grid_pattern(),
+    )
+
+    def inside(location: Location) -> bool:
+        return left <= location[0] <= right and top <= location[1] <= bottom
+
+    # Routes go under the worlds
+    segments = []
+    for start, end in routes:
+        if inside(start) or inside(end):
+            (x1, y1), (x2, y2) = hex_center(*start), hex_center(*end)
+            segments.append(f"M{x1:.1f} {y1:.1f}L{x2:.1f} {y2:.1f}")
+            if len(segments) == CHUNK_SIZE:
+                yield f'<path class="routes" d="{"".join(segments)}"/>\n'
+                segments = []
+    if segments:
+        yield f'<path class="routes" d="{"".join(segments)}"/>\n'
+
+    groups = []
+    for x, y, world in worlds:
+        if not inside((x, y)):
+            continue
+        center_x, center_y = hex_center(x, y)
+        groups.append(WORLD_GROUP.format(
+            starport=world.starport,
+            x=center_x,
+            y=center_y,
+            uwp=world.get_uwp_string(),
+            trade=world.get_trade_string(),
+            hex=world.hex,
+            name=html.escape(world.name),
+        ))
+        if len(groups) == CHUNK_SIZE:
+            yield ''.join(groups)
+            groups = []
+    if groups:
+        yield ''.join(groups)
+
+    yield '</svg>\n'
+
+
+def render_svg(maps: Sequence[Union[Sector, Subsector]], jump: int = 0,
+               title: Optional[str] = None) -> str:
+    """
+    Render generated sectors or subsectors to one SVG map.
+
+    Args:
+        maps: Generated sectors and subsectors
+        jump: Draw routes between worlds within this jump rating (0 for none)
+        title: Map title (optional)
+
+    Returns:
+        str: SVG document
+    """
+    worlds = map_worlds(maps)
+    routes = jump_routes(worlds, jump) if jump else ()
+    if title is None:
+        title = ', '.join(getattr(item, 'name', f"Subsector {getattr(item, 'letter', '')}") for item in maps)
+    return ''.join(iter_svg(worlds, map_bounds(maps), routes, title))
+
+
+def write_svg(chunks: Iterable[str], destination: Union[str, IO[str]]) -> None:
+    """
+    Write a rendered map as it is produced.
+
+    A path is written through OutputFile, so an interrupted render never
+    leaves a truncated map in place of the previous one.
+
+    Args:
+        chunks: Parts of the SVG document, e.g. from iter_svg()
+        destination: Path or open text file
+    """
+    if isinstance(destination, str):
+        with OutputFile(destination) as f:
+            for chunk in chunks:
+                f.write(chunk)
+    else:
+        destination.writelines(chunks)
+
+
+def save_sector_svgs(sectors: Sequence[Sector], filename: str, jump: int = 0,
+                     tile: Optional[int] = None) -> List[str]:
+    """
+    Render some sectors to SVG maps and save them.
+
+    Without tiling the whole block is saved as `<filename>.svg`. With tiling
+    it is split into maps of up to tile x tile sectors, named
+    `<filename>_<tile x>_<tile y>.svg`, whose coordinates line up. Routes
+    are found once for the whole block, so routes crossing a tile edge are
+    drawn on both tiles.
+
+    Args:
+        sectors: Generated sectors
+        filename: Base output filename
+        jump: Draw routes between worlds within this jump rating (0 for none)
+        tile: Sectors per tile side (optional)
+
+    Returns:
+        List[str]: Paths to the saved files
+    """
+    worlds = map_worlds(sectors)
+    routes = jump_routes(worlds, jump) if jump else ()
+
+    if tile is None:
+        groups = {None: list(sectors)}
+    else:
+        groups = {}
+        for sector in sectors:
+            key = (sector.sector_x // tile, sector.sector_y // tile)
+            groups.setdefault(key, []).append(sector)
+
+    paths = []
+    for key, group in groups.items():
+        name = filename if key is None else f"{filename}_{key[0]}_{key[1]}"
+        output_path = config.get_output_path(name, 'svg')
+        title = ', '.join(f"{sector.name} Sector" for sector in group)
+        try:
+            write_svg(iter_svg(worlds, map_bounds(group), routes, title), output_path)
+            paths.append(output_path)
+        except IOError as e:
+            print(f"Error saving file: {e}")
+    return paths
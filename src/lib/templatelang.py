@@ -0,0 +1,623 @@
+"""
+Template language module for CTchargen.
+
+This module compiles character templates. Placeholders follow
+`string.Template` (`$name`, `${name}`, `$$`), and a placeholder can also
+hold an expression:
+
+    ${died ? "Deceased" : "Active"}
+    ${psionic.talents.length ? psionic.talents.join(", ") : "None"}
+    ${`PSR ${psionic.psr}`}
+
+Expressions have dotted and indexed access into the data, `.length`,
+the `join`, `upper`, `lower` and `title` methods, `? :`, `||`, `&&`, `!`,
+comparisons, `+` and `-`, quoted and backquoted strings (with `${...}`
+inside backquotes), numbers, `true`, `false` and `null`. Blocks choose and
+repeat parts of the template:
+
+    {% if terms > 1 %}...{% elif terms %}...{% else %}...{% endif %}
+    {% for skill, level in skills %}- ${skill}-${level}
+    {% else %}None
+    {% endfor %}
+
+A loop over a dictionary goes over its keys, or its keys and values with
+two names; `loop.index`, `loop.first` and `loop.last` describe the current
+pass. A block tag alone on its line takes the whole line with it.
+
+Templates are parsed once into nested lists of literal text and closures.
+Nothing is evaluated with `eval`: names only reach into the data, and the
+methods are the fixed set above, so a template cannot call into Python.
+
+v1.0 - Added for CTchargen templates
+"""
+
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+# A compiled expression, evaluated against the data and the loop variables
+Expression = Callable[[Dict[str, Any], Dict[str, Any]], Any]
+
+# A compiled template part: literal text, or a function rendering text
+Part = Union[str, Callable[[Dict[str, Any], Dict[str, Any]], str]]
+
+# Text that starts a placeholder or a block tag
+MARKUP_PATTERN = re.compile(r'\$|\{%')
+
+# A placeholder that is just a name
+FIELD_PATTERN = re.compile(r'\{\s*([A-Za-z_]\w*)\s*\}|([A-Za-z_]\w*)')
+
+# Expression tokens: numbers, names, quoted strings and operators
+TOKEN_PATTERN = re.compile(r'''\s*(?:
+    (?P<number>\d+(?:\.\d+)?)
+  | (?P<name>[A-Za-z_]\w*)
+  | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+  | (?P<op>%\}|==|!=|<=|>=|&&|\|\||[?:!<>+\-.,()\[\]}`])
+)''', re.VERBOSE)
+
+ESCAPES = {'n': '\n', 't': '\t'}
+
+KEYWORDS = {'true': True, 'false': False, 'null': None}
+
+COMPARISONS: Dict[str, Callable[[Any, Any], bool]] = {
+    '==': lambda left, right: left == right,
+    '!=': lambda left, right: left != right,
+    '<': lambda left, right: left < right,
+    '<=': lambda left, right: left <= right,
+    '>': lambda left, right: left > right,
+    '>=': lambda left, right: left >= right,
+}
+
+# Loop variables available inside no loop
+NO_NAMES: Dict[str, Any] = {}
+
+
+def _text(value: Any) -> str:
+    """Convert one value to text."""
+    return '' if value is None else str(value)
+
+
+def format_value(value: Any) -> str:
+    """
+    Convert a placeholder's value to text.
+
+    Args:
+        value: Value
+
+    Returns:
+        str: The value, with lists joined by commas ("None" when empty) and
+            null as nothing
+    """
+    if isinstance(value, (list, tuple)):
+        return ", ".join(_text(item) for item in value) if value else "None"
+    return _text(value)
+
+
+def _items(value: Any) -> List[Any]:
+    """Get the items of a value to join or loop over."""
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple, dict)):
+        return list(value)
+    return [value]
+
+
+METHODS: Dict[str, Callable[..., Any]] = {
+    'join': lambda value, separator=", ": _text(separator).join(_text(item) for item in _items(value)),
+    'upper': lambda value: _text(value).upper(),
+    'lower': lambda value: _text(value).lower(),
+    'title': lambda value: _text(value).title(),
+}
+
+
+def _join(parts: List[Part], data: Dict[str, Any], names: Dict[str, Any]) -> str:
+    """Render a list of parts."""
+    return ''.join([part if part.__class__ is str else part(data, names) for part in parts])
+
+
+def _merge(parts: List[Part]) -> List[Part]:
+    """Merge neighbouring literals and drop empty ones."""
+    merged: List[Part] = []
+    for part in parts:
+        if isinstance(part, str) and merged and isinstance(merged[-1], str):
+            merged[-1] += part
+        elif part != '':
+            merged.append(part)
+    return merged
+
+
+def field(name: str, text: str,
+          computed: Optional[Callable[[Dict[str, Any]], Optional[str]]] = None) -> Part:
+    """
+    Compile a placeholder that is just a name.
+
+    Loop variables come first. Otherwise nested dictionaries are reached
+    with `key_subkey` names; the candidate (key, subkey) splits of the name
+    are worked out here, once, rather than flattening the data for every
+    render. A name with no value leaves the placeholder as written.
+
+    Args:
+        name: Placeholder name
+        text: Placeholder as written
+        computed: Function computing the value from the data instead (optional)
+
+    Returns:
+        Part: The placeholder's renderer
+    """
+    candidates = [(name, None)] + [
+        (name[:index], name[index + 1:]) for index, char in enumerate(name) if char == '_'
+    ]
+
+    def render(data: Dict[str, Any], names: Dict[str, Any]) -> str:
+        if name in names:
+            return format_value(names[name])
+        if computed is not None:
+            value = computed(data)
+            if value is not None:
+                return value
+        for key, subkey in candidates:
+            if key not in data:
+                continue
+            value = data[key]
+            if subkey is None:
+                if isinstance(value, dict):
+                    continue
+                return format_value(value)
+            if isinstance(value, dict) and subkey in value:
+                return _text(value[subkey])
+        return text
+    return render
+
+
+def _name(name: str) -> Expression:
+    """Compile a name: a loop variable, a data key or a `key_subkey` name."""
+    if name in KEYWORDS:
+        constant = KEYWORDS[name]
+        return lambda data, names: constant
+    candidates = [(name[:index], name[index + 1:]) for index, char in enumerate(name) if char == '_']
+
+    def evaluate(data: Dict[str, Any], names: Dict[str, Any]) -> Any:
+        if name in names:
+            return names[name]
+        if name in data:
+            return data[name]
+        for key, subkey in candidates:
+            value = data.get(key)
+            if isinstance(value, dict) and subkey in value:
+                return value[subkey]
+        return None
+    return evaluate
+
+
+def _attribute(target: Expression, name: str) -> Expression:
+    """Compile `target.name`."""
+    def evaluate(data: Dict[str, Any], names: Dict[str, Any]) -> Any:
+        value = target(data, names)
+        if isinstance(value, dict) and name in value:
+            return value[name]
+        if name == 'length' and isinstance(value, (list, tuple, dict, str)):
+            return len(value)
+        return None
+    return evaluate
+
+
+def _index(target: Expression, key: Expression) -> Expression:
+    """Compile `target[key]`."""
+    def evaluate(data: Dict[str, Any], names: Dict[str, Any]) -> Any:
+        value, index = target(data, names), key(data, names)
+        if isinstance(value, dict):
+            return value.get(index)
+        if isinstance(value, (list, tuple, str)) and isinstance(index, int) and -len(value) <= index < len(value):
+            return value[index]
+        return None
+    return evaluate
+
+
+def _call(target: Expression, method: Callable[..., Any], arguments: List[Expression]) -> Expression:
+    """Compile a method call."""
+    def evaluate(data: Dict[str, Any], names: Dict[str, Any]) -> Any:
+        return method(target(data, names), *(argument(data, names) for argument in arguments))
+    return evaluate
+
+
+def _ternary(condition: Expression, then: Expression, otherwise: Expression) -> Expression:
+    """Compile `condition ? then : otherwise`."""
+    def evaluate(data: Dict[str, Any], names: Dict[str, Any]) -> Any:
+        return then(data, names) if condition(data, names) else otherwise(data, names)
+    return evaluate
+
+
+def _either(left: Expression, right: Expression) -> Expression:
+    """Compile `left || right`."""
+    return lambda data, names: left(data, names) or right(data, names)
+
+
+def _both(left: Expression, right: Expression) -> Expression:
+    """Compile `left && right`."""
+    return lambda data, names: left(data, names) and right(data, names)
+
+
+def _not(operand: Expression) -> Expression:
+    """Compile `!operand`."""
+    return lambda data, names: not operand(data, names)
+
+
+def _compare(left: Expression, operator: str, right: Expression) -> Expression:
+    """Compile a comparison; values that cannot be ordered compare false."""
+    compare = COMPARISONS[operator]
+
+    def evaluate(data: Dict[str, Any], names: Dict[str, Any]) -> bool:
+        try:
+            return compare(left(data, names), right(data, names))
+        except TypeError:
+            return False
+    return evaluate
+
+
+def _arithmetic(left: Expression, operator: str, right: Expression) -> Expression:
+    """Compile `+` (joining text when either side is text) or `-`."""
+    def evaluate(data: Dict[str, Any], names: Dict[str, Any]) -> Any:
+        a, b = left(data, names), right(data, names)
+        if operator == '+' and (isinstance(a, str) or isinstance(b, str)):
+            return _text(a) + _text(b)
+        try:
+            return a + b if operator == '+' else a - b
+        except TypeError:
+            return None
+    return evaluate
+
+
+def _interpolate(parts: List[Union[str, Expression]]) -> Expression:
+    """Compile a backquoted string."""
+    def evaluate(data: Dict[str, Any], names: Dict[str, Any]) -> str:
+        return ''.join([part if part.__class__ is str else format_value(part(data, names)) for part in parts])
+    return evaluate
+
+
+def _output(expression: Expression) -> Part:
+    """Compile a placeholder holding an expression."""
+    return lambda data, names: format_value(expression(data, names))
+
+
+def _conditional(branches: List[Tuple[Optional[Expression], List[Part]]]) -> Part:
+    """Compile an if block."""
+    def render(data: Dict[str, Any], names: Dict[str, Any]) -> str:
+        for condition, parts in branches:
+            if condition is None or condition(data, names):
+                return _join(parts, data, names)
+        return ''
+    return render
+
+
+def _loop(targets: List[str], iterable: Expression, body: List[Part], otherwise: List[Part]) -> Part:
+    """Compile a for block."""
+    def render(data: Dict[str, Any], names: Dict[str, Any]) -> str:
+        value = iterable(data, names)
+        items = list(value.items()) if isinstance(value, dict) and len(targets) > 1 else _items(value)
+        if not items:
+            return _join(otherwise, data, names)
+
+        scope = dict(names)
+        last = len(items) - 1
+        rendered = []
+        for index, item in enumerate(items):
+            if len(targets) > 1:
+                values = list(item) if isinstance(item, (list, tuple)) else [item]
+                for position, target in enumerate(targets):
+                    scope[target] = values[position] if position < len(values) else None
+            else:
+                scope[targets[0]] = item
+            scope['loop'] = {'index': index + 1, 'first': index == 0, 'last': index == last}
+            rendered.append(_join(body, data, scope))
+        return ''.join(rendered)
+    return render
+
+
+class _Parser:
+    """
+    Recursive descent parser turning template text into parts.
+    """
+
+    def __init__(self, content: str,
+                 computed: Dict[str, Callable[[Dict[str, Any]], Optional[str]]]):
+        self.content = content
+        self.computed = computed
+        self.position = 0
+
+    def error(self, message: str) -> ValueError:
+        """Make a syntax error naming the current line."""
+        line = self.content.count('\n', 0, self.position) + 1
+        return ValueError(f"Template syntax error on line {line}: {message}")
+
+    # Template text
+
+    def body(self, ends: Tuple[str, ...]) -> Tuple[List[Part], Optional[str], Optional[Expression]]:
+        """
+        Parse text up to one of the given block tags.
+
+        Returns:
+            Tuple: (parts, closing tag keyword, its condition for elif)
+        """
+        content = self.content
+        parts: List[Part] = []
+        while True:
+            match = MARKUP_PATTERN.search(content, self.position)
+            if match is None:
+                parts.append(content[self.position:])
+                self.position = len(content)
+                if ends:
+                    raise self.error(f"missing {{% {ends[-1]} %}}")
+                return _merge(parts), None, None
+
+            start = match.start()
+            literal = content[self.position:start]
+            if match.group() == '$':
+                parts.append(literal)
+                parts.append(self.placeholder(start))
+                continue
+
+            # A block tag alone on its line takes the line with it
+            self.position = match.end()
+            keyword, condition = self.tag()
+            line_start = content.rfind('\n', 0, start) + 1
+            line_end = content.find('\n', self.position)
+            line_end = len(content) if line_end == -1 else line_end + 1
+            if not content[line_start:start].strip() and not content[self.position:line_end].strip():
+                literal = literal[:len(literal) - (start - max(line_start, start - len(literal)))]
+                self.position = line_end
+            parts.append(literal)
+
+            if keyword in ends:
+                return _merge(parts), keyword, condition
+            if keyword == 'if':
+                parts.append(self.conditional(condition))
+            elif keyword == 'for':
+                parts.append(self.loop(condition))
+            else:
+                raise self.error(f"unexpected {{% {keyword} %}}")
+
+    def placeholder(self, start: int) -> Part:
+        """Parse a placeholder starting at a dollar sign."""
+        content = self.content
+        self.position = start + 1
+        if content.startswith('$', self.position):
+            self.position += 1
+            return '$'
+
+        match = FIELD_PATTERN.match(content, self.position)
+        if match is not None:
+            self.position = match.end()
+            name = match.group(1) or match.group(2)
+            return field(name, content[start:self.position], self.computed.get(name))
+        if not content.startswith('{', self.position):
+            return '$'
+
+        self.position += 1
+        expression = self.expression()
+        self.expect('}')
+        return _output(expression)
+
+    def tag(self) -> Tuple[str, Any]:
+        """Parse the inside of a block tag, after its opening."""
+        keyword = self.expect_name()
+        payload: Any = None
+        if keyword in ('if', 'elif'):
+            payload = self.expression()
+        elif keyword == 'for':
+            targets = [self.expect_name()]
+            while self.accept(','):
+                targets.append(self.expect_name())
+            if self.expect_name() != 'in':
+                raise self.error("expected 'in'")
+            payload = (targets, self.expression())
+        elif keyword not in ('else', 'endif', 'endfor'):
+            raise self.error(f"unknown block {keyword!r}")
+        self.expect('%}')
+        return keyword, payload
+
+    def conditional(self, condition: Expression) -> Part:
+        """Parse the rest of an if block."""
+        branches: List[Tuple[Optional[Expression], List[Part]]] = []
+        while True:
+            parts, keyword, next_condition = self.body(('elif', 'else', 'endif'))
+            branches.append((condition, parts))
+            if keyword == 'endif':
+                return _conditional(branches)
+            if keyword == 'else':
+                parts, _, _ = self.body(('endif',))
+                branches.append((None, parts))
+                return _conditional(branches)
+            condition = next_condition
+
+    def loop(self, payload: Tuple[List[str], Expression]) -> Part:
+        """Parse the rest of a for block."""
+        targets, iterable = payload
+        body, keyword, _ = self.body(('else', 'endfor'))
+        otherwise: List[Part] = []
+        if keyword == 'else':
+            otherwise, _, _ = self.body(('endfor',))
+        return _loop(targets, iterable, body, otherwise)
+
+    # Expressions
+
+    def peek(self) -> Tuple[Optional[str], str, int]:
+        """Get the next token's kind, text and end without consuming it."""
+        match = TOKEN_PATTERN.match(self.content, self.position)
+        if match is None:
+            rest = self.content[self.position:].lstrip()
+            if not rest:
+                raise self.error("unexpected end of template")
+            raise self.error(f"unexpected {rest[0]!r}")
+        return match.lastgroup, match.group(match.lastgroup), match.end()
+
+    def accept(self, operator: str) -> bool:
+        """Consume an operator if it is next."""
+        kind, text, end = self.peek()
+        if kind == 'op' and text == operator:
+            self.position = end
+            return True
+        return False
+
+    def expect(self, operator: str) -> None:
+        """Consume an operator that must be next."""
+        if not self.accept(operator):
+            raise self.error(f"expected {operator!r}, found {self.peek()[1]!r}")
+
+    def expect_name(self) -> str:
+        """Consume a name that must be next."""
+        kind, text, end = self.peek()
+        if kind != 'name':
+            raise self.error(f"expected a name, found {text!r}")
+        self.position = end
+        return text
+
+    def expression(self) -> Expression:
+        """Parse `condition ? then : otherwise`, or a plain expression."""
+        condition = self.either()
+        if self.accept('?'):
+            then = self.expression()
+            self.expect(':')
+            return _ternary(condition, then, self.expression())
+        return condition
+
+    def either(self) -> Expression:
+        """Parse `a || b`."""
+        left = self.both()
+        while self.accept('||'):
+            left = _either(left, self.both())
+        return left
+
+    def both(self) -> Expression:
+        """Parse `a && b`."""
+        left = self.negation()
+        while self.accept('&&'):
+            left = _both(left, self.negation())
+        return left
+
+    def negation(self) -> Expression:
+        """Parse `!a`."""
+        if self.accept('!'):
+            return _not(self.negation())
+        return self.comparison()
+
+    def comparison(self) -> Expression:
+        """Parse `a == b` and the other comparisons."""
+        left = self.arithmetic()
+        kind, text, end = self.peek()
+        if kind == 'op' and text in COMPARISONS:
+            self.position = end
+            return _compare(left, text, self.arithmetic())
+        return left
+
+    def arithmetic(self) -> Expression:
+        """Parse `a + b` and `a - b`."""
+        left = self.postfix()
+        while True:
+            kind, text, end = self.peek()
+            if kind != 'op' or text not in '+-':
+                return left
+            self.position = end
+            left = _arithmetic(left, text, self.postfix())
+
+    def postfix(self) -> Expression:
+        """Parse attribute access, indexing and method calls."""
+        value = self.primary()
+        while True:
+            if self.accept('.'):
+                name = self.expect_name()
+                if not self.accept('('):
+                    value = _attribute(value, name)
+                    continue
+                if name not in METHODS:
+                    raise self.error(f"unknown method {name!r}")
+                arguments = []
+                if not self.accept(')'):
+                    arguments.append(self.expression())
+                    while self.accept(','):
+                        arguments.append(self.expression())
+                    self.expect(')')
+                value = _call(value, METHODS[name], arguments)
+            elif self.accept('['):
+                key = self.expression()
+                self.expect(']')
+                value = _index(value, key)
+            else:
+                return value
+
+    def primary(self) -> Expression:
+        """Parse a name, literal, backquoted string or parenthesised expression."""
+        kind, text, end = self.peek()
+        self.position = end
+        if kind == 'number':
+            constant: Any = float(text) if '.' in text else int(text)
+            return lambda data, names: constant
+        if kind == 'string':
+            constant = re.sub(r'\\(.)', lambda match: ESCAPES.get(match.group(1), match.group(1)), text[1:-1])
+            return lambda data, names: constant
+        if kind == 'name':
+            return _name(text)
+        if text == '(':
+            expression = self.expression()
+            self.expect(')')
+            return expression
+        if text == '`':
+            return self.backquoted()
+        raise self.error(f"unexpected {text!r}")
+
+    def backquoted(self) -> Expression:
+        """Parse the rest of a backquoted string, after its opening quote."""
+        content = self.content
+        parts: List[Union[str, Expression]] = []
+        text: List[str] = []
+        while self.position < len(content):
+            char = content[self.position]
+            if char == '\\' and self.position + 1 < len(content):
+                text.append(ESCAPES.get(content[self.position + 1], content[self.position + 1]))
+                self.position += 2
+            elif char == '`':
+                self.position += 1
+                parts.append(''.join(text))
+                return _interpolate([part for part in parts if part != ''])
+            elif content.startswith('${', self.position):
+                parts.append(''.join(text))
+                text = []
+                self.position += 2
+                parts.append(self.expression())
+                self.expect('}')
+            else:
+                text.append(char)
+                self.position += 1
+        raise self.error("unterminated backquoted string")
+
+
+class CompiledTemplate:
+    """
+    Class holding a template compiled into literal text and render functions.
+    """
+
+    def __init__(self, content: str,
+                 computed: Optional[Dict[str, Callable[[Dict[str, Any]], Optional[str]]]] = None):
+        """
+        Compile a template.
+
+        Args:
+            content: Template content
+            computed: Functions computing the value of plain `${name}`
+                placeholders from the data, by name (optional)
+
+        Raises:
+            ValueError: If the template has a syntax error
+        """
+        self.content = content
+        self.parts, _, _ = _Parser(content, computed or {}).body(())
+
+    def render(self, data: Dict[str, Any]) -> str:
+        """
+        Render the template.
+
+        Args:
+            data: Character data
+
+        Returns:
+            str: Rendered text
+        """
+        return _join(self.parts, data, NO_NAMES)
@@ -0,0 +1,315 @@
+"""
+Trade module for CTchargen.
+
+This module prices Classic Traveller speculative trade and freight between
+generated worlds.
+
+The trade goods table (`data/trade_goods.json`) gives each good a base
+price and purchase and resale DMs by trade code. A good's price on a world
+is its base price times the actual value percentage rolled on 2D plus the
+world's DM; this module works with the expected percentage, computed
+exactly from the dice distribution. DM tables are compiled per good over
+just the trade codes the table mentions, so a world's DM for every good is
+one table row picked by bits of its trade mask.
+
+Prices are computed for all worlds at once as NumPy arrays (worlds x
+goods), and the profit of every world pair on a jump route as an array
+expression over those, in blocks of origins to bound memory. Passenger
+and freight traffic come from the traffic table by population.
+
+v1.0 - Added for CTchargen trade
+"""
+
+import json
+import os
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from src.config import config
+from src.lib.worldgen import TRADE_CODES, World, WorldArray, get_numpy
+from src.lib.worldrules import parse_values
+from src.lib.worldstats import dice_counts
+
+# Everything here works on numpy tables; only importing this module loads it
+np = get_numpy()
+
+
+TRADE_GOODS_FILE = os.path.join(config.DATA_DIR, 'trade_goods.json')
+
+# Origins whose pairs are priced together, bounding the profit block to
+# ORIGIN_BLOCK x worlds x goods
+ORIGIN_BLOCK = 64
+
+# Dice expressions in the tables: "0", "3D", "2D-4", "3Dx10"
+DICE_PATTERN = re.compile(r'^(?:(\d+)D([+-]\d+)?(?:x(\d+))?|(\d+))$')
+
+
+def expected_dice(expression: str) -> float:
+    """
+    Get the expected value of a table dice expression, counting negative rolls as zero.
+
+    Args:
+        expression: Dice expression, e.g. "2D-4" or "3Dx10"
+
+    Returns:
+        float: Exact expected value
+
+    Raises:
+        ValueError: If the expression is malformed
+    """
+    match = DICE_PATTERN.match(expression.strip())
+    if match is None:
+        raise ValueError(f"Invalid dice expression: {expression}")
+    dice, modifier, multiplier, flat = match.groups()
+    if flat is not None:
+        return float(flat)
+
+    counts = dice_counts(int(dice))
+    total = sum(max(roll + int(modifier or 0), 0) * ways for roll, ways in counts.items())
+    return total / 6 ** int(dice) * int(multiplier or 1)
+
+
+class TradeTables:
+    """
+    Class holding compiled trade goods, price and traffic tables.
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        """
+        Compile the tables.
+
+        Args:
+            data: Parsed trade goods file
+
+        Raises:
+            ImportError: If NumPy is not installed
+            ValueError: If a table is invalid
+        """
+        if np is None:
+            raise ImportError("The trade module requires numpy")
+
+        self.name = data.get('name', 'custom')
+        goods = data['goods']
+        self.goods: List[str] = [good['name'] for good in goods]
+        self.rolls: List[int] = [good.get('roll', 0) for good in goods]
+        self.base_prices = np.array([good['price'] for good in goods], dtype=np.float64)
+        self.quantities = np.array([expected_dice(good.get('quantity', '1D')) for good in goods])
+
+        # Trade codes the DMs depend on, in TRADE_CODES order
+        used = {code for good in goods for side in ('purchase', 'resale') for code in good.get(side, {})}
+        unknown = used - set(TRADE_CODES)
+        if unknown:
+            raise ValueError(f"Unknown trade codes: {', '.join(sorted(unknown))}")
+        self.codes = tuple(code for code in TRADE_CODES if code in used)
+        self.bits = np.array([TRADE_CODES.index(code) for code in self.codes], dtype=np.int64)
+
+        # DM of every good for every combination of those codes
+        combinations = 1 << len(self.codes)
+        self.purchase_dms = np.zeros((combinations, len(goods)), dtype=np.int16)
+        self.resale_dms = np.zeros((combinations, len(goods)), dtype=np.int16)
+        for index, good in enumerate(goods):
+            for table, side in ((self.purchase_dms, 'purchase'), (self.resale_dms, 'resale')):
+                for code, dm in good.get(side, {}).items():
+                    bit = 1 << self.codes.index(code)
+                    table[[combo for combo in range(combinations) if combo & bit], index] += dm
+
+        # Expected actual value for every DM the tables can produce
+        actual = {int(roll): percent / 100 for roll, percent in data['actual_value'].items()}
+        low, high = min(actual), max(actual)
+        reach = int(max(np.abs(self.purchase_dms).max(), np.abs(self.resale_dms).max()))
+        self.dm_offset = reach
+        counts = dice_counts(2)
+        self.expected_value = np.array([
+            sum(actual[min(max(roll + dm, low), high)] * ways for roll, ways in counts.items()) / 36
+            for dm in range(-reach, reach + 1)
+        ])
+
+        self.fares: Dict[str, float] = {kind: float(fare) for kind, fare in data['fares'].items()}
+
+        # Expected weekly traffic by population digit
+        self.traffic = {kind: np.zeros(16) for kind in ('high', 'middle', 'low', 'freight')}
+        for row in data['traffic']:
+            for population in parse_values(row['population'], 'population'):
+                for kind, table in self.traffic.items():
+                    table[population] = expected_dice(row.get(kind, '0'))
+
+    def code_index(self, masks: 'np.ndarray') -> 'np.ndarray':
+        """
+        Pick the DM table row of each world from its trade mask.
+
+        Args:
+            masks: Trade masks
+
+        Returns:
+            np.ndarray: Row index into the DM tables for each world
+        """
+        masks = np.asarray(masks, dtype=np.int64)
+        index = np.zeros(masks.shape, dtype=np.int64)
+        for position, bit in enumerate(self.bits):
+            index |= ((masks >> bit) & 1) << position
+        return index
+
+    def prices(self, masks: 'np.ndarray') -> Tuple['np.ndarray', 'np.ndarray']:
+        """
+        Get the expected purchase and resale price of every good on some worlds.
+
+        Args:
+            masks: Trade masks of the worlds
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (purchase, resale) prices, worlds x goods
+        """
+        index = self.code_index(masks)
+        purchase = self.expected_value[self.purchase_dms[index] + self.dm_offset] * self.base_prices
+        resale = self.expected_value[self.resale_dms[index] + self.dm_offset] * self.base_prices
+        return purchase, resale
+
+
+_tables: Dict[str, TradeTables] = {}
+
+
+def load_trade_tables(path: Optional[str] = None) -> TradeTables:
+    """
+    Load and compile a trade goods file, once per path.
+
+    Args:
+        path: Trade goods file (optional, uses data/trade_goods.json)
+
+    Returns:
+        TradeTables: The compiled tables
+
+    Raises:
+        ValueError: If the file is missing or invalid
+    """
+    path = path or TRADE_GOODS_FILE
+    tables = _tables.get(path)
+    if tables is None:
+        try:
+            with open(path, 'r') as f:
+                tables = TradeTables(json.load(f))
+        except (IOError, json.JSONDecodeError, KeyError) as e:
+            raise ValueError(f"Error loading trade goods {path}: {e}")
+        _tables[path] = tables
+    return tables
+
+
+class TradeMatrix:
+    """
+    Class holding the trade between every pair of worlds within a number of jumps.
+    """
+
+    def __init__(self, worlds: Union[Sequence[World], WorldArray], hops: 'np.ndarray',
+                 tables: Optional[TradeTables] = None):
+        """
+        Price every connected pair of worlds.
+
+        Args:
+            worlds: Worlds, as World objects or a WorldArray
+            hops: Jumps between each pair of worlds (worlds x worlds, negative
+                where there is no route), e.g. from a RouteTable
+            tables: Trade tables (optional, uses the default goods file)
+        """
+        self.tables = load_trade_tables() if tables is None else tables
+        self.worlds = worlds
+        self.hops = np.asarray(hops).reshape(len(worlds), len(worlds))
+
+        if isinstance(worlds, WorldArray):
+            masks, populations = worlds.trade_mask, np.minimum(worlds.population, 15)
+        else:
+            masks = np.array([world.trade_mask for world in worlds], dtype=np.int64)
+            populations = np.array([min(world.population, 15) for world in worlds], dtype=np.int64)
+        self.purchase, self.resale = self.tables.prices(masks)
+
+        # Best good and its profit per ton for every pair, priced a block of
+        # origins at a time
+        n = len(worlds)
+        self.best_good = np.zeros((n, n), dtype=np.int16)
+        self.best_profit = np.zeros((n, n), dtype=np.float64)
+        for start in range(0, n, ORIGIN_BLOCK):
+            stop = min(start + ORIGIN_BLOCK, n)
+            profit = self.resale[np.newaxis, :, :] - self.purchase[start:stop, np.newaxis, :]
+            self.best_good[start:stop] = profit.argmax(axis=2)
+            self.best_profit[start:stop] = profit.max(axis=2)
+        self.connected = self.hops > 0
+        self.best_profit[~self.connected] = 0.0
+
+        # Expected weekly traffic leaving each world, and what it pays per jump
+        self.traffic = {kind: table[populations] for kind, table in self.tables.traffic.items()}
+        fares = self.tables.fares
+        self.revenue_per_jump = sum(self.traffic[kind] * fares[kind] for kind in self.traffic)
+
+    def profit(self, origin: int, destination: int) -> 'np.ndarray':
+        """
+        Get the expected profit per ton of every good between two worlds.
+
+        Args:
+            origin: Index of the world where goods are bought
+            destination: Index of the world where they are sold
+
+        Returns:
+            np.ndarray: Profit per ton for each good
+        """
+        return self.resale[destination] - self.purchase[origin]
+
+    def routes(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        List the connected pairs, most profitable speculation per jump first.
+
+        Args:
+            limit: Maximum number of pairs (optional)
+
+        Returns:
+            List[Dict[str, Any]]: One entry per pair with the best good, its
+                prices and profit per ton (and per ton per jump), the expected
+                lot size and the passenger and freight revenue for the trip
+        """
+        origins, destinations = np.nonzero(self.connected)
+        per_jump = self.best_profit[origins, destinations] / self.hops[origins, destinations]
+        order = np.argsort(-per_jump, kind='stable')
+        if limit is not None:
+            order = order[:limit]
+
+        routes = []
+        for origin, destination in zip(origins[order].tolist(), destinations[order].tolist()):
+            good = int(self.best_good[origin, destination])
+            jumps = int(self.hops[origin, destination])
+            routes.append({
+                "origin": origin,
+                "destination": destination,
+                "jumps": jumps,
+                "good": self.tables.goods[good],
+                "purchase_price": float(self.purchase[origin, good]),
+                "resale_price": float(self.resale[destination, good]),
+                "profit_per_ton": float(self.best_profit[origin, destination]),
+                "profit_per_jump": float(self.best_profit[origin, destination] / jumps),
+                "lot_tons": float(self.tables.quantities[good]),
+                "traffic_revenue": float(self.revenue_per_jump[origin] * jumps),
+            })
+        return routes
+
+
+def sector_trade(graph: Any, sector_x: int, sector_y: int, jump: int = 2,
+                 max_jumps: Optional[int] = None,
+                 tables: Optional[TradeTables] = None) -> Tuple[List[Tuple[int, int]], TradeMatrix]:
+    """
+    Price the trade between the worlds of a sector.
+
+    Args:
+        graph: JumpGraph holding the sector's worlds
+        sector_x: Sector column
+        sector_y: Sector row
+        jump: Ship jump rating
+        max_jumps: Longest trip, in jumps, to price (optional, any reachable world)
+        tables: Trade tables (optional, uses the default goods file)
+
+    Returns:
+        Tuple[List[Tuple[int, int]], TradeMatrix]: (map-wide location of
+            each world, trade between them)
+    """
+    table = graph.route_table(sector_x, sector_y, jump)
+    n = len(table)
+    hops = np.frombuffer(table.hops, dtype=np.int16).reshape(n, n).copy()
+    if max_jumps is not None:
+        hops[hops > max_jumps] = -1
+    worlds = [graph.worlds[location] for location in table.locations]
+    return table.locations, TradeMatrix(worlds, hops, tables)
@@ -8,14 +8,87 @@ v3.0 - May 30th, 2025 - Updated for CTchargen refactoring
 
 import random
 import argparse
-import time
 import json
 import os
 from typing import List, Dict, Any, Optional, Union
 
 from src.lib import stellagama as sg
+from src.lib import namefilter
+from src.lib.namefilter import NameFilter, NameFilterError
+from src.lib.hyphenate import hyphenate_word
 from src.config import config
 
+# Number of syllable patterns to try before giving up on a filtered word
+MAX_WORD_ATTEMPTS = 50
+
+
+def pronounce(name: str) -> str:
+    """
+    Get a syllabified pronunciation guide for a name.
+    
+    Each part of the name is split at its hyphenation points, so "Kaverlin"
+    becomes "Ka-ver-lin".
+    
+    Args:
+        name: Name to syllabify
+        
+    Returns:
+        str: Pronunciation guide
+    """
+    if ' ' not in name:
+        return "-".join(hyphenate_word(name))
+    return " ".join("-".join(hyphenate_word(part)) for part in name.split())
+
+
+# Syllable rules already loaded, keyed by data file path
+_syllable_rules: Dict[str, Dict[str, Any]] = {}
+
+
+def syllable_rules_file() -> str:
+    """
+    Get the configured syllable rules file.
+    
+    Returns:
+        str: Path to the syllable rules JSON file
+    """
+    return config.get('name_generation', {}).get(
+        'data_file', 
+        os.path.join(config.BASE_DIR, 'data', 'syllable_starter.json')
+    )
+
+
+def load_syllable_rules(data_file: str) -> Optional[Dict[str, Any]]:
+    """
+    Load syllable rules, reading each file only once.
+    
+    Args:
+        data_file: Path to the syllable rules JSON file
+        
+    Returns:
+        Optional[Dict[str, Any]]: The rules, or None if the file can't be loaded
+    """
+    data = _syllable_rules.get(data_file)
+    if data is None:
+        try:
+            with open(data_file) as syllable_rules:
+                data = json.load(syllable_rules)
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            print(f"Error loading syllable rules: {e}")
+            return None
+        _syllable_rules[data_file] = data
+    return data
+
+
+def install_syllable_rules(data_file: str, data: Dict[str, Any]) -> None:
+    """
+    Provide already-loaded syllable rules for a data file.
+    
+    Args:
+        data_file: Path the rules were loaded from
+        data: The syllable rules
+    """
+    _syllable_rules[data_file] = data
+
 
 class Wordplay:
     """
@@ -41,15 +114,9 @@ class Wordplay:
 
     def load_dictionary(self) -> None:
         """Load syllable rules from JSON file."""
-        data_file = config.get('name_generation', {}).get(
-            'data_file', 
-            os.path.join(config.BASE_DIR, 'data', 'syllable_starter.json')
-        )
-        
-        try:
-            with open(data_file) as syllable_rules:
-                data = json.load(syllable_rules)
+        data = load_syllable_rules(syllable_rules_file())
 
+        if data is not None:
             self.syllable_length = data['syllable_length']
             self.syllable_size_list = data['syllable_size_list']
             self.vowels = data['vowels']
@@ -57,8 +124,7 @@ class Wordplay:
             self.voiced_consonants = data['voiced_consonants']
             self.voiceless_consonants = data['voiceless_consonants']
             self.syllable_styles = data['syllable_styles']
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            print(f"Error loading syllable rules: {e}")
+        else:
             # Set default values if file can't be loaded
             self.syllable_length = [1, 2, 3]
             self.syllable_size_list = [0, 1, 2]
@@ -133,6 +199,10 @@ class Wordplay:
         """
         Set the random seed for word generation.
         
+        Without a seed the random state is left alone. Reseeding from the
+        clock on every word made words created in the same microsecond, or
+        in parallel worker processes, identical.
+        
         Args:
             args: Command line arguments (optional)
             seed: Seed string (optional)
@@ -142,33 +212,66 @@ class Wordplay:
         elif seed and seed != 'A-1234567':
             self.random_seed = seed
         else:
-            self.random_seed = str(time.time())
+            return
 
         random.seed(self.random_seed)
 
-    def create_word(self, args: Optional[argparse.Namespace] = None, seed: Optional[str] = None) -> str:
+    def create_word(self, args: Optional[argparse.Namespace] = None, seed: Optional[str] = None,
+                    name_filter: Optional[NameFilter] = None, with_pronunciation: bool = True) -> str:
         """
         Create a random word.
         
         Args:
             args: Command line arguments (optional)
             seed: Seed string (optional)
+            name_filter: Constraints for the word (optional, uses the configured filter)
+            with_pronunciation: Fill in word_pronounced (set False for words
+                that need no guide, such as world names)
             
         Returns:
             str: Generated word
         """
         self.load_dictionary()
 
-        self.word = ''
-        self.word_pronounced = ''
-        self.create_seed(args, seed)
-
-        # Number of syllables
-        self.number_of_syllables = sg.random_choice(self.syllable_length)
+        if name_filter is None:
+            name_filter = namefilter.name_filter
 
-        # Create array of syllables
-        current_word_syllables = self.create_syllables(self.number_of_syllables)
+        self.create_seed(args, seed)
 
+        if not name_filter.is_active:
+            self.word = ''
+            self.word_pronounced = ''
+
+            # Number of syllables
+            self.number_of_syllables = sg.random_choice(self.syllable_length)
+
+            # Create array of syllables
+            current_word_syllables = self.create_syllables(self.number_of_syllables)
+            self.spell_syllables(current_word_syllables)
+            if with_pronunciation:
+                self.word_pronounced = pronounce(self.word)
+            return self.word
+
+        syllable_choices = name_filter.allowed_syllables(self.syllable_length)
+        for _ in range(MAX_WORD_ATTEMPTS):
+            self.word = ''
+            self.word_pronounced = ''
+            self.number_of_syllables = sg.random_choice(syllable_choices)
+            current_word_syllables = self.create_syllables(self.number_of_syllables)
+            if self.spell_syllables_constrained(current_word_syllables, name_filter):
+                if with_pronunciation:
+                    self.word_pronounced = pronounce(self.word)
+                return self.word
+
+        raise NameFilterError("Unable to create a word that satisfies the name filter")
+
+    def spell_syllables(self, current_word_syllables: List[str]) -> None:
+        """
+        Replace each syllable component with a random letter.
+        
+        Args:
+            current_word_syllables: List of syllable components
+        """
         for current_letter in current_word_syllables:
             if current_letter == 'v':
                 letter = sg.random_choice(self.vowels)
@@ -192,7 +295,96 @@ class Wordplay:
                 self.word += current_letter
                 self.word_pronounced += current_letter
 
-        return self.word
+    def letter_choices(self, component: str) -> List[str]:
+        """
+        Get the letters a syllable component can be spelled with.
+        
+        Args:
+            component: Syllable component ('v', 'vv', 'c', 'cc' or a literal)
+            
+        Returns:
+            List[str]: Possible spellings (repeats act as weights)
+        """
+        if component == 'v':
+            return self.vowels
+        elif component == 'vv':
+            return self.voiced_vowels
+        elif component == 'c':
+            return self.voiceless_consonants
+        elif component == 'cc':
+            return self.voiced_consonants
+        elif component == ',':
+            return ['']
+        else:
+            return [component]
+
+    def spell_syllables_constrained(self, current_word_syllables: List[str],
+                                    name_filter: NameFilter) -> bool:
+        """
+        Spell syllable components while enforcing a name filter.
+        
+        Letters that would push the word outside the length limits, or that
+        would complete a blocked substring, are removed from the choices
+        before each letter is drawn.
+        
+        Args:
+            current_word_syllables: List of syllable components
+            name_filter: Constraints for the word
+            
+        Returns:
+            bool: True if the word was spelled, False if the pattern hit a dead end
+        """
+        choices = [self.letter_choices(component) for component in current_word_syllables]
+
+        # Shortest and longest spelling of everything after each position
+        min_after = [0] * (len(choices) + 1)
+        max_after = [0] * (len(choices) + 1)
+        for index in range(len(choices) - 1, -1, -1):
+            lengths = [len(letter) for letter in choices[index]]
+            min_after[index] = min_after[index + 1] + min(lengths)
+            max_after[index] = max_after[index + 1] + max(lengths)
+
+        max_length = name_filter.max_length
+        min_length = name_filter.min_length
+        if max_length is not None and min_after[0] > max_length:
+            return False
+        if min_length is not None and max_after[0] < min_length:
+            return False
+
+        automaton = name_filter.automaton if name_filter.has_blocklist else None
+        state = 0
+
+        for index, component in enumerate(current_word_syllables):
+            if component == ',':
+                self.word_pronounced += component
+                continue
+
+            high = None
+            if max_length is not None:
+                high = max_length - len(self.word) - min_after[index + 1]
+            low = 0
+            if min_length is not None:
+                low = min_length - len(self.word) - max_after[index + 1]
+
+            candidates = []
+            for letter in choices[index]:
+                if len(letter) < low or (high is not None and len(letter) > high):
+                    continue
+                next_state = state
+                if automaton is not None:
+                    next_state, matched = automaton.advance(state, letter)
+                    if matched:
+                        continue
+                candidates.append((letter, next_state))
+
+            if not candidates:
+                return False
+
+            letter, state = sg.random_choice(candidates)
+            self.word += letter
+            self.word_pronounced += letter
+
+        return True
 
 
 # Create a singleton instance
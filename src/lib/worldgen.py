@@ -6,9 +6,137 @@ This module handles world generation for Classic Traveller.
 v3.0 - May 30th, 2025 - Updated for CTchargen refactoring
 """
 
-from typing import List, Dict, Any, Optional, Union
+from types import ModuleType
+from typing import List, Dict, Any, Optional, Tuple, Union
 
 from src.lib import stellagama as sg
+from src.lib.worldrules import (
+    STARPORT_CLASSES, CHARACTERISTICS, WorldRules, get_rules
+)
+
+# numpy is only needed by the column-wise paths (WorldArray and the modules
+# built on it), so it is imported on first use rather than by every run
+_numpy: Union[ModuleType, None, bool] = False
+
+
+def get_numpy() -> Optional[ModuleType]:
+    """
+    Get the numpy module, importing it on first use.
+    
+    Returns:
+        Optional[ModuleType]: numpy, or None if it isn't installed
+    """
+    global _numpy
+    if _numpy is False:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _numpy = numpy
+    return _numpy
+
+
+# Trade classification rules. A world has a trade code when every listed
+# characteristic is one of the listed values; unlisted characteristics don't
+# matter. Codes are stored as a bitmask, bit N for the Nth rule.
+TRADE_RULES = (
+    ('Ag', {'atmosphere': range(4, 10), 'hydrographics': range(4, 9), 'population': range(4, 8)}),
+    ('As', {'size': (0,), 'atmosphere': (0,), 'hydrographics': (0,)}),
+    ('Ba', {'population': (0,), 'government': (0,), 'lawlevel': (0,)}),
+    ('De', {'atmosphere': range(2, 16), 'hydrographics': (0,)}),
+    ('Fl', {'atmosphere': range(10, 16), 'hydrographics': range(1, 16)}),
+    ('Ga', {'atmosphere': range(5, 16), 'hydrographics': range(4, 10), 'population': range(4, 9)}),
+    ('Hi', {'population': range(9, 16)}),
+    ('Ht', {'techlevel': range(12, 16)}),
+    ('Ic', {'atmosphere': (0, 1), 'hydrographics': range(1, 16)}),
+    ('In', {'atmosphere': (0, 1, 2, 4, 7, 9), 'population': range(9, 16)}),
+    ('Lo', {'population': (1, 2, 3)}),
+    ('Lt', {'techlevel': range(0, 6)}),
+    ('Na', {'atmosphere': range(0, 4), 'hydrographics': range(0, 4), 'population': range(6, 16)}),
+    ('Ni', {'population': (4, 5, 6)}),
+    ('Po', {'atmosphere': (2, 3, 4, 5), 'hydrographics': range(0, 4)}),
+    ('Ri', {'atmosphere': (6, 8), 'population': (6, 7, 8)}),
+    ('Wa', {'hydrographics': (10,)}),
+    ('Va', {'atmosphere': (0,)}),
+)
+TRADE_CODES = tuple(code for code, _ in TRADE_RULES)
+TRADE_FIELDS = ('size', 'atmosphere', 'hydrographics', 'population',
+                'government', 'lawlevel', 'techlevel')
+
+
+def _trade_masks() -> Dict[str, Tuple[int, ...]]:
+    """Clear each rule's bit from the values of the characteristics it lists."""
+    masks = {field: [(1 << len(TRADE_RULES)) - 1] * 16 for field in TRADE_FIELDS}
+    for bit, (_, rule) in enumerate(TRADE_RULES):
+        for field, values in rule.items():
+            column = masks[field]
+            for value in set(range(16)).difference(values):
+                column[value] &= ~(1 << bit)
+    return {field: tuple(column) for field, column in masks.items()}
+
+
+# For each characteristic, the codes each of its values (0-15) allows. A
+# world's trade mask is the AND of one entry per characteristic.
+TRADE_MASKS = _trade_masks()
+
+
+def trade_mask(size: int, atmosphere: int, hydrographics: int, population: int,
+               government: int, lawlevel: int, techlevel: int) -> int:
+    """
+    Get the trade code bitmask for a set of world characteristics.
+    
+    Args:
+        size: World size
+        atmosphere: World atmosphere
+        hydrographics: World hydrographics
+        population: World population
+        government: World government
+        lawlevel: World law level
+        techlevel: World tech level
+        
+    Returns:
+        int: Bitmask with bit N set for TRADE_CODES[N]
+    """
+    return (TRADE_MASKS['size'][size] & TRADE_MASKS['atmosphere'][atmosphere]
+            & TRADE_MASKS['hydrographics'][hydrographics] & TRADE_MASKS['population'][population]
+            & TRADE_MASKS['government'][government] & TRADE_MASKS['lawlevel'][lawlevel]
+            & TRADE_MASKS['techlevel'][techlevel])
+
+
+def trade_codes(mask: int) -> List[str]:
+    """
+    List the trade codes in a bitmask.
+    
+    Args:
+        mask: Trade code bitmask
+        
+    Returns:
+        List[str]: Trade codes in TRADE_CODES order
+    """
+    return [code for bit, code in enumerate(TRADE_CODES) if mask >> bit & 1]
+
+
+def trade_code_mask(codes: Union[str, List[str]]) -> int:
+    """
+    Get the bitmask for some trade codes.
+    
+    Args:
+        codes: Trade codes, as a list or a space-separated string
+        
+    Returns:
+        int: Bitmask of the codes
+        
+    Raises:
+        ValueError: If a code is unknown
+    """
+    if isinstance(codes, str):
+        codes = codes.split()
+    mask = 0
+    for code in codes:
+        if code not in TRADE_CODES:
+            raise ValueError(f"Unknown trade code: {code}")
+        mask |= 1 << TRADE_CODES.index(code)
+    return mask
 
 
 class World:
@@ -16,57 +144,97 @@ class World:
     Class for generating Traveller worlds.
     """
     
-    def __init__(self):
-        """Initialize and generate a random world."""
-        self.starport = sg.random_choice([
-            'X', 'E', 'E', 'E', 'E', 'E', 'E', 'D', 'D', 'D', 'D', 'D', 'D', 'D', 'D', 'D',
-            'C', 'C', 'C', 'C', 'C', 'C', 'C', 'B', 'B', 'B', 'B', 'B', 'B', 'B', 'B', 'A', 'A'
-        ])
-        
-        self.size = sg.dice(2, 6) - 2
-        self.atmosphere = self.atmosphere_calc(self.size)
-        self.hydrographics = self.hydrographics_calc(self.size, self.atmosphere)
-        self.population = sg.dice(2, 6) - 2
-        self.government = self.government_calc(self.population)
-        self.lawlevel = self.law_level_calc(self.government, self.population)
-        self.techlevel = self.techlevel_calc(
-            self.population, self.starport, self.size, 
-            self.atmosphere, self.hydrographics, self.government
-        )
+    def __init__(self, rules: Optional[WorldRules] = None):
+        """
+        Initialize and generate a random world.
+        
+        Args:
+            rules: World generation rules (optional, uses the active rules)
+        """
+        if rules is None:
+            rules = get_rules()
+        
+        self.name = ''
+        self.hex = ''
+        
+        self.starport = rules.roll_starport()
+        
+        values = {'starport': STARPORT_CLASSES.index(self.starport)}
+        for field in CHARACTERISTICS:
+            values[field] = rules[field].roll(values)
+        
+        self.size = values['size']
+        self.atmosphere = values['atmosphere']
+        self.hydrographics = values['hydrographics']
+        self.population = values['population']
+        self.government = values['government']
+        self.lawlevel = values['lawlevel']
+        self.techlevel = values['techlevel']
         
         self.upp = [
             self.size, self.atmosphere, self.hydrographics, 
             self.population, self.government, self.lawlevel, self.techlevel
         ]
         
-        self.tradelevel = self.trade_classification(
+        self.trade_mask = trade_mask(
             self.size, self.atmosphere, self.hydrographics, 
             self.population, self.government, self.lawlevel, self.techlevel
         )
     
+    @classmethod
+    def from_values(cls, starport: str, values: List[int], name: str = '',
+                    hex_number: str = '') -> 'World':
+        """
+        Create a world from known characteristics instead of rolling them.
+        
+        Args:
+            starport: Starport class
+            values: Size, atmosphere, hydrographics, population, government,
+                law level and tech level
+            name: World name (optional)
+            hex_number: Hex number (optional)
+            
+        Returns:
+            World: The world
+        """
+        world = cls.__new__(cls)
+        world.name = name
+        world.hex = hex_number
+        world.starport = starport
+        (world.size, world.atmosphere, world.hydrographics, world.population,
+         world.government, world.lawlevel, world.techlevel) = values
+        world.upp = list(values)
+        # The trade rules treat 15 as "15 or more"
+        if max(values) > 15:
+            values = [min(value, 15) for value in values]
+        world.trade_mask = trade_mask(*values)
+        return world
+    
+    @property
+    def tradelevel(self) -> List[str]:
+        """The world's trade classifications, read from its trade mask."""
+        return trade_codes(self.trade_mask)
+    
     def atmosphere_calc(self, size: int) -> int:
         """
         Calculate atmosphere based on size.
         
+        Uses the active world generation rules.
+        
         Args:
             size: World size
             
         Returns:
             int: Atmosphere value
         """
-        atmo_base = sg.dice(2, 6) - 7 + size
-
-        if atmo_base <= 0:
-            return 0
-        elif atmo_base >= 15:
-            return 15
-        else:
-            return atmo_base
+        return get_rules()['atmosphere'].roll({'size': size})
 
     def hydrographics_calc(self, size: int, atmosphere: int) -> int:
         """
         Calculate hydrographics based on size and atmosphere.
         
+        Uses the active world generation rules.
+        
         Args:
             size: World size
             atmosphere: World atmosphere
@@ -74,52 +242,28 @@ class World:
         Returns:
             int: Hydrographics value
         """
-        hydro_base = sg.dice(2, 6) - 7
-        
-        if size <= 1:
-            return 0
-        else:
-            if atmosphere <= 1:
-                hydro_base += -4
-            elif atmosphere >= 10 and atmosphere <= 12:
-                hydro_base += -4
-
-            hydro_base += size
-
-            if hydro_base <= 0:
-                return 0
-            elif hydro_base >= 15:
-                return 15
-            else:
-                return hydro_base
+        return get_rules()['hydrographics'].roll({'size': size, 'atmosphere': atmosphere})
 
     def government_calc(self, population: int) -> int:
         """
         Calculate government based on population.
         
+        Uses the active world generation rules.
+        
         Args:
             population: World population
             
         Returns:
             int: Government value
         """
-        gov_base = sg.dice(2, 6) - 7
-
-        if population <= 0:
-            return 0
-        else:
-            gov_base += population
-            if gov_base <= 0:
-                return 0
-            elif gov_base >= 15:
-                return 15
-            else:
-                return gov_base
+        return get_rules()['government'].roll({'population': population})
 
     def law_level_calc(self, government: int, population: int) -> int:
         """
         Calculate law level based on government and population.
         
+        Uses the active world generation rules.
+        
         Args:
             government: World government
             population: World population
@@ -127,25 +271,15 @@ class World:
         Returns:
             int: Law level value
         """
-        law_base = sg.dice(2, 6) - 7
-
-        if population < 1:
-            return 0
-        else:
-            law_base += government
-
-            if law_base <= 0:
-                return 0
-            elif law_base >= 15:
-                return 15
-            else:
-                return law_base
+        return get_rules()['lawlevel'].roll({'government': government, 'population': population})
 
     def techlevel_calc(self, population: int, starport: str, size: int, 
                       atmosphere: int, hydrographics: int, government: int) -> int:
         """
         Calculate tech level based on various world characteristics.
         
+        Uses the active world generation rules.
+        
         Args:
             population: World population
             starport: World starport class
@@ -157,55 +291,14 @@ class World:
         Returns:
             int: Tech level value
         """
-        tech_base = sg.dice(1, 6)
-
-        if population <= 0:
-            return 0
-        else:
-            if starport == 'X':
-                tech_base += -6
-            elif starport == 'C':
-                tech_base += 2
-            elif starport == 'B':
-                tech_base += 4
-            elif starport == 'A':
-                tech_base += 6
-
-            if size in [1, 2]:
-                tech_base += 2
-            elif size in [2, 3, 4]:
-                tech_base += 1
-
-            if atmosphere in [0, 1, 2, 3, 10, 11, 12, 13, 14, 15]:
-                tech_base += 1
-
-            if hydrographics in [0, 9]:
-                tech_base += 1
-            elif hydrographics == 10:
-                tech_base += 2
-
-            if population in [0, 1, 2, 3, 4, 5, 9]:
-                tech_base += 1
-            elif population == 10:
-                tech_base += 2
-            elif population == 11:
-                tech_base += 3
-            elif population == 12:
-                tech_base += 4
-
-            if government in [0, 5]:
-                tech_base += 1
-            elif government == 7:
-                tech_base += 2
-            elif government in [13, 14]:
-                tech_base += -2
-
-            if tech_base <= 0:
-                return 0
-            elif tech_base >= 15:
-                return 15
-            else:
-                return tech_base
+        return get_rules()['techlevel'].roll({
+            'starport': STARPORT_CLASSES.index(starport),
+            'size': size,
+            'atmosphere': atmosphere,
+            'hydrographics': hydrographics,
+            'population': population,
+            'government': government,
+        })
 
     def trade_classification(self, size: int, atmosphere: int, hydrographics: int, 
                            population: int, government: int, lawlevel: int, techlevel: int) -> List[str]:
@@ -224,46 +317,9 @@ class World:
         Returns:
             List[str]: List of trade classifications
         """
-        trade_list = []
-
-        if atmosphere in [4, 5, 6, 7, 8, 9] and hydrographics in [4, 5, 6, 7, 8] and population in [4, 5, 6, 7]:
-            trade_list.append('Ag')
-        if size == 0 and atmosphere == 0 and hydrographics == 0:
-            trade_list.append('As')
-        if population == 0 and government == 0 and lawlevel == 0:
-            trade_list.append('Ba')
-        if atmosphere >= 2 and hydrographics == 0:
-            trade_list.append('De')
-        if atmosphere >= 10 and hydrographics >= 1:
-            trade_list.append('Fl')
-        if atmosphere >= 5 and hydrographics in [4, 5, 6, 7, 8, 9] and population in [4, 5, 6, 7, 8]:
-            trade_list.append('Ga')
-        if population >= 9:
-            trade_list.append('Hi')
-        if techlevel >= 12:
-            trade_list.append('Ht')
-        if atmosphere in [0, 1] and hydrographics >= 1:
-            trade_list.append('Ic')
-        if atmosphere in [0, 1, 2, 4, 7, 9] and population >= 9:
-            trade_list.append('In')
-        if population in [1, 2, 3]:
-            trade_list.append('Lo')
-        if techlevel <= 5:
-            trade_list.append('Lt')
-        if atmosphere in [0, 1, 2, 3] and hydrographics in [0, 1, 2, 3] and population >= 6:
-            trade_list.append('Na')
-        if population in [4, 5, 6]:
-            trade_list.append('Ni')
-        if atmosphere in [2, 3, 3, 4, 5] and hydrographics in [0, 1, 2, 3]:
-            trade_list.append('Po')
-        if atmosphere in [6, 8] and population in [6, 7, 8]:
-            trade_list.append('Ri')
-        if hydrographics == 10:
-            trade_list.append('Wa')
-        if atmosphere == 0:
-            trade_list.append('Va')
-
-        return trade_list
+        return trade_codes(trade_mask(
+            size, atmosphere, hydrographics, population, government, lawlevel, techlevel
+        ))
     
     def get_upp_string(self) -> str:
         """
@@ -274,6 +330,16 @@ class World:
         """
         return "".join(str(sg.pseudo_hex(val)) for val in self.upp)
     
+    def get_uwp_string(self) -> str:
+        """
+        Get the world's universal world profile, e.g. "A788899-C".
+        
+        Returns:
+            str: UWP string
+        """
+        upp = self.get_upp_string()
+        return f"{self.starport}{upp[:-1]}-{upp[-1]}"
+    
     def get_trade_string(self) -> str:
         """
         Get the world's trade classifications as a string.
@@ -291,6 +357,8 @@ class World:
             Dict[str, Any]: World data as a dictionary
         """
         return {
+            "name": self.name,
+            "hex": self.hex,
             "starport": self.starport,
             "size": self.size,
             "atmosphere": self.atmosphere,
@@ -301,7 +369,9 @@ class World:
             "techlevel": self.techlevel,
             "upp": self.upp,
             "upp_string": self.get_upp_string(),
+            "uwp_string": self.get_uwp_string(),
             "tradelevel": self.tradelevel,
+            "trade_mask": self.trade_mask,
             "trade_string": self.get_trade_string()
         }
     
@@ -347,3 +417,140 @@ def generate_worlds(count: int = 1) -> List[World]:
         List[World]: List of world instances
     """
     return [World() for _ in range(count)]
+
+
+class WorldArray:
+    """
+    Class holding many worlds as parallel columns.
+    
+    Each attribute is a NumPy array with one entry per world. The starport is
+    stored as an index into STARPORT_CLASSES.
+    """
+    
+    FIELDS = ('starport', 'size', 'atmosphere', 'hydrographics', 'population',
+              'government', 'lawlevel', 'techlevel')
+    
+    def __init__(self, names: Optional[List[str]] = None, hexes: Optional[List[str]] = None,
+                 **columns):
+        """
+        Initialize the world array from its columns.
+        
+        Args:
+            names: World names (optional)
+            hexes: Hex numbers (optional)
+            **columns: One array per name in FIELDS
+        """
+        for field in self.FIELDS:
+            setattr(self, field, columns[field])
+        self.names = names
+        self.hexes = hexes
+        self._trade_mask = None
+    
+    def __len__(self) -> int:
+        """Return the number of worlds."""
+        return len(self.size)
+    
+    def starport_class(self, index: int) -> str:
+        """
+        Get the starport class of one world.
+        
+        Args:
+            index: World index
+            
+        Returns:
+            str: Starport class
+        """
+        return STARPORT_CLASSES[int(self.starport[index])]
+    
+    def get_upp_string(self, index: int) -> str:
+        """
+        Get the UPP string of one world, in the same form as World.get_upp_string().
+        
+        Args:
+            index: World index
+            
+        Returns:
+            str: UPP string
+        """
+        return "".join(str(sg.pseudo_hex(int(getattr(self, field)[index])))
+                       for field in self.FIELDS[1:])
+    
+    @property
+    def trade_mask(self):
+        """Trade code bitmasks of every world, looked up column by column."""
+        if self._trade_mask is None:
+            np = get_numpy()
+            mask = np.full(len(self), (1 << len(TRADE_CODES)) - 1, dtype=np.uint32)
+            for field in TRADE_FIELDS:
+                values = np.minimum(getattr(self, field), 15)
+                mask &= np.array(TRADE_MASKS[field], dtype=np.uint32)[values]
+            self._trade_mask = mask
+        return self._trade_mask
+    
+    def to_dict(self, index: int) -> Dict[str, Any]:
+        """
+        Convert one world to a dictionary of plain values.
+        
+        Args:
+            index: World index
+            
+        Returns:
+            Dict[str, Any]: World data as a dictionary
+        """
+        data = {field: int(getattr(self, field)[index]) for field in self.FIELDS[1:]}
+        data['starport'] = self.starport_class(index)
+        data['upp'] = [data[field] for field in self.FIELDS[1:]]
+        data['upp_string'] = self.get_upp_string(index)
+        data['trade_mask'] = int(self.trade_mask[index])
+        data['tradelevel'] = trade_codes(data['trade_mask'])
+        data['trade_string'] = " ".join(data['tradelevel'])
+        if self.names is not None:
+            data['name'] = self.names[index]
+        if self.hexes is not None:
+            data['hex'] = self.hexes[index]
+        return data
+
+
+def generate_worlds_array(count: int, seed: Optional[int] = None,
+                          rules: Optional[WorldRules] = None) -> WorldArray:
+    """
+    Generate many random worlds at once as columns.
+    
+    The worlds follow the same rules and distributions as World(), but every
+    step is applied to whole columns, with the compiled DM tables of the
+    rules used as lookup arrays. Requires NumPy.
+    
+    Args:
+        count: Number of worlds to generate
+        seed: Seed for the random generator (optional)
+        rules: World generation rules (optional, uses the active rules)
+        
+    Returns:
+        WorldArray: The generated worlds
+    """
+    np = get_numpy()
+    if np is None:
+        raise ImportError("generate_worlds_array() requires numpy")
+    
+    if rules is None:
+        rules = get_rules()
+    
+    rng = np.random.default_rng(seed)
+    
+    starport_codes = np.array([STARPORT_CLASSES.index(c) for c in rules.starport_table], dtype=np.uint8)
+    columns = {'starport': starport_codes[rng.integers(0, len(rules.starport_table), size=count)]}
+    
+    for field in CHARACTERISTICS:
+        rule = rules[field]
+        value = rng.integers(1, 7, size=(rule.dice, count), dtype=np.int16).sum(axis=0, dtype=np.int16)
+        value += rule.modifier
+        if rule.add is not None:
+            value += columns[rule.add]
+        for source, table in rule.dms:
+            value += np.array(table, dtype=np.int16)[columns[source]]
+        value = np.clip(value, rule.low, rule.high).astype(np.uint8)
+        for source, zero in rule.zero_if:
+            value[np.array(zero, dtype=bool)[columns[source]]] = 0
+        columns[field] = value
+    
+    return WorldArray(**columns)
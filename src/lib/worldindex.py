@@ -0,0 +1,305 @@
+"""
+World index module for CTchargen.
+
+This module indexes large sets of generated worlds for fast conjunctive
+queries, such as "every Hi In world with a class A starport and tech level
+12 or more".
+
+Sets of worlds are stored as bitsets: Python integers with bit N set for
+world N. The index keeps one bitset per trade code and, for every UWP
+characteristic, the world numbers sorted by value with the offsets where
+each value starts. A query ANDs together the bitsets of its conditions, so
+it never scans the worlds themselves.
+
+v1.0 - Added for CTchargen world queries
+"""
+
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from src.lib.worldgen import (
+    STARPORT_CLASSES, TRADE_CODES, TRADE_FIELDS, World, WorldArray, trade_code_mask, get_numpy
+)
+
+
+# Characteristics with a sorted index; the starport is stored as its index
+# in STARPORT_CLASSES
+INDEX_FIELDS = ('starport',) + TRADE_FIELDS
+
+# Bit positions set in each byte value, for turning bitsets into world numbers
+_BYTE_BITS = tuple(tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256))
+
+
+def bitset_from_ids(ids: Sequence[int], size: int) -> int:
+    """
+    Build a bitset from world numbers.
+
+    Args:
+        ids: World numbers
+        size: Total number of worlds
+
+    Returns:
+        int: Bitset with the bit of every listed world set
+    """
+    np = get_numpy()
+    if np is not None:
+        flags = np.zeros(size, dtype=bool)
+        flags[np.asarray(ids, dtype=np.int64)] = True
+        return int.from_bytes(np.packbits(flags, bitorder='little').tobytes(), 'little')
+
+    data = bytearray((size + 7) // 8)
+    for world_id in ids:
+        data[world_id >> 3] |= 1 << (world_id & 7)
+    return int.from_bytes(data, 'little')
+
+
+def ids_from_bitset(bits: int) -> List[int]:
+    """
+    List the world numbers in a bitset.
+
+    Args:
+        bits: Bitset
+
+    Returns:
+        List[int]: World numbers in ascending order
+    """
+    ids = []
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+    for offset, byte in enumerate(data):
+        if byte:
+            base = offset * 8
+            ids.extend(base + bit for bit in _BYTE_BITS[byte])
+    return ids
+
+
+class WorldIndex:
+    """
+    Class indexing worlds by trade code and characteristic.
+    """
+
+    def __init__(self, worlds: Union[Sequence[World], WorldArray]):
+        """
+        Build the index.
+
+        World numbers in query results are positions in `worlds`.
+
+        Args:
+            worlds: World objects, or a WorldArray from generate_worlds_array()
+        """
+        self.worlds = worlds
+        self.size = len(worlds)
+        self.all = (1 << self.size) - 1
+
+        columns, masks = self._columns(worlds)
+
+        # Sorted index per characteristic: world numbers ordered by value,
+        # and the offset where each value starts (at least 0-15, more when
+        # imported worlds go higher)
+        self.order: Dict[str, array] = {}
+        self.bounds: Dict[str, List[int]] = {}
+        for field in INDEX_FIELDS:
+            self.order[field], self.bounds[field] = self._sort(columns[field])
+        self._value_bits: Dict[Tuple[str, int], int] = {}
+
+        self.codes: Dict[str, int] = {}
+        np = get_numpy()
+        if np is not None and isinstance(masks, np.ndarray):
+            for bit, code in enumerate(TRADE_CODES):
+                flags = (masks >> bit & 1).astype(bool)
+                self.codes[code] = int.from_bytes(np.packbits(flags, bitorder='little').tobytes(), 'little')
+            return
+
+        # Bitset per trade code, built from the distinct masks so each world
+        # is only visited once
+        by_mask: Dict[int, List[int]] = {}
+        for world_id, mask in enumerate(masks):
+            by_mask.setdefault(mask, []).append(world_id)
+        mask_bits = {mask: bitset_from_ids(ids, self.size) for mask, ids in by_mask.items()}
+
+        for bit, code in enumerate(TRADE_CODES):
+            bits = 0
+            for mask, ids in mask_bits.items():
+                if mask >> bit & 1:
+                    bits |= ids
+            self.codes[code] = bits
+
+    @staticmethod
+    def _columns(worlds: Union[Sequence[World], WorldArray]) -> Tuple[Dict[str, Sequence[int]], Sequence[int]]:
+        """
+        Get the characteristic columns and trade masks of some worlds.
+
+        Args:
+            worlds: Worlds to read
+
+        Returns:
+            Tuple[Dict[str, Sequence[int]], Sequence[int]]: (columns by field, trade masks)
+        """
+        if isinstance(worlds, WorldArray):
+            columns = {field: getattr(worlds, field) for field in INDEX_FIELDS}
+            return columns, worlds.trade_mask
+
+        columns = {field: [getattr(world, field) for world in worlds] for field in TRADE_FIELDS}
+        columns['starport'] = [STARPORT_CLASSES.index(world.starport) for world in worlds]
+        return columns, [world.trade_mask for world in worlds]
+
+    @staticmethod
+    def _sort(values: Sequence[int]) -> Tuple[array, List[int]]:
+        """
+        Counting-sort world numbers by a characteristic.
+
+        Values above 15 (possible in imported worlds) get their own buckets,
+        so ranges reaching past 15 still find them.
+
+        Args:
+            values: Characteristic value of every world
+
+        Returns:
+            Tuple[array, List[int]]: (world numbers by value, start offset of each value)
+        """
+        np = get_numpy()
+        if np is not None and isinstance(values, np.ndarray):
+            order = array('I')
+            order.frombytes(np.argsort(values, kind='stable').astype(np.uint32).tobytes())
+            counts = np.bincount(values, minlength=16)
+            return order, [0] + np.cumsum(counts).tolist()
+
+        buckets: List[List[int]] = [[] for _ in range(max(max(values, default=0), 15) + 1)]
+        for world_id, value in enumerate(values):
+            buckets[value].append(world_id)
+
+        order = array('I')
+        bounds = [0]
+        for bucket in buckets:
+            order.extend(bucket)
+            bounds.append(len(order))
+        return order, bounds
+
+    def __len__(self) -> int:
+        """Return the number of indexed worlds."""
+        return self.size
+
+    def ids_in_range(self, field: str, low: int, high: int) -> array:
+        """
+        List the worlds whose characteristic lies in a range.
+
+        Args:
+            field: Characteristic name
+            low: Lowest value (inclusive)
+            high: Highest value (inclusive)
+
+        Returns:
+            array: World numbers, sorted by the characteristic
+        """
+        bounds = self.bounds[field]
+        low, high = max(low, 0), min(high, len(bounds) - 2)
+        if low > high:
+            return array('I')
+        return self.order[field][bounds[low]:bounds[high + 1]]
+
+    def value_bits(self, field: str, value: int) -> int:
+        """
+        Get the bitset of worlds with one characteristic value.
+
+        Bitsets are built from the sorted index on first use.
+
+        Args:
+            field: Characteristic name
+            value: Value
+
+        Returns:
+            int: Bitset of matching worlds
+        """
+        key = (field, value)
+        bits = self._value_bits.get(key)
+        if bits is None:
+            bits = bitset_from_ids(self.ids_in_range(field, value, value), self.size)
+            self._value_bits[key] = bits
+        return bits
+
+    def range_bits(self, field: str, low: int, high: int) -> int:
+        """
+        Get the bitset of worlds whose characteristic lies in a range.
+
+        Args:
+            field: Characteristic name
+            low: Lowest value (inclusive)
+            high: Highest value (inclusive)
+
+        Returns:
+            int: Bitset of matching worlds
+        """
+        top = len(self.bounds[field]) - 2
+        if low <= 0 and high >= top:
+            return self.all
+        bits = 0
+        for value in range(max(low, 0), min(high, top) + 1):
+            bits |= self.value_bits(field, value)
+        return bits
+
+    def match(self, codes: Union[str, Sequence[str]] = (), starport: Optional[str] = None,
+              **ranges: Union[int, Tuple[int, int]]) -> int:
+        """
+        Get the bitset of worlds meeting every condition.
+
+        Args:
+            codes: Trade codes every match must have, as a list or a
+                space-separated string
+            starport: Allowed starport classes, e.g. "A" or "AB" (optional)
+            **ranges: Characteristic values, either exact (techlevel=12) or
+                inclusive ranges (techlevel=(12, 15))
+
+        Returns:
+            int: Bitset of matching worlds
+        """
+        bits = self.all
+        if isinstance(codes, str):
+            codes = codes.split()
+        trade_code_mask(list(codes))  # Reject unknown codes
+        for code in codes:
+            bits &= self.codes[code]
+
+        if starport is not None:
+            starport_bits = 0
+            for starport_class in starport.upper():
+                if starport_class not in STARPORT_CLASSES:
+                    raise ValueError(f"Unknown starport class: {starport_class}")
+                starport_bits |= self.value_bits('starport', STARPORT_CLASSES.index(starport_class))
+            bits &= starport_bits
+
+        for field, value in ranges.items():
+            if field not in TRADE_FIELDS:
+                raise ValueError(f"Unknown characteristic: {field}")
+            low, high = value if isinstance(value, tuple) else (value, value)
+            bits &= self.range_bits(field, low, high)
+
+        return bits
+
+    def query(self, codes: Union[str, Sequence[str]] = (), starport: Optional[str] = None,
+              **ranges: Union[int, Tuple[int, int]]) -> List[int]:
+        """
+        Find the worlds meeting every condition.
+
+        Args:
+            codes: Trade codes every match must have
+            starport: Allowed starport classes (optional)
+            **ranges: Exact characteristic values or inclusive ranges
+
+        Returns:
+            List[int]: Numbers of the matching worlds, in ascending order
+        """
+        return ids_from_bitset(self.match(codes, starport, **ranges))
+
+    def count(self, codes: Union[str, Sequence[str]] = (), starport: Optional[str] = None,
+              **ranges: Union[int, Tuple[int, int]]) -> int:
+        """
+        Count the worlds meeting every condition.
+
+        Args:
+            codes: Trade codes every match must have
+            starport: Allowed starport classes (optional)
+            **ranges: Exact characteristic values or inclusive ranges
+
+        Returns:
+            int: Number of matching worlds
+        """
+        return bin(self.match(codes, starport, **ranges)).count('1')
@@ -0,0 +1,281 @@
+"""
+World rules module for CTchargen.
+
+This module loads world generation rules from JSON rule files and compiles
+them into lookup tables.
+
+A rule file gives the starport table and, for each characteristic, the dice
+rolled, a flat modifier, the characteristic added to the roll (such as size
+for atmosphere), DMs from other characteristics, when the result is forced
+to zero and the range it is clamped to. DMs are compiled into 16-entry
+tuples indexed by characteristic value (or 6 entries for the starport), so
+generating a characteristic is a handful of table lookups, and the same
+tables feed the vectorized generator.
+
+Rule files live in `data/world_rules/`. The active rule set is chosen by the
+`world_generation.rules` setting and can be swapped at runtime with
+`set_rules()`.
+
+v1.0 - Added for CTchargen world generation rules
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.lib import stellagama as sg
+from src.config import config
+
+
+# Starport classes in code order
+STARPORT_CLASSES = 'ABCDEX'
+
+# Characteristics in generation order
+CHARACTERISTICS = ('size', 'atmosphere', 'hydrographics', 'population',
+                   'government', 'lawlevel', 'techlevel')
+
+RULES_DIR = os.path.join(config.DATA_DIR, 'world_rules')
+
+
+def parse_values(spec: str, field: str) -> Tuple[int, ...]:
+    """
+    Parse a value specification from a rule file.
+
+    Args:
+        spec: A value ("7"), a range ("10-12") or, for the starport, a class ("A")
+        field: Characteristic the values belong to
+
+    Returns:
+        Tuple[int, ...]: Table indexes the specification covers
+
+    Raises:
+        ValueError: If the specification is malformed
+    """
+    spec = str(spec).strip()
+    if field == 'starport':
+        if spec not in STARPORT_CLASSES:
+            raise ValueError(f"Unknown starport class: {spec}")
+        return (STARPORT_CLASSES.index(spec),)
+
+    low, _, high = spec.partition('-')
+    low, high = int(low), int(high or low)
+    if not 0 <= low <= high <= 15:
+        raise ValueError(f"Invalid {field} values: {spec}")
+    return tuple(range(low, high + 1))
+
+
+class Rule:
+    """
+    Class holding the compiled rule for one characteristic.
+    """
+
+    def __init__(self, field: str, data: Dict[str, Any]):
+        """
+        Compile a characteristic's rule.
+
+        Args:
+            field: Characteristic the rule generates
+            data: The characteristic's section of a rule file
+
+        Raises:
+            ValueError: If the rule refers to an unknown or later characteristic
+        """
+        earlier = ('starport',) + CHARACTERISTICS[:CHARACTERISTICS.index(field)]
+
+        self.field = field
+        self.dice = data.get('dice', 2)
+        self.modifier = data.get('modifier', 0)
+        self.add = data.get('add')
+        if self.add is not None and self.add not in earlier:
+            raise ValueError(f"{field} cannot add {self.add}")
+
+        self.low, self.high = data.get('clamp', (0, 15))
+        if not 0 <= self.low <= self.high <= 15:
+            raise ValueError(f"Invalid {field} clamp range: {self.low}-{self.high}")
+
+        # DM tables, indexed by the source characteristic's value
+        self.dms: Tuple[Tuple[str, Tuple[int, ...]], ...] = ()
+        for source, modifiers in data.get('dm', {}).items():
+            if source not in earlier:
+                raise ValueError(f"{field} cannot take DMs from {source}")
+            table = [0] * (len(STARPORT_CLASSES) if source == 'starport' else 16)
+            for spec, modifier in modifiers.items():
+                for value in parse_values(spec, source):
+                    table[value] += modifier
+            self.dms += ((source, tuple(table)),)
+
+        # Characteristic values that force this one to zero
+        self.zero_if: Tuple[Tuple[str, Tuple[bool, ...]], ...] = ()
+        for source, spec in data.get('zero_if', {}).items():
+            if source not in earlier:
+                raise ValueError(f"{field} cannot depend on {source}")
+            specs = spec if isinstance(spec, list) else [spec]
+            values = {value for item in specs for value in parse_values(item, source)}
+            size = len(STARPORT_CLASSES) if source == 'starport' else 16
+            self.zero_if += ((source, tuple(value in values for value in range(size))),)
+
+    def roll(self, values: Dict[str, int]) -> int:
+        """
+        Roll the characteristic.
+
+        The dice are always rolled, even when the result is forced to zero,
+        so every world uses the same number of rolls.
+
+        Args:
+            values: Characteristics generated so far (the starport as its
+                index in STARPORT_CLASSES)
+
+        Returns:
+            int: Characteristic value
+        """
+        value = sg.dice(self.dice, 6) + self.modifier
+        if self.add is not None:
+            value += values[self.add]
+        for source, table in self.dms:
+            value += table[values[source]]
+
+        for source, zero in self.zero_if:
+            if zero[values[source]]:
+                return 0
+
+        if value <= self.low:
+            return self.low
+        if value >= self.high:
+            return self.high
+        return value
+
+
+class WorldRules:
+    """
+    Class holding a compiled world generation rule set.
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        """
+        Compile a rule set.
+
+        Args:
+            data: Parsed rule file
+
+        Raises:
+            ValueError: If the rules are invalid
+        """
+        self.name = data.get('name', 'custom')
+        self.description = data.get('description', '')
+
+        # Weighted starport table, expanded so one random choice picks a class
+        self.starport_table = ''
+        for starport, weight in data.get('starport', {}).items():
+            parse_values(starport, 'starport')
+            self.starport_table += starport * weight
+        if not self.starport_table:
+            raise ValueError("The starport table is empty")
+
+        self.rules: Dict[str, Rule] = {
+            field: Rule(field, data.get(field, {})) for field in CHARACTERISTICS
+        }
+
+    def __getitem__(self, field: str) -> Rule:
+        """Get the rule for a characteristic."""
+        return self.rules[field]
+
+    def roll_starport(self) -> str:
+        """
+        Roll a starport class.
+
+        Returns:
+            str: Starport class
+        """
+        return sg.random_choice(self.starport_table)
+
+    def __repr__(self) -> str:
+        """Return a short description of the rule set."""
+        return f"WorldRules({self.name!r})"
+
+
+def rules_path(name: str) -> str:
+    """
+    Get the path of a rule file.
+
+    Args:
+        name: Rule set name in data/world_rules, or a path to a JSON file
+
+    Returns:
+        str: Path to the rule file
+    """
+    if name.endswith('.json') or os.sep in name:
+        return name if os.path.isabs(name) else os.path.join(config.BASE_DIR, name)
+    return os.path.join(RULES_DIR, f"{name}.json")
+
+
+# Compiled rule sets, keyed by rule file path
+_compiled: Dict[str, WorldRules] = {}
+
+
+def load_rules(name: str) -> WorldRules:
+    """
+    Load and compile a rule set.
+
+    Compiled rule sets are cached, so each file is read once.
+
+    Args:
+        name: Rule set name in data/world_rules, or a path to a JSON file
+
+    Returns:
+        WorldRules: The compiled rules
+
+    Raises:
+        ValueError: If the file is missing or invalid
+    """
+    path = rules_path(name)
+    rules = _compiled.get(path)
+    if rules is None:
+        try:
+            with open(path, 'r') as f:
+                rules = WorldRules(json.load(f))
+        except (IOError, json.JSONDecodeError) as e:
+            raise ValueError(f"Error loading world rules {name}: {e}")
+        _compiled[path] = rules
+    return rules
+
+
+def available_rules() -> List[str]:
+    """
+    List the rule sets shipped in data/world_rules.
+
+    Returns:
+        List[str]: Rule set names
+    """
+    return sorted(os.path.splitext(name)[0] for name in os.listdir(RULES_DIR)
+                  if name.endswith('.json'))
+
+
+_active: Optional[WorldRules] = None
+
+
+def get_rules() -> WorldRules:
+    """
+    Get the active rule set, loading the configured one on first use.
+
+    Returns:
+        WorldRules: The active rules
+    """
+    global _active
+    if _active is None:
+        _active = load_rules(config.get('world_generation', {}).get('rules', 'classic'))
+    return _active
+
+
+def set_rules(rules: Any) -> WorldRules:
+    """
+    Swap the active rule set.
+
+    Args:
+        rules: A WorldRules instance, a rule set name or a path to a rule file
+
+    Returns:
+        WorldRules: The new active rules
+    """
+    global _active
+    _active = rules if isinstance(rules, WorldRules) else load_rules(rules)
+    return _active
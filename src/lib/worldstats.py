@@ -0,0 +1,341 @@
+"""
+World statistics module for CTchargen.
+
+This module computes exact world statistics, such as how often an Ag world
+appears, by enumerating the world generation rules instead of sampling
+worlds.
+
+Each characteristic is generated in rule order from a dice distribution
+(the convolution of single dice). The enumeration carries only what later
+steps still need: the raw values later rules add or test, the DMs already
+owed to later rules, and the trade codes still possible. States that agree
+on those are merged. Probabilities are kept as integer counts over a common
+denominator, so the results are exact.
+
+v1.0 - Added for CTchargen world statistics
+"""
+
+from fractions import Fraction
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from src.lib.worldgen import (
+    CHARACTERISTICS, STARPORT_CLASSES, TRADE_CODES, TRADE_MASKS, World, WorldArray, trade_code_mask
+)
+from src.lib.worldrules import WorldRules, get_rules
+
+
+# Every field in generation order
+FIELDS = ('starport',) + CHARACTERISTICS
+
+
+def dice_counts(dice: int, sides: int = 6) -> Dict[int, int]:
+    """
+    Count the ways each total can be rolled.
+
+    Args:
+        dice: Number of dice
+        sides: Number of sides per die
+
+    Returns:
+        Dict[int, int]: Number of ways to roll each total
+    """
+    counts = {0: 1}
+    for _ in range(dice):
+        rolled: Dict[int, int] = {}
+        for total, ways in counts.items():
+            for face in range(1, sides + 1):
+                rolled[total + face] = rolled.get(total + face, 0) + ways
+        counts = rolled
+    return counts
+
+
+class WorldStatistics:
+    """
+    Class holding exact world statistics as counts over a common denominator.
+    """
+
+    def __init__(self, rules: WorldRules, denominator: int, keep: Tuple[str, ...],
+                 marginals: Dict[str, Dict[int, int]], joint: Dict[Tuple[Tuple[int, ...], int], int]):
+        """
+        Initialize the statistics.
+
+        Args:
+            rules: Rules the statistics were computed for
+            denominator: Total weight of all outcomes
+            keep: Fields whose joint distribution was kept
+            marginals: Weight of each value of each field
+            joint: Weight of each (kept values, trade mask) combination
+        """
+        self.rules = rules
+        self.denominator = denominator
+        self.keep = keep
+        self.marginals = marginals
+        self.joint = joint
+
+        self.trade_masks: Dict[int, int] = {}
+        for (_, mask), weight in joint.items():
+            self.trade_masks[mask] = self.trade_masks.get(mask, 0) + weight
+
+    def marginal(self, field: str) -> Dict[Any, Fraction]:
+        """
+        Get the exact distribution of one field.
+
+        Args:
+            field: Field name
+
+        Returns:
+            Dict[Any, Fraction]: Probability of each value (starport classes as letters)
+        """
+        distribution = {}
+        for value, weight in sorted(self.marginals[field].items()):
+            key = STARPORT_CLASSES[value] if field == 'starport' else value
+            distribution[key] = Fraction(weight, self.denominator)
+        return distribution
+
+    def trade_code_probability(self, code: str) -> Fraction:
+        """
+        Get the probability that a world has a trade code.
+
+        Args:
+            code: Trade code
+
+        Returns:
+            Fraction: Exact probability
+        """
+        return self.probability(codes=[code])
+
+    def trade_codes(self) -> Dict[str, Fraction]:
+        """
+        Get the probability of every trade code.
+
+        Returns:
+            Dict[str, Fraction]: Probability per trade code
+        """
+        return {code: self.trade_code_probability(code) for code in TRADE_CODES}
+
+    def probability(self, codes: Union[str, Sequence[str]] = (), **values: Any) -> Fraction:
+        """
+        Get the probability that a world has some trade codes and field values.
+
+        Args:
+            codes: Trade codes the world must have (it may have others)
+            **values: Required values of kept fields; a single field that
+                was not kept can be tested on its own
+
+        Returns:
+            Fraction: Exact probability
+
+        Raises:
+            ValueError: If a condition needs a field that was not kept
+        """
+        required = trade_code_mask(codes)
+        if 'starport' in values and isinstance(values['starport'], str):
+            values['starport'] = STARPORT_CLASSES.index(values['starport'])
+
+        missing = [field for field in values if field not in self.keep]
+        if missing:
+            if len(values) == 1 and not required:
+                field, value = next(iter(values.items()))
+                return Fraction(self.marginals[field].get(value, 0), self.denominator)
+            raise ValueError(f"Enumerate with keep={tuple(values)} to combine {', '.join(missing)}")
+
+        positions = [(self.keep.index(field), value) for field, value in values.items()]
+        weight = 0
+        for (kept, mask), count in self.joint.items():
+            if mask & required == required and all(kept[i] == value for i, value in positions):
+                weight += count
+        return Fraction(weight, self.denominator)
+
+    def sample_distance(self, worlds: Union[Iterable[World], WorldArray]) -> Dict[str, float]:
+        """
+        Compare sampled worlds with the exact distributions.
+
+        This is a regression check for the generators: the total variation
+        distance of each field shrinks towards zero as the sample grows, so
+        a generator that drifts from its rules stands out.
+
+        Args:
+            worlds: World objects or a WorldArray generated with the same rules
+
+        Returns:
+            Dict[str, float]: Total variation distance per field and for the trade codes
+        """
+        counts: Dict[str, Dict[int, int]] = {field: {} for field in FIELDS}
+        mask_counts: Dict[int, int] = {}
+        total = 0
+
+        if isinstance(worlds, WorldArray):
+            for field in FIELDS:
+                values = getattr(worlds, field).tolist()
+                for value in values:
+                    counts[field][value] = counts[field].get(value, 0) + 1
+            for mask in worlds.trade_mask.tolist():
+                mask_counts[mask] = mask_counts.get(mask, 0) + 1
+            total = len(worlds)
+        else:
+            for world in worlds:
+                for field in CHARACTERISTICS:
+                    value = getattr(world, field)
+                    counts[field][value] = counts[field].get(value, 0) + 1
+                starport = STARPORT_CLASSES.index(world.starport)
+                counts['starport'][starport] = counts['starport'].get(starport, 0) + 1
+                mask_counts[world.trade_mask] = mask_counts.get(world.trade_mask, 0) + 1
+                total += 1
+
+        def distance(exact: Dict[int, int], sampled: Dict[int, int]) -> float:
+            keys = set(exact) | set(sampled)
+            return sum(abs(exact.get(key, 0) / self.denominator - sampled.get(key, 0) / total)
+                       for key in keys) / 2
+
+        distances = {field: distance(self.marginals[field], counts[field]) for field in FIELDS}
+        distances['trade_codes'] = distance(self.trade_masks, mask_counts)
+        return distances
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the statistics to a dictionary of plain values.
+
+        Returns:
+            Dict[str, Any]: Probabilities as floats, by field and trade code
+        """
+        return {
+            "rules": self.rules.name,
+            "fields": {
+                field: {str(value): float(p) for value, p in self.marginal(field).items()}
+                for field in FIELDS
+            },
+            "trade_codes": {code: float(p) for code, p in self.trade_codes().items()},
+        }
+
+
+def _needed_after(rules: WorldRules, step: int, keep: Tuple[str, ...]) -> Tuple[str, ...]:
+    """
+    List the raw field values still needed after a generation step.
+
+    Args:
+        rules: World generation rules
+        step: Index into FIELDS of the step just generated
+        keep: Fields whose joint distribution is kept
+
+    Returns:
+        Tuple[str, ...]: Fields to carry, in FIELDS order
+    """
+    needed = set(keep)
+    for field in CHARACTERISTICS:
+        if FIELDS.index(field) > step:
+            rule = rules[field]
+            if rule.add is not None:
+                needed.add(rule.add)
+            needed.update(source for source, _ in rule.zero_if)
+    return tuple(field for field in FIELDS[:step + 1] if field in needed)
+
+
+def enumerate_worlds(rules: Optional[WorldRules] = None, keep: Sequence[str] = ()) -> WorldStatistics:
+    """
+    Compute exact world statistics for a rule set.
+
+    Args:
+        rules: World generation rules (optional, uses the active rules)
+        keep: Fields whose joint distribution with the trade codes should be
+            kept, e.g. ('starport', 'techlevel')
+
+    Returns:
+        WorldStatistics: Exact marginals and joint probabilities
+    """
+    if rules is None:
+        rules = get_rules()
+    keep = tuple(field for field in FIELDS if field in keep)
+
+    # A state is (carried raw values, DMs owed to each later rule, trade mask)
+    later = {field: index for index, field in enumerate(CHARACTERISTICS)}
+    full_mask = (1 << len(TRADE_CODES)) - 1
+    no_dms = (0,) * len(CHARACTERISTICS)
+
+    starport_counts: Dict[int, int] = {}
+    for starport in rules.starport_table:
+        index = STARPORT_CLASSES.index(starport)
+        starport_counts[index] = starport_counts.get(index, 0) + 1
+
+    marginals: Dict[str, Dict[int, int]] = {'starport': dict(starport_counts)}
+    carried: Tuple[str, ...] = ()
+    states: Dict[Tuple[Tuple[int, ...], Tuple[int, ...], int], int] = {}
+    denominator = len(rules.starport_table)
+
+    # DM tables each field contributes to later rules
+    dm_targets = {
+        field: [(later[target], table) for target in CHARACTERISTICS
+                for source, table in rules[target].dms if source == field]
+        for field in FIELDS
+    }
+
+    def owe(dms: Tuple[int, ...], field: str, value: int) -> Tuple[int, ...]:
+        """Settle the DMs owed to a field and add those its value gives later rules."""
+        owed = list(dms)
+        if field in later:
+            owed[later[field]] = 0
+        for target, table in dm_targets[field]:
+            owed[target] += table[value]
+        return tuple(owed)
+
+    step_carried = _needed_after(rules, 0, keep)
+    for starport, weight in starport_counts.items():
+        raw = (starport,) if step_carried else ()
+        key = (raw, owe(no_dms, 'starport', starport), full_mask)
+        states[key] = states.get(key, 0) + weight
+    carried = step_carried
+
+    for step, field in enumerate(CHARACTERISTICS, start=1):
+        rule = rules[field]
+        counts = dice_counts(rule.dice)
+        denominator *= 6 ** rule.dice
+        next_carried = _needed_after(rules, step, keep)
+        field_marginal: Dict[int, int] = {}
+        next_states: Dict[Tuple[Tuple[int, ...], Tuple[int, ...], int], int] = {}
+        trade_masks = TRADE_MASKS[field]
+
+        # Distribution of the clamped value for each total modifier, so the
+        # dice totals that clamp to the same value are handled once
+        outcomes: Dict[int, List[Tuple[int, int]]] = {}
+        owed: Dict[Tuple[Tuple[int, ...], int], Tuple[int, ...]] = {}
+
+        for (raw, dms, mask), weight in states.items():
+            values = dict(zip(carried, raw))
+            if any(table[values[source]] for source, table in rule.zero_if):
+                distribution = [(0, 6 ** rule.dice)]
+            else:
+                base = rule.modifier + dms[later[field]]
+                if rule.add is not None:
+                    base += values[rule.add]
+                distribution = outcomes.get(base)
+                if distribution is None:
+                    clamped: Dict[int, int] = {}
+                    for total, ways in counts.items():
+                        value = min(max(total + base, rule.low), rule.high)
+                        clamped[value] = clamped.get(value, 0) + ways
+                    distribution = outcomes[base] = list(clamped.items())
+
+            for value, ways in distribution:
+                values[field] = value
+                new_dms = owed.get((dms, value))
+                if new_dms is None:
+                    new_dms = owed[(dms, value)] = owe(dms, field, value)
+
+                key = (tuple(values[name] for name in next_carried), new_dms, mask & trade_masks[value])
+                next_states[key] = next_states.get(key, 0) + weight * ways
+                field_marginal[value] = field_marginal.get(value, 0) + weight * ways
+
+        # Every state was multiplied by the new dice, so scale the earlier
+        # marginals to the new denominator
+        for earlier in marginals.values():
+            for value in earlier:
+                earlier[value] *= 6 ** rule.dice
+        marginals[field] = field_marginal
+        states = next_states
+        carried = next_carried
+
+    joint: Dict[Tuple[Tuple[int, ...], int], int] = {}
+    for (raw, _, mask), weight in states.items():
+        key = (raw, mask)
+        joint[key] = joint.get(key, 0) + weight
+
+    return WorldStatistics(rules, denominator, keep, marginals, joint)
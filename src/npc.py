@@ -0,0 +1,188 @@
+"""
+NPC module for CTchargen.
+
+This module generates the notable NPCs of a world's starport and cities:
+patrons offering work, officials and crew for hire.
+
+How many there are scales with the world's population digit, as 10 to the
+power of half of it, so a population 2 world has a handful and a population
+9 world tens of thousands. Who they are comes from the role table
+(`data/npc_roles.json`), which weights each role and career and adjusts the
+weights by starport, law level and trade codes. The table is compiled once
+into rows of factors per starport, law level and trade code; a world's mix
+is the product of the rows it matches, kept as an alias table per starport,
+law level and set of codes, so worlds that are alike share one.
+
+NPCs are yielded one at a time as `Character`s, so a world's NPCs are never
+held in memory together.
+"""
+
+import json
+import os
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from src.config import config
+from src.careers import CAREERS
+from src.character import Character
+from src.lib.homeworld import AliasTable
+from src.lib.worldgen import TRADE_CODES, World
+from src.lib.worldrules import STARPORT_CLASSES, parse_values
+
+
+NPC_ROLES_FILE = os.path.join(config.DATA_DIR, 'npc_roles.json')
+
+
+class NpcTables:
+    """
+    Class holding a compiled NPC role table.
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        """
+        Compile the table.
+
+        Args:
+            data: Parsed role file
+
+        Raises:
+            ValueError: If the table names an unknown career, trade code or
+                characteristic
+        """
+        self.name = data.get('name', 'custom')
+
+        # Every (role, career) pair, with its share of the role's weight
+        self.entries: List[Tuple[str, str]] = []
+        self.base: List[float] = []
+        for role, spec in data['roles'].items():
+            careers = spec['careers']
+            total = float(sum(careers.values()))
+            for career, weight in careers.items():
+                if career not in CAREERS:
+                    raise ValueError(f"Unknown career: {career}")
+                self.entries.append((role, career))
+                self.base.append(spec.get('weight', 1) * weight / total)
+
+        # Factor rows by starport class, law level and trade code
+        n = len(self.entries)
+        self.starport: Dict[str, List[float]] = {port: [1.0] * n for port in STARPORT_CLASSES}
+        self.law: List[List[float]] = [[1.0] * n for _ in range(16)]
+        trade: Dict[str, List[float]] = {}
+        for modifier in data.get('modifiers', []):
+            if 'starport' in modifier:
+                rows = [self.starport[STARPORT_CLASSES[index]]
+                        for index in parse_values(modifier['starport'], 'starport')]
+            elif 'law' in modifier:
+                rows = [self.law[index] for index in parse_values(modifier['law'], 'lawlevel')]
+            elif 'trade' in modifier:
+                if modifier['trade'] not in TRADE_CODES:
+                    raise ValueError(f"Unknown trade code: {modifier['trade']}")
+                rows = [trade.setdefault(modifier['trade'], [1.0] * n)]
+            else:
+                raise ValueError(f"Modifier needs a starport, law or trade condition: {modifier}")
+
+            columns = [index for index, (role, career) in enumerate(self.entries)
+                       if modifier.get('role', role) == role and modifier.get('career', career) == career]
+            for row in rows:
+                for index in columns:
+                    row[index] *= modifier['factor']
+
+        self.trade: Tuple[Tuple[int, List[float]], ...] = tuple(
+            (TRADE_CODES.index(code), row) for code, row in trade.items()
+        )
+        self.trade_bits = sum(1 << bit for bit, _ in self.trade)
+        self._mixes: Dict[Tuple[str, int, int], AliasTable] = {}
+
+    def mix(self, world: World) -> AliasTable:
+        """
+        Get the role and career mix of a world.
+
+        Args:
+            world: The world
+
+        Returns:
+            AliasTable: Draws an index into `entries`
+
+        Raises:
+            ValueError: If the modifiers leave the world with no NPCs to draw
+        """
+        key = (world.starport, min(world.lawlevel, 15), world.trade_mask & self.trade_bits)
+        table = self._mixes.get(key)
+        if table is None:
+            starport = self.starport.get(world.starport, [1.0] * len(self.base))
+            weights = [base * port * law for base, port, law in zip(self.base, starport, self.law[key[1]])]
+            for bit, row in self.trade:
+                if key[2] >> bit & 1:
+                    weights = [weight * factor for weight, factor in zip(weights, row)]
+            table = self._mixes[key] = AliasTable(weights)
+        return table
+
+
+_tables: Dict[str, NpcTables] = {}
+
+
+def load_npc_tables(path: Optional[str] = None) -> NpcTables:
+    """
+    Load and compile an NPC role file, once per path.
+
+    Args:
+        path: Role file (optional, uses data/npc_roles.json)
+
+    Returns:
+        NpcTables: The compiled table, shared by every caller
+
+    Raises:
+        ValueError: If the file is missing or invalid
+    """
+    path = path or NPC_ROLES_FILE
+    tables = _tables.get(path)
+    if tables is None:
+        try:
+            with open(path, 'r') as f:
+                tables = NpcTables(json.load(f))
+        except (IOError, json.JSONDecodeError, KeyError) as e:
+            raise ValueError(f"Error loading NPC roles {path}: {e}")
+        _tables[path] = tables
+    return tables
+
+
+def npc_count(world: World, scale: float = 1.0) -> int:
+    """
+    Get the number of notable NPCs of a world.
+
+    Args:
+        world: The world
+        scale: Multiplier for the count
+
+    Returns:
+        int: 10 to the power of half the population digit, times the scale
+            (at least 1 for an inhabited world, 0 otherwise)
+    """
+    if world.population <= 0:
+        return 0
+    return max(1, int(round(scale * 10 ** (world.population / 2))))
+
+
+def generate_npcs(world: World, count: Optional[int] = None,
+                  tables: Optional[NpcTables] = None) -> Iterator[Tuple[str, Character]]:
+    """
+    Generate the notable NPCs of a world, one at a time.
+
+    Args:
+        world: The world; it is every NPC's homeworld
+        count: Number of NPCs (optional, scaled to the population)
+        tables: Role table (optional, uses the default role file)
+
+    Yields:
+        Tuple[str, Character]: (role, character) for each NPC
+    """
+    if tables is None:
+        tables = load_npc_tables()
+    if count is None:
+        count = npc_count(world)
+    if count <= 0:
+        return
+
+    mix = tables.mix(world)
+    for _ in range(count):
+        role, career = tables.entries[mix.draw()]
+        yield role, Character(career=career, homeworld=world)
@@ -2,14 +2,132 @@
 Renderer module for CTchargen.
 
 This module handles rendering character data to different formats.
+
+Templates are compiled once by the template language
+(`src/lib/templatelang.py`) into literal text and closures, and kept in a
+process-wide cache keyed by path and modification time, so rendering a
+character is a string join.
+
+One batch can be saved in several formats in a single pass: each character
+is turned into its data dictionary once, and batches of dictionaries are
+handed to one writer thread per output, which renders or exports them and
+writes its file alongside the others.
 """
 
 import os
-import string
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Callable, Iterable, Iterator, Optional, Tuple, Union
 
 import glob
 from src.config import config
+from src.lib.outputfile import OutputFile, compressed_extension
+from src.lib.templatelang import CompiledTemplate
+
+
+# Template contents provided by a data bundle, keyed by template path
+_template_sources: Dict[str, str] = {}
+
+
+def install_template(template_path: str, content: str) -> None:
+    """
+    Provide already-loaded content for a template file.
+    
+    Args:
+        template_path: Path to the template file
+        content: Template content
+    """
+    _template_sources[template_path] = content
+
+
+def read_template(template_path: str) -> Optional[str]:
+    """
+    Read a template file, preferring content provided by a data bundle.
+    
+    Args:
+        template_path: Path to the template file
+        
+    Returns:
+        Optional[str]: Template content, or None if the file does not exist
+    """
+    if template_path in _template_sources:
+        return _template_sources[template_path]
+    
+    try:
+        with open(template_path, 'r') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+# Character data to render: a dictionary, or anything with a to_dict() method
+CharacterData = Union[Dict[str, Any], Any]
+
+# Text written between characters saved to one file
+CHARACTER_SEPARATOR = "\n\n---\n\n"
+
+# One output of a multi-format save: a template or export format, and the
+# file extension (None for the format's default)
+OutputSpec = Tuple[str, Optional[str]]
+
+# Characters handed to the outputs of a multi-format save at a time
+FANOUT_BATCH_SIZE = 1000
+
+# Content used when a template file is missing
+DEFAULT_TEMPLATE = "{name}\nUPP: {upp_string}\nSkills: {skills_string}"
+
+
+def _rank(data: Dict[str, Any]) -> Optional[str]:
+    """Render the rank as its title and number."""
+    if 'rank' not in data:
+        return None
+    rank = data['rank']
+    if 'career' in data:
+        from src.careers import CAREERS
+        ranks = CAREERS.get(data['career'], {}).get('ranks', [])
+        if rank < len(ranks):
+            return f"{ranks[rank]} (Rank {rank})"
+    return str(rank)
+
+
+# Placeholders computed from the character data rather than read from it
+COMPUTED_FIELDS: Dict[str, Callable[[Dict[str, Any]], Optional[str]]] = {
+    'rank': _rank,
+}
+
+
+# Compiled templates by path, with the modification time they were compiled at
+_compiled: Dict[str, Tuple[Optional[int], CompiledTemplate]] = {}
+
+
+def compile_template(template_path: str) -> Optional[CompiledTemplate]:
+    """
+    Get a template compiled, parsing it only the first time it is used or
+    after its file changes.
+    
+    Args:
+        template_path: Path to the template file
+        
+    Returns:
+        Optional[CompiledTemplate]: The compiled template, or None if the
+            file does not exist
+    
+    Raises:
+        ValueError: If the template has a syntax error
+    """
+    try:
+        mtime: Optional[int] = os.stat(template_path).st_mtime_ns
+    except OSError:
+        mtime = None
+    
+    cached = _compiled.get(template_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    
+    content = read_template(template_path)
+    if content is None:
+        return None
+    compiled = CompiledTemplate(content, COMPUTED_FIELDS)
+    _compiled[template_path] = (mtime, compiled)
+    return compiled
 
 
 class TemplateRenderer:
@@ -29,22 +147,28 @@ class TemplateRenderer:
         
         self.template_name = template_name
         self.template_path = config.get_template_path(template_name)
-        self.template_content = self._load_template()
+        self.template = self._load_template()
+        self.template_content = self.template.content
     
-    def _load_template(self) -> str:
+    def _load_template(self) -> CompiledTemplate:
         """
-        Load the template content from file.
+        Get the compiled template.
         
         Returns:
-            str: Template content
+            CompiledTemplate: Compiled template
         """
         try:
-            with open(self.template_path, 'r') as f:
-                return f.read()
-        except FileNotFoundError:
-            print(f"Template file not found: {self.template_path}")
+            compiled = compile_template(self.template_path)
+        except ValueError as e:
+            print(f"Error compiling template {self.template_path}: {e}")
+            compiled = None
+        else:
+            if compiled is None:
+                print(f"Template file not found: {self.template_path}")
+        if compiled is None:
             print("Using default template.")
-            return "{name}\nUPP: {upp_string}\nSkills: {skills_string}"
+            return CompiledTemplate(DEFAULT_TEMPLATE, COMPUTED_FIELDS)
+        return compiled
     
     def render(self, character_data: Dict[str, Any]) -> str:
         """
@@ -56,145 +180,235 @@ class TemplateRenderer:
         Returns:
             str: Rendered character data
         """
-        # Use string.Template for simple template substitution
-        template_content = self.template_content
-        
-        # Prepare the data for rendering
-        render_data = {}
-        for key, value in character_data.items():
-            if isinstance(value, dict):
-                # Flatten nested dictionaries
-                for subkey, subvalue in value.items():
-                    render_data[f"{key}_{subkey}"] = subvalue
-            elif isinstance(value, list):
-                # Join lists with commas
-                render_data[key] = ", ".join(value) if value else "None"
-            else:
-                render_data[key] = value
+        return self.template.render(character_data)
+    
+    def render_multiple(self, characters_data: Iterable[CharacterData]) -> str:
+        """
+        Render multiple characters using the template.
         
-        # Add rank title if available
-        if 'career' in character_data and 'rank' in character_data:
-            from src.careers import CAREERS
-            career = character_data['career']
-            rank_index = character_data['rank']
+        Args:
+            characters_data: Character data dictionaries or characters
             
-            if career in CAREERS and rank_index < len(CAREERS[career]['ranks']):
-                rank_title = CAREERS[career]['ranks'][rank_index]
-                render_data['rank'] = f"{rank_title} (Rank {rank_index})"
+        Returns:
+            str: Rendered characters data
+        """
+        return "".join(self.iter_render(characters_data))
+    
+    def iter_render(self, characters_data: Iterable[CharacterData]) -> Iterator[str]:
+        """
+        Render characters one at a time, with separators between them.
         
-        # Handle special template variables
+        Args:
+            characters_data: Character data dictionaries or characters (anything
+                with a to_dict() method)
+            
+        Yields:
+            str: Each rendered character, preceded by the separator after the first
+        """
+        for index, character_data in enumerate(characters_data):
+            if not isinstance(character_data, dict):
+                character_data = character_data.to_dict()
+            if index:
+                yield CHARACTER_SEPARATOR
+            yield self.render(character_data)
+    
+    def iter_render_parallel(self, characters_data: Iterable[CharacterData], workers: Optional[int] = None,
+                             chunk_size: int = 250, max_pending: Optional[int] = None) -> Iterator[str]:
+        """
+        Render characters across worker processes, in their original order.
         
-        # Status (died)
-        if 'died' in character_data:
-            died = character_data['died']
-            status = "Deceased (died during service)" if died else "Active"
-            template_content = template_content.replace("${died ? \"Deceased (died during service)\" : \"Active\"}", status)
+        The input is cut into chunks of `chunk_size` characters, and each
+        worker renders whole chunks with the template compiled once when it
+        starts. At most `max_pending` chunks are in flight, so a slow reader
+        of the output holds back the input and memory stays bounded.
         
-        # Psionics
-        if 'psionic' in character_data:
-            psionic = character_data['psionic']
-            psionic_text = "None"
-            
-            if psionic.get('has_psionic', False):
-                psr = psionic.get('psr', 0)
-                is_trained = psionic.get('is_trained', False)
-                talents = psionic.get('talents', [])
-                
-                if is_trained:
-                    talents_str = ", ".join(talents) if talents else "None"
-                    if "**PSR:**" in template_content:  # Markdown format
-                        psionic_text = f"**PSR:** {psr} (Trained)  \n**Talents:** {talents_str}"
-                    else:  # Text format
-                        psionic_text = f"PSR {psr} (Trained) - Talents: {talents_str}"
-                else:
-                    if "**PSR:**" in template_content:  # Markdown format
-                        psionic_text = f"**PSR:** {psr} (Untrained)"
-                    else:  # Text format
-                        psionic_text = f"PSR {psr} (Untrained)"
-            
-            template_content = template_content.replace(
-                "${psionic.has_psionic ? (psionic.is_trained ? `**PSR:** ${psionic.psr} (Trained)  \\n**Talents:** ${psionic.talents.length ? psionic.talents.join(\", \") : \"None\"}` : `**PSR:** ${psionic.psr} (Untrained)`) : \"None\"}",
-                psionic_text
-            )
+        Args:
+            characters_data: Character data dictionaries or characters (picklable)
+            workers: Number of worker processes (optional, defaults to the CPU count)
+            chunk_size: Number of characters rendered per task
+            max_pending: Most chunks rendering or waiting to be read (optional,
+                twice the number of workers)
             
-            template_content = template_content.replace(
-                "${psionic.has_psionic ? (psionic.is_trained ? `PSR ${psionic.psr} (Trained) - Talents: ${psionic.talents.length ? psionic.talents.join(\", \") : \"None\"}` : `PSR ${psionic.psr} (Untrained)`) : \"None\"}",
-                psionic_text
-            )
-        
-        # Create a new template with the processed content
-        template = string.Template(template_content)
+        Yields:
+            str: Rendered chunks, with separators between them
+        """
+        # Imported here so serial rendering doesn't pay for multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        from src.lib.pipeline import chunked, ordered_map
         
-        # Render the template
-        try:
-            return template.safe_substitute(render_data)
-        except KeyError as e:
-            print(f"Error rendering template: {e}")
-            return str(character_data)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker,
+                                 initargs=(self.template_name,)) as pool:
+            chunks = ordered_map(pool, _render_chunk, chunked(characters_data, chunk_size), max_pending)
+            for index, text in enumerate(chunks):
+                if index:
+                    yield CHARACTER_SEPARATOR
+                yield text
     
-    def render_multiple(self, characters_data: List[Dict[str, Any]]) -> str:
+    def iter_generate_parallel(self, count: int, workers: Optional[int] = None,
+                               chunk_size: int = 250, max_pending: Optional[int] = None) -> Iterator[str]:
         """
-        Render multiple characters using the template.
+        Generate and render characters across worker processes, in task order.
+        
+        Each worker generates a chunk of `chunk_size` characters and renders
+        it right away, so one pool does both and only the rendered text
+        comes back to this process. Workers attach to a shared data bundle
+        as in `iter_characters_parallel()`.
         
         Args:
-            characters_data: List of character data dictionaries
+            count: Number of characters to generate
+            workers: Number of worker processes (optional, defaults to the CPU count)
+            chunk_size: Number of characters generated and rendered per task
+            max_pending: Most chunks in flight (optional, twice the number of workers)
             
-        Returns:
-            str: Rendered characters data
+        Yields:
+            str: Rendered chunks, with separators between them
         """
-        rendered_characters = []
-        for character_data in characters_data:
-            rendered_characters.append(self.render(character_data))
+        # Imported here so serial rendering doesn't pay for multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        from src.bundle import SharedBundle, init_worker
+        from src.lib.pipeline import ordered_map
         
-        return "\n\n---\n\n".join(rendered_characters)
+        tasks = ((self.template_name, min(chunk_size, count - start)) for start in range(0, count, chunk_size))
+        with SharedBundle() as shared:
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                     initargs=(shared.name,)) as pool:
+                for index, text in enumerate(ordered_map(pool, _generate_chunk, tasks, max_pending)):
+                    if index:
+                        yield CHARACTER_SEPARATOR
+                    yield text
     
-    def save(self, character_data: Dict[str, Any], filename: str, extension: Optional[str] = None) -> str:
+    def save(self, character_data: CharacterData, filename: str, extension: Optional[str] = None) -> str:
         """
         Render character data and save to a file.
         
         Args:
-            character_data: Dictionary of character data
+            character_data: Dictionary of character data, or a character
             filename: Output filename
             extension: File extension (optional)
             
         Returns:
             str: Path to the saved file
         """
-        rendered_data = self.render(character_data)
-        output_path = config.get_output_path(filename, extension)
-        
-        try:
-            with open(output_path, 'w') as f:
-                f.write(rendered_data)
-            return output_path
-        except IOError as e:
-            print(f"Error saving file: {e}")
-            return ""
+        return self.save_multiple([character_data], filename, extension)
     
-    def save_multiple(self, characters_data: List[Dict[str, Any]], filename: str, extension: Optional[str] = None) -> str:
+    def save_multiple(self, characters_data: Iterable[CharacterData], filename: str,
+                      extension: Optional[str] = None, flush_size: Optional[int] = None,
+                      atomic: bool = True, workers: Optional[int] = 1,
+                      compression: Optional[str] = None) -> str:
         """
         Render multiple characters and save to a file.
         
+        Characters are rendered and written as they come, in chunks of
+        `flush_size` characters, so a generator of characters is saved in
+        constant memory. The file is written to a temporary file that
+        replaces the output only once every character has been written.
+        
         Args:
-            characters_data: List of character data dictionaries
+            characters_data: Character data dictionaries or characters
             filename: Output filename
             extension: File extension (optional)
+            flush_size: Characters of output collected before each write
+                (optional, uses the output_flush_size setting)
+            atomic: Replace the output file only when it is complete
+            workers: Number of rendering processes (1 renders in this
+                process, None uses the CPU count)
+            compression: Compress the file with "gzip", "bz2" or "lzma"
+                (optional; the extension gets the compression's suffix)
             
         Returns:
             str: Path to the saved file
         """
-        rendered_data = self.render_multiple(characters_data)
-        output_path = config.get_output_path(filename, extension)
+        if workers == 1:
+            rendered = self.iter_render(characters_data)
+        else:
+            rendered = self.iter_render_parallel(characters_data, workers)
+        return self._write(rendered, filename, extension, flush_size, atomic, compression)
+    
+    def save_generated(self, count: int, filename: str, extension: Optional[str] = None,
+                       flush_size: Optional[int] = None, atomic: bool = True,
+                       workers: Optional[int] = None, compression: Optional[str] = None) -> str:
+        """
+        Generate characters in worker processes and save them rendered.
         
+        Args:
+            count: Number of characters to generate
+            filename: Output filename
+            extension: File extension (optional)
+            flush_size: Characters of output collected before each write (optional)
+            atomic: Replace the output file only when it is complete
+            workers: Number of worker processes (optional, defaults to the CPU count)
+            compression: Compress the file with "gzip", "bz2" or "lzma" (optional)
+            
+        Returns:
+            str: Path to the saved file
+        """
+        rendered = self.iter_generate_parallel(count, workers)
+        return self._write(rendered, filename, extension, flush_size, atomic, compression)
+    
+    def _write(self, rendered: Iterable[str], filename: str, extension: Optional[str],
+               flush_size: Optional[int], atomic: bool, compression: Optional[str]) -> str:
+        """Write rendered text to the output file, returning its path or "" on error."""
+        if extension is None:
+            extension = config.get('default_output_format', 'txt')
+        output_path = config.get_output_path(filename, compressed_extension(extension, compression))
         try:
-            with open(output_path, 'w') as f:
-                f.write(rendered_data)
+            with OutputFile(output_path, flush_size, atomic, compression=compression) as f:
+                for text in rendered:
+                    f.write(text)
             return output_path
         except IOError as e:
             print(f"Error saving file: {e}")
             return ""
 
 
+# Renderer of a rendering worker process, set up when the worker starts
+_worker_renderer: Optional[TemplateRenderer] = None
+
+
+def _init_render_worker(template_name: str) -> None:
+    """
+    Compile the template in a rendering worker process.
+    
+    Args:
+        template_name: Name of the template to render with
+    """
+    global _worker_renderer
+    _worker_renderer = TemplateRenderer(template_name)
+
+
+def _render_chunk(characters_data: List[CharacterData]) -> str:
+    """
+    Render a chunk of characters in a worker process.
+    
+    Args:
+        characters_data: Character data dictionaries or characters
+        
+    Returns:
+        str: The rendered characters, with separators between them
+    """
+    return "".join(_worker_renderer.iter_render(characters_data))
+
+
+def _generate_chunk(task: Tuple[str, int]) -> str:
+    """
+    Generate and render a chunk of characters in a worker process.
+    
+    Args:
+        task: Template name and number of characters
+        
+    Returns:
+        str: The rendered characters, with separators between them
+    """
+    # Imported here so rendering alone doesn't load the character generator
+    from src.character import iter_characters
+    
+    global _worker_renderer
+    template_name, count = task
+    if _worker_renderer is None or _worker_renderer.template_name != template_name:
+        _worker_renderer = TemplateRenderer(template_name)
+    return "".join(_worker_renderer.iter_render(iter_characters(count)))
+
+
 def render_character(character_data: Dict[str, Any], template_name: Optional[str] = None) -> str:
     """
     Render character data using a template.
@@ -210,13 +424,13 @@ def render_character(character_data: Dict[str, Any], template_name: Optional[str
     return renderer.render(character_data)
 
 
-def save_character(character_data: Dict[str, Any], filename: str, 
+def save_character(character_data: CharacterData, filename: str, 
                   template_name: Optional[str] = None, extension: Optional[str] = None) -> str:
     """
     Render character data and save to a file.
     
     Args:
-        character_data: Dictionary of character data
+        character_data: Dictionary of character data, or a character
         filename: Output filename
         template_name: Name of the template to use (optional)
         extension: File extension (optional)
@@ -228,22 +442,245 @@ def save_character(character_data: Dict[str, Any], filename: str,
     return renderer.save(character_data, filename, extension)
 
 
-def save_characters(characters_data: List[Dict[str, Any]], filename: str,
-                   template_name: Optional[str] = None, extension: Optional[str] = None) -> str:
+# Marks the end of the batches sent to an output
+_END = None
+
+# Tells the outputs that the input failed and their files should be discarded
+_ABORT = object()
+
+
+class _FanoutAborted(Exception):
+    """Raised in an output of a multi-format save when its input failed."""
+
+
+class _BatchQueue:
+    """
+    Bounded queue of the batches sent to one output of a multi-format save.
+    """
+    
+    def __init__(self, maxsize: int):
+        """
+        Initialize the queue.
+        
+        Args:
+            maxsize: Most batches waiting to be read
+        """
+        # Imported here so single-format saves don't pay for threads
+        import queue
+        
+        self.queue = queue.Queue(maxsize=max(1, maxsize))
+        self.closed = False
+    
+    def put(self, batch: Any) -> None:
+        """Send a batch, _END or _ABORT, waiting while the queue is full."""
+        self.queue.put(batch)
+    
+    def __iter__(self) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Read the batches until the end marker.
+        
+        Raises:
+            _FanoutAborted: If the input failed
+        """
+        while not self.closed:
+            batch = self.queue.get()
+            if batch is _END or batch is _ABORT:
+                self.closed = True
+                if batch is _ABORT:
+                    raise _FanoutAborted()
+                return
+            yield batch
+    
+    def drain(self) -> None:
+        """Read and drop the remaining batches, so the sender never waits on this output."""
+        try:
+            for _ in self:
+                pass
+        except _FanoutAborted:
+            pass
+
+
+def output_path(spec: OutputSpec, filename: str, compression: Optional[str] = None) -> str:
     """
-    Render multiple characters and save to a file.
+    Get the file one output of a multi-format save is written to.
     
     Args:
-        characters_data: List of character data dictionaries
+        spec: (template or export format, extension) of the output
+        filename: Output filename (without extension)
+        compression: "gzip", "bz2", "lzma" or None
+        
+    Returns:
+        str: Path to the output file
+    """
+    from src.exporters import EXPORT_FORMATS
+    
+    name, extension = spec
+    if name in EXPORT_FORMATS:
+        # Exports are always named after their format
+        extension = name
+    elif extension is None:
+        extension = config.get('default_output_format', 'txt')
+    return config.get_output_path(filename, compressed_extension(extension, compression))
+
+
+def _fanout_output(spec: OutputSpec, batches: _BatchQueue, filename: str,
+                   flush_size: Optional[int], atomic: bool, compression: Optional[str]) -> str:
+    """
+    Write one output of a multi-format save from its queue of batches.
+    
+    The queue is always read to the end, even if writing fails, so the
+    reader feeding every output is never left waiting on this one.
+    
+    Returns:
+        str: Path to the saved file, or "" if it could not be written
+    """
+    from src.exporters import EXPORT_FORMATS, export_characters
+    
+    name, _ = spec
+    try:
+        if name in EXPORT_FORMATS:
+            characters = (data for batch in batches for data in batch)
+            return export_characters(characters, filename, name, atomic=atomic,
+                                     compression=compression)
+        
+        renderer = TemplateRenderer(name)
+        path = output_path(spec, filename, compression)
+        with OutputFile(path, flush_size, atomic, compression=compression) as f:
+            render = renderer.template.render
+            for index, batch in enumerate(batches):
+                if index:
+                    f.write(CHARACTER_SEPARATOR)
+                f.write(CHARACTER_SEPARATOR.join(map(render, batch)))
+        return path
+    except IOError as e:
+        print(f"Error saving file: {e}")
+        return ""
+    finally:
+        batches.drain()
+
+
+def save_outputs(characters_data: Iterable[CharacterData], filename: str, outputs: List[OutputSpec],
+                 flush_size: Optional[int] = None, atomic: bool = True,
+                 compression: Optional[str] = None, batch_size: int = FANOUT_BATCH_SIZE,
+                 max_pending: int = 4) -> List[str]:
+    """
+    Save characters in several formats in one pass over them.
+    
+    Each character is turned into its data dictionary once, and that
+    dictionary is shared by every template and exporter. Batches of
+    dictionaries are queued to one writer thread per output, which renders
+    or exports them and writes its file while the others write theirs; file
+    writes and compression run outside the interpreter lock. At most
+    `max_pending` batches wait for each output, so a slow output holds back
+    the input and memory stays bounded.
+    
+    Args:
+        characters_data: Character data dictionaries or characters, e.g. a generator
+        filename: Output filename (without extension), shared by every output
+        outputs: (template or export format, extension) of each output, e.g.
+            [("text", "txt"), ("markdown", "md"), ("jsonl", None)]
+        flush_size: Characters of output collected before each write (optional)
+        atomic: Replace each output file only when it is complete
+        compression: Compress every output with "gzip", "bz2" or "lzma" (optional)
+        batch_size: Characters handed to the outputs at a time
+        max_pending: Most batches waiting for each output
+        
+    Returns:
+        List[str]: Path to each saved file, in the order of `outputs` ("" for
+            an output that could not be written)
+    
+    Raises:
+        ValueError: If the compression or an export format is unknown, or two
+            outputs would be written to the same file
+        ImportError: If an export format needs pyarrow and it is not installed
+    """
+    # Imported here so single-format saves don't pay for threads
+    from concurrent.futures import ThreadPoolExecutor
+    from src.exporters import EXPORT_FORMATS, check_export_format
+    from src.lib.pipeline import chunked
+    
+    compressed_extension('', compression)
+    for name, _ in outputs:
+        if name in EXPORT_FORMATS:
+            check_export_format(name)
+    
+    # Each output needs a file of its own, or one would overwrite another
+    paths: Dict[str, OutputSpec] = {}
+    for spec in outputs:
+        path = os.path.abspath(output_path(spec, filename, compression))
+        if path in paths:
+            raise ValueError(f"Outputs {_spec_string(paths[path])} and {_spec_string(spec)} "
+                             f"would both be saved to {path}")
+        paths[path] = spec
+    
+    queues = [_BatchQueue(max_pending) for _ in outputs]
+    dictionaries = (data if isinstance(data, dict) else data.to_dict() for data in characters_data)
+    
+    with ThreadPoolExecutor(max_workers=len(outputs)) as pool:
+        futures = [pool.submit(_fanout_output, spec, batches, filename, flush_size, atomic, compression)
+                   for spec, batches in zip(outputs, queues)]
+        try:
+            for batch in chunked(dictionaries, batch_size):
+                for batches in queues:
+                    batches.put(batch)
+        except BaseException:
+            for batches in queues:
+                batches.put(_ABORT)
+            raise
+        else:
+            for batches in queues:
+                batches.put(_END)
+        
+        saved = []
+        for future in futures:
+            try:
+                saved.append(future.result())
+            except _FanoutAborted:
+                saved.append("")
+        return saved
+
+
+def _spec_string(spec: OutputSpec) -> str:
+    """Write an output the way --outputs takes it, e.g. "text:txt"."""
+    name, extension = spec
+    return f"{name}:{extension}" if extension else name
+
+
+def save_characters(characters_data: Iterable[CharacterData], filename: str,
+                   template_name: Optional[str] = None, extension: Optional[str] = None,
+                   flush_size: Optional[int] = None, atomic: bool = True,
+                   workers: Optional[int] = 1, compression: Optional[str] = None,
+                   outputs: Optional[List[OutputSpec]] = None) -> Union[str, List[str]]:
+    """
+    Render multiple characters and save to a file, streaming them as they come.
+    
+    With `outputs`, the characters are saved in every listed format in one
+    pass (see `save_outputs()`) instead of through `template_name` and
+    `extension`.
+    
+    Args:
+        characters_data: Character data dictionaries or characters, e.g. a generator
         filename: Output filename
         template_name: Name of the template to use (optional)
         extension: File extension (optional)
+        flush_size: Characters of output collected before each write (optional)
+        atomic: Replace the output file only when it is complete
+        workers: Number of rendering processes (1 renders in this process,
+            None uses the CPU count)
+        compression: Compress the file with "gzip", "bz2" or "lzma" (optional)
+        outputs: (template or export format, extension) of each of several
+            outputs (optional); workers are not used for these
         
     Returns:
-        str: Path to the saved file
+        Union[str, List[str]]: Path to the saved file, or to each output's
+            file, in order, when `outputs` is given
     """
+    if outputs:
+        return save_outputs(characters_data, filename, outputs, flush_size, atomic, compression)
+    
     renderer = TemplateRenderer(template_name)
-    return renderer.save_multiple(characters_data, filename, extension)
+    return renderer.save_multiple(characters_data, filename, extension, flush_size, atomic, workers,
+                                  compression)
 
 
 def get_available_templates() -> List[str]:
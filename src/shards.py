@@ -0,0 +1,318 @@
+"""
+Shards module for CTchargen.
+
+This module saves a large run of characters as numbered shards instead of
+one file: `characters-00001.jsonl.gz`, `characters-00002.jsonl.gz` and so
+on, each optionally compressed, with a manifest listing every shard's
+path, character count, seed and checksum.
+
+Each shard is generated from its own seed, derived from the run seed and
+its number, so shards are independent: they are generated and written
+concurrently by worker processes, any shard can be regenerated alone, and
+an interrupted run resumes by keeping the shards whose checksums match the
+manifest. The manifest is rewritten as each shard completes, so it always
+describes the shards on disk.
+"""
+
+import hashlib
+import json
+import os
+import random
+from typing import Any, Dict, IO, Iterator, List, Optional, Tuple
+
+from src.config import config
+from src.lib.outputfile import OutputFile, compressed_extension
+
+
+MANIFEST_VERSION = 1
+
+# Settings a manifest must share with a run for its shards to be reused
+MANIFEST_SETTINGS = ('seed', 'count', 'shard_size', 'format', 'template', 'compression')
+
+
+def shard_seed(seed: str, index: int) -> int:
+    """
+    Derive the random seed for a single shard.
+
+    Args:
+        seed: Run seed
+        index: Shard number, from 1
+
+    Returns:
+        int: Seed for the shard
+    """
+    key = f"{seed}:shard:{index}".encode('utf-8')
+    return int.from_bytes(hashlib.sha256(key).digest()[:8], 'little')
+
+
+def shard_name(filename: str, index: int) -> str:
+    """
+    Get the filename of a shard.
+
+    Args:
+        filename: Output filename (without extension)
+        index: Shard number, from 1
+
+    Returns:
+        str: Shard filename (without extension), e.g. "characters-00001"
+    """
+    return f"{filename}-{index:05d}"
+
+
+def file_checksum(path: str) -> str:
+    """
+    Get the SHA-256 checksum of a file.
+
+    Args:
+        path: Path to the file
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def plan_shards(count: int, shard_size: int, seed: str) -> List[Dict[str, Any]]:
+    """
+    Split a run into shards.
+
+    Args:
+        count: Number of characters
+        shard_size: Characters per shard
+        seed: Run seed
+
+    Returns:
+        List[Dict[str, Any]]: Number, character count and seed of each shard
+    """
+    shard_size = max(1, shard_size)
+    return [
+        {'index': index, 'count': min(shard_size, count - start), 'seed': shard_seed(seed, index)}
+        for index, start in enumerate(range(0, count, shard_size), 1)
+    ]
+
+
+def _write_shard(task: Tuple[Dict[str, Any], str, Optional[str], str, Optional[str]]) -> Dict[str, Any]:
+    """
+    Generate and save one shard.
+
+    Args:
+        task: The shard, output filename, template name, format and compression
+
+    Returns:
+        Dict[str, Any]: Manifest entry of the shard
+    """
+    # Imported here so worker processes load them after attaching the data bundle
+    from src.character import iter_characters
+    from src.exporters import EXPORT_FORMATS, export_characters
+    from src.lib.homeworld import get_homeworld_pool
+    from src.renderer import save_characters
+
+    shard, filename, template_name, output_format, compression = task
+    name = shard_name(filename, shard['index'])
+
+    # Set up the homeworld pool before seeding, so it never consumes the shard's rolls
+    homeworlds = get_homeworld_pool()
+    random.seed(shard['seed'])
+    characters = iter_characters(shard['count'], homeworlds)
+
+    if output_format in EXPORT_FORMATS:
+        path = export_characters(characters, name, output_format, compression=compression)
+    else:
+        path = save_characters(characters, name, template_name, output_format, compression=compression)
+        if not path:
+            raise IOError(f"Could not save shard {name}")
+
+    return dict(shard, path=os.path.basename(path), bytes=os.path.getsize(path),
+                sha256=file_checksum(path))
+
+
+def manifest_path(filename: str) -> str:
+    """
+    Get the path of a run's manifest.
+
+    Args:
+        filename: Output filename (without extension)
+
+    Returns:
+        str: Path to the manifest, e.g. "output/characters.manifest.json"
+    """
+    return config.get_output_path(filename, 'manifest.json')
+
+
+def load_manifest(path: str) -> Optional[Dict[str, Any]]:
+    """
+    Load a shard manifest.
+
+    Args:
+        path: Path to the manifest
+
+    Returns:
+        Optional[Dict[str, Any]]: The manifest, or None if it does not exist or
+            cannot be read
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Error loading manifest {path}: {e}")
+        return None
+
+
+def _save_manifest(path: str, manifest: Dict[str, Any]) -> None:
+    """Write a manifest atomically."""
+    with OutputFile(path) as f:
+        f.write(json.dumps(manifest, indent=2) + '\n')
+
+
+def verify_shard(entry: Dict[str, Any], directory: str) -> bool:
+    """
+    Check that a shard on disk matches its manifest entry.
+
+    Args:
+        entry: Manifest entry of the shard
+        directory: Directory of the manifest
+
+    Returns:
+        bool: True if the file exists with the recorded size and checksum
+    """
+    path = os.path.join(directory, entry['path'])
+    try:
+        if os.path.getsize(path) != entry['bytes']:
+            return False
+    except OSError:
+        return False
+    return file_checksum(path) == entry['sha256']
+
+
+def open_shard(entry: Dict[str, Any], directory: str, binary: bool = False) -> IO:
+    """
+    Open a shard for reading, decompressing it as it is read.
+
+    Args:
+        entry: Manifest entry of the shard
+        directory: Directory of the manifest
+        binary: Read bytes instead of text
+
+    Returns:
+        IO: The open shard
+    """
+    # Imported here since only readers of shards need them
+    import bz2
+    import gzip
+    import lzma
+
+    path = os.path.join(directory, entry['path'])
+    opener = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open}.get(os.path.splitext(path)[1], open)
+    if binary:
+        return opener(path, 'rb')
+    return opener(path, 'rt', encoding='utf-8')
+
+
+def save_sharded_characters(count: int, filename: str, shard_size: int,
+                            template_name: Optional[str] = None, output_format: Optional[str] = None,
+                            compression: Optional[str] = None, seed: Optional[str] = None,
+                            workers: Optional[int] = 1, resume: bool = False) -> str:
+    """
+    Generate characters and save them as shards with a manifest.
+
+    Args:
+        count: Number of characters
+        filename: Output filename (without extension); shards add their number
+        shard_size: Characters per shard
+        template_name: Template to render with (optional; unused for
+            structured formats)
+        output_format: Template file extension or export format (optional)
+        compression: Compress each shard with "gzip", "bz2" or "lzma" (optional)
+        seed: Run seed (optional; reused from the manifest when resuming,
+            otherwise random)
+        workers: Number of processes writing shards (1 works in this
+            process, None uses the CPU count)
+        resume: Keep the shards of an earlier run with the same settings
+            that still match the manifest, and generate only the rest
+
+    Returns:
+        str: Path to the manifest
+
+    Raises:
+        ValueError: If the compression is unknown
+    """
+    if template_name is None:
+        template_name = config.get('default_template', 'text')
+    if output_format is None:
+        output_format = config.get('default_output_format', 'txt')
+    compressed_extension(output_format, compression)
+
+    path = manifest_path(filename)
+    directory = os.path.dirname(path)
+    previous = load_manifest(path) if resume else None
+    if seed is None:
+        seed = previous['seed'] if previous else f"{random.getrandbits(64):016x}"
+
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'seed': seed,
+        'count': count,
+        'shard_size': shard_size,
+        'format': output_format,
+        'template': template_name,
+        'compression': compression,
+        'complete': False,
+        'shards': [],
+    }
+
+    # Reuse the shards of an earlier run of the same job that are intact on disk
+    done: Dict[int, Dict[str, Any]] = {}
+    if previous and all(previous.get(key) == manifest[key] for key in MANIFEST_SETTINGS):
+        done = {entry['index']: entry for entry in previous['shards'] if verify_shard(entry, directory)}
+
+    shards = plan_shards(count, shard_size, seed)
+    tasks = [(shard, filename, template_name, output_format, compression)
+             for shard in shards if shard['index'] not in done]
+    entries = dict(done)
+
+    def record(entry: Dict[str, Any]) -> None:
+        entries[entry['index']] = entry
+        manifest['shards'] = [entries[index] for index in sorted(entries)]
+        _save_manifest(path, manifest)
+
+    if workers == 1:
+        for task in tasks:
+            record(_write_shard(task))
+    elif tasks:
+        # Imported here so single-process runs don't pay for multiprocessing
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        from src.bundle import SharedBundle, init_worker
+
+        with SharedBundle() as shared:
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                     initargs=(shared.name,)) as pool:
+                futures = [pool.submit(_write_shard, task) for task in tasks]
+                for future in as_completed(futures):
+                    record(future.result())
+
+    manifest['complete'] = True
+    manifest['shards'] = [entries[shard['index']] for shard in shards]
+    _save_manifest(path, manifest)
+    return path
+
+
+def iter_shards(manifest: Dict[str, Any], start: int = 1) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate over the shards of a manifest, from a given shard on.
+
+    Args:
+        manifest: Loaded manifest
+        start: First shard number to yield
+
+    Yields:
+        Dict[str, Any]: Manifest entry of each shard, in order
+    """
+    for entry in manifest['shards']:
+        if entry['index'] >= start:
+            yield entry
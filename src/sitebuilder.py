@@ -0,0 +1,335 @@
+"""
+Site builder module for CTchargen.
+
+This module publishes generated sectors as a static HTML site: a page per
+world (`templates/world.template`), an index per subsector and per sector
+(`templates/site_index.template`), an SVG map per sector and a domain index.
+
+Builds are incremental. Every page is described by its kind and the data it
+is rendered from, and the hash of that data and of the page's template is
+recorded in the site's manifest. A rebuild renders only the pages whose
+hash changed (or whose file is missing) and removes pages that no longer
+exist, so regenerating one world rewrites its own page, its subsector index
+and its sector map. Changed pages are rendered across worker processes.
+"""
+
+import hashlib
+import html
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.config import config
+from src.renderer import TemplateRenderer, read_template
+from src.lib.sector import SECTOR_COLUMNS, SECTOR_ROWS, Sector, parse_hex, to_global
+
+
+# Manifest of page hashes, kept in the site's root directory
+MANIFEST_FILENAME = 'manifest.json'
+MANIFEST_VERSION = 1
+
+# Templates used by each kind of page (maps and the stylesheet have none)
+PAGE_TEMPLATES = {
+    'world': 'world',
+    'index': 'site_index',
+}
+
+# Jump routes drawn on the sector maps
+DEFAULT_JUMP = 2
+
+SITE_CSS = """body { background: #393939; color: #eee; font-family: sans-serif; margin: 2em; }
+a { color: #fdbf00; }
+table { border-collapse: collapse; }
+th, td { padding: 0.2em 0.8em; text-align: left; }
+.uwp { font-family: monospace; font-size: 1.2em; }
+.map { max-width: 100%; }
+"""
+
+# A page: (path relative to the site root, kind, render data)
+Page = Tuple[str, str, Dict[str, Any]]
+
+
+def page_hash(kind: str, data: Dict[str, Any], templates: Dict[str, str]) -> str:
+    """
+    Hash everything a page is rendered from.
+
+    Args:
+        kind: Page kind
+        data: Render data
+        templates: Template content by template name
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256(kind.encode('utf-8'))
+    template = PAGE_TEMPLATES.get(kind)
+    if template is not None:
+        digest.update(templates[template].encode('utf-8'))
+    elif kind == 'css':
+        digest.update(SITE_CSS.encode('utf-8'))
+    digest.update(json.dumps(data, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _row(cells: Iterable[str]) -> str:
+    """Format a table row of already escaped cells."""
+    return '\t\t<tr>' + ''.join(f'<td>{cell}</td>' for cell in cells) + '</tr>'
+
+
+def sector_pages(sector: Sector, jump: int = DEFAULT_JUMP) -> List[Page]:
+    """
+    Describe the pages of one sector.
+
+    Args:
+        sector: Generated sector
+        jump: Jump routes drawn on the sector map (0 for none)
+
+    Returns:
+        List[Page]: World pages, subsector indexes, the sector index and map
+    """
+    directory = f"{sector.sector_x}_{sector.sector_y}"
+    sector_name = html.escape(sector.name)
+    domain_link = '<a href="../index.html">Domain</a>'
+    pages = []
+
+    subsector_rows = []
+    for subsector in sector.subsectors:
+        world_rows = []
+        for hex_number in sorted(subsector.worlds):
+            world = subsector.worlds[hex_number]
+            data = world.to_dict()
+            del data['upp']  # The template shows the UWP string
+            data['name'] = html.escape(world.name)
+            data['sector_name'] = sector_name
+            data['subsector'] = subsector.letter
+            pages.append((f"{directory}/{hex_number}.html", 'world', data))
+            world_rows.append(_row((
+                hex_number,
+                f'<a href="{hex_number}.html">{data["name"]}</a>',
+                data['uwp_string'],
+                data['trade_string'],
+            )))
+
+        pages.append((f"{directory}/{subsector.letter}.html", 'index', {
+            'title': f"{sector_name} Subsector {subsector.letter}",
+            'root': '../',
+            'breadcrumb': f'{domain_link} / <a href="index.html">{sector_name}</a>',
+            'map': '',
+            'header': '<th>Hex</th><th>Name</th><th>UWP</th><th>Trade</th>',
+            'rows': '\n'.join(world_rows),
+        }))
+        subsector_rows.append(_row((
+            subsector.letter,
+            f'<a href="{subsector.letter}.html">Subsector {subsector.letter}</a>',
+            str(len(subsector)),
+        )))
+
+    pages.append((f"{directory}/index.html", 'index', {
+        'title': f"{sector_name} Sector",
+        'root': '../',
+        'breadcrumb': f'{domain_link} / {sector_name}',
+        'map': '<img class="map" src="map.svg" alt="Sector map">',
+        'header': '<th></th><th>Subsector</th><th>Worlds</th>',
+        'rows': '\n'.join(subsector_rows),
+    }))
+
+    # The map is rendered from each world's location and UWP
+    left, top = to_global(sector.sector_x, sector.sector_y, 1, 1)
+    worlds = []
+    for hex_number, world in sorted(sector.worlds.items()):
+        x, y = to_global(sector.sector_x, sector.sector_y, *parse_hex(hex_number))
+        worlds.append([x, y, hex_number, world.name, world.get_uwp_string()])
+    pages.append((f"{directory}/map.svg", 'map', {
+        'title': f"{sector.name} Sector",
+        'origin': [left, top],
+        'jump': jump,
+        'worlds': worlds,
+    }))
+    return pages
+
+
+def site_pages(sectors: Iterable[Sector], jump: int = DEFAULT_JUMP) -> List[Page]:
+    """
+    Describe every page of a site.
+
+    Args:
+        sectors: Generated sectors
+        jump: Jump routes drawn on the sector maps (0 for none)
+
+    Returns:
+        List[Page]: Every page of the site
+    """
+    pages: List[Page] = [('site.css', 'css', {})]
+    sector_rows = []
+    for sector in sectors:
+        pages.extend(sector_pages(sector, jump))
+        sector_rows.append(_row((
+            f"{sector.sector_x},{sector.sector_y}",
+            f'<a href="{sector.sector_x}_{sector.sector_y}/index.html">{html.escape(sector.name)}</a>',
+            str(len(sector)),
+        )))
+
+    pages.append(('index.html', 'index', {
+        'title': "Domain",
+        'root': '',
+        'breadcrumb': '',
+        'map': '',
+        'header': '<th>Location</th><th>Sector</th><th>Worlds</th>',
+        'rows': '\n'.join(sector_rows),
+    }))
+    return pages
+
+
+# Renderers created in this process, by template name
+_renderers: Dict[str, TemplateRenderer] = {}
+
+
+def render_page(kind: str, data: Dict[str, Any]) -> str:
+    """
+    Render one page.
+
+    Args:
+        kind: Page kind
+        data: Render data
+
+    Returns:
+        str: Page content
+    """
+    if kind == 'css':
+        return SITE_CSS
+
+    if kind == 'map':
+        # Imported here so building pages that are unchanged skips the renderer
+        from src.lib.sectormap import iter_svg, jump_routes
+        from src.lib.secfile import decode_uwp
+        from src.lib.worldgen import World
+
+        worlds = []
+        for x, y, hex_number, name, uwp in data['worlds']:
+            starport, values = decode_uwp(uwp)
+            worlds.append((x, y, World.from_values(starport, values, name, hex_number)))
+        routes = jump_routes(worlds, data['jump']) if data['jump'] else ()
+        left, top = data['origin']
+        bounds = (left, top, left + SECTOR_COLUMNS - 1, top + SECTOR_ROWS - 1)
+        return ''.join(iter_svg(worlds, bounds, routes, data['title']))
+
+    template = PAGE_TEMPLATES[kind]
+    renderer = _renderers.get(template)
+    if renderer is None:
+        renderer = _renderers[template] = TemplateRenderer(template)
+    return renderer.render(data)
+
+
+def _write_page(root: str, page: Page) -> str:
+    """
+    Render a page and write it to its file, as a task for a worker process.
+
+    Args:
+        root: Site directory
+        page: Page to write
+
+    Returns:
+        str: Path of the page relative to the site root
+    """
+    path, kind, data = page
+    output_path = os.path.join(root, *path.split('/'))
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(render_page(kind, data))
+    return path
+
+
+def load_manifest(root: str) -> Dict[str, str]:
+    """
+    Load the page hashes recorded by the last build.
+
+    Args:
+        root: Site directory
+
+    Returns:
+        Dict[str, str]: Hash by page path (empty if there is no usable manifest)
+    """
+    try:
+        with open(os.path.join(root, MANIFEST_FILENAME), 'r') as f:
+            manifest = json.load(f)
+    except (IOError, ValueError):
+        return {}
+    if manifest.get('version') != MANIFEST_VERSION:
+        return {}
+    return manifest.get('pages', {})
+
+
+def save_manifest(root: str, hashes: Dict[str, str]) -> None:
+    """
+    Record the page hashes of a build.
+
+    The manifest is written to a temporary file and moved into place, so an
+    interrupted build never leaves a manifest describing pages it did not
+    write.
+
+    Args:
+        root: Site directory
+        hashes: Hash by page path
+    """
+    path = os.path.join(root, MANIFEST_FILENAME)
+    with open(path + '.tmp', 'w') as f:
+        json.dump({'version': MANIFEST_VERSION, 'pages': hashes}, f, indent=0, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def build_site(sectors: Iterable[Sector], root: str, jump: int = DEFAULT_JUMP,
+               workers: Optional[int] = None, force: bool = False) -> Dict[str, List[str]]:
+    """
+    Build or update the static site for some sectors.
+
+    Args:
+        sectors: Generated sectors
+        root: Site directory
+        jump: Jump routes drawn on the sector maps (0 for none)
+        workers: Number of worker processes (optional, defaults to the CPU count;
+            1 renders in this process)
+        force: Rewrite every page, ignoring the manifest
+
+    Returns:
+        Dict[str, List[str]]: Page paths that were "written", "unchanged" and "removed"
+    """
+    os.makedirs(root, exist_ok=True)
+    templates = {}
+    for template in PAGE_TEMPLATES.values():
+        content = read_template(config.get_template_path(template))
+        if content is None:
+            raise ValueError(f"Template file not found: {template}")
+        templates[template] = content
+
+    previous = {} if force else load_manifest(root)
+    hashes: Dict[str, str] = {}
+    changed: List[Page] = []
+    unchanged: List[str] = []
+    for page in site_pages(sectors, jump):
+        path, kind, data = page
+        hashes[path] = page_hash(kind, data, templates)
+        if previous.get(path) == hashes[path] and os.path.exists(os.path.join(root, *path.split('/'))):
+            unchanged.append(path)
+        else:
+            changed.append(page)
+
+    if workers == 1 or len(changed) <= 1:
+        written = [_write_page(root, page) for page in changed]
+    else:
+        # Imported here so small updates don't pay for multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        from functools import partial
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            written = list(pool.map(partial(_write_page, root), changed, chunksize=64))
+
+    removed = []
+    for path in sorted(set(previous) - set(hashes)):
+        try:
+            os.remove(os.path.join(root, *path.split('/')))
+            removed.append(path)
+        except FileNotFoundError:
+            pass
+
+    save_manifest(root, hashes)
+    return {'written': written, 'unchanged': unchanged, 'removed': removed}
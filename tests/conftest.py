@@ -0,0 +1,14 @@
+"""
+Shared fixtures for the CTchargen tests.
+"""
+
+import pytest
+
+from src.config import config
+
+
+@pytest.fixture
+def output_dir(tmp_path, monkeypatch):
+    """Send output files to a temporary directory."""
+    monkeypatch.setitem(config.config, 'output_dir', str(tmp_path))
+    return tmp_path
@@ -0,0 +1,115 @@
+"""
+Tests for the packed data bundle.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from src import bundle, renderer
+from src.bundle import DataBundle, PackedStrings, SharedBundle, attach_shared, build_bundle
+from src.config import config
+from src.lib import hyphenate, namefilter, wordplay
+
+
+@pytest.fixture(scope='module')
+def data():
+    return build_bundle()
+
+
+@pytest.fixture
+def isolated(monkeypatch):
+    """Let a bundle install into fresh copies of the loaded data."""
+    monkeypatch.setattr(namefilter, '_name_lists', {})
+    monkeypatch.setattr(namefilter, '_names_by_length', {})
+    monkeypatch.setattr(wordplay, '_syllable_rules', {})
+    monkeypatch.setattr(renderer, '_template_sources', {})
+    monkeypatch.setattr(hyphenate, 'hyphenator', hyphenate.Hyphenator(hyphenate.hyphenator.patterns))
+
+
+def test_packed_strings():
+    strings = ['Kaverlin', '', 'Zoë', 'x' * 1000]
+    packed = PackedStrings(memoryview(PackedStrings.pack(strings)), len(strings))
+    assert list(packed) == strings
+    assert packed[-1] == strings[-1]
+    assert len(packed) == 4
+    with pytest.raises(IndexError):
+        packed[4]
+
+
+def test_sections(data):
+    sections = DataBundle(data).sections
+    assert 'names/surnames.txt' in sections
+    assert 'syllables' in sections and 'hyphenation' in sections
+    assert 'templates/text.template' in sections
+    assert not {'careers', 'psionics'} & set(sections)
+
+
+def test_name_lists_match_the_sources(data):
+    for filename, names in DataBundle(data).name_lists().items():
+        assert list(names) == list(namefilter.load_name_list(os.path.join(config.NAMES_DIR, filename)))
+
+
+def test_install_reads_the_bundle_in_place(data, isolated):
+    loaded = DataBundle(data)
+    loaded.install()
+
+    surnames = namefilter.load_name_list(os.path.join(config.NAMES_DIR, 'surnames.txt'))
+    assert isinstance(surnames, PackedStrings)
+    assert isinstance(hyphenate.hyphenator.transitions, memoryview)
+    assert hyphenate.hyphenator.hyphenate_word('hyphenation') == ['hyphena', 'tion']
+    assert wordplay.load_syllable_rules(wordplay.syllable_rules_file()) == loaded.json('syllables')
+
+
+def test_shared_bundle_is_attached_zero_copy(data):
+    with SharedBundle(data) as shared:
+        attached = attach_shared(shared.name)
+        assert attached.buffer.obj is attached.keepalive.buf.obj
+        assert bytes(attached.buffer[:len(data)]) == data
+        assert list(attached.name_lists()) == list(DataBundle(data).name_lists())
+        attached.buffer.release()
+        attached.keepalive.close()
+
+
+def test_rejects_other_buffers():
+    with pytest.raises(ValueError):
+        DataBundle(b'XXXX' + bytes(16))
+
+
+def test_cached_bundle_round_trip(tmp_path, monkeypatch):
+    path = str(tmp_path / 'cache' / 'ctchargen.bundle')
+    assert bundle.load_bundle(path) is None
+
+    assert bundle.write_bundle(path) == path
+    loaded = bundle.load_bundle(path)
+    assert loaded is not None and loaded.is_fresh()
+    assert bytes(loaded.buffer) == build_bundle()
+
+    # Changing a name generation setting makes the cached bundle stale
+    settings = dict(config.get('name_generation', {}), max_length=7)
+    monkeypatch.setitem(config.config, 'name_generation', settings)
+    assert bundle.load_bundle(path) is None
+    assert not bundle.use_cached_bundle(path)
+
+
+def test_corrupt_bundle_is_ignored(tmp_path):
+    path = tmp_path / 'ctchargen.bundle'
+    path.write_bytes(b'CTDB' + bytes(4))
+    assert bundle.load_bundle(str(path)) is None
+
+
+def test_data_files(tmp_path):
+    for filename in ['b.txt', 'a.txt', '.hidden.txt', 'c.template']:
+        (tmp_path / filename).write_text('')
+    assert bundle.data_files(str(tmp_path), '.txt') == [str(tmp_path / 'a.txt'), str(tmp_path / 'b.txt')]
+    assert bundle.data_files(str(tmp_path / 'missing'), '.txt') == []
+
+
+def test_bundle_does_not_import_the_generators():
+    code = ("import sys; import src.bundle; "
+            "print(any(m in sys.modules for m in ('src.renderer', 'src.lib.wordplay', 'src.lib.hyphenate')))")
+    result = subprocess.run([sys.executable, '-c', code], cwd=config.BASE_DIR,
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == 'False'
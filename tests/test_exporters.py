@@ -0,0 +1,81 @@
+"""
+Tests for the structured character exporters.
+"""
+
+import csv
+import gzip
+import json
+import random
+
+import pytest
+
+from src.character import iter_characters
+from src.exporters import (
+    COLUMN_NAMES, COLUMNS, SKILL_NAMES, character_columns, character_row, check_export_format,
+    export_characters,
+)
+
+
+@pytest.fixture(scope='module')
+def characters():
+    random.seed(48)
+    return [character.to_dict() for character in iter_characters(40)]
+
+
+def expected_rows(characters):
+    return [list(character_row(data)) for data in characters]
+
+
+def test_columns_match_the_rows(characters):
+    columns = character_columns(characters)
+    assert list(columns) == COLUMN_NAMES
+    rows = expected_rows(characters)
+    for index, name in enumerate(COLUMN_NAMES):
+        assert columns[name] == [row[index] for row in rows]
+    assert character_columns([]) == {name: [] for name in COLUMN_NAMES}
+
+
+def test_skill_levels_are_spread_over_columns(characters):
+    columns = character_columns(characters)
+    for row, data in enumerate(characters):
+        levels = {name: columns[f"skill_{name}"][row] for name in SKILL_NAMES}
+        assert {name: level for name, level in levels.items() if level} == \
+            {name: level for name, level in data['skills'].items() if level and name in SKILL_NAMES}
+
+
+def test_jsonl_round_trip(output_dir, characters):
+    path = export_characters(iter(characters), 'export', 'jsonl', batch_size=7)
+    with open(path, encoding='utf-8') as f:
+        assert [json.loads(line) for line in f] == json.loads(json.dumps(characters))
+
+
+def test_csv_round_trip(output_dir, characters):
+    path = export_characters(characters, 'export', 'csv', batch_size=7, compression='gzip')
+    with gzip.open(path, 'rt', encoding='utf-8', newline='') as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == COLUMN_NAMES
+    assert rows[1:] == [[str(value) for value in row] for row in expected_rows(characters)]
+
+
+@pytest.mark.parametrize('file_format', ['parquet', 'arrow'])
+def test_arrow_round_trip(output_dir, characters, file_format):
+    pa = pytest.importorskip('pyarrow')
+    path = export_characters(characters, 'export', file_format, batch_size=16)
+    if file_format == 'parquet':
+        import pyarrow.parquet as pq
+        parquet = pq.ParquetFile(path)
+        assert parquet.metadata.num_row_groups == 3
+        table = parquet.read()
+    else:
+        with pa.memory_map(path) as source:
+            table = pa.ipc.open_file(source).read_all()
+
+    assert table.column_names == COLUMN_NAMES
+    assert [str(field.type) for field in table.schema] == \
+        [{'string': 'string', 'int': 'int64', 'small': 'int8', 'bool': 'bool'}[kind] for _, kind in COLUMNS]
+    assert [list(row.values()) for row in table.to_pylist()] == expected_rows(characters)
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        check_export_format('xml')
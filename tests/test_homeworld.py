@@ -0,0 +1,119 @@
+"""
+Tests for homeworld pools.
+"""
+
+import random
+from collections import Counter
+
+import pytest
+
+from src.config import config
+from src.lib import homeworld
+from src.lib.homeworld import AliasTable, HomeworldPool
+from src.lib.worldgen import World
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """Cache the pool of one subsector in a temporary directory."""
+    monkeypatch.setitem(config.config, 'cache_dir', str(tmp_path))
+    monkeypatch.setitem(config.config, 'homeworlds', {'seed': 'Test', 'sector': [0, 0], 'subsector': 'A'})
+    return tmp_path
+
+
+def make_world(population, name='World', hex_number='0101'):
+    return World.from_values('B', [5, 5, 5, population, 5, 5, 9], name, hex_number)
+
+
+def test_alias_table_draws_in_proportion():
+    weights = [1.0, 2.0, 0.0, 5.0]
+    table = AliasTable(weights)
+    random.seed(1)
+    counts = Counter(table.draw() for _ in range(40000))
+    assert counts[2] == 0
+    for index, weight in enumerate(weights):
+        assert counts[index] / 40000 == pytest.approx(weight / sum(weights), abs=0.01)
+
+
+def test_alias_table_from_arrays():
+    table = AliasTable([3.0, 1.0, 4.0])
+    copy = AliasTable.from_arrays(table.prob, table.alias)
+    random.seed(2)
+    first = [table.draw() for _ in range(100)]
+    random.seed(2)
+    assert [copy.draw() for _ in range(100)] == first
+
+    with pytest.raises(ValueError):
+        AliasTable.from_arrays([], [])
+    with pytest.raises(ValueError):
+        AliasTable.from_arrays([1.0], [0, 0])
+
+
+def test_uninhabited_worlds_are_left_out():
+    pool = HomeworldPool([make_world(0, 'Empty'), make_world(6, 'Home', '0102')])
+    assert [world.name for world in pool.worlds] == ['Home']
+    with pytest.raises(ValueError):
+        HomeworldPool([make_world(0)])
+
+
+def test_worlds_are_built_when_drawn():
+    pool = HomeworldPool([make_world(4, 'Low'), make_world(8, 'High', '0102')])
+    table = AliasTable.from_arrays(pool.table.prob, pool.table.alias)
+    lazy = HomeworldPool.from_rows(pool.to_rows(), table)
+    assert lazy._worlds == [None, None]
+
+    random.seed(4)
+    drawn = [lazy.draw() for _ in range(5)]
+    built = [world for world in lazy._worlds if world is not None]
+    assert built and all(any(world is other for other in built) for world in drawn)
+    assert lazy.world(0) is lazy.world(0)
+    assert [world.to_dict() for world in lazy.worlds] == [world.to_dict() for world in pool.worlds]
+
+    with pytest.raises(ValueError):
+        HomeworldPool.from_rows(pool.to_rows()[:1], table)
+
+
+def test_intern_returns_the_pool_world():
+    pool = HomeworldPool.from_rows(HomeworldPool([make_world(6, 'Home')]).to_rows(),
+                                   AliasTable([1.0]))
+    copy = make_world(6, 'Home')
+    assert pool.intern(copy) is pool.draw()
+    stranger = make_world(6, 'Elsewhere')
+    assert pool.intern(stranger) is stranger
+
+
+def test_cached_pool_draws_like_a_fresh_one(cache_dir):
+    fresh = HomeworldPool.from_setting()
+    key = homeworld.pool_cache_key()
+    assert homeworld.load_cached_pool(key) is None
+
+    homeworld.save_cached_pool(fresh, key)
+    cached = homeworld.load_cached_pool(key)
+    assert cached is not None and len(cached) == len(fresh)
+    assert cached.to_rows() == fresh.to_rows()
+    assert all(world is None for world in cached._worlds)
+
+    random.seed(3)
+    expected = [fresh.draw().to_dict() for _ in range(50)]
+    random.seed(3)
+    assert [cached.draw().to_dict() for _ in range(50)] == expected
+
+
+def test_stale_cache_is_ignored(cache_dir, monkeypatch):
+    homeworld.save_cached_pool(HomeworldPool.from_setting(), homeworld.pool_cache_key())
+
+    monkeypatch.setitem(config.config, 'homeworlds', {'seed': 'Other', 'sector': [0, 0], 'subsector': 'A'})
+    assert homeworld.load_cached_pool(homeworld.pool_cache_key()) is None
+
+
+@pytest.mark.parametrize('damage', [
+    lambda blob: blob[:-40],
+    lambda blob: blob[:10],
+    lambda blob: b'XXXX' + blob[4:],
+])
+def test_corrupt_cache_is_ignored(cache_dir, damage):
+    key = homeworld.pool_cache_key()
+    homeworld.save_cached_pool(HomeworldPool.from_setting(), key)
+    path = cache_dir / homeworld.POOL_CACHE_FILENAME
+    path.write_bytes(damage(path.read_bytes()))
+    assert homeworld.load_cached_pool(key) is None
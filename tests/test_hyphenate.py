@@ -0,0 +1,71 @@
+"""
+Tests for the hyphenation tables.
+"""
+
+import json
+import os
+
+import pytest
+
+from src.lib import hyphenate
+from src.lib.hyphenate import Hyphenator, hyphenate_many, hyphenate_word
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+
+# Words hyphenated by the pattern trie the packed tables replaced
+with open(os.path.join(DATA_DIR, 'baseline_hyphenation.json'), encoding='utf-8') as f:
+    BASELINE_HYPHENATION = json.load(f)
+
+PATTERNS = "1ba 2b1c a1c .ab4 4cd."
+
+
+def test_hyphenates_like_the_baseline():
+    assert {word: hyphenate_word(word) for word in BASELINE_HYPHENATION} == BASELINE_HYPHENATION
+
+
+def test_hyphenate_many_matches_hyphenate_word():
+    words = list(BASELINE_HYPHENATION)
+    assert hyphenate_many(words) == [hyphenate_word(word) for word in words]
+    assert hyphenate_many(iter(words[:3])) == [hyphenate_word(word) for word in words[:3]]
+    assert hyphenate_many([]) == []
+
+
+def test_exceptions():
+    assert hyphenate_word('table') == ['ta', 'ble']
+    assert hyphenate_word('Project') == ['Project']
+
+
+def test_tables_are_cached(tmp_path):
+    cache_file = str(tmp_path / 'hyphenate.bin')
+    words = ['abcabcab', 'cabbacba', 'bacab']
+
+    built = Hyphenator(PATTERNS, cache_file=cache_file)
+    expected = built.hyphenate_many(words)
+    assert os.path.exists(cache_file)
+
+    cached = Hyphenator(PATTERNS, cache_file=cache_file)
+    assert cached._load_cache()
+    assert cached.hyphenate_many(words) == expected
+
+
+def test_stale_cache_is_rebuilt(tmp_path):
+    cache_file = str(tmp_path / 'hyphenate.bin')
+    Hyphenator(PATTERNS, cache_file=cache_file).hyphenate_word('abcabcab')
+
+    other = Hyphenator("1ab", cache_file=cache_file)
+    assert not other._load_cache()
+    assert other.hyphenate_word('abababab') == Hyphenator("1ab").hyphenate_word('abababab')
+
+
+@pytest.mark.parametrize('blob', [b'', b'CTHY', b'XXXX' + bytes(64)])
+def test_invalid_tables_are_rejected(blob):
+    assert not Hyphenator(PATTERNS).load_tables(blob)
+
+
+def test_dumped_tables_load_in_place():
+    blob = hyphenate.hyphenator.dump_tables()
+    loaded = Hyphenator(hyphenate.hyphenator.patterns)
+    loaded.exceptions = hyphenate.hyphenator.exceptions
+    assert loaded.load_tables(bytearray(blob))
+    words = list(BASELINE_HYPHENATION)[:50]
+    assert loaded.hyphenate_many(words) == hyphenate_many(words)
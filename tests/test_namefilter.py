@@ -0,0 +1,149 @@
+"""
+Tests for the name filter.
+"""
+
+import os
+import random
+import string
+
+import pytest
+
+from src import bundle, character, chargen
+from src.lib import namefilter
+from src.lib.namefilter import AhoCorasick, NameFilter, NameFilterError
+from src.lib.wordplay import Wordplay
+
+BLOCKLIST = ['ka', 'ore', 'th', 'an', 'ui']
+
+
+def naive_search(words, text):
+    """Every (start, word) match, found one position at a time."""
+    text = text.lower()
+    return sorted((start, word) for word in set(words)
+                  for start in range(len(text)) if text.startswith(word, start))
+
+
+@pytest.fixture
+def name_filter(monkeypatch):
+    """Install a name filter for the tests and reset what it caches."""
+    def install(**kwargs):
+        installed = NameFilter(**kwargs)
+        monkeypatch.setattr(namefilter, 'name_filter', installed)
+        monkeypatch.setattr(namefilter, '_name_lists', {})
+        monkeypatch.setattr(namefilter, '_names_by_length', {})
+        return installed
+    return install
+
+
+def test_automaton_matches_naive_search():
+    words = ['he', 'she', 'his', 'hers', 'a', 'aa', 'ushe']
+    rng = random.Random(0)
+    for _ in range(200):
+        text = ''.join(rng.choice('ahersuxHS') for _ in range(rng.randint(0, 20)))
+        assert sorted(AhoCorasick(words).search(text)) == naive_search(words, text)
+        assert AhoCorasick(words).contains_match(text) == bool(naive_search(words, text))
+
+
+def test_automaton_ignores_case_and_blanks():
+    automaton = AhoCorasick(['Ka', ' ', 'ka'])
+    assert len(automaton) == 1
+    assert automaton.contains_match('OKAY')
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_words_never_contain_blocked_substrings(seed):
+    name_filter = NameFilter(BLOCKLIST, min_length=4, max_length=9)
+    wordplay = Wordplay()
+    for i in range(25):
+        word = wordplay.create_word(seed=f'{seed}-{i}', name_filter=name_filter)
+        assert name_filter.is_allowed(word)
+        assert not any(blocked in word.lower() for blocked in BLOCKLIST)
+        assert 4 <= len(word) <= 9
+
+
+def test_filter_names():
+    name_filter = NameFilter(BLOCKLIST)
+    assert name_filter.filter_names(['Kai', 'Doris', 'Lea', 'Moreno', 'Thea']) == ['Doris', 'Lea']
+    assert NameFilter().filter_names(['Kai']) == ['Kai']
+
+
+def test_is_allowed_counts_letters():
+    name_filter = NameFilter(min_length=3, max_length=5)
+    assert name_filter.is_allowed('Li Lo')
+    assert not name_filter.is_allowed('Li')
+    assert not name_filter.is_allowed('Lorena')
+
+
+def test_allowed_syllables():
+    name_filter = NameFilter(min_syllables=2, max_syllables=3)
+    assert name_filter.allowed_syllables([1, 2, 2, 3, 4]) == [2, 2, 3]
+    assert NameFilter(min_syllables=6).allowed_syllables([1, 2, 3]) == [6]
+
+
+def test_characters_fall_back_to_name_lists(name_filter, capsys):
+    # No phonetic name is this long, but first names and surnames together are
+    name_filter(min_length=20)
+    random.seed(0)
+    names = [character.Character().name for _ in range(5)]
+    assert all(' ' in name and namefilter.letter_count(name) >= 20 for name in names)
+    assert capsys.readouterr().out == ''
+
+
+def test_fallback_is_decided_per_character(name_filter, monkeypatch):
+    name_filter()
+    create_word = character.wordplay.create_word
+    failures = iter([True])
+
+    def unlucky(*args, **kwargs):
+        if next(failures, False):
+            raise NameFilterError("Unable to create a word that satisfies the name filter")
+        return create_word(*args, **kwargs)
+
+    monkeypatch.setattr(character.wordplay, 'create_word', unlucky)
+    random.seed(0)
+    names = [character.Character().name for _ in range(3)]
+    assert ' ' in names[0]
+    assert ' ' not in names[1] and ' ' not in names[2]
+
+
+@pytest.mark.parametrize('limits', [{'max_length': 8}, {'min_length': 15, 'max_length': 16}])
+def test_list_names_keep_to_the_length_limits(name_filter, monkeypatch, limits):
+    installed = name_filter(blocklist=['ka'], **limits)
+    monkeypatch.setitem(character.config.config, 'name_generation', {'use_phonetic': False})
+    random.seed(0)
+    for _ in range(50):
+        name = character.Character().name
+        assert ' ' in name
+        assert installed.is_allowed(name)
+
+
+def test_random_name_without_fitting_names(name_filter):
+    name_filter(max_length=2)
+    with pytest.raises(NameFilterError):
+        namefilter.random_name(os.path.join(character.config.NAMES_DIR, 'malenames.txt'),
+                               os.path.join(character.config.NAMES_DIR, 'surnames.txt'))
+
+
+def test_no_allowed_name_raises_name_filter_error(name_filter):
+    name_filter(blocklist=string.ascii_lowercase)
+    with pytest.raises(NameFilterError):
+        character.Character()
+
+
+def test_chargen_reports_name_filter_errors(name_filter, output_dir, monkeypatch, capsys):
+    # The cached bundle holds name lists filtered with the configured settings
+    monkeypatch.setattr(bundle, 'use_cached_bundle', lambda: False)
+    name_filter(blocklist=string.ascii_lowercase)
+    with pytest.raises(SystemExit) as exit_info:
+        chargen.main(['-n', '1', '-o', 'names'])
+    assert exit_info.value.code == 1
+    assert capsys.readouterr().out.startswith('Error: No name satisfies')
+
+
+def test_chargen_lets_other_errors_through(output_dir, monkeypatch):
+    def broken(*args, **kwargs):
+        raise ValueError('not a name filter error')
+
+    monkeypatch.setattr(chargen, 'generate_and_save_characters', broken)
+    with pytest.raises(ValueError, match='not a name filter error'):
+        chargen.main(['-n', '1', '-o', 'names'])
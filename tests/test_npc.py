@@ -0,0 +1,125 @@
+"""
+Tests for world NPC generation.
+"""
+
+import inspect
+import json
+import random
+
+import pytest
+
+from src.lib.homeworld import AliasTable
+from src.lib.worldgen import World, trade_codes
+from src.lib.worldrules import STARPORT_CLASSES, parse_values
+from src.npc import NPC_ROLES_FILE, NpcTables, generate_npcs, load_npc_tables, npc_count
+
+with open(NPC_ROLES_FILE, encoding='utf-8') as f:
+    ROLES = json.load(f)
+
+
+def make_world(starport='B', population=6, lawlevel=5, **values):
+    upp = dict(size=5, atmosphere=6, hydrographics=5, population=population,
+               government=5, lawlevel=lawlevel, techlevel=9)
+    upp.update(values)
+    return World.from_values(starport, list(upp.values()), 'Home', '0101')
+
+
+def expected_mix(world):
+    """Chance of each (role, career) on a world, multiplying out the raw table."""
+    codes = trade_codes(world.trade_mask)
+    weights = {}
+    for role, spec in ROLES['roles'].items():
+        total = sum(spec['careers'].values())
+        for career, weight in spec['careers'].items():
+            value = spec.get('weight', 1) * weight / total
+            for modifier in ROLES['modifiers']:
+                if modifier.get('role', role) != role or modifier.get('career', career) != career:
+                    continue
+                if 'starport' in modifier:
+                    matches = world.starport in [STARPORT_CLASSES[index] for index in
+                                                 parse_values(modifier['starport'], 'starport')]
+                elif 'law' in modifier:
+                    matches = world.lawlevel in parse_values(modifier['law'], 'lawlevel')
+                else:
+                    matches = modifier['trade'] in codes
+                if matches:
+                    value *= modifier['factor']
+            weights[role, career] = value
+    total = sum(weights.values())
+    return {entry: weight / total for entry, weight in weights.items()}
+
+
+def alias_chances(table):
+    """Chance of each index of an alias table."""
+    n = len(table)
+    chances = [prob / n for prob in table.prob]
+    for prob, alias in zip(table.prob, table.alias):
+        chances[alias] += (1 - prob) / n
+    return chances
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_mix_follows_the_modifiers(seed):
+    rng = random.Random(seed)
+    tables = load_npc_tables()
+    for _ in range(100):
+        world = World.from_values(rng.choice(STARPORT_CLASSES), [rng.randint(0, 15) for _ in range(7)],
+                                  'Home', '0101')
+        chances = alias_chances(tables.mix(world))
+        expected = expected_mix(world)
+        assert chances == pytest.approx([expected[entry] for entry in tables.entries])
+
+
+def test_mixes_are_shared_by_alike_worlds():
+    tables = NpcTables(ROLES)
+    first = tables.mix(make_world(population=4))
+    assert tables.mix(make_world(population=5, government=2)) is first
+    assert tables.mix(make_world(lawlevel=12)) is not first
+    assert load_npc_tables() is load_npc_tables()
+
+
+def test_npc_count():
+    assert npc_count(make_world(population=0)) == 0
+    assert npc_count(make_world(population=2)) == 10
+    assert npc_count(make_world(population=9)) == 31623
+    assert npc_count(make_world(population=1), scale=0.01) == 1
+
+
+def test_npcs_are_streamed():
+    world = make_world(population=9)
+    npcs = generate_npcs(world)
+    assert inspect.isgenerator(npcs)
+
+    tables = load_npc_tables()
+    for role, npc in [next(npcs) for _ in range(20)]:
+        assert (role, npc.career) in tables.entries
+        assert npc.homeworld is world
+    npcs.close()
+
+    assert list(generate_npcs(make_world(population=0))) == []
+    assert len(list(generate_npcs(world, count=5))) == 5
+
+
+def test_seeded_npcs_repeat():
+    world = make_world()
+    random.seed(43)
+    first = [(role, npc.to_dict()) for role, npc in generate_npcs(world, count=10)]
+    random.seed(43)
+    assert [(role, npc.to_dict()) for role, npc in generate_npcs(world, count=10)] == first
+
+
+@pytest.mark.parametrize('change', [
+    {'roles': {'crew': {'careers': {'Pirates': 1}}}},
+    {'modifiers': [{'trade': 'Zz', 'factor': 2}]},
+    {'modifiers': [{'role': 'crew', 'factor': 2}]},
+])
+def test_invalid_tables_are_rejected(change):
+    with pytest.raises(ValueError):
+        NpcTables(dict(ROLES, **change))
+
+
+def test_empty_mix_is_rejected():
+    data = dict(ROLES, modifiers=[{'starport': 'X', 'factor': 0}])
+    with pytest.raises(ValueError):
+        NpcTables(data).mix(make_world(starport='X'))
+    assert isinstance(NpcTables(data).mix(make_world(starport='A')), AliasTable)
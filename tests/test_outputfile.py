@@ -0,0 +1,136 @@
+"""
+Tests for the streaming output file writer.
+"""
+
+import bz2
+import gzip
+import lzma
+import os
+import random
+import stat
+
+import pytest
+
+from src.lib.outputfile import NEW_FILE_MODE, OutputFile, compressed_extension
+
+
+def read(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+def leftovers(directory, path):
+    """Files other than the target left in the directory."""
+    return [name for name in os.listdir(directory) if name != os.path.basename(path)]
+
+
+def test_writes_in_chunks(tmp_path):
+    path = str(tmp_path / 'out.txt')
+    with OutputFile(path, flush_size=4) as f:
+        for word in ('alpha', ' ', 'beta', ' ', 'gamma'):
+            f.write(word)
+    assert read(path) == 'alpha beta gamma'
+    assert leftovers(tmp_path, path) == []
+
+
+def test_target_replaced_only_on_commit(tmp_path):
+    path = str(tmp_path / 'out.txt')
+    with open(path, 'w') as f:
+        f.write('old')
+
+    with OutputFile(path, flush_size=1) as f:
+        f.write('new')
+        assert read(path) == 'old'
+    assert read(path) == 'new'
+
+
+def test_discarded_on_error(tmp_path):
+    path = str(tmp_path / 'out.txt')
+    with open(path, 'w') as f:
+        f.write('old')
+
+    with pytest.raises(RuntimeError):
+        with OutputFile(path, flush_size=1) as f:
+            f.write('partial')
+            raise RuntimeError('interrupted')
+
+    assert read(path) == 'old'
+    assert leftovers(tmp_path, path) == []
+
+
+def test_discarded_new_file_leaves_nothing(tmp_path):
+    path = str(tmp_path / 'out.txt')
+    with pytest.raises(RuntimeError):
+        with OutputFile(path) as f:
+            f.write('partial')
+            raise RuntimeError('interrupted')
+    assert os.listdir(tmp_path) == []
+
+
+def test_not_atomic_writes_in_place(tmp_path):
+    path = str(tmp_path / 'out.txt')
+    with OutputFile(path, flush_size=1, atomic=False) as f:
+        f.write('text')
+        assert os.path.exists(path)
+    assert read(path) == 'text'
+
+
+@pytest.mark.skipif(os.name != 'posix', reason="POSIX permissions")
+def test_new_file_mode_follows_umask(tmp_path):
+    path = str(tmp_path / 'out.txt')
+    with OutputFile(path) as f:
+        f.write('text')
+    assert stat.S_IMODE(os.stat(path).st_mode) == NEW_FILE_MODE
+
+
+@pytest.mark.skipif(os.name != 'posix', reason="POSIX permissions")
+def test_replaced_file_keeps_its_mode(tmp_path):
+    path = str(tmp_path / 'out.txt')
+    with open(path, 'w') as f:
+        f.write('old')
+    os.chmod(path, 0o640)
+
+    with OutputFile(path) as f:
+        f.write('new')
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+
+
+def test_gzip_is_deterministic(tmp_path):
+    paths = [str(tmp_path / f'out{i}.txt.gz') for i in range(2)]
+    for path in paths:
+        with OutputFile(path, compression='gzip') as f:
+            f.write('text ' * 1000)
+
+    with gzip.open(paths[0], 'rt', encoding='utf-8') as f:
+        assert f.read() == 'text ' * 1000
+    with open(paths[0], 'rb') as first, open(paths[1], 'rb') as second:
+        assert first.read() == second.read()
+
+
+def test_unknown_compression():
+    with pytest.raises(ValueError):
+        OutputFile('out.txt', compression='zip')
+    with pytest.raises(ValueError):
+        compressed_extension('txt', 'zip')
+    assert compressed_extension('jsonl', 'lzma') == 'jsonl.xz'
+
+
+@pytest.mark.parametrize('compression, module', [('bz2', bz2), ('lzma', lzma)])
+def test_other_compressions(tmp_path, compression, module):
+    path = str(tmp_path / 'out.txt')
+    with OutputFile(path, flush_size=100, compression=compression) as f:
+        for _ in range(50):
+            f.write('line of text\n')
+    with module.open(path, 'rt', encoding='utf-8') as f:
+        assert f.read() == 'line of text\n' * 50
+
+
+def test_writing_leaves_the_random_sequence_alone(tmp_path):
+    random.seed(46)
+    expected = [random.random() for _ in range(3)]
+    random.seed(46)
+    for index in range(3):
+        with OutputFile(str(tmp_path / f'out{index}.txt')) as f:
+            f.write('text')
+    assert [random.random() for _ in range(3)] == expected
+
@@ -0,0 +1,70 @@
+"""
+Tests for generating and rendering characters across worker processes.
+"""
+
+import concurrent.futures
+import random
+
+import pytest
+
+from src import renderer
+from src.character import iter_characters, iter_characters_parallel
+from src.chargen import generate_and_save_characters
+from src.lib.homeworld import get_homeworld_pool
+from src.renderer import CHARACTER_SEPARATOR, TemplateRenderer
+
+
+@pytest.fixture
+def pools(monkeypatch):
+    """Count the process pools started."""
+    started = []
+
+    class CountedPool(concurrent.futures.ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            started.append(self)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(concurrent.futures, 'ProcessPoolExecutor', CountedPool)
+    return started
+
+
+def test_worker_chunk_renders_like_a_serial_run(monkeypatch):
+    monkeypatch.setattr(renderer, '_worker_renderer', None)
+    random.seed(47)
+    rendered = renderer._generate_chunk(('text', 5))
+    random.seed(47)
+    assert rendered == TemplateRenderer('text').render_multiple(iter_characters(5))
+
+
+def test_generated_chunks_come_back_in_order():
+    text = ''.join(TemplateRenderer('text').iter_generate_parallel(7, workers=2, chunk_size=3))
+    characters = text.split(CHARACTER_SEPARATOR)
+    assert len(characters) == 7
+    assert all(character.startswith('Name: ') for character in characters)
+
+
+def test_rendering_in_workers_keeps_the_input_order():
+    random.seed(1)
+    characters = [character.to_dict() for character in iter_characters(9)]
+    text_renderer = TemplateRenderer('text')
+    assert ''.join(text_renderer.iter_render_parallel(characters, workers=2, chunk_size=2)) == \
+        text_renderer.render_multiple(characters)
+
+
+def test_parallel_characters_share_this_process_worlds():
+    characters = list(iter_characters_parallel(6, workers=2, chunk_size=2))
+    assert len(characters) == 6
+    worlds = get_homeworld_pool()
+    assert all(worlds.intern(character.homeworld) is character.homeworld for character in characters)
+
+
+@pytest.mark.parametrize('output_format, template', [('txt', 'text'), ('jsonl', 'text')])
+def test_workers_start_one_pool(output_dir, pools, output_format, template):
+    path = generate_and_save_characters(5, 'workers', template, output_format, workers=2)
+    assert len(pools) == 1
+    with open(path, encoding='utf-8') as f:
+        content = f.read()
+    if output_format == 'jsonl':
+        assert len(content.splitlines()) == 5
+    else:
+        assert len(content.split(CHARACTER_SEPARATOR)) == 5
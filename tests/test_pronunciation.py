@@ -0,0 +1,48 @@
+"""
+Tests for name pronunciation guides.
+"""
+
+import random
+
+from src import character
+from src.lib.hyphenate import hyphenate_word
+from src.lib.wordplay import Wordplay, pronounce
+
+
+def test_pronounce_splits_each_word():
+    assert pronounce('hyphenation') == 'hyphena-tion'
+    assert pronounce('Alicea Lo') == 'Al-icea Lo'
+    assert pronounce('Lo') == 'Lo'
+    assert pronounce('') == ''
+
+
+def test_pronounce_matches_hyphenation():
+    random.seed(0)
+    names = [character.Character().name for _ in range(200)]
+    for name in names:
+        assert pronounce(name) == ' '.join('-'.join(hyphenate_word(part)) for part in name.split())
+
+
+def test_characters_get_the_guide_of_their_name():
+    random.seed(0)
+    for _ in range(100):
+        generated = character.Character()
+        assert generated.pronunciation.replace('-', '') == generated.name
+        assert generated.pronunciation == pronounce(generated.name)
+
+
+def test_words_without_guides_are_unchanged():
+    first, second = Wordplay(), Wordplay()
+    words = [first.create_word(seed=f'seed-{i}') for i in range(50)]
+    assert first.word_pronounced == pronounce(words[-1])
+
+    bare = [second.create_word(seed=f'seed-{i}', with_pronunciation=False) for i in range(50)]
+    assert bare == words
+
+
+def test_seeded_characters_are_repeatable():
+    random.seed(5)
+    first = [character.Character().to_dict() for _ in range(20)]
+    random.seed(5)
+    second = [character.Character().to_dict() for _ in range(20)]
+    assert first == second
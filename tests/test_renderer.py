@@ -0,0 +1,84 @@
+"""
+Tests for saving characters in several formats at once.
+"""
+
+import os
+import random
+
+import pytest
+
+from src.character import Character
+from src.exporters import export_characters
+from src.lib.worldgen import World
+from src.renderer import save_characters, save_outputs
+
+OUTPUTS = [('text', 'txt'), ('markdown', 'md'), ('jsonl', None)]
+
+
+@pytest.fixture(scope='module')
+def characters():
+    random.seed(0)
+    homeworld = World.from_values('A', [5] * 7, 'Home', '0101')
+    return [Character(homeworld=homeworld).to_dict() for _ in range(12)]
+
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('outputs', [
+    [('text', 'txt'), ('markdown', 'txt')],
+    [('jsonl', None), ('jsonl', 'txt')],
+    [('text', None), ('text', 'txt')],
+])
+def test_outputs_sharing_a_file_are_rejected(output_dir, characters, outputs):
+    with pytest.raises(ValueError):
+        save_outputs(characters, 'fanout', outputs)
+    assert os.listdir(output_dir) == []
+
+
+def test_outputs_match_separate_saves(output_dir, characters):
+    paths = save_outputs(iter(characters), 'fanout', OUTPUTS, batch_size=5, max_pending=1)
+    assert [os.path.basename(path) for path in paths] == ['fanout.txt', 'fanout.md', 'fanout.jsonl']
+
+    expected = [
+        save_characters(characters, 'text', 'text', 'txt'),
+        save_characters(characters, 'markdown', 'markdown', 'md'),
+        export_characters(characters, 'jsonl', 'jsonl'),
+    ]
+    assert [read(path) for path in paths] == [read(path) for path in expected]
+
+
+def test_outputs_are_compressed_alike(output_dir, characters):
+    paths = save_outputs(characters, 'fanout', OUTPUTS, compression='gzip')
+    assert all(path.endswith('.gz') for path in paths)
+    assert read(paths[2]) == read(export_characters(characters, 'jsonl', 'jsonl', compression='gzip'))
+
+
+def test_failed_input_leaves_no_files(output_dir, characters):
+    def failing():
+        yield from characters
+        raise RuntimeError('interrupted')
+
+    with pytest.raises(RuntimeError):
+        save_outputs(failing(), 'fanout', OUTPUTS, batch_size=5, max_pending=1)
+    assert os.listdir(output_dir) == []
+
+
+def test_each_character_is_converted_once(output_dir, characters):
+    class Counted:
+        calls = 0
+
+        def __init__(self, data):
+            self.data = data
+
+        def to_dict(self):
+            Counted.calls += 1
+            return self.data
+
+    paths = save_outputs([Counted(data) for data in characters], 'fanout', OUTPUTS + [('csv', None)],
+                         batch_size=5)
+    assert Counted.calls == len(characters)
+    assert read(paths[3]) == read(export_characters(characters, 'csv', 'csv'))
+
@@ -0,0 +1,111 @@
+"""
+Tests for jump routes.
+"""
+
+import random
+from collections import deque
+
+import pytest
+
+from src.lib.routes import JumpGraph, hex_distance
+from src.lib.worldgen import World
+
+# Worlds of sector (0, 0) and a world of sector (1, 0) that links two of them
+START = (31, 10)
+END = (31, 15)
+INSIDE = [START, (28, 11), (28, 14), END]
+OUTSIDE = (32, 13)
+
+
+def make_world():
+    return World.from_values('A', [5] * 7, 'World', '0101')
+
+
+def random_map(seed, count=120):
+    """Worlds scattered over two sectors side by side."""
+    rng = random.Random(seed)
+    locations = rng.sample([(x, y) for x in range(64) for y in range(40)], count)
+    return [(x, y, make_world()) for x, y in locations]
+
+
+def fewest_jumps(locations, start, jump):
+    """Jumps from a world to every reachable world, checking every pair of hexes."""
+    jumps = {start: 0}
+    queue = deque([start])
+    while queue:
+        current = queue.popleft()
+        for other in locations:
+            if other not in jumps and hex_distance(current, other) <= jump:
+                jumps[other] = jumps[current] + 1
+                queue.append(other)
+    return jumps
+
+
+def check_path(graph, path, start, end, jump):
+    assert path[0] == start and path[-1] == end
+    assert all(location in graph.worlds for location in path)
+    assert all(hex_distance(a, b) <= jump for a, b in zip(path, path[1:]))
+
+
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('jump', [1, 2, 3])
+def test_paths_are_shortest(seed, jump):
+    worlds = random_map(seed)
+    graph = JumpGraph(worlds, max_jump=3)
+    locations = [(x, y) for x, y, _ in worlds]
+
+    for start in locations[:20]:
+        jumps = fewest_jumps(locations, start, jump)
+        for end in locations:
+            path = graph.path(start, end, jump)
+            if end not in jumps:
+                assert path is None
+                continue
+            check_path(graph, path, start, end, jump)
+            assert len(path) - 1 == jumps[end]
+
+
+def test_path_leaves_sector_when_shorter():
+    # Two worlds of the left sector, two jumps apart through the right sector
+    # and three apart without leaving their own
+    graph = JumpGraph([(x, y, make_world()) for x, y in INSIDE + [OUTSIDE]], max_jump=3)
+    assert graph.route_table(0, 0, 3).jumps(START, END) == 3
+    assert graph.path(START, END, 3) == [START, OUTSIDE, END]
+
+
+def test_set_world_drops_neighbouring_tables():
+    graph = JumpGraph([(x, y, make_world()) for x, y in INSIDE], max_jump=3)
+    assert len(graph.path(START, END, 3)) - 1 == 3
+
+    # The left sector's cached table must notice a new world across the border
+    graph.set_world(OUTSIDE, make_world())
+    assert graph.path(START, END, 3) == [START, OUTSIDE, END]
+
+    graph.set_world(OUTSIDE, None)
+    assert len(graph.path(START, END, 3)) - 1 == 3
+
+
+def test_set_world_keeps_paths_shortest():
+    worlds = random_map(0)
+    graph = JumpGraph(worlds, max_jump=3)
+    locations = [(x, y) for x, y, _ in worlds]
+    for sector_x in (0, 1):
+        graph.route_table(sector_x, 0, 3)
+
+    changes = [(31, y) for y in range(40) if (31, y) not in graph.worlds][:3]
+    changes += locations[:3]
+    for location in changes:
+        if location in graph.worlds:
+            graph.set_world(location, None)
+            locations.remove(location)
+        else:
+            graph.set_world(location, make_world())
+            locations.append(location)
+
+        for start in locations[:10]:
+            jumps = fewest_jumps(locations, start, 3)
+            for end in locations:
+                path = graph.path(start, end, 3)
+                assert (path is None) == (end not in jumps)
+                if path:
+                    assert len(path) - 1 == jumps[end]
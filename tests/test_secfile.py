@@ -0,0 +1,86 @@
+"""
+Tests for reading and writing sector files.
+"""
+
+import io
+
+import pytest
+
+from src.lib.secfile import decode_uwp, encode_uwp, read_world_arrays, read_worlds, write_worlds
+from src.lib.sector import Subsector
+from src.lib.worldgen import STARPORT_CLASSES, World
+
+# A SEC line with a starport class outside STARPORT_CLASSES
+UNSUPPORTED_STARPORT = "Regina       1910 F788899-C  A Ri Pa Ph An Cp       703 Im G2 V\n"
+
+
+@pytest.fixture(scope='module')
+def worlds():
+    return list(Subsector('Test', 0, 0, 5).generate().worlds.values())
+
+
+def world_fields(world):
+    return world.hex, world.name, world.get_uwp_string(), world.trade_mask
+
+
+@pytest.mark.parametrize('file_format', ['tab', 'sec'])
+def test_round_trip(worlds, file_format):
+    buffer = io.StringIO()
+    assert write_worlds(worlds, buffer, file_format, 'Test') == len(worlds)
+
+    buffer.seek(0)
+    assert [world_fields(world) for world in read_worlds(buffer)] == \
+        [world_fields(world) for world in worlds]
+
+
+@pytest.mark.parametrize('file_format', ['tab', 'sec'])
+def test_round_trip_keeps_extra_columns(worlds, file_format):
+    first = io.StringIO()
+    write_worlds(worlds, first, file_format, 'Test')
+    first.seek(0)
+
+    second = io.StringIO()
+    write_worlds(read_worlds(first), second, file_format, 'Test')
+    assert second.getvalue() == first.getvalue()
+
+
+def test_world_arrays_match_worlds(worlds):
+    pytest.importorskip('numpy')
+    buffer = io.StringIO()
+    write_worlds(worlds, buffer, 'tab', 'Test')
+    buffer.seek(0)
+
+    arrays = list(read_world_arrays(buffer, chunk_size=7))
+    uwps = [encode_uwp(array.starport_class(i), [array.to_dict(i)[field] for field in array.FIELDS[1:]])
+            for array in arrays for i in range(len(array))]
+    assert uwps == [world.get_uwp_string() for world in worlds]
+
+
+def test_decode_uwp():
+    assert decode_uwp('A788899-C') == ('A', [7, 8, 8, 8, 9, 9, 12])
+    assert decode_uwp('b000000-0') == ('B', [0, 0, 0, 0, 0, 0, 0])
+
+
+def test_unknown_starport_reads_as_x():
+    assert decode_uwp('?788899-C')[0] == 'X'
+
+
+@pytest.mark.parametrize('uwp', ['F788899-C', 'H788899-C', 'A788899C', 'A7888I9-C', 'A788899-'])
+def test_decode_uwp_rejects_invalid(uwp):
+    with pytest.raises(ValueError):
+        decode_uwp(uwp)
+
+
+def test_readers_reject_unsupported_starports_alike():
+    with pytest.raises(ValueError):
+        list(read_worlds(io.StringIO(UNSUPPORTED_STARPORT)))
+
+    pytest.importorskip('numpy')
+    with pytest.raises(ValueError):
+        list(read_world_arrays(io.StringIO(UNSUPPORTED_STARPORT)))
+
+
+def test_read_starports_are_supported():
+    for world in read_worlds(io.StringIO(UNSUPPORTED_STARPORT.replace('F788899', '?788899'))):
+        assert world.starport in STARPORT_CLASSES
+        assert isinstance(world, World)
@@ -0,0 +1,76 @@
+"""
+Tests for seeded sector generation.
+"""
+
+import random
+
+import pytest
+
+from src.lib import wordplay
+from src.lib.sector import (
+    Sector, Subsector, from_global, generate_hex, parse_hex, world_at, worlds_in_region
+)
+
+SEED = 'test-domain'
+
+
+def world_dicts(worlds):
+    return {hex_number: world.to_dict() for hex_number, world in worlds.items()}
+
+
+def test_unseeded_words_follow_the_random_state():
+    random.seed(1)
+    first = [wordplay.wordplay.create_word() for _ in range(10)]
+    random.seed(1)
+    second = [wordplay.wordplay.create_word() for _ in range(10)]
+    assert first == second
+    assert len(set(first)) > 1
+
+
+def test_seeded_words_repeat():
+    words = [wordplay.wordplay.create_word(seed='Regina') for _ in range(3)]
+    assert len(set(words)) == 1
+
+
+def test_hexes_depend_only_on_the_seed_and_location():
+    first = generate_hex(SEED, 0, 0, 3, 7)
+    random.seed(99)
+    state = random.getstate()
+    second = generate_hex(SEED, 0, 0, 3, 7)
+    assert random.getstate() == state
+    assert (first and first.to_dict()) == (second and second.to_dict())
+
+
+def test_subsectors_match_world_at():
+    subsector = Subsector(SEED, 1, 2, index=5).generate()
+    for hex_number in subsector.hexes():
+        world = world_at(SEED, 1, 2, hex_number)
+        generated = subsector.worlds.get(hex_number)
+        assert (world and world.to_dict()) == (generated and generated.to_dict())
+
+
+def test_regions_match_world_at():
+    for x, y, world in worlds_in_region(SEED, 28, 5, 36, 12):
+        sector_x, sector_y, column, row = from_global(x, y)
+        assert world is world_at(SEED, sector_x, sector_y, f"{column:02d}{row:02d}")
+
+
+def test_parallel_sector_matches_serial():
+    serial = Sector(SEED).generate(workers=1)
+    parallel = Sector(SEED).generate(workers=2)
+    assert len(serial) > 0
+    assert world_dicts(parallel.worlds) == world_dicts(serial.worlds)
+    assert parallel.name == serial.name
+
+
+def test_world_at_does_not_depend_on_order():
+    hexes = [f"{column:02d}{row:02d}" for column in range(1, 9) for row in range(1, 11)]
+    forward = {hex_number: generate_hex(SEED, 2, 3, *parse_hex(hex_number)) for hex_number in hexes}
+    backward = {hex_number: generate_hex(SEED, 2, 3, *parse_hex(hex_number)) for hex_number in reversed(hexes)}
+    assert {k: v and v.to_dict() for k, v in forward.items()} == {k: v and v.to_dict() for k, v in backward.items()}
+
+
+@pytest.mark.parametrize('region', [(5, 5, 4, 10), (0, 0, 200, 200)])
+def test_invalid_regions_are_rejected(region):
+    with pytest.raises(ValueError):
+        worlds_in_region(SEED, *region)
@@ -0,0 +1,41 @@
+"""
+Tests for the sector map API.
+"""
+
+import pytest
+
+pytest.importorskip('fastapi')
+pytest.importorskip('httpx')
+
+from fastapi.testclient import TestClient
+
+from web.backend.main import app
+
+client = TestClient(app)
+
+
+def test_sector_map_is_streamed():
+    response = client.get('/api/sectors/0/0/map.svg', params={'seed': 'test-domain'})
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('image/svg+xml')
+    assert response.text.startswith('<')
+
+
+def test_hex_matches_the_region():
+    region = client.get('/api/sectors/region', params={
+        'seed': 'test-domain', 'left': 0, 'top': 0, 'right': 7, 'bottom': 9,
+    }).json()
+    for world in region['worlds']:
+        hex_world = client.get(f"/api/sectors/{world['sector_x']}/{world['sector_y']}/{world['hex']}",
+                               params={'seed': 'test-domain'}).json()['world']
+        assert hex_world == world
+
+
+@pytest.mark.parametrize('url, params', [
+    ('/api/sectors/region', {'left': 5, 'top': 0, 'right': 0, 'bottom': 0}),
+    ('/api/sectors/0/0/9999', {}),
+    ('/api/sectors/0/0/map.svg', {'jump': 7}),
+])
+def test_bad_requests_are_rejected(url, params):
+    response = client.get(url, params={'seed': 'test-domain', **params})
+    assert response.status_code in (400, 422)
@@ -0,0 +1,93 @@
+"""
+Tests for SVG sector maps.
+"""
+
+import os
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from src.lib.sector import Sector, to_global
+from src.lib.sectormap import (
+    CHUNK_SIZE, COLUMN_WIDTH, iter_svg, jump_routes, map_bounds, map_worlds, save_sector_svgs, write_svg
+)
+from src.lib.worldgen import World
+
+SVG = '{http://www.w3.org/2000/svg}'
+SEED = 'test-domain'
+
+
+@pytest.fixture(scope='module')
+def sector():
+    return Sector(SEED).generate(workers=1)
+
+
+def world_groups(root):
+    return [group for group in root.iter(f'{SVG}g') if 'w' in group.get('class', '').split()]
+
+
+def test_map_structure(sector):
+    worlds = map_worlds([sector])
+    routes = jump_routes(worlds, 2)
+    root = ET.fromstring(''.join(iter_svg(worlds, map_bounds([sector]), routes, 'Test & Map')))
+
+    assert root.tag == f'{SVG}svg'
+    assert root.find(f'{SVG}title').text == 'Test & Map'
+    groups = world_groups(root)
+    assert len(groups) == len(sector) == len(worlds)
+
+    by_hex = {group.find(f'{SVG}text[@class="h"]').text: group for group in groups}
+    for hex_number, world in sector.worlds.items():
+        group = by_hex[hex_number]
+        assert group.get('data-uwp') == world.get_uwp_string()
+        assert group.get('data-trade') == world.get_trade_string()
+        assert group.find(f'{SVG}text[@class="n"]').text == (world.name or None)
+        assert world.starport in group.get('class').split()
+
+    segments = ''.join(path.get('d') for path in root.iter(f'{SVG}path')).count('M')
+    assert segments == len(routes) > 0
+
+
+def test_worlds_outside_the_bounds_are_skipped():
+    world = World.from_values('A', [5] * 7, 'Edge', '0101')
+    worlds = [(0, 0, world), (5, 5, world), (40, 3, world)]
+    root = ET.fromstring(''.join(iter_svg(worlds, (0, 0, 31, 39))))
+    assert len(world_groups(root)) == 2
+
+
+def test_worlds_are_chunked():
+    world = World.from_values('B', [5] * 7, 'W', '0101')
+    worlds = [(x, y, world) for x in range(32) for y in range(40)][:CHUNK_SIZE + 1]
+    chunks = list(iter_svg(worlds, (0, 0, 31, 39)))
+    # Head, a full chunk of worlds, the last world and the closing tag
+    assert len(chunks) == 4
+
+
+def test_tiles_line_up(output_dir):
+    sectors = [Sector(SEED, x, 0) for x in range(2)]
+    for sector in sectors:
+        sector.generate(workers=1)
+    paths = save_sector_svgs(sectors, 'domain', jump=1, tile=1)
+    assert [os.path.basename(path) for path in paths] == ['domain_0_0.svg', 'domain_1_0.svg']
+
+    left = ET.parse(paths[0]).getroot().get('viewBox').split()
+    right = ET.parse(paths[1]).getroot().get('viewBox').split()
+    # Same size, shifted by exactly one sector's width of hex columns
+    assert left[2:] == right[2:]
+    width = to_global(1, 0, 1, 1)[0] - to_global(0, 0, 1, 1)[0]
+    assert float(right[0]) - float(left[0]) == pytest.approx(width * COLUMN_WIDTH)
+
+
+def test_failed_render_keeps_the_old_map(tmp_path):
+    path = str(tmp_path / 'map.svg')
+    write_svg(['<svg/>'], path)
+
+    def failing():
+        yield '<svg>'
+        raise RuntimeError('interrupted')
+
+    with pytest.raises(RuntimeError):
+        write_svg(failing(), path)
+    with open(path, encoding='utf-8') as f:
+        assert f.read() == '<svg/>'
+    assert os.listdir(tmp_path) == ['map.svg']
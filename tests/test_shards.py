@@ -0,0 +1,114 @@
+"""
+Tests for saving characters as shards.
+"""
+
+import json
+import os
+
+import pytest
+
+from src import shards
+from src.shards import iter_shards, load_manifest, open_shard, plan_shards, save_sharded_characters, verify_shard
+
+
+def save(**kwargs):
+    options = dict(count=5, filename='run', shard_size=2, output_format='jsonl',
+                   compression='gzip', seed='test', workers=1)
+    options.update(kwargs)
+    path = save_sharded_characters(**options)
+    return path, load_manifest(path)
+
+
+def checksums(manifest):
+    return [entry['sha256'] for entry in manifest['shards']]
+
+
+@pytest.fixture
+def written(monkeypatch):
+    """Record the numbers of the shards generated."""
+    indexes = []
+    write_shard = shards._write_shard
+
+    def record(task):
+        indexes.append(task[0]['index'])
+        return write_shard(task)
+
+    monkeypatch.setattr(shards, '_write_shard', record)
+    return indexes
+
+
+def test_plan_covers_every_character():
+    plan = plan_shards(5, 2, 'test')
+    assert [shard['count'] for shard in plan] == [2, 2, 1]
+    assert len({shard['seed'] for shard in plan}) == 3
+    assert plan == plan_shards(5, 2, 'test')
+
+
+def test_manifest_describes_the_shards(output_dir):
+    path, manifest = save()
+    assert manifest['complete']
+    assert [entry['index'] for entry in manifest['shards']] == [1, 2, 3]
+    assert sum(entry['count'] for entry in manifest['shards']) == 5
+    assert all(verify_shard(entry, os.path.dirname(path)) for entry in manifest['shards'])
+
+
+def test_same_seed_same_shards(output_dir):
+    _, first = save(filename='first')
+    _, second = save(filename='second')
+    _, other = save(filename='other', seed='other')
+    assert checksums(first) == checksums(second)
+    assert checksums(first) != checksums(other)
+
+
+def test_resume_keeps_intact_shards(output_dir, written):
+    _, manifest = save()
+    written.clear()
+
+    _, resumed = save(resume=True)
+    assert written == []
+    assert checksums(resumed) == checksums(manifest)
+
+
+def test_resume_regenerates_missing_and_corrupt_shards(output_dir, written):
+    _, manifest = save()
+    written.clear()
+
+    os.remove(output_dir / manifest['shards'][0]['path'])
+    with open(output_dir / manifest['shards'][2]['path'], 'r+b') as f:
+        f.write(b'corrupt')
+
+    _, resumed = save(resume=True)
+    assert written == [1, 3]
+    assert checksums(resumed) == checksums(manifest)
+
+
+def test_resume_with_other_settings_starts_over(output_dir, written):
+    save()
+    written.clear()
+
+    save(resume=True, shard_size=3)
+    assert written == [1, 2]
+
+
+def test_resume_reuses_the_manifest_seed(output_dir):
+    _, manifest = save()
+    _, resumed = save(seed=None, resume=True)
+    assert resumed['seed'] == manifest['seed']
+    assert checksums(resumed) == checksums(manifest)
+
+
+def test_workers_write_the_same_shards(output_dir):
+    _, serial = save(filename='serial')
+    _, parallel = save(filename='parallel', workers=2)
+    assert checksums(parallel) == checksums(serial)
+
+
+@pytest.mark.parametrize('compression', [None, 'bz2', 'lzma'])
+def test_shards_read_back(output_dir, compression):
+    path, manifest = save(compression=compression)
+    counts = []
+    for entry in iter_shards(manifest, start=2):
+        with open_shard(entry, os.path.dirname(path)) as f:
+            counts.append(len([json.loads(line) for line in f]))
+    assert counts == [2, 1]
+
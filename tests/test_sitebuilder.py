@@ -0,0 +1,71 @@
+"""
+Tests for the incremental static-site build.
+"""
+
+import os
+
+import pytest
+
+from src.lib.sector import Sector
+from src.sitebuilder import MANIFEST_FILENAME, build_site
+
+
+@pytest.fixture
+def sector():
+    return Sector('test-domain').generate(workers=1)
+
+
+def first_world(sector):
+    for subsector in sector.subsectors:
+        for hex_number, world in sorted(subsector.worlds.items()):
+            return subsector, hex_number, world
+
+
+def test_first_build_writes_every_page(tmp_path, sector):
+    result = build_site([sector], str(tmp_path), workers=1)
+    assert result['unchanged'] == [] and result['removed'] == []
+    assert len(result['written']) == len(sector) + len(sector.subsectors) + 4
+    for path in result['written']:
+        assert os.path.exists(os.path.join(tmp_path, *path.split('/')))
+
+
+def test_unchanged_sector_is_not_rewritten(tmp_path, sector):
+    first = build_site([sector], str(tmp_path), workers=1)
+    second = build_site([sector], str(tmp_path), workers=1)
+    assert second['written'] == []
+    assert sorted(second['unchanged']) == sorted(first['written'])
+
+
+def test_only_changed_pages_are_rewritten(tmp_path, sector):
+    build_site([sector], str(tmp_path), workers=1)
+    subsector, hex_number, world = first_world(sector)
+    world.name = 'Renamed'
+
+    result = build_site([sector], str(tmp_path), workers=1)
+    assert sorted(result['written']) == sorted([
+        f"0_0/{hex_number}.html", f"0_0/{subsector.letter}.html", "0_0/map.svg",
+    ])
+    with open(os.path.join(tmp_path, '0_0', f'{hex_number}.html'), encoding='utf-8') as f:
+        assert 'Renamed' in f.read()
+
+
+def test_removed_worlds_lose_their_pages(tmp_path, sector):
+    build_site([sector], str(tmp_path), workers=1)
+    subsector, hex_number, _ = first_world(sector)
+    del subsector.worlds[hex_number]
+
+    result = build_site([sector], str(tmp_path), workers=1)
+    assert result['removed'] == [f"0_0/{hex_number}.html"]
+    assert not os.path.exists(os.path.join(tmp_path, '0_0', f'{hex_number}.html'))
+    assert f"0_0/{subsector.letter}.html" in result['written']
+
+
+def test_missing_pages_and_manifests_are_rebuilt(tmp_path, sector):
+    first = build_site([sector], str(tmp_path), workers=1)
+    os.remove(os.path.join(tmp_path, 'site.css'))
+    assert build_site([sector], str(tmp_path), workers=1)['written'] == ['site.css']
+
+    with open(os.path.join(tmp_path, MANIFEST_FILENAME), 'w') as f:
+        f.write('{not json')
+    assert len(build_site([sector], str(tmp_path), workers=1)['written']) == len(first['written'])
+    assert len(build_site([sector], str(tmp_path), workers=1, force=True)['written']) == len(first['written'])
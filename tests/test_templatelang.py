@@ -0,0 +1,137 @@
+"""
+Tests for the template language.
+"""
+
+import json
+import os
+
+import pytest
+
+from src import renderer
+from src.lib.templatelang import CompiledTemplate
+from src.renderer import COMPUTED_FIELDS, compile_template
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+
+# Characters rendered through the shipped templates by the string.Template
+# renderer the template language replaced
+with open(os.path.join(DATA_DIR, 'baseline_renders.json'), encoding='utf-8') as f:
+    BASELINE_RENDERS = json.load(f)
+
+
+def load_baseline_template(name):
+    with open(os.path.join(DATA_DIR, 'baseline_templates', f'{name}.template'), encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('case', BASELINE_RENDERS,
+                         ids=[f"{case['template']}-{i}" for i, case in enumerate(BASELINE_RENDERS)])
+def test_renders_like_the_baseline(case):
+    template = CompiledTemplate(load_baseline_template(case['template']), COMPUTED_FIELDS)
+    assert template.render(case['data']) == case['expected']
+
+
+def test_placeholders_follow_string_template():
+    template = CompiledTemplate("$name ${name}s $$5 $missing", {})
+    assert template.render({'name': 'Ka'}) == "Ka Kas $5 $missing"
+
+
+def test_template_is_literal_text_and_accessors():
+    template = CompiledTemplate("Name: ${name}\nAge: $age years\n", {})
+    assert [part for part in template.parts if isinstance(part, str)] == ["Name: ", "\nAge: ", " years\n"]
+    assert sum(callable(part) for part in template.parts) == 2
+
+
+def test_nested_fields_and_lists():
+    template = CompiledTemplate("${homeworld_name} ${psionic_psr} $skills $empty", {})
+    data = {'homeworld': {'name': 'Regina'}, 'psionic': {'psr': 7}, 'skills': ['Pilot-1', 'Gun Combat-2'],
+            'empty': []}
+    assert template.render(data) == "Regina 7 Pilot-1, Gun Combat-2 None"
+
+
+def test_compiled_templates_are_cached_by_mtime(tmp_path, monkeypatch):
+    monkeypatch.setattr(renderer, '_compiled', {})
+    path = tmp_path / 'test.template'
+    path.write_text("Hello $name")
+    template = compile_template(str(path))
+    assert compile_template(str(path)) is template
+
+    path.write_text("Goodbye $name")
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10 ** 9))
+    changed = compile_template(str(path))
+    assert changed is not template
+    assert changed.render({'name': 'Ka'}) == "Goodbye Ka"
+
+    assert compile_template(str(tmp_path / 'missing.template')) is None
+
+
+def test_if_and_for_blocks():
+    template = CompiledTemplate(
+        "{% if terms > 1 %}Veteran{% elif terms %}Recruit{% else %}None{% endif %}\n"
+        "{% for skill, level in skills %}${skill}-${level}{% if !loop.last %}, {% endif %}"
+        "{% else %}No skills{% endfor %}",
+        {},
+    )
+    assert template.render({'terms': 3, 'skills': {'Pilot': 2, 'Vacc Suit': 1}}) == \
+        "Veteran\nPilot-2, Vacc Suit-1"
+    assert template.render({'terms': 0, 'skills': {}}) == "None\nNo skills"
+
+
+def test_syntax_errors_raise_value_error():
+    with pytest.raises(ValueError):
+        CompiledTemplate("{% if terms %}never closed", {})
+
+
+@pytest.mark.parametrize('expression, expected', [
+    ('died ? "Deceased" : "Active"', 'Active'),
+    ('psionic.talents.length ? psionic.talents.join(", ") : "None"', 'Telepathy, Awareness'),
+    ('psionic.talents[1].upper()', 'AWARENESS'),
+    ('`PSR ${psionic.psr} (${terms + 1})`', 'PSR 9 (4)'),
+    ('terms >= 3 && !died', 'True'),
+    ('missing.field || "none"', 'none'),
+    ('name.title() + "!"', 'Kaverlin!'),
+    ('terms > "x"', 'False'),
+    ('(null)', ''),
+])
+def test_expressions(expression, expected):
+    data = {'name': 'kaverlin', 'terms': 3, 'died': False,
+            'psionic': {'psr': 9, 'talents': ['Telepathy', 'Awareness']}}
+    assert CompiledTemplate('${' + expression + '}', {}).render(data) == expected
+
+
+def test_block_lines_are_dropped():
+    template = CompiledTemplate("Skills:\n{% for skill in skills %}\n- $skill\n{% endfor %}\nEnd\n", {})
+    assert template.render({'skills': ['Pilot-1', 'Medic-2']}) == "Skills:\n- Pilot-1\n- Medic-2\nEnd\n"
+
+
+def test_loop_variables_stay_in_the_loop():
+    template = CompiledTemplate("{% for name in names %}${loop.index}:$name {% endfor %}$name", {})
+    assert template.render({'names': ['a', 'b'], 'name': 'outer'}) == "1:a 2:b outer"
+
+
+@pytest.mark.parametrize('expression', [
+    'name.__class__',
+    'name.__class__.__mro__',
+    'skills.pop()',
+    'name.format("x")',
+])
+def test_expressions_cannot_reach_python(expression):
+    try:
+        template = CompiledTemplate('${' + expression + '}', {})
+    except ValueError:
+        return
+    data = {'name': 'Ka', 'skills': ['Pilot-1']}
+    assert template.render(data) == ''
+    assert data['skills'] == ['Pilot-1']
+
+
+@pytest.mark.parametrize('content', [
+    '${terms ?}',
+    '{% for in skills %}{% endfor %}',
+    '{% endif %}',
+    '{% while true %}',
+    '${"unclosed}',
+])
+def test_more_syntax_errors(content):
+    with pytest.raises(ValueError):
+        CompiledTemplate(content, {})
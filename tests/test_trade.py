@@ -0,0 +1,136 @@
+"""
+Tests for speculative trade pricing.
+"""
+
+import itertools
+import json
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from src.lib.trade import TRADE_GOODS_FILE, TradeMatrix, TradeTables, expected_dice, load_trade_tables
+from src.lib.worldgen import TRADE_CODES, World, generate_worlds_array, trade_codes
+
+with open(TRADE_GOODS_FILE, encoding='utf-8') as f:
+    GOODS = json.load(f)
+
+
+def rolled_dice(expression):
+    """Average a dice expression over the totals of its dice, adding one die at a time."""
+    text, _, multiplier = expression.partition('x')
+    if 'D' not in text:
+        return float(text)
+    dice, _, modifier = text.partition('D')
+    totals = {0: 1}
+    for _ in range(int(dice)):
+        rolled = {}
+        for total, ways in totals.items():
+            for face in range(1, 7):
+                rolled[total + face] = rolled.get(total + face, 0) + ways
+        totals = rolled
+    average = sum(max(total + int(modifier or 0), 0) * ways for total, ways in totals.items())
+    return average / 6 ** int(dice) * int(multiplier or 1)
+
+
+def price(good, codes, side):
+    """Expected price of a good on a world with some trade codes, from the raw table."""
+    actual = {int(roll): percent / 100 for roll, percent in GOODS['actual_value'].items()}
+    dm = sum(good.get(side, {}).get(code, 0) for code in codes)
+    rolls = [min(max(a + b + dm, min(actual)), max(actual)) for a in range(1, 7) for b in range(1, 7)]
+    return good['price'] * sum(actual[roll] for roll in rolls) / 36
+
+
+def random_worlds(count, seed):
+    rng = random.Random(seed)
+    return [World.from_values(rng.choice('ABCDEX'), [rng.randint(0, 15) for _ in range(7)],
+                              f'World {index}', '0101')
+            for index in range(count)]
+
+
+@pytest.mark.parametrize('expression', ['0', '7', '1D', '2D-4', '1D-5', '3Dx10', '1Dx5', '2D-8'])
+def test_expected_dice(expression):
+    assert expected_dice(expression) == pytest.approx(rolled_dice(expression))
+
+
+def test_invalid_dice():
+    with pytest.raises(ValueError):
+        expected_dice('2d6')
+
+
+def test_prices_follow_trade_codes():
+    tables = load_trade_tables()
+    worlds = random_worlds(200, 42)
+    purchase, resale = tables.prices(np.array([world.trade_mask for world in worlds]))
+
+    for row, world in enumerate(worlds):
+        codes = trade_codes(world.trade_mask)
+        for column, good in enumerate(GOODS['goods']):
+            assert purchase[row, column] == pytest.approx(price(good, codes, 'purchase'))
+            assert resale[row, column] == pytest.approx(price(good, codes, 'resale'))
+
+
+def test_every_code_combination_is_priced():
+    tables = load_trade_tables()
+    masks = [sum(1 << TRADE_CODES.index(code) for code in combo)
+             for count in range(len(tables.codes) + 1)
+             for combo in itertools.combinations(tables.codes, count)]
+    purchase, _ = tables.prices(np.array(masks))
+    for row, mask in enumerate(masks):
+        expected = [price(good, trade_codes(mask), 'purchase') for good in GOODS['goods']]
+        assert purchase[row] == pytest.approx(expected)
+
+
+def test_unknown_trade_codes_are_rejected():
+    data = dict(GOODS, goods=[{'name': 'Rocks', 'price': 10, 'purchase': {'Zz': 1}}])
+    with pytest.raises(ValueError):
+        TradeTables(data)
+
+
+def test_traffic_by_population():
+    tables = load_trade_tables()
+    for row in GOODS['traffic']:
+        low, _, high = row['population'].partition('-')
+        for population in range(int(low), int(high or low) + 1):
+            for kind in ('high', 'middle', 'low', 'freight'):
+                assert tables.traffic[kind][population] == pytest.approx(rolled_dice(row[kind]))
+
+
+def test_matrix_finds_the_best_good_of_every_pair():
+    worlds = random_worlds(150, 7)
+    rng = np.random.default_rng(7)
+    hops = rng.integers(-1, 4, size=(150, 150))
+    matrix = TradeMatrix(worlds, hops)
+
+    for origin in range(0, 150, 7):
+        for destination in range(150):
+            profit = matrix.resale[destination] - matrix.purchase[origin]
+            if hops[origin, destination] > 0:
+                assert matrix.best_profit[origin, destination] == pytest.approx(profit.max())
+                assert profit[matrix.best_good[origin, destination]] == pytest.approx(profit.max())
+            else:
+                assert matrix.best_profit[origin, destination] == 0
+
+
+def test_routes_are_sorted_by_profit_per_jump():
+    worlds = random_worlds(40, 3)
+    hops = np.random.default_rng(3).integers(-1, 4, size=(40, 40))
+    routes = TradeMatrix(worlds, hops).routes()
+    assert len(routes) == int((hops > 0).sum())
+    per_jump = [route['profit_per_jump'] for route in routes]
+    assert per_jump == sorted(per_jump, reverse=True)
+    assert all(route['jumps'] == hops[route['origin'], route['destination']] for route in routes)
+
+
+def test_world_array_matches_worlds():
+    array = generate_worlds_array(60, seed=5)
+    worlds = [World.from_values(array.to_dict(index)['starport'], [
+        int(getattr(array, field)[index]) for field in
+        ('size', 'atmosphere', 'hydrographics', 'population', 'government', 'lawlevel', 'techlevel')
+    ], f'World {index}', '0101') for index in range(60)]
+    hops = np.ones((60, 60), dtype=np.int64)
+    from_array, from_worlds = TradeMatrix(array, hops), TradeMatrix(worlds, hops)
+    assert np.array_equal(from_array.purchase, from_worlds.purchase)
+    assert np.array_equal(from_array.best_profit, from_worlds.best_profit)
+    assert np.array_equal(from_array.revenue_per_jump, from_worlds.revenue_per_jump)
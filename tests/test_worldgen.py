@@ -0,0 +1,53 @@
+"""
+Tests for column-wise world generation.
+"""
+
+import random
+from collections import Counter
+
+import pytest
+
+from src.lib.worldgen import World, WorldArray, generate_worlds_array
+from src.lib.worldrules import CHARACTERISTICS, STARPORT_CLASSES
+
+np = pytest.importorskip('numpy')
+
+
+def frequencies(values):
+    counts = Counter(values)
+    return {value: count / len(values) for value, count in counts.items()}
+
+
+def test_seeded_arrays_repeat():
+    first = generate_worlds_array(1000, seed=3)
+    second = generate_worlds_array(1000, seed=3)
+    assert len(first) == 1000
+    for field in WorldArray.FIELDS:
+        assert np.array_equal(getattr(first, field), getattr(second, field))
+
+
+def test_rows_match_worlds_with_the_same_values():
+    worlds = generate_worlds_array(500, seed=1)
+    for index in range(len(worlds)):
+        data = worlds.to_dict(index)
+        world = World.from_values(data['starport'], data['upp'])
+        assert data['upp_string'] == world.get_upp_string()
+        assert data['tradelevel'] == world.tradelevel
+
+
+def test_distributions_match_world():
+    random.seed(0)
+    worlds = [World() for _ in range(20000)]
+    array = generate_worlds_array(200000, seed=0)
+
+    starports = [STARPORT_CLASSES[code] for code in array.starport]
+    expected = frequencies([world.starport for world in worlds])
+    actual = frequencies(starports)
+    assert set(actual) == set(expected)
+    assert all(abs(actual[value] - expected[value]) < 0.02 for value in expected)
+
+    for field in CHARACTERISTICS:
+        expected = frequencies([getattr(world, field) for world in worlds])
+        actual = frequencies(getattr(array, field).tolist())
+        for value in set(expected) | set(actual):
+            assert abs(actual.get(value, 0) - expected.get(value, 0)) < 0.02, (field, value)
@@ -0,0 +1,86 @@
+"""
+Tests for the world index.
+"""
+
+import random
+
+import pytest
+
+from src.lib.worldgen import World, generate_worlds_array
+from src.lib.worldindex import WorldIndex, bitset_from_ids, ids_from_bitset
+
+QUERIES = [
+    {},
+    {'codes': 'Hi'},
+    {'codes': 'Ag Ni', 'starport': 'AB'},
+    {'starport': 'X'},
+    {'techlevel': (12, 15)},
+    {'techlevel': (12, 99)},
+    {'population': (5, 7), 'lawlevel': 0},
+    {'codes': ['In'], 'starport': 'a', 'techlevel': 10},
+    {'size': (-3, 2), 'atmosphere': (4, 3)},
+    {'techlevel': 17},
+]
+
+
+def matches(world, codes=(), starport=None, **ranges):
+    """Check one world against a query, the slow way."""
+    if isinstance(codes, str):
+        codes = codes.split()
+    if not set(codes) <= set(world['tradelevel']):
+        return False
+    if starport is not None and world['starport'] not in starport.upper():
+        return False
+    for field, value in ranges.items():
+        low, high = value if isinstance(value, tuple) else (value, value)
+        if not low <= world[field] <= high:
+            return False
+    return True
+
+
+def scan(worlds, query):
+    return [world_id for world_id, world in enumerate(worlds) if matches(world, **query)]
+
+
+@pytest.fixture(scope='module')
+def worlds():
+    random.seed(0)
+    worlds = [World() for _ in range(2000)]
+    # Imported worlds can go past 15
+    worlds += [World.from_values('A', [8, 6, 5, 9, 6, 4, tech]) for tech in (16, 17, 23)]
+    return worlds
+
+
+@pytest.mark.parametrize('query', QUERIES)
+def test_queries_match_a_scan(worlds, query):
+    index = WorldIndex(worlds)
+    rows = [world.to_dict() for world in worlds]
+    assert index.query(**query) == scan(rows, query)
+    assert index.count(**query) == len(scan(rows, query))
+
+
+@pytest.mark.parametrize('query', QUERIES)
+def test_array_queries_match_a_scan(query):
+    pytest.importorskip('numpy')
+    worlds = generate_worlds_array(5000, seed=2)
+    rows = [worlds.to_dict(world_id) for world_id in range(len(worlds))]
+    assert WorldIndex(worlds).query(**query) == scan(rows, query)
+
+
+def test_values_above_15_are_found(worlds):
+    index = WorldIndex(worlds)
+    assert index.query(techlevel=17) == [len(worlds) - 2]
+    assert index.query(techlevel=(16, 99)) == list(range(len(worlds) - 3, len(worlds)))
+    assert len(index.ids_in_range('techlevel', 0, 99)) == len(worlds)
+
+
+def test_bitsets_round_trip():
+    ids = [0, 3, 64, 65, 1000]
+    assert ids_from_bitset(bitset_from_ids(ids, 1001)) == ids
+    assert ids_from_bitset(0) == []
+
+
+@pytest.mark.parametrize('query', [{'codes': 'Zz'}, {'starport': 'Q'}, {'gravity': 3}])
+def test_bad_queries_are_rejected(worlds, query):
+    with pytest.raises(ValueError):
+        WorldIndex(worlds).query(**query)
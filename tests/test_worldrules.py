@@ -0,0 +1,86 @@
+"""
+Tests for the compiled world rule tables.
+"""
+
+import json
+import os
+import random
+
+import pytest
+
+from src.lib import worldrules
+from src.lib.worldgen import World, generate_worlds_array
+from src.lib.worldrules import WorldRules, available_rules, get_rules, load_rules, set_rules
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+
+# Worlds rolled by the hard-coded calc methods the classic rules replaced,
+# after random.seed(36): starport, the seven characteristics and trade codes
+with open(os.path.join(DATA_DIR, 'baseline_worlds.json'), encoding='utf-8') as f:
+    BASELINE_WORLDS = json.load(f)
+
+SMALL_WORLDS = {
+    'name': 'small',
+    'starport': {'A': 1},
+    'size': {'dice': 1, 'modifier': -1, 'clamp': [0, 3]},
+    'techlevel': {'dice': 1, 'dm': {'size': {'0-1': 5}}},
+}
+
+
+@pytest.fixture
+def active_rules(monkeypatch):
+    """Restore the active rule set after a test swaps it."""
+    monkeypatch.setattr(worldrules, '_active', None)
+
+
+def test_classic_rules_match_the_original_generator(active_rules):
+    set_rules('classic')
+    random.seed(36)
+    worlds = [World() for _ in BASELINE_WORLDS]
+    assert [[w.starport] + w.upp + [w.tradelevel] for w in worlds] == BASELINE_WORLDS
+
+
+def test_dm_tables_are_compiled():
+    techlevel = load_rules('classic')['techlevel']
+    assert dict(techlevel.dms)['starport'] == (6, 4, 2, 0, 0, -6)
+    assert dict(techlevel.dms)['size'][:6] == (0, 2, 2, 1, 1, 0)
+    assert dict(techlevel.zero_if)['population'][:2] == (True, False)
+
+
+def test_rules_are_swappable(active_rules):
+    assert set(available_rules()) >= {'classic', 'book3'}
+    assert set_rules('book3') is get_rules() is load_rules('book3')
+
+    small = set_rules(WorldRules(SMALL_WORLDS))
+    random.seed(1)
+    worlds = [World() for _ in range(300)]
+    assert {world.starport for world in worlds} == {'A'}
+    assert {world.size for world in worlds} == {0, 1, 2, 3}
+    assert all(6 <= world.techlevel <= 11 for world in worlds if world.size <= 1)
+    assert all(1 <= world.techlevel <= 6 for world in worlds if world.size >= 2)
+    assert get_rules() is small
+
+
+def test_custom_rules_feed_the_array_generator():
+    pytest.importorskip('numpy')
+    worlds = generate_worlds_array(5000, seed=1, rules=WorldRules(SMALL_WORLDS))
+    assert set(worlds.starport.tolist()) == {0}
+    assert set(worlds.size.tolist()) == {0, 1, 2, 3}
+
+
+@pytest.mark.parametrize('data', [
+    {'starport': {}},
+    {'starport': {'Q': 1}},
+    {'starport': {'A': 1}, 'size': {'clamp': [5, 2]}},
+    {'starport': {'A': 1}, 'size': {'dm': {'techlevel': {'1': 1}}}},
+    {'starport': {'A': 1}, 'atmosphere': {'add': 'hydrographics'}},
+    {'starport': {'A': 1}, 'government': {'zero_if': {'population': '0-16'}}},
+])
+def test_invalid_rules_are_rejected(data):
+    with pytest.raises(ValueError):
+        WorldRules(data)
+
+
+def test_missing_rule_file(tmp_path):
+    with pytest.raises(ValueError):
+        load_rules(str(tmp_path / 'missing.json'))
@@ -0,0 +1,122 @@
+"""
+Tests for the exact world statistics.
+"""
+
+import itertools
+from fractions import Fraction
+
+import pytest
+
+from src.lib.worldgen import generate_worlds_array, trade_code_mask, trade_mask
+from src.lib.worldrules import CHARACTERISTICS, STARPORT_CLASSES, WorldRules, load_rules
+from src.lib.worldstats import FIELDS, dice_counts, enumerate_worlds
+
+# Every characteristic is rolled on one die, as the brute-force enumeration assumes
+ONE_DIE = {
+    'name': 'one-die',
+    'starport': {'A': 1, 'C': 2, 'X': 1},
+    'size': {'dice': 1, 'modifier': -1},
+    'atmosphere': {'dice': 1, 'modifier': -4, 'add': 'size'},
+    'hydrographics': {'dice': 1, 'modifier': -3, 'add': 'size',
+                      'dm': {'atmosphere': {'0-1': -4}}, 'zero_if': {'size': '0-1'}},
+    'population': {'dice': 1, 'modifier': 2},
+    'government': {'dice': 1, 'modifier': -4, 'add': 'population', 'zero_if': {'population': '0'}},
+    'lawlevel': {'dice': 1, 'modifier': -4, 'add': 'government'},
+    'techlevel': {'dice': 1, 'dm': {'starport': {'A': 6, 'X': -4}, 'population': {'7-8': 2}},
+                  'clamp': [0, 9]},
+}
+
+
+def brute_force(rules):
+    """
+    Weight of every (field values, trade mask) outcome.
+
+    Every die face is rolled, keeping the full tuple of values so far, so no
+    state is pruned; equal tuples are merged only to keep the test quick.
+    """
+    states = {}
+    for starport in rules.starport_table:
+        key = (STARPORT_CLASSES.index(starport),)
+        states[key] = states.get(key, 0) + 1
+
+    for field in CHARACTERISTICS:
+        rule = rules[field]
+        rolled = {}
+        for values, weight in states.items():
+            known = dict(zip(FIELDS, values))
+            for face in range(1, 7):
+                value = face + rule.modifier
+                if rule.add is not None:
+                    value += known[rule.add]
+                for source, table in rule.dms:
+                    value += table[known[source]]
+                if any(zero[known[source]] for source, zero in rule.zero_if):
+                    value = 0
+                key = values + (min(max(value, rule.low), rule.high),)
+                rolled[key] = rolled.get(key, 0) + weight
+        states = rolled
+
+    outcomes = {(values, trade_mask(*values[1:])): weight for values, weight in states.items()}
+    return outcomes, len(rules.starport_table) * 6 ** len(CHARACTERISTICS)
+
+
+def test_dice_counts():
+    assert dice_counts(1) == {face: 1 for face in range(1, 7)}
+    assert dice_counts(2)[7] == 6 and sum(dice_counts(2).values()) == 36
+    assert sum(dice_counts(3).values()) == 216
+
+
+@pytest.mark.parametrize('name', ['classic', 'book3'])
+def test_probabilities_sum_to_one(name):
+    stats = enumerate_worlds(load_rules(name), keep=('starport', 'techlevel'))
+    for field in FIELDS:
+        assert sum(stats.marginal(field).values()) == 1
+    assert sum(stats.joint.values()) == stats.denominator
+    assert sum(stats.trade_masks.values()) == stats.denominator
+
+
+def test_classic_marginals():
+    stats = enumerate_worlds(load_rules('classic'))
+    assert stats.marginal('size')[5] == Fraction(6, 36)
+    assert stats.marginal('population')[0] == Fraction(1, 36)
+    assert stats.marginal('starport')['A'] == Fraction(2, 33)
+
+
+def test_matches_brute_force():
+    rules = WorldRules(ONE_DIE)
+    stats = enumerate_worlds(rules, keep=('starport', 'techlevel'))
+    outcomes, total = brute_force(rules)
+
+    for position, field in enumerate(FIELDS):
+        expected = {}
+        for (values, _), weight in outcomes.items():
+            expected[values[position]] = expected.get(values[position], 0) + weight
+        assert {value: Fraction(weight, stats.denominator) for value, weight in stats.marginals[field].items()} \
+            == {value: Fraction(weight, total) for value, weight in expected.items()}
+
+    for code in ('Ag', 'Hi', 'Va', 'Ni', 'In'):
+        bit = trade_code_mask(code)
+        expected = sum(weight for (_, mask), weight in outcomes.items() if mask & bit)
+        assert stats.trade_code_probability(code) == Fraction(expected, total)
+
+    bit = trade_code_mask('Ni')
+    expected = sum(weight for (values, mask), weight in outcomes.items()
+                   if values[0] == STARPORT_CLASSES.index('A') and values[-1] >= 8 and mask & bit)
+    probability = sum(stats.probability(codes='Ni', starport='A', techlevel=level) for level in range(8, 16))
+    assert probability == Fraction(expected, total)
+
+
+def test_unkept_fields_cannot_be_combined():
+    stats = enumerate_worlds(load_rules('classic'))
+    assert stats.probability(size=0) == Fraction(1, 36)
+    with pytest.raises(ValueError):
+        stats.probability(size=0, population=0)
+
+
+def test_samples_converge_on_the_exact_values():
+    pytest.importorskip('numpy')
+    rules = load_rules('classic')
+    distances = enumerate_worlds(rules).sample_distance(generate_worlds_array(200000, seed=5, rules=rules))
+    assert max(distance for field, distance in distances.items() if field != 'trade_codes') < 0.01
+    # Spread over many more outcomes, so the sampling noise is larger
+    assert distances['trade_codes'] < 0.02
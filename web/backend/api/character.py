@@ -56,6 +56,7 @@ async def generate_characters(request: CharacterGenerationRequest):
         for char_dict in character_dicts:
             character_models.append(Character(
                 name=char_dict.get("name", ""),
+                pronunciation=char_dict.get("pronunciation", ""),
                 upp=char_dict.get("upp", []),
                 upp_string=char_dict.get("upp_string", ""),
                 gender=char_dict.get("gender", ""),
@@ -69,7 +70,8 @@ async def generate_characters(request: CharacterGenerationRequest):
                 weapons=char_dict.get("weapons", ""),
                 armor=char_dict.get("armor", ""),
                 equipment=char_dict.get("equipment", ""),
-                cash=char_dict.get("cash", 0)
+                cash=char_dict.get("cash", 0),
+                homeworld=char_dict.get("homeworld")
             ))
         
         return CharacterGenerationResponse(
@@ -0,0 +1,104 @@
+"""
+API endpoints for procedural sector maps.
+"""
+import os
+import sys
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+# Add the project root to the Python path to import the CTchargen modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
+
+from src.lib.sector import (
+    world_at, worlds_in_region, to_global, from_global, parse_hex, sector_name, SECTOR_COLUMNS, SECTOR_ROWS
+)
+from src.lib.sectormap import iter_svg, jump_routes
+
+from web.backend.models.sector import World, RegionResponse, HexResponse
+
+# Create router
+router = APIRouter(prefix="/api/sectors", tags=["sectors"])
+
+
+def world_model(x: int, y: int, world) -> World:
+    """Convert a generated world at map-wide coordinates to a response model."""
+    sector_x, sector_y, _, _ = from_global(x, y)
+    world_dict = world.to_dict()
+    return World(
+        x=x,
+        y=y,
+        sector_x=sector_x,
+        sector_y=sector_y,
+        hex=world_dict["hex"],
+        name=world_dict["name"],
+        starport=world_dict["starport"],
+        uwp_string=world_dict["uwp_string"],
+        tradelevel=world_dict["tradelevel"],
+        trade_string=world_dict["trade_string"],
+    )
+
+
+@router.get("/region", response_model=RegionResponse)
+async def get_region(
+    seed: str = Query(..., description="Domain seed"),
+    left: int = Query(..., description="First map-wide hex column"),
+    top: int = Query(..., description="First map-wide hex row"),
+    right: int = Query(..., description="Last map-wide hex column (inclusive)"),
+    bottom: int = Query(..., description="Last map-wide hex row (inclusive)"),
+    presence: Optional[int] = Query(None, ge=1, le=7, description="Minimum 1D roll for a system"),
+):
+    """Generate the worlds visible in a rectangle of the map."""
+    try:
+        worlds = worlds_in_region(seed, left, top, right, bottom, presence)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return RegionResponse(
+        seed=seed,
+        left=left,
+        top=top,
+        right=right,
+        bottom=bottom,
+        worlds=[world_model(x, y, world) for x, y, world in worlds],
+    )
+
+
+@router.get("/{sector_x}/{sector_y}/map.svg")
+async def get_sector_map(sector_x: int, sector_y: int,
+                         seed: str = Query(..., description="Domain seed"),
+                         jump: int = Query(0, ge=0, le=6, description="Draw jump routes up to this rating"),
+                         presence: Optional[int] = Query(None, ge=1, le=7,
+                                                         description="Minimum 1D roll for a system")):
+    """Stream an SVG map of a whole sector."""
+    try:
+        left, top = to_global(sector_x, sector_y, 1, 1)
+        right, bottom = to_global(sector_x, sector_y, SECTOR_COLUMNS, SECTOR_ROWS)
+        worlds = worlds_in_region(seed, left, top, right, bottom, presence)
+        routes = jump_routes(worlds, jump) if jump else ()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    title = f"{sector_name(seed, sector_x, sector_y)} Sector"
+    
+    return StreamingResponse(iter_svg(worlds, (left, top, right, bottom), routes, title),
+                             media_type="image/svg+xml")
+
+
+@router.get("/{sector_x}/{sector_y}/{hex_number}", response_model=HexResponse)
+async def get_hex(sector_x: int, sector_y: int, hex_number: str,
+                  seed: str = Query(..., description="Domain seed"),
+                  presence: Optional[int] = Query(None, ge=1, le=7,
+                                                  description="Minimum 1D roll for a system")):
+    """Get the world in a single hex."""
+    try:
+        column, row = parse_hex(hex_number)
+        world = world_at(seed, sector_x, sector_y, hex_number, presence)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if world is None:
+        return HexResponse(seed=seed)
+    
+    x, y = to_global(sector_x, sector_y, column, row)
+    return HexResponse(seed=seed, world=world_model(x, y, world))
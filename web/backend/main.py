@@ -40,9 +40,11 @@ async def health_check():
 
 # Import and include API routers
 from web.backend.api.character import router as character_router
+from web.backend.api.sector import router as sector_router
 
 # Include routers
 app.include_router(character_router)
+app.include_router(sector_router)
 
 if __name__ == "__main__":
     # Run the API server
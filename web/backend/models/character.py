@@ -23,6 +23,7 @@ class CharacterSkill(BaseModel):
 class Character(BaseModel):
     """Model for a character."""
     name: str
+    pronunciation: str = ""
     upp: Dict[str, int]
     upp_string: str
     gender: str
@@ -37,6 +38,7 @@ class Character(BaseModel):
     armor: str
     equipment: List[str]
     cash: int
+    homeworld: Optional[Dict[str, Any]] = None
 
 
 class CharacterGenerationResponse(BaseModel):
@@ -0,0 +1,35 @@
+"""
+Pydantic models for sector maps.
+"""
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+class World(BaseModel):
+    """Model for a world in a hex."""
+    x: int = Field(..., description="Map-wide hex column")
+    y: int = Field(..., description="Map-wide hex row")
+    sector_x: int
+    sector_y: int
+    hex: str
+    name: str
+    starport: str
+    uwp_string: str
+    tradelevel: List[str]
+    trade_string: str
+
+
+class RegionResponse(BaseModel):
+    """Response model for the worlds in a map region."""
+    seed: str
+    left: int
+    top: int
+    right: int
+    bottom: int
+    worlds: List[World]
+
+
+class HexResponse(BaseModel):
+    """Response model for a single hex."""
+    seed: str
+    world: Optional[World] = None